@@ -0,0 +1,148 @@
+"""
+Batched bridge actions
+Collects several bridge actions and sends them to bridge.js in one /batch request
+"""
+
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _status_of(error: Exception) -> Optional[int]:
+    """HTTP-style status carried by an HTTP or stream error, if any"""
+    response = getattr(error, 'response', None)
+    if response is not None:
+        return response.status_code
+    return getattr(error, 'status', None)
+
+
+class BatchResult:
+    """Result of one action in a batch, filled in when the batch is sent"""
+
+    def __init__(self, action: str, params: Dict[str, Any]):
+        self.action = action
+        self.params = params
+        self.success: Optional[bool] = None
+        self.data: Dict[str, Any] = {}
+        self.error: Optional[str] = None
+
+    @property
+    def message_id(self) -> Optional[str]:
+        return self.data.get('messageId')
+
+    def _resolve(self, result: Dict[str, Any]) -> None:
+        self.success = bool(result.get('success'))
+        self.error = result.get('error')
+        self.data = {k: v for k, v in result.items() if k not in ('success', 'error')}
+
+    def __repr__(self) -> str:
+        return f"BatchResult({self.action!r}, success={self.success}, error={self.error!r})"
+
+
+class BridgeBatch:
+    """
+    Ordered list of bridge actions sent in a single round trip
+
+    Use through ``WhatsAppBridgeClient.batch()``; the actions are sent when
+    the ``with`` block exits, even if it raised, so actions already decided
+    on are not lost. bridge.js runs them in order and reports each result.
+    Against a bridge without ``/batch`` the actions fall back to one request
+    each.
+    """
+
+    def __init__(self, client, stop_on_error: bool = False):
+        """
+        Args:
+            client: WhatsAppBridgeClient to send through
+            stop_on_error: Skip the remaining actions after the first failure
+        """
+        self.client = client
+        self.stop_on_error = stop_on_error
+        self.results: List[BatchResult] = []
+        self.sent = False
+
+    def _add(self, action: str, **params) -> BatchResult:
+        if self.sent:
+            raise RuntimeError('Batch already sent')
+        result = BatchResult(action, params)
+        self.results.append(result)
+        return result
+
+    def send_message(self, chat_id: str, message: str) -> BatchResult:
+        return self._add('send-message', chatId=chat_id, message=message)
+
+    def send_mention(self, chat_id: str, message: str, mention_ids: List[str]) -> BatchResult:
+        return self._add('send-mention', chatId=chat_id, message=message, mentionIds=mention_ids)
+
+    def delete_message(self, chat_id: str, message_id: str) -> BatchResult:
+        return self._add('delete-message', chatId=chat_id, messageId=message_id)
+
+    def remove_participant(self, group_id: str, participant_id: str) -> BatchResult:
+        return self._add('remove-participant', groupId=group_id, participantId=participant_id)
+
+    def promote_participant(self, group_id: str, participant_id: str) -> BatchResult:
+        return self._add('promote-participant', groupId=group_id, participantId=participant_id)
+
+    def demote_participant(self, group_id: str, participant_id: str) -> BatchResult:
+        return self._add('demote-participant', groupId=group_id, participantId=participant_id)
+
+    def execute(self) -> List[BatchResult]:
+        """
+        Send the queued actions (once)
+
+        Returns:
+            Per-action results in submission order
+        """
+        if self.sent or not self.results:
+            self.sent = True
+            return self.results
+        self.sent = True
+        payload = {
+            'actions': [{'action': r.action, 'params': r.params} for r in self.results],
+            'stopOnError': self.stop_on_error,
+        }
+        try:
+            response = self.client._request('POST', '/batch', json=payload, timeout=30)
+            for result, outcome in zip(self.results, response.get('results', [])):
+                result._resolve(outcome)
+        except Exception as e:
+            if _status_of(e) == 404:
+                logger.info("Bridge has no /batch route, sending actions one by one")
+                self._execute_sequentially()
+                return self.results
+            logger.error(f"Failed to send bridge batch: {e}")
+            for result in self.results:
+                if result.success is None:
+                    result._resolve({'success': False, 'error': str(e)})
+        return self.results
+
+    def _execute_sequentially(self) -> None:
+        calls: Dict[str, Callable[..., Any]] = {
+            'send-message': lambda p: self.client._request('POST', '/send-message', json=p, timeout=10),
+            'send-mention': lambda p: self.client._request('POST', '/send-mention', json=p, timeout=10),
+            'delete-message': lambda p: self.client._request('POST', '/delete-message', json=p, timeout=10),
+            'remove-participant': lambda p: self.client._request(
+                'POST', f"/group/{p['groupId']}/remove", json={'participantId': p['participantId']}, timeout=10),
+            'promote-participant': lambda p: self.client._request(
+                'POST', f"/group/{p['groupId']}/promote", json={'participantId': p['participantId']}, timeout=10),
+            'demote-participant': lambda p: self.client._request(
+                'POST', f"/group/{p['groupId']}/demote", json={'participantId': p['participantId']}, timeout=10),
+        }
+        failed = False
+        for result in self.results:
+            if failed and self.stop_on_error:
+                result._resolve({'success': False, 'error': 'skipped', 'skipped': True})
+                continue
+            try:
+                result._resolve({'success': True, **(calls[result.action](result.params) or {})})
+            except Exception as e:
+                failed = True
+                result._resolve({'success': False, 'error': str(e)})
+
+    def __enter__(self) -> 'BridgeBatch':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.execute()
+        return False
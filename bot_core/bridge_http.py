@@ -0,0 +1,123 @@
+"""
+Keep-alive HTTP session for bridge calls
+Pooled connections, retry policy and per-endpoint timeouts for the Node.js bridge
+"""
+
+import logging
+import os
+import threading
+from typing import Any, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+BRIDGE_POOL_SIZE = int(os.getenv('BRIDGE_POOL_SIZE', '20'))
+BRIDGE_RETRIES = int(os.getenv('BRIDGE_RETRIES', '2'))
+BRIDGE_RETRY_BACKOFF = float(os.getenv('BRIDGE_RETRY_BACKOFF', '0.2'))
+# Comma-separated "path-prefix=seconds" overrides, e.g. "/send-media=60,/call=45"
+BRIDGE_TIMEOUTS = os.getenv('BRIDGE_TIMEOUTS', '')
+
+
+def parse_timeouts(spec: str) -> Dict[str, float]:
+    """Parse a "prefix=seconds,prefix=seconds" timeout spec"""
+    timeouts: Dict[str, float] = {}
+    for part in spec.split(','):
+        prefix, sep, seconds = part.strip().partition('=')
+        if not sep:
+            continue
+        try:
+            timeouts[prefix.strip()] = float(seconds)
+        except ValueError:
+            logger.warning(f"⚠️ Ignoring invalid bridge timeout '{part}'")
+    return timeouts
+
+
+class BridgeSession:
+    """
+    Pooled keep-alive session to the bridge
+
+    Connection errors are retried for every method (nothing reached the
+    bridge), while read errors and 502/503/504 responses are only retried for
+    GETs so a send is never duplicated. Per-endpoint timeouts override the
+    caller's default by longest matching path prefix.
+    """
+
+    def __init__(self, base_url: str, pool_size: int = BRIDGE_POOL_SIZE, retries: int = BRIDGE_RETRIES,
+                 backoff_factor: float = BRIDGE_RETRY_BACKOFF, timeouts: Optional[Dict[str, float]] = None):
+        """
+        Args:
+            base_url: Bridge base URL
+            pool_size: Maximum keep-alive connections to the bridge
+            retries: Retry attempts for failed requests
+            backoff_factor: Exponential backoff factor between retries
+            timeouts: Path prefix -> timeout overrides (defaults to BRIDGE_TIMEOUTS)
+        """
+        self.base_url = base_url.rstrip('/')
+        self.timeouts = parse_timeouts(BRIDGE_TIMEOUTS) if timeouts is None else dict(timeouts)
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset(['GET', 'HEAD']),
+            raise_on_status=False,
+        )
+        self.adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount('http://', self.adapter)
+        self.session.mount('https://', self.adapter)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+
+    def timeout_for(self, path: str, default: float) -> float:
+        """Timeout for a path: the longest matching override, else ``default``"""
+        best = None
+        for prefix in self.timeouts:
+            if path.startswith(prefix) and (best is None or len(prefix) > len(best)):
+                best = prefix
+        return self.timeouts[best] if best is not None else default
+
+    def request(self, method: str, path: str, timeout: float = 10, **kwargs) -> requests.Response:
+        """
+        Send a request to the bridge over a pooled connection
+
+        Args:
+            method: HTTP method
+            path: Path below the bridge URL
+            timeout: Default timeout for this call
+
+        Returns:
+            The response (status is not checked)
+        """
+        with self._lock:
+            self.requests += 1
+        try:
+            return self.session.request(method, f"{self.base_url}{path}",
+                                        timeout=self.timeout_for(path, timeout), **kwargs)
+        except requests.RequestException:
+            with self._lock:
+                self.errors += 1
+            raise
+
+    def stats(self) -> Dict[str, Any]:
+        """Request count, connections opened and the resulting reuse ratio"""
+        pools = list(self.adapter.poolmanager.pools._container.values())
+        opened = sum(pool.num_connections for pool in pools)
+        with self._lock:
+            sent, errors = self.requests, self.errors
+        return {
+            'requests': sent,
+            'errors': errors,
+            'connections_opened': opened,
+            'connection_reuse': round(1 - opened / sent, 4) if sent else 0.0,
+        }
+
+    def close(self) -> None:
+        """Close every pooled connection"""
+        self.session.close()
@@ -0,0 +1,293 @@
+"""
+Persistent stream channel to the WhatsApp bridge
+One long-lived socket carrying both bridge events and action RPCs, correlated by id
+"""
+
+import itertools
+import json
+import logging
+import os
+import re
+import socket
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# "unix:/run/rose/bridge.sock" or "tcp:127.0.0.1:3001"; empty keeps the HTTP-only transport
+BRIDGE_STREAM = os.getenv('BRIDGE_STREAM', '')
+BRIDGE_STREAM_RECONNECT_MAX = float(os.getenv('BRIDGE_STREAM_RECONNECT_MAX', '30'))
+
+# Frames are compact JSON objects, one per line:
+#   request   {"t":"q","i":7,"a":"send-message","d":{...}}   Python -> bridge
+#   event     {"t":"e","i":3,"d":{...webhook payload...}}    bridge -> Python
+#   response  {"t":"r","i":7,"ok":true,"d":{...}}            answers a q (or an e)
+#             {"t":"r","i":7,"ok":false,"e":"message","s":503}
+
+
+class BridgeStreamError(RuntimeError):
+    """The bridge answered an RPC with an error"""
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+def parse_address(address: str) -> Tuple[int, Any]:
+    """
+    Parse a stream address
+
+    Args:
+        address: "unix:<path>" or "tcp:<host>:<port>"
+
+    Returns:
+        (socket family, connect address)
+    """
+    scheme, _, rest = address.partition(':')
+    if scheme == 'unix' and rest:
+        return socket.AF_UNIX, rest
+    if scheme == 'tcp':
+        host, _, port = rest.rpartition(':')
+        if host and port.isdigit():
+            return socket.AF_INET, (host, int(port))
+    raise ValueError(f"Invalid bridge stream address: {address!r}")
+
+
+_PARTICIPANT_PATH = re.compile(r'^/group/([^/]+)/(remove|promote|demote)$')
+_STREAM_ROUTES = {
+    '/send-message': 'send-message',
+    '/send-mention': 'send-mention',
+    '/delete-message': 'delete-message',
+    '/batch': 'batch',
+}
+
+
+def stream_action(method: str, path: str, body: Optional[Dict[str, Any]]) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """
+    Map an HTTP bridge call onto a stream action
+
+    Returns:
+        (action, data), or None if the call has no stream equivalent and must use HTTP
+    """
+    if method != 'POST':
+        return None
+    if path in _STREAM_ROUTES:
+        return _STREAM_ROUTES[path], dict(body or {})
+    match = _PARTICIPANT_PATH.match(path)
+    if match:
+        return f"{match.group(2)}-participant", {'groupId': match.group(1), **(body or {})}
+    return None
+
+
+def encode_frame(frame: Dict[str, Any]) -> bytes:
+    return json.dumps(frame, separators=(',', ':'), ensure_ascii=False).encode('utf-8') + b'\n'
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.response: Optional[Dict[str, Any]] = None
+
+
+class BridgeStream:
+    """
+    Auto-reconnecting stream client
+
+    A reader thread keeps the connection open, reconnecting with exponential
+    backoff (capped at ``reconnect_max``). Incoming events are passed to
+    ``on_event``, whose boolean result is acknowledged so the bridge can back
+    off when the bot is busy. RPCs in flight when the connection drops fail
+    with ConnectionError; callers fall back to HTTP while disconnected.
+    """
+
+    def __init__(self, address: str, on_event: Callable[[Dict[str, Any]], bool],
+                 connect_timeout: float = 5, reconnect_min: float = 0.5,
+                 reconnect_max: float = BRIDGE_STREAM_RECONNECT_MAX):
+        """
+        Args:
+            address: "unix:<path>" or "tcp:<host>:<port>"
+            on_event: Callable receiving event payloads; returns False to ask for a retry
+            connect_timeout: Seconds to wait for a connection
+            reconnect_min: First reconnect delay in seconds
+            reconnect_max: Longest reconnect delay in seconds
+        """
+        self.address = address
+        self.family, self.target = parse_address(address)
+        self.on_event = on_event
+        self.connect_timeout = connect_timeout
+        self.reconnect_min = reconnect_min
+        self.reconnect_max = reconnect_max
+        self._sock: Optional[socket.socket] = None
+        self._write_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._calls: Dict[int, _Call] = {}
+        self._connected = threading.Event()
+        self._closed = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.requests = 0
+        self.events = 0
+        self.connects = 0
+
+    @property
+    def connected(self) -> bool:
+        return self._connected.is_set()
+
+    def start(self) -> None:
+        """Start the connection thread (idempotent)"""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name='bridge-stream', daemon=True)
+            self._thread.start()
+
+    def wait_connected(self, timeout: Optional[float] = None) -> bool:
+        return self._connected.wait(timeout)
+
+    def _run(self) -> None:
+        delay = self.reconnect_min
+        while not self._closed.is_set():
+            try:
+                sock = socket.socket(self.family, socket.SOCK_STREAM)
+                sock.settimeout(self.connect_timeout)
+                sock.connect(self.target)
+                sock.settimeout(None)
+                if self.family == socket.AF_INET:
+                    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            except OSError as e:
+                logger.debug(f"Bridge stream connect to {self.address} failed: {e}")
+                self._closed.wait(delay)
+                delay = min(delay * 2, self.reconnect_max)
+                continue
+
+            delay = self.reconnect_min
+            with self._lock:
+                self._sock = sock
+                self.connects += 1
+            self._connected.set()
+            logger.info(f"🔌 Bridge stream connected to {self.address}")
+            try:
+                self._read(sock)
+            except OSError as e:
+                if not self._closed.is_set():
+                    logger.warning(f"⚠️ Bridge stream connection lost: {e}")
+            finally:
+                self._disconnect(sock)
+
+    def _read(self, sock: socket.socket) -> None:
+        reader = sock.makefile('rb')
+        for line in reader:
+            try:
+                frame = json.loads(line)
+            except ValueError:
+                frame = None
+            if not isinstance(frame, dict):
+                logger.warning("⚠️ Ignoring malformed bridge stream frame")
+                continue
+            kind = frame.get('t')
+            if kind == 'r':
+                with self._lock:
+                    call = self._calls.pop(frame.get('i'), None)
+                if call is not None:
+                    call.response = frame
+                    call.done.set()
+            elif kind == 'e':
+                self._handle_event(frame)
+
+    def _handle_event(self, frame: Dict[str, Any]) -> None:
+        self.events += 1
+        try:
+            accepted = bool(self.on_event(frame.get('d') or {}))
+        except Exception as e:
+            logger.error(f"Error handling bridge stream event: {e}", exc_info=True)
+            accepted = True  # a handler bug should not make the bridge redeliver forever
+        reply = {'t': 'r', 'i': frame.get('i'), 'ok': accepted}
+        if not accepted:
+            reply['s'] = 503
+        try:
+            self._write(reply)
+        except OSError:
+            pass
+
+    def _disconnect(self, sock: socket.socket) -> None:
+        self._connected.clear()
+        with self._lock:
+            if self._sock is sock:
+                self._sock = None
+            calls, self._calls = self._calls, {}
+        try:
+            sock.close()
+        except OSError:
+            pass
+        for call in calls.values():
+            call.done.set()
+
+    def _write(self, frame: Dict[str, Any]) -> None:
+        sock = self._sock
+        if sock is None:
+            raise ConnectionError('Bridge stream is not connected')
+        with self._write_lock:
+            sock.sendall(encode_frame(frame))
+
+    def call(self, action: str, data: Optional[Dict[str, Any]] = None, timeout: float = 10) -> Dict[str, Any]:
+        """
+        Run a bridge action over the stream
+
+        Args:
+            action: Bridge action name (e.g. 'send-message', 'batch')
+            data: Action parameters
+            timeout: Seconds to wait for the response
+
+        Returns:
+            The action's result
+
+        Raises:
+            ConnectionError: Not connected, or the connection dropped mid-call
+            TimeoutError: No response within ``timeout``
+            BridgeStreamError: The bridge reported an error
+        """
+        call_id = next(self._ids)
+        call = _Call()
+        with self._lock:
+            self._calls[call_id] = call
+            self.requests += 1
+        try:
+            self._write({'t': 'q', 'i': call_id, 'a': action, 'd': data or {}})
+        except OSError as e:
+            with self._lock:
+                self._calls.pop(call_id, None)
+            raise ConnectionError(f"Bridge stream write failed: {e}") from e
+
+        if not call.done.wait(timeout):
+            with self._lock:
+                self._calls.pop(call_id, None)
+            raise TimeoutError(f"Bridge stream call {action} timed out after {timeout}s")
+        response = call.response
+        if response is None:
+            raise ConnectionError('Bridge stream disconnected during call')
+        if not response.get('ok'):
+            raise BridgeStreamError(response.get('e') or 'Unknown error', response.get('s'))
+        return response.get('d') or {}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'address': self.address,
+                'connected': self.connected,
+                'connects': self.connects,
+                'requests': self.requests,
+                'events': self.events,
+                'in_flight': len(self._calls),
+            }
+
+    def close(self) -> None:
+        """Close the connection and stop reconnecting"""
+        self._closed.set()
+        sock = self._sock
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        if self._thread is not None:
+            self._thread.join(timeout=5)
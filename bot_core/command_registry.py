@@ -0,0 +1,191 @@
+"""
+Declarative command registry
+Maps command names and aliases to handlers with their admin and group-only requirements
+"""
+
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+
+class CommandContext:
+    """
+    One command invocation
+
+    ``is_admin()`` asks the platform at most once, and only when something
+    actually needs the answer.
+    """
+
+    def __init__(self, actions, command: str, args: str, from_id: str, chat_id: str,
+                 is_group: bool, message: dict):
+        self.actions = actions
+        self.command = command
+        self.args = args
+        self.from_id = from_id
+        self.chat_id = chat_id
+        self.is_group = is_group
+        self.message = message
+        self._is_admin: Optional[bool] = None
+
+    @property
+    def quoted_msg(self):
+        return self.message.get('quotedMsg')
+
+    def is_admin(self) -> bool:
+        if self._is_admin is None:
+            self._is_admin = bool(self.actions.is_admin(self.chat_id, self.from_id))
+        return self._is_admin
+
+
+Handler = Callable[[Any, CommandContext], None]
+
+
+@dataclass(frozen=True)
+class CommandSpec:
+    """
+    A command: handler(logic, ctx) plus the checks that gate it
+
+    ``unit_of_work`` runs the handler inside the event's unit of work; it is
+    off for handlers that wait on a slow network call.
+    """
+    name: str
+    handler: Handler
+    admin: bool = False
+    group_only: bool = False
+    aliases: Tuple[str, ...] = ()
+    unit_of_work: bool = True
+
+
+class CommandRegistry:
+    """Command specs indexed by name and alias"""
+
+    def __init__(self, specs: Iterable[CommandSpec] = ()):
+        self._specs: Dict[str, CommandSpec] = {}
+        self._index: Dict[str, CommandSpec] = {}
+        for spec in specs:
+            self.register(spec)
+
+    def register(self, spec: CommandSpec) -> CommandSpec:
+        """
+        Add a command
+
+        Raises:
+            ValueError: If the name or an alias is already taken
+        """
+        for key in (spec.name, *spec.aliases):
+            if key in self._index:
+                raise ValueError(f"Command /{key} is already registered")
+        self._specs[spec.name] = spec
+        for key in (spec.name, *spec.aliases):
+            self._index[key] = spec
+        return spec
+
+    def command(self, name: str, admin: bool = False, group_only: bool = False,
+                aliases: Tuple[str, ...] = (), unit_of_work: bool = True) -> Callable[[Handler], Handler]:
+        """Decorator registering ``handler(logic, ctx)`` as a command"""
+        def decorator(handler: Handler) -> Handler:
+            self.register(CommandSpec(name, handler, admin=admin, group_only=group_only, aliases=aliases,
+                                      unit_of_work=unit_of_work))
+            return handler
+        return decorator
+
+    def get(self, name: str) -> Optional[CommandSpec]:
+        """Spec for a command name or alias"""
+        return self._index.get(name)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._index
+
+    def __iter__(self) -> Iterator[CommandSpec]:
+        return iter(self._specs.values())
+
+    def __len__(self) -> int:
+        return len(self._specs)
+
+    def help_table(self, texts: Dict[str, Dict[str, Dict[str, str]]], fallback_lang: str = 'en') -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """
+        Build per-language help entries for every registered command
+
+        Args:
+            texts: lang -> command -> {'usage', 'desc', 'example'}
+            fallback_lang: Language used when a command has no text in another
+
+        Returns:
+            lang -> command (and alias) -> {'usage', 'desc', 'example', 'admin'}
+            for every command that has help text
+        """
+        table: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for lang, lang_texts in texts.items():
+            entries: Dict[str, Dict[str, Any]] = {}
+            for spec in self:
+                text = lang_texts.get(spec.name) or texts.get(fallback_lang, {}).get(spec.name)
+                if not text:
+                    continue  # undocumented commands stay out of /help
+                entry = {
+                    'usage': text['usage'],
+                    'desc': text['desc'],
+                    'example': text['example'],
+                    'admin': spec.admin,
+                }
+                for key in (spec.name, *spec.aliases):
+                    entries[key] = entry
+            table[lang] = entries
+        return table
+
+
+COMMANDS = CommandRegistry([
+    # General
+    CommandSpec('start', lambda bot, c: bot.cmd_start(c.chat_id)),
+    # Nobody is an admin in a private chat, so /help there never asks the platform
+    CommandSpec('help', lambda bot, c: bot.cmd_help(c.chat_id, c.from_id, lambda: c.is_group and c.is_admin(), c.args)),
+    CommandSpec('info', lambda bot, c: bot.cmd_info(c.chat_id, c.from_id)),
+    CommandSpec('ping', lambda bot, c: bot.cmd_ping(c.chat_id)),
+
+    # Rules
+    CommandSpec('rules', lambda bot, c: bot.cmd_rules(c.chat_id)),
+    CommandSpec('setrules', lambda bot, c: bot.cmd_setrules(c.chat_id, c.args), admin=True),
+
+    # Warns
+    CommandSpec('warn', lambda bot, c: bot.cmd_warn(c.chat_id, c.from_id, c.args, c.message), admin=True, group_only=True),
+    CommandSpec('warns', lambda bot, c: bot.cmd_warns(c.chat_id, c.from_id, c.message, c.args)),
+    CommandSpec('resetwarns', lambda bot, c: bot.cmd_resetwarns(c.chat_id, c.message, c.args), admin=True, group_only=True),
+    CommandSpec('setwarn', lambda bot, c: bot.cmd_setwarn(c.chat_id, c.args), admin=True),
+
+    # Members
+    CommandSpec('kick', lambda bot, c: bot.cmd_kick(c.chat_id, c.message, c.args), admin=True, group_only=True),
+    CommandSpec('ban', lambda bot, c: bot.cmd_ban(c.chat_id, c.message, c.args), admin=True, group_only=True),
+    CommandSpec('unban', lambda bot, c: bot.cmd_unban(c.chat_id, c.args), admin=True, group_only=True),
+    CommandSpec('role', lambda bot, c: bot.cmd_role(c.chat_id, c.message, c.args), group_only=True),
+    CommandSpec('add', lambda bot, c: bot.cmd_add(c.chat_id, c.args), admin=True, group_only=True),
+    CommandSpec('invite', lambda bot, c: bot.cmd_invite(c.chat_id), admin=True, group_only=True),
+    CommandSpec('delcmds', lambda bot, c: bot.cmd_delcmds(c.chat_id, c.args), admin=True),
+
+    # Welcome
+    CommandSpec('welcome', lambda bot, c: bot.cmd_welcome(c.chat_id)),
+    CommandSpec('setwelcome', lambda bot, c: bot.cmd_setwelcome(c.chat_id, c.args), admin=True),
+
+    # Blacklist
+    CommandSpec('blacklist', lambda bot, c: bot.cmd_blacklist(c.chat_id)),
+    CommandSpec('addblacklist', lambda bot, c: bot.cmd_addblacklist(c.chat_id, c.args, c.message), admin=True),
+    CommandSpec('rmblacklist', lambda bot, c: bot.cmd_rmblacklist(c.chat_id, c.args), admin=True),
+
+    # Locks
+    CommandSpec('lock', lambda bot, c: bot.cmd_lock(c.chat_id, c.args), admin=True),
+    CommandSpec('unlock', lambda bot, c: bot.cmd_unlock(c.chat_id, c.args), admin=True),
+    CommandSpec('locks', lambda bot, c: bot.cmd_locks(c.chat_id)),
+
+    # Language
+    CommandSpec('lang', lambda bot, c: bot.cmd_setlang(c.chat_id, c.args), admin=True),
+    CommandSpec('setlang', lambda bot, c: bot.cmd_setlang(c.chat_id, c.args), admin=True),
+
+    # AI moderation
+    CommandSpec('aimod', lambda bot, c: bot.cmd_aimod(c.chat_id, c.args), admin=True),
+    CommandSpec('aimodstatus', lambda bot, c: bot.cmd_aimodstatus(c.chat_id)),
+    CommandSpec('aimodset', lambda bot, c: bot.cmd_aimodset(c.chat_id, c.args), admin=True),
+    CommandSpec('aimodkey', lambda bot, c: bot.cmd_aimodkey(c.chat_id, c.args), admin=True),
+    CommandSpec('aimodbackend', lambda bot, c: bot.cmd_aimodbackend(c.chat_id, c.args), admin=True),
+    CommandSpec('aimodaction', lambda bot, c: bot.cmd_aimodaction(c.chat_id, c.args), admin=True),
+    CommandSpec('aimodthreshold', lambda bot, c: bot.cmd_aimodthreshold(c.chat_id, c.args), admin=True),
+    CommandSpec('aihelp', lambda bot, c: bot.cmd_aihelp(c.chat_id)),
+    CommandSpec('aitest', lambda bot, c: bot.cmd_aitest(c.chat_id, c.args, c.quoted_msg), admin=True,
+                unit_of_work=False),
+])
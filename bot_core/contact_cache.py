@@ -0,0 +1,178 @@
+"""
+Contact resolution cache for the WhatsApp bridge client
+LRU + TTL cache of /contact lookups with in-flight deduplication and batch prefetch
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CONTACT_CACHE_TTL = float(os.getenv('CONTACT_CACHE_TTL', '3600'))
+CONTACT_CACHE_SIZE = int(os.getenv('CONTACT_CACHE_SIZE', '10000'))
+
+Contact = Dict[str, Any]
+
+
+class _Pending:
+    """A fetch in progress that other callers can wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.contact: Optional[Contact] = None
+
+
+class ContactCache:
+    """
+    Thread-safe contact cache
+
+    Concurrent lookups of the same id share one bridge request. Failed
+    lookups (None) are not cached so they are retried next time.
+    ``prefetch`` resolves every missing id with a single ``fetch_many`` call.
+    """
+
+    def __init__(self, fetch_one: Callable[[str], Optional[Contact]],
+                 fetch_many: Optional[Callable[[List[str]], Dict[str, Contact]]] = None,
+                 ttl: float = CONTACT_CACHE_TTL, max_size: int = CONTACT_CACHE_SIZE,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            fetch_one: Callable fetching one contact (None on failure)
+            fetch_many: Callable fetching several contacts, returning {id: contact}
+            ttl: Seconds a contact stays valid
+            max_size: Maximum contacts kept in memory
+            clock: Monotonic time source
+        """
+        self.fetch_one = fetch_one
+        self.fetch_many = fetch_many
+        self.ttl = ttl
+        self.max_size = max_size
+        self.clock = clock
+        self._entries: "OrderedDict[str, Tuple[Contact, float]]" = OrderedDict()
+        self._pending: Dict[str, _Pending] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _cached_locked(self, contact_id: str, now: float) -> Optional[Contact]:
+        entry = self._entries.get(contact_id)
+        if entry is None:
+            return None
+        contact, stored_at = entry
+        if now - stored_at >= self.ttl:
+            del self._entries[contact_id]
+            return None
+        self._entries.move_to_end(contact_id)
+        return contact
+
+    def _store_locked(self, contact_id: str, contact: Contact, now: float) -> None:
+        self._entries[contact_id] = (contact, now)
+        self._entries.move_to_end(contact_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def _claim(self, contact_ids: Iterable[str]) -> Tuple[Dict[str, Contact], Dict[str, _Pending], Dict[str, _Pending]]:
+        """Split ids into cached, already in flight elsewhere, and claimed by this caller"""
+        cached: Dict[str, Contact] = {}
+        waiting: Dict[str, _Pending] = {}
+        claimed: Dict[str, _Pending] = {}
+        now = self.clock()
+        with self._lock:
+            for contact_id in contact_ids:
+                if contact_id in cached or contact_id in waiting or contact_id in claimed:
+                    continue
+                contact = self._cached_locked(contact_id, now)
+                if contact is not None:
+                    self.hits += 1
+                    cached[contact_id] = contact
+                elif contact_id in self._pending:
+                    self.hits += 1
+                    waiting[contact_id] = self._pending[contact_id]
+                else:
+                    self.misses += 1
+                    claimed[contact_id] = self._pending[contact_id] = _Pending()
+        return cached, waiting, claimed
+
+    def _resolve(self, claimed: Dict[str, _Pending], fetched: Dict[str, Optional[Contact]]) -> None:
+        now = self.clock()
+        with self._lock:
+            for contact_id, pending in claimed.items():
+                contact = fetched.get(contact_id)
+                if contact is not None:
+                    self._store_locked(contact_id, contact, now)
+                pending.contact = contact
+                self._pending.pop(contact_id, None)
+        for pending in claimed.values():
+            pending.done.set()
+
+    def get(self, contact_id: str, timeout: Optional[float] = 15) -> Optional[Contact]:
+        """
+        Get a contact, fetching it once even if many threads ask at the same time
+
+        Args:
+            contact_id: WhatsApp id
+            timeout: Seconds to wait for another caller's in-flight request
+
+        Returns:
+            Contact dict or None if it could not be resolved
+        """
+        return self.get_many([contact_id], timeout=timeout).get(contact_id)
+
+    def get_many(self, contact_ids: Iterable[str], timeout: Optional[float] = 15) -> Dict[str, Contact]:
+        """
+        Get several contacts with at most one bridge request for the missing ones
+
+        Args:
+            contact_ids: WhatsApp ids
+            timeout: Seconds to wait for other callers' in-flight requests
+
+        Returns:
+            Dict of id -> contact for every id that could be resolved
+        """
+        ids = [contact_id for contact_id in contact_ids if contact_id]
+        cached, waiting, claimed = self._claim(ids)
+
+        if claimed:
+            fetched: Dict[str, Optional[Contact]] = {}
+            try:
+                missing = list(claimed)
+                if len(missing) > 1 and self.fetch_many is not None:
+                    fetched = dict(self.fetch_many(missing) or {})
+                else:
+                    fetched = {contact_id: self.fetch_one(contact_id) for contact_id in missing}
+            except Exception as e:
+                logger.debug(f"Failed to fetch contacts {claimed.keys()}: {e}")
+            finally:
+                self._resolve(claimed, fetched)
+            cached.update({k: v for k, v in fetched.items() if v is not None and k in claimed})
+
+        for contact_id, pending in waiting.items():
+            if pending.done.wait(timeout) and pending.contact is not None:
+                cached[contact_id] = pending.contact
+        return cached
+
+    def prefetch(self, contact_ids: Iterable[str]) -> int:
+        """
+        Warm the cache for ids that are about to be displayed
+
+        Returns:
+            Number of ids that are now cached
+        """
+        return len(self.get_many(contact_ids))
+
+    def invalidate(self, contact_id: str) -> None:
+        """Forget a contact (e.g. after a name change)"""
+        with self._lock:
+            self._entries.pop(contact_id, None)
+
+    def clear(self) -> None:
+        """Forget every contact"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -9,10 +9,16 @@ Backend:
 import re
 import logging
 import os
-from typing import Dict, Optional, List
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, List, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
+from .moderation_batcher import MODERATION_BATCH_TIMEOUT, MicroBatcher, batching_enabled
+from .moderation_cache import CachedVerdict, VerdictCache, get_verdict_cache
+
 logger = logging.getLogger(__name__)
 
 
@@ -46,15 +52,18 @@ class ContentModerator:
     - openai: OpenAI Moderation API
     """
     
-    def __init__(self, backend: str = 'openai', api_key: Optional[str] = None):
+    def __init__(self, backend: str = 'openai', api_key: Optional[str] = None,
+                 verdict_cache: Optional[VerdictCache] = None):
         """
         Initialize content moderator
         
         Args:
             backend: Moderation backend ('openai')
             api_key: OpenAI API key
+            verdict_cache: Cache of raw verdicts (defaults to the shared cache)
         """
         self.backend = backend
+        self.verdict_cache = verdict_cache if verdict_cache is not None else get_verdict_cache()
         self.api_key = api_key or os.getenv(f'{backend.upper()}_API_KEY')
         self.ai_model = None
         self.client = None
@@ -65,6 +74,9 @@ class ContentModerator:
             logger.warning(f"Only OpenAI is supported. Switching backend '{backend}' to 'openai'.")
         self.backend = 'openai'
         self._init_openai()
+        self.batcher: Optional[MicroBatcher] = None
+        if self.client is not None and batching_enabled():
+            self.batcher = MicroBatcher(self._fetch_openai_batch, name='openai-moderation')
         
         # Spam keywords (rule-based) - Hebrew + English
         self.spam_keywords_en = [
@@ -308,102 +320,129 @@ class ContentModerator:
     
     def _check_openai(self, text: str, thresholds: Dict[str, float]) -> ModerationResult:
         """Check with OpenAI Moderation API (English only)"""
-        try:
-            if self.openai_client_type == "new":
-                response = self.client.moderations.create(
-                    model="omni-moderation-latest",
-                    input=text,
+        cache = self.verdict_cache
+        verdict = cache.get(self.backend, text) if cache is not None else None
+        if verdict is None:
+            try:
+                verdict = self._fetch_openai(text)
+            except Exception as e:
+                logger.error(f"OpenAI API error: {e}")
+                return ModerationResult(
+                    is_flagged=False,
+                    violation_type=None,
+                    confidence=0.0,
+                    reason="OpenAI backend error",
+                    scores={}
                 )
-                result = response.results[0]
-                categories = result.categories
-                category_scores = result.category_scores
-                flagged = result.flagged
+            if cache is not None:
+                cache.put(self.backend, text, verdict)
+        return self._evaluate_verdict(verdict, thresholds)
+
+    def _fetch_openai(self, text: str) -> CachedVerdict:
+        """Get raw scores for one text, batched with concurrent callers when enabled"""
+        if self.batcher is not None:
+            return self.batcher.call(text, timeout=MODERATION_BATCH_TIMEOUT)
+        return self._fetch_openai_batch([text])[0]
+
+    def _fetch_openai_batch(self, texts: List[str]) -> List[CachedVerdict]:
+        """Send several texts in one OpenAI Moderation API request"""
+        if self.openai_client_type == "new":
+            response = self.client.moderations.create(
+                model="omni-moderation-latest",
+                input=texts,
+            )
+            results = response.results
+        else:
+            response = self.client.Moderation.create(input=texts)
+            results = response['results']
+        return [self._parse_openai_result(result) for result in results]
+
+    def _parse_openai_result(self, result) -> CachedVerdict:
+        """Extract raw scores from one OpenAI moderation result"""
+        if isinstance(result, dict):
+            categories = result['categories']
+            category_scores = result['category_scores']
+            flagged = result['flagged']
+        else:
+            categories = result.categories
+            category_scores = result.category_scores
+            flagged = result.flagged
+
+        def _score(key: str) -> float:
+            if isinstance(category_scores, dict):
+                value = category_scores.get(key, 0.0)
             else:
-                response = self.client.Moderation.create(input=text)
-                result = response['results'][0]
-                categories = result['categories']
-                category_scores = result['category_scores']
-                flagged = result['flagged']
-
-            def _score(key: str) -> float:
-                if isinstance(category_scores, dict):
-                    value = category_scores.get(key, 0.0)
-                else:
-                    attr_name = key.replace('/', '_').replace('-', '_')
-                    value = getattr(category_scores, attr_name, 0.0)
-                return float(value) if value is not None else 0.0
-
-            def _category_items():
-                if isinstance(categories, dict):
-                    return categories.items()
-                if hasattr(categories, "model_dump"):
-                    return categories.model_dump().items()
-                if hasattr(categories, "__dict__"):
-                    return categories.__dict__.items()
-                return []
-
-            raw_keys = [
-                'sexual',
-                'sexual/minors',
-                'harassment',
-                'harassment/threatening',
-                'hate',
-                'hate/threatening',
-                'illicit',
-                'illicit/violent',
-                'self-harm',
-                'self-harm/intent',
-                'self-harm/instructions',
-                'violence',
-                'violence/graphic',
-            ]
+                attr_name = key.replace('/', '_').replace('-', '_')
+                value = getattr(category_scores, attr_name, 0.0)
+            return float(value) if value is not None else 0.0
 
-            scores = {
-                key.replace('/', '_').replace('-', '_'): _score(key)
-                for key in raw_keys
-            }
+        def _category_items():
+            if isinstance(categories, dict):
+                return categories.items()
+            if hasattr(categories, "model_dump"):
+                return categories.model_dump().items()
+            if hasattr(categories, "__dict__"):
+                return categories.__dict__.items()
+            return []
 
-            # Check against thresholds
-            for category, score in scores.items():
-                threshold = thresholds.get(category, thresholds.get('toxicity', 0.7))
-                if score >= threshold:
-                    return ModerationResult(
-                        is_flagged=True,
-                        violation_type=self._map_content_type(category),
-                        confidence=score,
-                        reason=f"{category.replace('_', ' ').title()} detected (confidence: {score:.1%})",
-                        scores=scores
-                    )
+        raw_keys = [
+            'sexual',
+            'sexual/minors',
+            'harassment',
+            'harassment/threatening',
+            'hate',
+            'hate/threatening',
+            'illicit',
+            'illicit/violent',
+            'self-harm',
+            'self-harm/intent',
+            'self-harm/instructions',
+            'violence',
+            'violence/graphic',
+        ]
 
-            if flagged:
-                flagged_categories = [
-                    k.replace('/', '_').replace('-', '_')
-                    for k, v in _category_items() if v
-                ]
+        scores = {
+            key.replace('/', '_').replace('-', '_'): _score(key)
+            for key in raw_keys
+        }
+        flagged_categories = tuple(
+            k.replace('/', '_').replace('-', '_')
+            for k, v in _category_items() if v
+        ) if flagged else ()
+        return CachedVerdict(scores=scores, flagged_categories=flagged_categories)
+
+    def _evaluate_verdict(self, verdict: CachedVerdict, thresholds: Dict[str, float]) -> ModerationResult:
+        """Apply thresholds to raw backend scores"""
+        scores = dict(verdict.scores)
+
+        # Check against thresholds
+        for category, score in scores.items():
+            threshold = thresholds.get(category, thresholds.get('toxicity', 0.7))
+            if score >= threshold:
                 return ModerationResult(
-                    is_flagged=False,
-                    violation_type=None,
-                    confidence=max(scores.values()) if scores else 0.0,
-                    reason=f"Flagged by backend but below thresholds: {', '.join(flagged_categories)}",
+                    is_flagged=True,
+                    violation_type=self._map_content_type(category),
+                    confidence=score,
+                    reason=f"{category.replace('_', ' ').title()} detected (confidence: {score:.1%})",
                     scores=scores
                 )
 
+        if verdict.flagged_categories:
             return ModerationResult(
                 is_flagged=False,
                 violation_type=None,
-                confidence=0.0,
-                reason="Content passed moderation",
+                confidence=max(scores.values()) if scores else 0.0,
+                reason=f"Flagged by backend but below thresholds: {', '.join(verdict.flagged_categories)}",
                 scores=scores
             )
-        except Exception as e:
-            logger.error(f"OpenAI API error: {e}")
-            return ModerationResult(
-                is_flagged=False,
-                violation_type=None,
-                confidence=0.0,
-                reason="OpenAI backend error",
-                scores={}
-            )
+
+        return ModerationResult(
+            is_flagged=False,
+            violation_type=None,
+            confidence=0.0,
+            reason="Content passed moderation",
+            scores=scores
+        )
     
     def _check_azure(self, text: str, thresholds: Dict[str, float]) -> ModerationResult:
         """Check with Azure Content Moderator (Hebrew + English)"""
@@ -655,21 +694,152 @@ class ContentModerator:
         return []
 
 
-# Singleton instance
-_moderator_instance: Optional[ContentModerator] = None
+MODERATOR_POOL_SIZE = int(os.getenv('MODERATOR_POOL_SIZE', '64'))
+MODERATOR_IDLE_TIMEOUT = float(os.getenv('MODERATOR_IDLE_TIMEOUT', '1800'))
+
+
+class ModeratorPool:
+    """
+    Thread-safe pool of ContentModerator instances keyed by (backend, api_key)
+
+    Chats that share an API key share one moderator, and with it one warm
+    client and HTTP connection pool. Entries idle for longer than
+    ``idle_timeout`` are evicted (and their clients closed) on the next
+    lookup; the least recently used entry goes first when ``max_size`` is hit.
+    """
+
+    def __init__(self, max_size: int = MODERATOR_POOL_SIZE, idle_timeout: float = MODERATOR_IDLE_TIMEOUT,
+                 factory: Callable[..., ContentModerator] = ContentModerator,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            max_size: Maximum number of moderators kept alive
+            idle_timeout: Seconds without use before a moderator is evicted
+            factory: Callable building a moderator from (backend, api_key)
+            clock: Monotonic time source
+        """
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.factory = factory
+        self.clock = clock
+        self._entries: "OrderedDict[Tuple[str, Optional[str]], Tuple[ContentModerator, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._building: Dict[Tuple[str, Optional[str]], threading.Lock] = {}
+
+    @staticmethod
+    def _key(backend: str, api_key: Optional[str]) -> Tuple[str, Optional[str]]:
+        backend = backend or 'openai'
+        return backend, api_key or os.getenv(f'{backend.upper()}_API_KEY')
+
+    def get(self, backend: str = 'openai', api_key: Optional[str] = None) -> ContentModerator:
+        """
+        Get a warm moderator for the backend/key pair, creating it on first use
+
+        Args:
+            backend: Moderation backend
+            api_key: API key (falls back to the backend's environment variable)
+
+        Returns:
+            Shared ContentModerator instance
+        """
+        key = self._key(backend, api_key)
+        with self._lock:
+            now = self.clock()
+            idle = self._evict_idle_locked(now)
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries[key] = (entry[0], now)
+                self._entries.move_to_end(key)
+            else:
+                build_lock = self._building.setdefault(key, threading.Lock())
+        # Closing waits for in-flight requests, so never do it under the pool lock
+        for old in idle:
+            self._close(old)
+        if entry is not None:
+            return entry[0]
+
+        # Build outside the pool lock so a slow client import does not block
+        # other keys; concurrent callers for the same key wait on build_lock.
+        with build_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    return entry[0]
+            try:
+                moderator = self.factory(backend=key[0], api_key=key[1])
+            except BaseException:
+                with self._lock:
+                    self._building.pop(key, None)
+                raise
+            evicted = []
+            with self._lock:
+                # Publish the entry and retire the build lock together, so no
+                # caller can find neither and start a second build
+                if self._building.get(key) is build_lock:
+                    del self._building[key]
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries[key] = (entry[0], self.clock())
+                    evicted.append(moderator)
+                    moderator = entry[0]
+                else:
+                    self._entries[key] = (moderator, self.clock())
+                    while len(self._entries) > self.max_size:
+                        evicted.append(self._entries.popitem(last=False)[1][0])
+        for old in evicted:
+            self._close(old)
+        return moderator
+
+    def _evict_idle_locked(self, now: float) -> List[ContentModerator]:
+        """Drop moderators idle past the timeout and return them for closing"""
+        # Entries are in LRU order, so the first fresh one ends the sweep
+        evicted = []
+        while self._entries:
+            key, (moderator, last_used) = next(iter(self._entries.items()))
+            if now - last_used < self.idle_timeout:
+                break
+            del self._entries[key]
+            evicted.append(moderator)
+        return evicted
+
+    @staticmethod
+    def _close(moderator: ContentModerator) -> None:
+        batcher = getattr(moderator, 'batcher', None)
+        if batcher is not None:
+            batcher.close()
+        close = getattr(moderator.client, 'close', None)
+        if callable(close):
+            try:
+                close()
+            except Exception as e:
+                logger.debug(f"Error closing moderation client: {e}")
+
+    def clear(self) -> None:
+        """Close and drop every pooled moderator"""
+        with self._lock:
+            moderators = [moderator for moderator, _ in self._entries.values()]
+            self._entries.clear()
+        for moderator in moderators:
+            self._close(moderator)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_moderator_pool = ModeratorPool()
+
+
+def get_moderator_pool() -> ModeratorPool:
+    """Get the process-wide moderator pool"""
+    return _moderator_pool
 
 
 def get_moderator(backend: str = 'openai', api_key: Optional[str] = None) -> ContentModerator:
     """
-    Get or create content moderator instance
+    Get a pooled content moderator for a backend/API key pair
     
     Args:
         backend: 'openai'
-        api_key: OpenAI API key
+        api_key: OpenAI API key (falls back to OPENAI_API_KEY)
     """
-    global _moderator_instance
-    
-    if _moderator_instance is None:
-        _moderator_instance = ContentModerator(backend=backend, api_key=api_key)
-    
-    return _moderator_instance
+    return _moderator_pool.get(backend=backend, api_key=api_key)
@@ -4,9 +4,16 @@ Database initialization and session management
 
 import logging
 import os
-from sqlalchemy import create_engine
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Tuple
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine.url import make_url
 from sqlalchemy.orm import scoped_session, sessionmaker
-from sqlalchemy.pool import StaticPool, NullPool
+from sqlalchemy.pool import StaticPool, NullPool, QueuePool
 from .db_models import Base
 
 # Configure logging
@@ -15,29 +22,169 @@ logger = logging.getLogger(__name__)
 
 # Database configuration
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///bot.db")
+# Connection used for read-only queries; defaults to DATABASE_URL with writes refused
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL", "")
+
+# Engine profile: auto (pick by URL), sqlite, sqlite-memory, postgres or default (no tuning)
+DB_PROFILE = os.getenv('DB_PROFILE', 'auto').lower()
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '10'))
+DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '20'))
+DB_POOL_TIMEOUT = int(os.getenv('DB_POOL_TIMEOUT', '30'))
+DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', '1800'))
+SQLITE_JOURNAL_MODE = os.getenv('SQLITE_JOURNAL_MODE', 'WAL')
+SQLITE_SYNCHRONOUS = os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000'))
+SQLITE_CACHE_SIZE_KB = int(os.getenv('SQLITE_CACHE_SIZE_KB', '16384'))
+# One session per inbound event (see unit_of_work): auto (per profile), true or false
+DB_UNIT_OF_WORK = os.getenv('DB_UNIT_OF_WORK', 'auto').lower()
+
+
+@dataclass(frozen=True)
+class EngineProfile:
+    """
+    Engine settings for one kind of database
+
+    ``engine_kwargs`` go to create_engine; ``pragmas`` run on every new
+    SQLite connection; ``read_only`` holds the extra settings that make a
+    connection refuse writes; ``unit_of_work`` says whether an event may
+    keep one transaction open across all its service calls.
+    """
+    name: str
+    engine_kwargs: Dict[str, Any] = field(default_factory=dict)
+    pragmas: Tuple[Tuple[str, Any], ...] = ()
+    read_only: Dict[str, Any] = field(default_factory=dict)
+    unit_of_work: bool = True
+
+    def describe(self) -> str:
+        """One-line summary for startup logs"""
+        parts = [self.name]
+        pool = self.engine_kwargs.get('poolclass')
+        if pool is not None:
+            parts.append(pool.__name__)
+        if 'pool_size' in self.engine_kwargs:
+            parts.append(f"pool_size={self.engine_kwargs['pool_size']}+{self.engine_kwargs.get('max_overflow', 0)}")
+        if self.engine_kwargs.get('pool_pre_ping'):
+            parts.append('pre_ping')
+        parts.extend(f"{name}={value}" for name, value in self.pragmas)
+        return ' '.join(parts)
+
+
+def _is_memory_sqlite(url) -> bool:
+    return url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+
+
+def resolve_profile(url: str, name: str = DB_PROFILE) -> EngineProfile:
+    """
+    Build the engine profile for a database URL
+
+    Args:
+        url: Database URL
+        name: Profile name, or 'auto' to pick one from the URL
+
+    Returns:
+        EngineProfile
+    """
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if name == 'auto':
+        if backend == 'sqlite':
+            name = 'sqlite-memory' if _is_memory_sqlite(parsed) else 'sqlite'
+        elif backend == 'postgresql':
+            name = 'postgres'
+        else:
+            name = 'default'
+
+    # In-memory SQLite shares one connection between threads, so it keeps
+    # per-service transactions; file SQLite units start with BEGIN IMMEDIATE
+    # (see start_transaction) so a unit that reads and then writes cannot fail
+    if name == 'sqlite-memory':
+        return EngineProfile(name, {
+            'connect_args': {'check_same_thread': False},
+            'poolclass': StaticPool,
+        }, unit_of_work=False)
+    if name == 'sqlite':
+        return EngineProfile(name, {
+            'connect_args': {'check_same_thread': False, 'timeout': SQLITE_BUSY_TIMEOUT_MS / 1000},
+            'poolclass': QueuePool,
+            'pool_size': DB_POOL_SIZE,
+            'max_overflow': DB_MAX_OVERFLOW,
+            'pool_timeout': DB_POOL_TIMEOUT,
+        }, pragmas=(
+            ('journal_mode', SQLITE_JOURNAL_MODE),
+            ('synchronous', SQLITE_SYNCHRONOUS),
+            ('busy_timeout', SQLITE_BUSY_TIMEOUT_MS),
+            ('cache_size', -SQLITE_CACHE_SIZE_KB),
+            ('temp_store', 'MEMORY'),
+        ), read_only={'pragmas': (('query_only', 'ON'),)})
+    if name == 'postgres':
+        kwargs = {
+            'pool_size': DB_POOL_SIZE,
+            'max_overflow': DB_MAX_OVERFLOW,
+            'pool_timeout': DB_POOL_TIMEOUT,
+            'pool_recycle': DB_POOL_RECYCLE,
+            'pool_pre_ping': True,
+        }
+        if parsed.drivername in ('postgresql', 'postgresql+psycopg2'):
+            kwargs['executemany_mode'] = 'values'  # multi-row INSERTs for bulk writes
+        return EngineProfile(name, kwargs, read_only={
+            'connect_args': {'options': '-c default_transaction_read_only=on'},
+        })
+    if name == 'default':
+        if backend == 'sqlite':
+            return EngineProfile(name, {'connect_args': {'check_same_thread': False}},
+                                 unit_of_work=not _is_memory_sqlite(parsed))
+        return EngineProfile(name, {'pool_pre_ping': True})
+    raise ValueError(f"Unknown DB_PROFILE: {name}")
+
+
+def build_engine(url: str, profile: EngineProfile, read_only: bool = False) -> Engine:
+    """
+    Create an engine configured by a profile
+
+    Args:
+        url: Database URL
+        profile: Profile from resolve_profile()
+        read_only: Apply the profile's read-only settings
+
+    Returns:
+        SQLAlchemy Engine
+    """
+    kwargs = dict(profile.engine_kwargs)
+    pragmas = profile.pragmas
+    if read_only:
+        extra = profile.read_only
+        pragmas = pragmas + extra.get('pragmas', ())
+        if 'connect_args' in extra:
+            kwargs['connect_args'] = {**kwargs.get('connect_args', {}), **extra['connect_args']}
+    new_engine = create_engine(url, echo=False, **kwargs)
+
+    if pragmas:
+        @event.listens_for(new_engine, 'connect')
+        def _apply_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            try:
+                for name, value in pragmas:
+                    cursor.execute(f"PRAGMA {name} = {value}")
+            finally:
+                cursor.close()
+
+    return new_engine
+
 
 # Create engine
 if DATABASE_URL.startswith("sqlite:///:memory:") or DATABASE_URL == "sqlite://":
     if os.getenv('TESTING') == 'true':
         DATABASE_URL = "sqlite:///test.db"
-        engine = create_engine(
-            DATABASE_URL,
-            connect_args={"check_same_thread": False},
-            echo=False
-        )
-    else:
-        engine = create_engine(
-            DATABASE_URL,
-            connect_args={"check_same_thread": False},
-            poolclass=StaticPool,
-            echo=False
-        )
+
+profile = resolve_profile(DATABASE_URL)
+engine = build_engine(DATABASE_URL, profile)
+
+# Read-only engine: a separate pool that refuses writes, or the main engine
+# when the database cannot be shared (in-memory SQLite) or has no read-only mode
+if DATABASE_READ_URL or profile.read_only:
+    read_engine = build_engine(DATABASE_READ_URL or DATABASE_URL, profile, read_only=True)
 else:
-    engine = create_engine(
-        DATABASE_URL,
-        connect_args={"check_same_thread": False},
-        echo=False
-    )
+    read_engine = engine
 
 # Create session factory
 db_session = scoped_session(
@@ -48,6 +195,27 @@ db_session = scoped_session(
     )
 )
 
+db_read_session = scoped_session(
+    sessionmaker(
+        autocommit=False,
+        autoflush=False,
+        bind=read_engine
+    )
+) if read_engine is not engine else db_session
+
+
+unit_of_work_enabled = profile.unit_of_work if DB_UNIT_OF_WORK == 'auto' else DB_UNIT_OF_WORK == 'true'
+
+
+# Callbacks run after init_db() so in-memory state never outlives the tables
+_init_callbacks = []
+
+
+def on_init_db(callback):
+    """Register a callback to run after init_db() (re)creates the schema"""
+    _init_callbacks.append(callback)
+    return callback
+
 
 def init_db():
     """Initialize the database - create all tables"""
@@ -55,12 +223,169 @@ def init_db():
         if os.getenv('TESTING') == 'true':
             Base.metadata.drop_all(bind=engine)
         Base.metadata.create_all(bind=engine)
+        for callback in _init_callbacks:
+            callback()
+        logger.info(f"🗄️ Database profile: {profile.describe()}"
+                    f"{' (separate read-only pool)' if read_engine is not engine else ''}"
+                    f", unit of work {'on' if unit_of_work_enabled else 'off'}")
         logger.info("✅ Database initialized successfully")
     except Exception as e:
         logger.error(f"❌ Failed to initialize database: {e}")
         raise
 
 
+def start_transaction(session) -> None:
+    """Open a session's database transaction so savepoints nest inside it"""
+    if session.get_bind().dialect.driver == 'pysqlite':
+        # pysqlite delays BEGIN until the first write, so a leading SAVEPOINT
+        # would open the transaction itself and its RELEASE would commit it.
+        # IMMEDIATE takes the write lock up front (waiting out busy_timeout):
+        # a deferred transaction that has read cannot start writing once
+        # another connection has committed
+        session.execute(text('BEGIN IMMEDIATE'))
+
+
+class _UnitSession:
+    """
+    A service's handle on the unit-of-work session
+
+    Work done through the handle runs in a savepoint: commit() releases it,
+    rollback() and close() roll back to it. Nothing reaches the database
+    until the unit itself commits.
+    """
+
+    def __init__(self, session):
+        self._session = session
+        self._savepoint = None
+
+    def __getattr__(self, name):
+        if self._savepoint is None:
+            self._savepoint = self._session.begin_nested()
+        return getattr(self._session, name)
+
+    def commit(self):
+        if self._savepoint is not None:
+            self._savepoint.commit()
+            self._savepoint = None
+
+    def rollback(self):
+        if self._savepoint is not None:
+            self._savepoint.rollback()
+            self._savepoint = None
+
+    close = rollback
+
+
+class _Unit:
+    """State of the unit of work open on this thread"""
+
+    def __init__(self):
+        self._session = None
+        self.callbacks: List[Callable[[bool], None]] = []
+
+    @property
+    def started(self) -> bool:
+        return self._session is not None
+
+    @property
+    def session(self):
+        """The unit's session, opening its transaction on first use"""
+        if self._session is None:
+            session = db_session.session_factory()
+            try:
+                start_transaction(session)
+            except BaseException:
+                session.close()
+                raise
+            self._session = session
+        return self._session
+
+
+_units = threading.local()
+
+
+def _current_unit():
+    return getattr(_units, 'current', None)
+
+
+def in_unit_of_work() -> bool:
+    """Whether this thread is inside an active unit_of_work() block"""
+    return _current_unit() is not None
+
+
+@contextmanager
+def unit_of_work():
+    """
+    Share one session and one transaction across every service call in the block
+
+    Services keep calling get_session()/commit()/close() as usual; inside
+    the block those calls work on savepoints of a single transaction that
+    commits when the outermost block exits. A block that raises rolls back
+    only its own work. Outside a block, or when the engine profile turns
+    the unit of work off, nothing changes.
+    """
+    unit = _current_unit()
+    if unit is not None:
+        savepoint = unit.session.begin_nested()
+        try:
+            yield
+        except BaseException:
+            savepoint.rollback()
+            raise
+        savepoint.commit()
+        return
+    if not unit_of_work_enabled:
+        yield
+        return
+
+    # The transaction opens on the first database access, so events served
+    # entirely from in-memory caches never take a connection
+    unit = _Unit()
+    _units.current = unit
+    committed = False
+    try:
+        yield
+        if unit.started:
+            unit.session.commit()
+        committed = True
+    except BaseException:
+        if unit.started:
+            unit.session.rollback()
+        raise
+    finally:
+        _units.current = None
+        if unit.started:
+            unit.session.close()
+        for callback in unit.callbacks:
+            try:
+                callback(committed)
+            except Exception as e:
+                logger.error(f"❌ Unit of work callback failed: {e}")
+
+
+def after_unit(callback: Callable[[bool], None]) -> None:
+    """
+    Run callback(committed) when the current unit of work ends
+
+    Outside a unit of work the callback runs at once with committed=True.
+    In-memory caches use this to drop state built from writes that were
+    rolled back.
+    """
+    unit = _current_unit()
+    if unit is None:
+        callback(True)
+    else:
+        unit.callbacks.append(callback)
+
+
 def get_session():
-    """Get a database session"""
-    return db_session()
+    """Get a database session (the event's shared session inside unit_of_work())"""
+    unit = _current_unit()
+    return _UnitSession(unit.session) if unit is not None else db_session()
+
+
+def get_read_session():
+    """Get a database session for queries that never write"""
+    # Inside a unit of work, reads must see the unit's uncommitted writes
+    unit = _current_unit()
+    return _UnitSession(unit.session) if unit is not None else db_read_session()
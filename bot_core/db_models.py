@@ -3,7 +3,7 @@ Database Models - Platform Independent
 All database models used by the bot
 """
 
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, Float
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, Float, Index, func
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
 
@@ -22,6 +22,18 @@ class Warn(Base):
     date = Column(DateTime, default=datetime.utcnow)
     warned_at = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        Index('ix_warns_chat_user', 'chat_id', 'user_id'),
+    )
+
+
+class WarnCount(Base):
+    """Number of warns per user, kept in step with the warns table"""
+    __tablename__ = 'warn_counts'
+    chat_id = Column(String(100), primary_key=True)
+    user_id = Column(String(100), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
 
 class WarnSettings(Base):
     """Warning configuration per chat"""
@@ -43,6 +55,10 @@ class Ban(Base):
     date = Column(DateTime, default=datetime.utcnow)
     banned_at = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        Index('uq_bans_chat_user', 'chat_id', 'user_id', unique=True),
+    )
+
 
 class Rules(Base):
     """Chat rules"""
@@ -66,6 +82,10 @@ class BlacklistWord(Base):
     chat_id = Column(String(100), nullable=False)
     word = Column(String(255), nullable=False)
 
+    __table_args__ = (
+        Index('uq_blacklist_chat_word', chat_id, func.lower(word), unique=True),  # case-insensitive
+    )
+
 
 class Lock(Base):
     """Content locks per chat"""
@@ -87,6 +107,11 @@ class FloodControl(Base):
     limit = Column(Integer, default=5)  # messages
     timeframe = Column(Integer, default=10)  # seconds
 
+    __table_args__ = (
+        Index('ix_flood_control_chat_user_time', 'chat_id', 'user_id', 'timestamp'),
+        Index('ix_flood_control_time', 'timestamp'),
+    )
+
 
 class FloodSettings(Base):
     """Per-chat flood settings"""
@@ -127,3 +152,12 @@ class ChatConfig(Base):
     __tablename__ = 'chat_config'
     chat_id = Column(String(100), primary_key=True)
     delete_commands = Column(Boolean, default=False)  # Delete command messages after processing
+
+
+class ModerationVerdict(Base):
+    """Persisted moderation verdicts keyed by message fingerprint"""
+    __tablename__ = 'moderation_verdicts'
+    fingerprint = Column(String(64), primary_key=True)  # sha256 of backend + normalized text
+    scores = Column(Text, nullable=False)  # JSON: category -> score
+    flagged_categories = Column(Text)  # JSON list of categories the backend flagged
+    created_at = Column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,153 @@
+"""
+Group commit for high-frequency writes
+Runs writes from concurrent handlers in one transaction with a single commit
+"""
+
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from .database import get_session, in_unit_of_work, start_transaction
+from .moderation_batcher import MicroBatcher
+
+logger = logging.getLogger(__name__)
+
+# sync: every write commits on its own; batched: writes share group commits
+DB_WRITE_MODE = os.getenv('DB_WRITE_MODE', 'sync').lower()
+DB_GROUP_COMMIT_WINDOW_MS = float(os.getenv('DB_GROUP_COMMIT_WINDOW_MS', '5'))
+DB_GROUP_COMMIT_SIZE = int(os.getenv('DB_GROUP_COMMIT_SIZE', '64'))
+DB_GROUP_COMMIT_TIMEOUT = float(os.getenv('DB_GROUP_COMMIT_TIMEOUT', '10'))
+
+# A write takes a session and returns the caller's result
+Write = Callable[[Any], Any]
+
+
+class _Failed:
+    """A write that raised; its exception is re-raised in the caller's thread"""
+
+    def __init__(self, error: Exception):
+        self.error = error
+
+
+class GroupCommitter:
+    """
+    Commits writes from many threads together
+
+    Each write is a callable taking a session. Writes arriving within
+    ``max_wait`` of each other, up to ``max_batch_size``, run one after
+    another in a single transaction, each inside its own savepoint, so a
+    write that fails is rolled back alone and its exception goes to its
+    caller. Callers block until the shared commit is done and get their own
+    write's return value.
+    """
+
+    def __init__(self, max_batch_size: int = DB_GROUP_COMMIT_SIZE,
+                 max_wait: float = DB_GROUP_COMMIT_WINDOW_MS / 1000.0,
+                 name: str = 'group-commit'):
+        """
+        Args:
+            max_batch_size: Maximum writes per commit
+            max_wait: Seconds to wait for more writes after the first one arrives
+            name: Name used for the committer thread and log messages
+        """
+        # One batch at a time: concurrent transactions would contend for the same locks
+        self._batcher = MicroBatcher(self._commit_batch, max_batch_size=max_batch_size,
+                                     max_wait=max_wait, max_concurrency=1, name=name)
+
+    def run(self, write: Write, timeout: Optional[float] = DB_GROUP_COMMIT_TIMEOUT) -> Any:
+        """
+        Run a write in the next group commit and wait for it
+
+        Args:
+            write: Callable taking a session and returning the caller's result
+            timeout: Seconds to wait for the commit
+
+        Returns:
+            The write's return value, once committed
+
+        Raises:
+            TimeoutError: If the commit did not finish in time (the write may still commit)
+            Exception: Whatever the write, or the shared commit, raised
+        """
+        outcome = self._batcher.call(write, timeout=timeout)
+        if isinstance(outcome, _Failed):
+            raise outcome.error
+        return outcome
+
+    def _commit_batch(self, writes: List[Write]) -> List[Any]:
+        session = get_session()
+        try:
+            start_transaction(session)
+            results = []
+            for write in writes:
+                savepoint = session.begin_nested()
+                try:
+                    results.append(write(session))
+                    savepoint.commit()
+                except Exception as e:
+                    savepoint.rollback()
+                    results.append(_Failed(e))
+            session.commit()
+            return results
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return commit counters"""
+        stats = self._batcher.stats()
+        return {
+            'commits': stats['batches_sent'],
+            'writes': stats['items_sent'],
+            'avg_writes_per_commit': stats['avg_batch_size'],
+        }
+
+    def close(self) -> None:
+        """Stop the committer thread once queued writes are committed"""
+        self._batcher.close()
+
+
+_committer: Optional[GroupCommitter] = None
+_committer_lock = threading.Lock()
+
+
+def get_group_committer() -> GroupCommitter:
+    """Get the process-wide group committer"""
+    global _committer
+    if _committer is None:
+        with _committer_lock:
+            if _committer is None:
+                _committer = GroupCommitter()
+    return _committer
+
+
+def run_write(write: Write) -> Any:
+    """
+    Run a write and commit it, batching commits when DB_WRITE_MODE is 'batched'
+
+    Inside a unit_of_work() block the write joins the unit's transaction
+    instead. Either way the call returns only after the write is committed
+    (or handed to the unit), with the write's own result.
+
+    Args:
+        write: Callable taking a session and returning the caller's result
+
+    Returns:
+        The write's return value
+    """
+    if DB_WRITE_MODE == 'batched' and not in_unit_of_work():
+        return get_group_committer().run(write)
+
+    session = get_session()
+    try:
+        result = write(session)
+        session.commit()
+        return result
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
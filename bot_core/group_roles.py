@@ -0,0 +1,183 @@
+"""
+Group membership and role cache
+Indexes each group's participants by id, LID and phone for constant-time role lookups
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+GROUP_ROLE_CACHE_TTL = float(os.getenv('GROUP_ROLE_CACHE_TTL', '300'))
+GROUP_ROLE_CACHE_SIZE = int(os.getenv('GROUP_ROLE_CACHE_SIZE', '1024'))
+
+
+def _identifier(value: Optional[str]) -> str:
+    """Part of a WhatsApp id before the '@' ('' for empty values)"""
+    return value.split('@')[0] if value else ''
+
+
+def _member_role(member: Dict) -> str:
+    if member.get('isSuperAdmin', False):
+        return 'superadmin'
+    if member.get('isAdmin', False):
+        return 'admin'
+    return 'member'
+
+
+@dataclass
+class GroupIndex:
+    """Role lookup tables for one group"""
+    by_id: Dict[str, str] = field(default_factory=dict)
+    by_lid: Dict[str, str] = field(default_factory=dict)
+    by_phone: Dict[str, str] = field(default_factory=dict)
+    loaded_at: float = 0.0
+
+    @classmethod
+    def from_members(cls, members: Iterable[Dict], loaded_at: float) -> 'GroupIndex':
+        index = cls(loaded_at=loaded_at)
+        for member in members:
+            role = _member_role(member)
+            # setdefault keeps the first member for a key, like the old linear scan
+            member_id = _identifier(member.get('id', ''))
+            if member_id:
+                index.by_id.setdefault(member_id, role)
+            lid = _identifier(member.get('lid', ''))
+            if lid:
+                index.by_lid.setdefault(lid, role)
+            phone = _identifier(member.get('phone', ''))
+            if phone:
+                index.by_phone.setdefault(phone, role)
+        return index
+
+    def role_of(self, user_id: str) -> Optional[str]:
+        """Role of ``user_id`` or None if they are not a member"""
+        user_identifier = _identifier(user_id)
+        role = self.by_id.get(user_identifier)
+        if role is not None:
+            return role
+        if user_id.endswith('@lid'):
+            return self.by_lid.get(user_identifier)
+        return self.by_phone.get(user_identifier)
+
+
+class GroupRoleCache:
+    """
+    Per-group membership index with TTL
+
+    Entries are rebuilt from ``fetch_members`` when older than ``ttl`` or
+    after ``invalidate`` (called for join/leave/admin-change events). Failed
+    fetches are not cached.
+    """
+
+    def __init__(self, fetch_members: Callable[[str], Optional[List[Dict]]],
+                 ttl: float = GROUP_ROLE_CACHE_TTL, max_groups: int = GROUP_ROLE_CACHE_SIZE,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            fetch_members: Callable returning a group's participant list (or None on failure)
+            ttl: Seconds an index stays valid
+            max_groups: Maximum groups kept in memory
+            clock: Monotonic time source
+        """
+        self.fetch_members = fetch_members
+        self.ttl = ttl
+        self.max_groups = max_groups
+        self.clock = clock
+        self._groups: "OrderedDict[str, GroupIndex]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_index(self, chat_id: str) -> Optional[GroupIndex]:
+        """
+        Get a group's membership index, fetching it when missing or stale
+
+        Args:
+            chat_id: Group id
+
+        Returns:
+            GroupIndex or None if the member list could not be fetched
+        """
+        now = self.clock()
+        with self._lock:
+            index = self._groups.get(chat_id)
+            if index is not None and now - index.loaded_at < self.ttl:
+                self._groups.move_to_end(chat_id)
+                self.hits += 1
+                return index
+            self.misses += 1
+            generation = self._generations.get(chat_id, 0)
+
+        members = self.fetch_members(chat_id)
+        if not members:
+            return None
+        index = GroupIndex.from_members(members, loaded_at=self.clock())
+
+        with self._lock:
+            # A join/leave/admin event during the fetch means this list may be stale
+            if self._generations.get(chat_id, 0) == generation:
+                self._groups[chat_id] = index
+                self._groups.move_to_end(chat_id)
+                while len(self._groups) > self.max_groups:
+                    evicted, _ = self._groups.popitem(last=False)
+                    self._generations.pop(evicted, None)
+        return index
+
+    def get_role(self, chat_id: str, user_id: str) -> str:
+        """
+        Get a participant's role
+
+        Returns:
+            'superadmin', 'admin', 'member', or 'unknown' if the member list
+            is unavailable or the user is not in it
+        """
+        index = self.get_index(chat_id)
+        if index is None:
+            logger.warning(f"Could not get members for {chat_id}")
+            return 'unknown'
+        role = index.role_of(user_id or '')
+        if role is None:
+            logger.warning(f"User {user_id} not found in group members")
+            return 'unknown'
+        return role
+
+    def invalidate(self, chat_id: Optional[str]) -> None:
+        """Drop a group's index after its membership or admins changed"""
+        if not chat_id:
+            return
+        with self._lock:
+            self._groups.pop(chat_id, None)
+            self._generations[chat_id] = self._generations.get(chat_id, 0) + 1
+
+    def warm(self, chat_ids: Iterable[str]) -> int:
+        """
+        Load indexes for several groups up front
+
+        Returns:
+            Number of groups loaded
+        """
+        loaded = 0
+        for chat_id in chat_ids:
+            try:
+                if self.get_index(chat_id) is not None:
+                    loaded += 1
+            except Exception as e:
+                logger.debug(f"Failed to warm members for {chat_id}: {e}")
+        logger.info(f"👥 Warmed group role cache for {loaded} groups")
+        return loaded
+
+    def clear(self) -> None:
+        """Drop every group"""
+        with self._lock:
+            self._groups.clear()
+            self._generations.clear()
+
+    def __len__(self) -> int:
+        return len(self._groups)
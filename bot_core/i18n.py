@@ -3,7 +3,11 @@ Internationalization (i18n) System
 Multi-language support for the bot
 """
 
-from typing import Dict
+import string
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional
+
+from .command_registry import COMMANDS
 
 # Language names
 LANG_NAMES = {
@@ -58,6 +62,7 @@ TRANSLATIONS = {
       'help_ai_admin': '\n/aimodstatus - בדוק הגדרות AI\n/aihelp - מדריך מלא\n/aimod on|off - הפעל/כבה מודרציית AI (מנהל)\n/aitest <טקסט> - בדיקת הודעה עם AI (או השב להודעה) (מנהל)\n\n',
         'help_note': '_הערה: פקודות מנהל דורשות הרשאות מנהל קבוצה_',
         'admin_only': '❌ פקודה זו זמינה רק למנהלי קבוצה',
+        'group_only': '❌ פקודה זו זמינה רק בקבוצות',
         'owner_only': '❌ פקודה זו זמינה רק לבעלים של הבוט',
         'reply_to_user': '❌ השב להודעה של משתמש כדי להשתמש בפקודה זו',
         'unknown_command': '❓ פקודה לא מוכרת: /{command}\n\nשלח /help לרשימת פקודות',
@@ -93,6 +98,8 @@ TRANSLATIONS = {
         'blacklist_show': '🚫 *מילים חסומות:*\n{words}',
         'blacklist_empty': 'ℹ️ אין מילים חסומות בקבוצה זו',
         'blacklist_added': '✅ המילה "{word}" נוספה לרשימה השחורה',
+        'blacklist_bulk_added': '✅ נוספו {added} מילים לרשימה השחורה ({skipped} כבר היו ברשימה)',
+        'blacklist_file_invalid': '❌ ניתן לייבא רק קובץ טקסט, מילה אחת בכל שורה',
         'blacklist_removed': '✅ המילה "{word}" הוסרה מהרשימה השחורה',
         'blacklist_not_found': '❌ המילה לא נמצאה ברשימה השחורה',
         'blacklist_detected': '🚫 הודעה מכילה מילה חסומה ונמחקה',
@@ -136,7 +143,7 @@ TRANSLATIONS = {
         'usage_setrules': '❌ שימוש: /setrules <טקסט חוקים>',
         'usage_setwarn': '❌ שימוש: /setwarn <מספר>\n\nדוגמה: /setwarn 3',
         'usage_setwelcome': '❌ שימוש: /setwelcome <הודעה>\n\nתוכל להשתמש ב-{mention} לתיוג משתמשים חדשים',
-        'usage_addblacklist': '❌ שימוש: /addblacklist <מילה>',
+        'usage_addblacklist': '❌ שימוש: /addblacklist <מילה>\nאפשר מילה בכל שורה, או לצרף קובץ טקסט',
         'usage_rmblacklist': '❌ שימוש: /rmblacklist <מילה>',
         
         # AI Help
@@ -190,6 +197,7 @@ TRANSLATIONS = {
       'bot_info': '🤖 *Rose Bot*\n\nמזהה: {from_id}\nצ\'אט: {chat_id_value}',
       'warn_usage': '❌ השב להודעה של משתמש או כתוב מספר טלפון כדי להזהיר אותו',
         'warns_list': '⚠️ *אזהרות ({count}/{limit}):*\n',
+        'warns_earlier': '_(+{count} אזהרות קודמות)_\n',
       'resetwarns_usage': '❌ השב להודעה של משתמש או כתוב מספר טלפון כדי לאפס אזהרות',
       'kick_usage': '❌ השב להודעה של משתמש או כתוב מספר טלפון כדי להוציא אותו',
       'ban_usage': '❌ השב להודעה של משתמש או כתוב מספר טלפון כדי לחסום אותו',
@@ -417,6 +425,7 @@ Send /help to see all commands.''',
       'help_ai_admin': '\n/aimodstatus - Check AI settings\n/aihelp - Detailed AI moderation guide\n/aimod on|off - Enable/disable AI moderation (admin)\n/aitest <text> - Test text with AI (or reply) (admin)\n\n',
         'help_note': '_Note: Admin commands require group admin rights_',
         'admin_only': '❌ This command is only available to group admins',
+        'group_only': '❌ This command can only be used in groups',
         'owner_only': '❌ This command is only available to bot owner',
         'reply_to_user': '❌ Reply to a user message to use this command',
         'unknown_command': '❓ Unknown command: /{command}\n\nSend /help for available commands',
@@ -452,6 +461,8 @@ Send /help to see all commands.''',
         'blacklist_show': '🚫 *Blacklisted words:*\n{words}',
         'blacklist_empty': 'ℹ️ No blacklisted words in this group',
         'blacklist_added': '✅ "{word}" added to blacklist',
+        'blacklist_bulk_added': '✅ Added {added} words to blacklist ({skipped} already listed)',
+        'blacklist_file_invalid': '❌ Only text files can be imported, one word per line',
         'blacklist_removed': '✅ "{word}" removed from blacklist',
         'blacklist_not_found': '❌ Word not found in blacklist',
         'blacklist_detected': '🚫 Message contains blacklisted word and was deleted',
@@ -495,7 +506,7 @@ The bot will automatically detect:
         'usage_setrules': '❌ Usage: /setrules <rules text>',
         'usage_setwarn': '❌ Usage: /setwarn <number>\n\nExample: /setwarn 3',
         'usage_setwelcome': '❌ Usage: /setwelcome <message>\n\nYou can use {mention} to mention new users',
-        'usage_addblacklist': '❌ Usage: /addblacklist <word>',
+        'usage_addblacklist': '❌ Usage: /addblacklist <word>\nOne word per line, or attach a text file',
         'usage_rmblacklist': '❌ Usage: /rmblacklist <word>',
         
         # AI Help
@@ -549,6 +560,7 @@ The bot will automatically detect:
       'bot_info': '🤖 *Rose Bot*\n\nID: {from_id}\nChat: {chat_id_value}',
       'warn_usage': '❌ Reply to a user message or provide a phone number to warn them',
         'warns_list': '⚠️ *Warnings ({count}/{limit}):*\n',
+        'warns_earlier': '_(+{count} earlier warnings)_\n',
       'resetwarns_usage': '❌ Reply to a user message or provide a phone number to reset warns',
       'kick_usage': '❌ Reply to a user message or provide a phone number to kick them',
       'ban_usage': '❌ Reply to a user message or provide a phone number to ban them',
@@ -734,79 +746,143 @@ The threshold determines sensitivity:
 }
 
 # Command help dictionary for /help <cmd>
-COMMAND_HELP = {
+# Help text per command; which commands exist and who may run them comes from
+# the command registry
+COMMAND_HELP_TEXT = {
    'he': {
-      'start': {'usage': '/start', 'desc': 'התחל את הבוט וקבל הודעת פתיחה', 'example': '/start', 'admin': False},
-      'help': {'usage': '/help [פקודה]', 'desc': 'הצג רשימת פקודות או מידע על פקודה ספציפית', 'example': '/help warn', 'admin': False},
-      'info': {'usage': '/info', 'desc': 'הצג מידע על הבוט', 'example': '/info', 'admin': False},
-      'ping': {'usage': '/ping', 'desc': 'בדוק אם הבוט פועל', 'example': '/ping', 'admin': False},
-      'rules': {'usage': '/rules', 'desc': 'הצג את חוקי הקבוצה', 'example': '/rules', 'admin': False},
-      'setrules': {'usage': '/setrules <טקסט>', 'desc': 'הגדר חוקים לקבוצה', 'example': '/setrules 1. היו נחמדים\n2. אין ספאם', 'admin': True},
-      'clearrules': {'usage': '/clearrules', 'desc': 'מחק את חוקי הקבוצה', 'example': '/clearrules', 'admin': True},
-      'warn': {'usage': '/warn <טלפון> [סיבה] או תשובה', 'desc': 'תן אזהרה למשתמש (השב להודעה או ציין טלפון)', 'example': '/warn 972501234567 ספאם', 'admin': True},
-      'warns': {'usage': '/warns [טלפון]', 'desc': 'בדוק אזהרות למשתמש (השב להודעה או ציין טלפון)', 'example': '/warns 972501234567', 'admin': False},
-      'resetwarns': {'usage': '/resetwarns [טלפון]', 'desc': 'אפס אזהרות למשתמש (השב להודעה או ציין טלפון)', 'example': '/resetwarns 972501234567', 'admin': True},
-      'setwarn': {'usage': '/setwarn <מספר>', 'desc': 'הגדר מגבלת אזהרות', 'example': '/setwarn 3', 'admin': True},
-      'kick': {'usage': '/kick [טלפון]', 'desc': 'בעט משתמש מהקבוצה (השב להודעה או ציין טלפון)', 'example': '/kick 972501234567', 'admin': True},
-      'ban': {'usage': '/ban [טלפון] [סיבה]', 'desc': 'חסום משתמש מהקבוצה (השב להודעה או ציין טלפון)', 'example': '/ban 972501234567 ספאם', 'admin': True},
-      'role': {'usage': '/role [טלפון]', 'desc': 'בדוק אם משתמש הוא מנהל (השב להודעה או ציין טלפון)', 'example': '/role 972501234567', 'admin': False},
-      'unban': {'usage': '/unban <טלפון>', 'desc': 'בטל חסימה של משתמש', 'example': '/unban 972501234567', 'admin': True},
-      'add': {'usage': '/add <טלפון>', 'desc': 'הוסף משתמש לקבוצה', 'example': '/add 972501234567', 'admin': True},
-      'invite': {'usage': '/invite', 'desc': 'קבל לינק הזמנה לקבוצה', 'example': '/invite', 'admin': True},
-      'delcmds': {'usage': '/delcmds <on|off|status>', 'desc': 'הפעל/כבה מחיקת פקודות', 'example': '/delcmds on', 'admin': True},
-      'welcome': {'usage': '/welcome', 'desc': 'הצג הודעת קבלת פנים נוכחית', 'example': '/welcome', 'admin': False},
-      'setwelcome': {'usage': '/setwelcome <הודעה>', 'desc': 'הגדר הודעת קבלת פנים. השתמש ב-{mention} לתיוג', 'example': '/setwelcome ברוך הבא {mention}!', 'admin': True},
-      'blacklist': {'usage': '/blacklist', 'desc': 'הצג רשימת מילים חסומות', 'example': '/blacklist', 'admin': False},
-      'addblacklist': {'usage': '/addblacklist <מילה>', 'desc': 'הוסף מילה לרשימה השחורה', 'example': '/addblacklist ספאם', 'admin': True},
-      'rmblacklist': {'usage': '/rmblacklist <מילה>', 'desc': 'הסר מילה מהרשימה השחורה', 'example': '/rmblacklist ספאם', 'admin': True},
-      'lock': {'usage': '/lock <סוג>', 'desc': 'נעל סוג תוכן (links/stickers/media)', 'example': '/lock links', 'admin': True},
-      'unlock': {'usage': '/unlock <סוג>', 'desc': 'בטל נעילה', 'example': '/unlock links', 'admin': True},
-      'locks': {'usage': '/locks', 'desc': 'הצג נעילות פעילות', 'example': '/locks', 'admin': False},
-      'lang': {'usage': '/lang [he|en]', 'desc': 'הצג או שנה שפה', 'example': '/lang he', 'admin': True},
-      'setlang': {'usage': '/setlang <he|en>', 'desc': 'שנה שפת הבוט', 'example': '/setlang en', 'admin': True},
-      'aimod': {'usage': '/aimod [on|off]', 'desc': 'הפעל/כבה מודרציית AI או הצג סטטוס', 'example': '/aimod on', 'admin': True},
-      'aimodstatus': {'usage': '/aimodstatus', 'desc': 'בדוק הגדרות AI', 'example': '/aimodstatus', 'admin': False},
-      'aimodset': {'usage': '/aimodset <קטגוריה|all|cat1,cat2> <סף>', 'desc': 'כוונן רגישות AI (0-100)', 'example': '/aimodset toxicity,spam 80', 'admin': True},
-      'aihelp': {'usage': '/aihelp', 'desc': 'מדריך מפורט ל-AI Moderation', 'example': '/aihelp', 'admin': False},
-      'aitest': {'usage': '/aitest <טקסט> או השב להודעה', 'desc': 'בדוק הודעה עם AI והצג ציונים', 'example': '/aitest בדוק את הטקסט הזה', 'admin': True},
+      'start': {'usage': '/start', 'desc': 'התחל את הבוט וקבל הודעת פתיחה', 'example': '/start'},
+      'help': {'usage': '/help [פקודה]', 'desc': 'הצג רשימת פקודות או מידע על פקודה ספציפית', 'example': '/help warn'},
+      'info': {'usage': '/info', 'desc': 'הצג מידע על הבוט', 'example': '/info'},
+      'ping': {'usage': '/ping', 'desc': 'בדוק אם הבוט פועל', 'example': '/ping'},
+      'rules': {'usage': '/rules', 'desc': 'הצג את חוקי הקבוצה', 'example': '/rules'},
+      'setrules': {'usage': '/setrules <טקסט>', 'desc': 'הגדר חוקים לקבוצה', 'example': '/setrules 1. היו נחמדים\n2. אין ספאם'},
+      'warn': {'usage': '/warn <טלפון> [סיבה] או תשובה', 'desc': 'תן אזהרה למשתמש (השב להודעה או ציין טלפון)', 'example': '/warn 972501234567 ספאם'},
+      'warns': {'usage': '/warns [טלפון]', 'desc': 'בדוק אזהרות למשתמש (השב להודעה או ציין טלפון)', 'example': '/warns 972501234567'},
+      'resetwarns': {'usage': '/resetwarns [טלפון]', 'desc': 'אפס אזהרות למשתמש (השב להודעה או ציין טלפון)', 'example': '/resetwarns 972501234567'},
+      'setwarn': {'usage': '/setwarn <מספר>', 'desc': 'הגדר מגבלת אזהרות', 'example': '/setwarn 3'},
+      'kick': {'usage': '/kick [טלפון]', 'desc': 'בעט משתמש מהקבוצה (השב להודעה או ציין טלפון)', 'example': '/kick 972501234567'},
+      'ban': {'usage': '/ban [טלפון] [סיבה]', 'desc': 'חסום משתמש מהקבוצה (השב להודעה או ציין טלפון)', 'example': '/ban 972501234567 ספאם'},
+      'role': {'usage': '/role [טלפון]', 'desc': 'בדוק אם משתמש הוא מנהל (השב להודעה או ציין טלפון)', 'example': '/role 972501234567'},
+      'unban': {'usage': '/unban <טלפון>', 'desc': 'בטל חסימה של משתמש', 'example': '/unban 972501234567'},
+      'add': {'usage': '/add <טלפון>', 'desc': 'הוסף משתמש לקבוצה', 'example': '/add 972501234567'},
+      'invite': {'usage': '/invite', 'desc': 'קבל לינק הזמנה לקבוצה', 'example': '/invite'},
+      'delcmds': {'usage': '/delcmds <on|off|status>', 'desc': 'הפעל/כבה מחיקת פקודות', 'example': '/delcmds on'},
+      'welcome': {'usage': '/welcome', 'desc': 'הצג הודעת קבלת פנים נוכחית', 'example': '/welcome'},
+      'setwelcome': {'usage': '/setwelcome <הודעה>', 'desc': 'הגדר הודעת קבלת פנים. השתמש ב-{mention} לתיוג', 'example': '/setwelcome ברוך הבא {mention}!'},
+      'blacklist': {'usage': '/blacklist', 'desc': 'הצג רשימת מילים חסומות', 'example': '/blacklist'},
+      'addblacklist': {'usage': '/addblacklist <מילה>', 'desc': 'הוסף מילה לרשימה השחורה', 'example': '/addblacklist ספאם'},
+      'rmblacklist': {'usage': '/rmblacklist <מילה>', 'desc': 'הסר מילה מהרשימה השחורה', 'example': '/rmblacklist ספאם'},
+      'lock': {'usage': '/lock <סוג>', 'desc': 'נעל סוג תוכן (links/stickers/media)', 'example': '/lock links'},
+      'unlock': {'usage': '/unlock <סוג>', 'desc': 'בטל נעילה', 'example': '/unlock links'},
+      'locks': {'usage': '/locks', 'desc': 'הצג נעילות פעילות', 'example': '/locks'},
+      'lang': {'usage': '/lang [he|en]', 'desc': 'הצג או שנה שפה', 'example': '/lang he'},
+      'setlang': {'usage': '/setlang <he|en>', 'desc': 'שנה שפת הבוט', 'example': '/setlang en'},
+      'aimod': {'usage': '/aimod [on|off]', 'desc': 'הפעל/כבה מודרציית AI או הצג סטטוס', 'example': '/aimod on'},
+      'aimodstatus': {'usage': '/aimodstatus', 'desc': 'בדוק הגדרות AI', 'example': '/aimodstatus'},
+      'aimodset': {'usage': '/aimodset <קטגוריה|all|cat1,cat2> <סף>', 'desc': 'כוונן רגישות AI (0-100)', 'example': '/aimodset toxicity,spam 80'},
+      'aihelp': {'usage': '/aihelp', 'desc': 'מדריך מפורט ל-AI Moderation', 'example': '/aihelp'},
+      'aitest': {'usage': '/aitest <טקסט> או השב להודעה', 'desc': 'בדוק הודעה עם AI והצג ציונים', 'example': '/aitest בדוק את הטקסט הזה'},
    },
    'en': {
-      'start': {'usage': '/start', 'desc': 'Start the bot and get welcome message', 'example': '/start', 'admin': False},
-      'help': {'usage': '/help [command]', 'desc': 'Show command list or info about specific command', 'example': '/help warn', 'admin': False},
-      'info': {'usage': '/info', 'desc': 'Show bot information', 'example': '/info', 'admin': False},
-      'ping': {'usage': '/ping', 'desc': 'Check if bot is running', 'example': '/ping', 'admin': False},
-      'rules': {'usage': '/rules', 'desc': 'Show group rules', 'example': '/rules', 'admin': False},
-      'setrules': {'usage': '/setrules <text>', 'desc': 'Set group rules', 'example': '/setrules 1. Be nice\n2. No spam', 'admin': True},
-      'clearrules': {'usage': '/clearrules', 'desc': 'Clear group rules', 'example': '/clearrules', 'admin': True},
-      'warn': {'usage': '/warn <phone> [reason] or reply', 'desc': 'Warn a user (reply or provide phone)', 'example': '/warn 972501234567 spam', 'admin': True},
-      'warns': {'usage': '/warns [phone]', 'desc': 'Check user warnings (reply or provide phone)', 'example': '/warns 972501234567', 'admin': False},
-      'resetwarns': {'usage': '/resetwarns [phone]', 'desc': 'Reset user warnings (reply or provide phone)', 'example': '/resetwarns 972501234567', 'admin': True},
-      'setwarn': {'usage': '/setwarn <number>', 'desc': 'Set warn limit', 'example': '/setwarn 3', 'admin': True},
-      'kick': {'usage': '/kick [phone]', 'desc': 'Kick user from group (reply or provide phone)', 'example': '/kick 972501234567', 'admin': True},
-      'ban': {'usage': '/ban [phone] [reason]', 'desc': 'Ban user from group (reply or provide phone)', 'example': '/ban 972501234567 spam', 'admin': True},
-      'role': {'usage': '/role [phone]', 'desc': 'Check if a user is admin (reply or provide phone)', 'example': '/role 972501234567', 'admin': False},
-      'unban': {'usage': '/unban <phone>', 'desc': 'Unban a user', 'example': '/unban 972501234567', 'admin': True},
-      'add': {'usage': '/add <phone>', 'desc': 'Add user to group', 'example': '/add 972501234567', 'admin': True},
-      'invite': {'usage': '/invite', 'desc': 'Get group invite link', 'example': '/invite', 'admin': True},
-      'delcmds': {'usage': '/delcmds <on|off|status>', 'desc': 'Enable/disable command deletion', 'example': '/delcmds on', 'admin': True},
-      'welcome': {'usage': '/welcome', 'desc': 'Show current welcome message', 'example': '/welcome', 'admin': False},
-      'setwelcome': {'usage': '/setwelcome <message>', 'desc': 'Set welcome message. Use {mention} to tag', 'example': '/setwelcome Welcome {mention}!', 'admin': True},
-      'blacklist': {'usage': '/blacklist', 'desc': 'Show blacklisted words', 'example': '/blacklist', 'admin': False},
-      'addblacklist': {'usage': '/addblacklist <word>', 'desc': 'Add word to blacklist', 'example': '/addblacklist spam', 'admin': True},
-      'rmblacklist': {'usage': '/rmblacklist <word>', 'desc': 'Remove word from blacklist', 'example': '/rmblacklist spam', 'admin': True},
-      'lock': {'usage': '/lock <type>', 'desc': 'Lock content type (links/stickers/media)', 'example': '/lock links', 'admin': True},
-      'unlock': {'usage': '/unlock <type>', 'desc': 'Unlock content', 'example': '/unlock links', 'admin': True},
-      'locks': {'usage': '/locks', 'desc': 'Show active locks', 'example': '/locks', 'admin': False},
-      'lang': {'usage': '/lang [he|en]', 'desc': 'Show or change language', 'example': '/lang he', 'admin': True},
-      'setlang': {'usage': '/setlang <he|en>', 'desc': 'Change bot language', 'example': '/setlang en', 'admin': True},
-      'aimod': {'usage': '/aimod [on|off]', 'desc': 'Enable/disable AI moderation or show status', 'example': '/aimod on', 'admin': True},
-      'aimodstatus': {'usage': '/aimodstatus', 'desc': 'Check AI settings', 'example': '/aimodstatus', 'admin': False},
-      'aimodset': {'usage': '/aimodset <category|all|cat1,cat2> <threshold>', 'desc': 'Adjust AI sensitivity (0-100)', 'example': '/aimodset toxicity,spam 80', 'admin': True},
-      'aihelp': {'usage': '/aihelp', 'desc': 'Detailed AI Moderation guide', 'example': '/aihelp', 'admin': False},
-      'aitest': {'usage': '/aitest <text> or reply', 'desc': 'Test message with AI and show scores', 'example': '/aitest test this text', 'admin': True},
+      'start': {'usage': '/start', 'desc': 'Start the bot and get welcome message', 'example': '/start'},
+      'help': {'usage': '/help [command]', 'desc': 'Show command list or info about specific command', 'example': '/help warn'},
+      'info': {'usage': '/info', 'desc': 'Show bot information', 'example': '/info'},
+      'ping': {'usage': '/ping', 'desc': 'Check if bot is running', 'example': '/ping'},
+      'rules': {'usage': '/rules', 'desc': 'Show group rules', 'example': '/rules'},
+      'setrules': {'usage': '/setrules <text>', 'desc': 'Set group rules', 'example': '/setrules 1. Be nice\n2. No spam'},
+      'warn': {'usage': '/warn <phone> [reason] or reply', 'desc': 'Warn a user (reply or provide phone)', 'example': '/warn 972501234567 spam'},
+      'warns': {'usage': '/warns [phone]', 'desc': 'Check user warnings (reply or provide phone)', 'example': '/warns 972501234567'},
+      'resetwarns': {'usage': '/resetwarns [phone]', 'desc': 'Reset user warnings (reply or provide phone)', 'example': '/resetwarns 972501234567'},
+      'setwarn': {'usage': '/setwarn <number>', 'desc': 'Set warn limit', 'example': '/setwarn 3'},
+      'kick': {'usage': '/kick [phone]', 'desc': 'Kick user from group (reply or provide phone)', 'example': '/kick 972501234567'},
+      'ban': {'usage': '/ban [phone] [reason]', 'desc': 'Ban user from group (reply or provide phone)', 'example': '/ban 972501234567 spam'},
+      'role': {'usage': '/role [phone]', 'desc': 'Check if a user is admin (reply or provide phone)', 'example': '/role 972501234567'},
+      'unban': {'usage': '/unban <phone>', 'desc': 'Unban a user', 'example': '/unban 972501234567'},
+      'add': {'usage': '/add <phone>', 'desc': 'Add user to group', 'example': '/add 972501234567'},
+      'invite': {'usage': '/invite', 'desc': 'Get group invite link', 'example': '/invite'},
+      'delcmds': {'usage': '/delcmds <on|off|status>', 'desc': 'Enable/disable command deletion', 'example': '/delcmds on'},
+      'welcome': {'usage': '/welcome', 'desc': 'Show current welcome message', 'example': '/welcome'},
+      'setwelcome': {'usage': '/setwelcome <message>', 'desc': 'Set welcome message. Use {mention} to tag', 'example': '/setwelcome Welcome {mention}!'},
+      'blacklist': {'usage': '/blacklist', 'desc': 'Show blacklisted words', 'example': '/blacklist'},
+      'addblacklist': {'usage': '/addblacklist <word>', 'desc': 'Add word to blacklist', 'example': '/addblacklist spam'},
+      'rmblacklist': {'usage': '/rmblacklist <word>', 'desc': 'Remove word from blacklist', 'example': '/rmblacklist spam'},
+      'lock': {'usage': '/lock <type>', 'desc': 'Lock content type (links/stickers/media)', 'example': '/lock links'},
+      'unlock': {'usage': '/unlock <type>', 'desc': 'Unlock content', 'example': '/unlock links'},
+      'locks': {'usage': '/locks', 'desc': 'Show active locks', 'example': '/locks'},
+      'lang': {'usage': '/lang [he|en]', 'desc': 'Show or change language', 'example': '/lang he'},
+      'setlang': {'usage': '/setlang <he|en>', 'desc': 'Change bot language', 'example': '/setlang en'},
+      'aimod': {'usage': '/aimod [on|off]', 'desc': 'Enable/disable AI moderation or show status', 'example': '/aimod on'},
+      'aimodstatus': {'usage': '/aimodstatus', 'desc': 'Check AI settings', 'example': '/aimodstatus'},
+      'aimodset': {'usage': '/aimodset <category|all|cat1,cat2> <threshold>', 'desc': 'Adjust AI sensitivity (0-100)', 'example': '/aimodset toxicity,spam 80'},
+      'aihelp': {'usage': '/aihelp', 'desc': 'Detailed AI Moderation guide', 'example': '/aihelp'},
+      'aitest': {'usage': '/aitest <text> or reply', 'desc': 'Test message with AI and show scores', 'example': '/aitest test this text'},
    }
 }
 
+COMMAND_HELP = COMMANDS.help_table(COMMAND_HELP_TEXT)
+
+
+Formatter = Callable[[Dict[str, Any]], str]
+
+
+def _compile_template(text: str) -> Formatter:
+    """
+    Pre-parse a translation into a formatter taking a kwargs dict
+
+    Plain ``{name}`` placeholders become a printf-style pattern, which skips
+    str.format's parsing on every call; anything fancier (format specs,
+    attribute access) keeps using str.format.
+    """
+    parts = []
+    try:
+        for literal, field, spec, conversion in string.Formatter().parse(text):
+            parts.append(literal.replace('%', '%%'))
+            if field is None:
+                continue
+            if spec or conversion or not field.isidentifier():
+                return lambda kwargs: text.format(**kwargs)
+            parts.append(f"%({field})s")
+    except ValueError:
+        # Malformed template: let str.format raise when it is actually used
+        return lambda kwargs: text.format(**kwargs)
+    return ''.join(parts).__mod__
+
+
+# lang -> key -> (raw text, formatter), with English filling any missing keys
+_TEMPLATES: Dict[str, Dict[str, tuple]] = {
+    lang: {
+        key: (text, _compile_template(text))
+        for key, text in {**TRANSLATIONS['en'], **TRANSLATIONS[lang]}.items()
+    }
+    for lang in TRANSLATIONS
+}
+
+# Keys making up the general /help message
+HELP_KEYS = {
+    True: (
+        'help_general', 'help_general_admin',
+        'help_rules', 'help_rules_admin',
+        'help_warns', 'help_warns_admin',
+        'help_moderation', 'help_moderation_admin',
+        'help_welcome', 'help_welcome_admin',
+        'help_blacklist', 'help_blacklist_admin',
+        'help_locks', 'help_locks_admin',
+        'help_language_admin',
+        'help_ai', 'help_ai_admin',
+        'help_note', 'help_use_cmd',
+    ),
+    False: (
+        'help_general', 'help_general_user',
+        'help_rules', 'help_rules_user',
+        'help_warns', 'help_warns_user',
+        'help_welcome', 'help_welcome_user',
+        'help_blacklist', 'help_blacklist_user',
+        'help_locks', 'help_locks_user',
+        'help_ai', 'help_ai_user',
+        'help_note', 'help_use_cmd',
+    ),
+}
+
 
 def get_text(lang_code: str, key: str, **kwargs) -> str:
     """
@@ -820,8 +896,11 @@ def get_text(lang_code: str, key: str, **kwargs) -> str:
     Returns:
         Translated and formatted text
     """
-    text = TRANSLATIONS.get(lang_code, {}).get(key, TRANSLATIONS['en'].get(key, key))
-    return text.format(**kwargs) if kwargs else text
+    template = _TEMPLATES.get(lang_code, _TEMPLATES['en']).get(key)
+    if template is None:
+        return key.format(**kwargs) if kwargs else key
+    text, render = template
+    return render(kwargs) if kwargs else text
 
 
 def get_chat_text(chat_id: str, key: str, **kwargs) -> str:
@@ -839,3 +918,52 @@ def get_chat_text(chat_id: str, key: str, **kwargs) -> str:
     from .services.language_service import get_chat_language
     lang = get_chat_language(chat_id)
     return get_text(lang, key, **kwargs)
+
+
+@lru_cache(maxsize=None)
+def _help_text(lang_code: str, is_admin: bool) -> str:
+    return ''.join(get_text(lang_code, key) for key in HELP_KEYS[is_admin])
+
+
+def get_help_text(lang_code: str, is_admin: bool) -> str:
+    """
+    Get the general /help message, rendered once per language and role
+
+    Args:
+        lang_code: Language code
+        is_admin: Whether to include the admin sections
+
+    Returns:
+        Help message text
+    """
+    if lang_code not in TRANSLATIONS:
+        lang_code = 'en'
+    return _help_text(lang_code, bool(is_admin))
+
+
+@lru_cache(maxsize=None)
+def _command_help_text(lang_code: str, cmd_name: str) -> str:
+    cmd_data = COMMAND_HELP[lang_code][cmd_name]
+    msg = get_text(lang_code, 'help_cmd_header', cmd=cmd_name)
+    msg += get_text(lang_code, 'help_cmd_usage', usage=cmd_data['usage'])
+    msg += get_text(lang_code, 'help_cmd_desc', desc=cmd_data['desc'])
+    msg += get_text(lang_code, 'help_cmd_example', example=cmd_data['example'])
+    if cmd_data['admin']:
+        msg += get_text(lang_code, 'help_cmd_admin')
+    return msg
+
+
+def get_command_help(lang_code: str, cmd_name: str) -> Optional[str]:
+    """
+    Get the /help <command> message, rendered once per language and command
+
+    Args:
+        lang_code: Language code
+        cmd_name: Command name or alias
+
+    Returns:
+        Help message text, or None if the command has no help entry
+    """
+    if cmd_name not in COMMAND_HELP.get(lang_code, {}):
+        return None
+    return _command_help_text(lang_code, cmd_name)
@@ -0,0 +1,173 @@
+"""
+Join-burst aggregator
+Collects group joins per chat over a short window so one welcome greets everyone
+"""
+
+import heapq
+import itertools
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from .outbound_queue import OUTBOUND_MAX_CHARS
+
+logger = logging.getLogger(__name__)
+
+JOIN_WELCOME_WINDOW_MS = float(os.getenv('JOIN_WELCOME_WINDOW_MS', '3000'))
+JOIN_WELCOME_MAX_BATCH = int(os.getenv('JOIN_WELCOME_MAX_BATCH', '500'))
+
+MENTION_PLACEHOLDER = '{mention}'
+MENTION_SEPARATOR = ', '
+
+Flush = Callable[[str, List[str]], None]
+
+
+def render_welcomes(template: str, participant_ids: Sequence[str], mentions: Sequence[str],
+                    max_chars: int = OUTBOUND_MAX_CHARS) -> List[Tuple[str, List[str]]]:
+    """
+    Fill a welcome template for many joiners, split to fit the message limit
+
+    Every ``{mention}`` in the template receives the comma-separated
+    mentions of one message's joiners. A template without the placeholder
+    is sent once, tagging everyone.
+
+    Args:
+        template: Welcome message
+        participant_ids: Joined user IDs
+        mentions: Mention text for each user, in the same order
+        max_chars: Longest message to produce
+
+    Returns:
+        (text, mentioned user IDs) for each message to send
+    """
+    if MENTION_PLACEHOLDER not in template:
+        return [(template, list(participant_ids))]
+
+    slots = template.count(MENTION_PLACEHOLDER)
+    base = len(template) - slots * len(MENTION_PLACEHOLDER)
+    messages: List[Tuple[str, List[str]]] = []
+    ids: List[str] = []
+    names: List[str] = []
+    width = 0
+
+    def emit():
+        messages.append((template.replace(MENTION_PLACEHOLDER, MENTION_SEPARATOR.join(names)), ids))
+
+    for participant_id, mention in zip(participant_ids, mentions):
+        extra = len(mention) + (len(MENTION_SEPARATOR) if names else 0)
+        if names and base + slots * (width + extra) > max_chars:
+            emit()
+            ids, names, width = [], [], 0
+            extra = len(mention)
+        ids.append(participant_id)
+        names.append(mention)
+        width += extra
+    if names:
+        emit()
+    return messages
+
+
+class JoinAggregator:
+    """
+    Collects joins per chat and hands each burst to ``flush`` once
+
+    The first join in a chat opens a window of ``window`` seconds and every
+    join arriving before it closes joins the same burst; a burst that
+    reaches ``max_batch`` members is flushed straight away. Members are
+    deduplicated and keep their join order. With a zero window each join
+    event is flushed in the caller's thread.
+    """
+
+    def __init__(self, flush: Flush, window: float = JOIN_WELCOME_WINDOW_MS / 1000.0,
+                 max_batch: int = JOIN_WELCOME_MAX_BATCH):
+        """
+        Args:
+            flush: Called as flush(chat_id, participant_ids) for each burst
+            window: Seconds to collect joins after the first one
+            max_batch: Members that close a burst early
+        """
+        self.flush = flush
+        self.window = window
+        self.max_batch = max(int(max_batch), 1)
+        self._pending: Dict[str, Dict[str, None]] = {}
+        self._schedule: List = []
+        self._sequence = itertools.count()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self.joins = 0
+        self.bursts = 0
+
+    def add(self, chat_id: str, participant_ids: Sequence[str]) -> None:
+        """Record members who joined a chat"""
+        if self.window <= 0:
+            self._flush(chat_id, list(dict.fromkeys(participant_ids)))
+            return
+
+        ready = None
+        with self._cond:
+            self._start_locked()
+            burst = self._pending.get(chat_id)
+            if burst is None:
+                burst = self._pending[chat_id] = {}
+                heapq.heappush(self._schedule, (time.monotonic() + self.window, next(self._sequence), chat_id, burst))
+                self._cond.notify_all()
+            for participant_id in participant_ids:
+                burst[participant_id] = None
+            self.joins += len(participant_ids)
+            if len(burst) >= self.max_batch:
+                del self._pending[chat_id]
+                ready = list(burst)
+        if ready:
+            self._flush(chat_id, ready)
+
+    def _start_locked(self) -> None:
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name='join-aggregator', daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while self._running and (not self._schedule or self._schedule[0][0] > time.monotonic()):
+                    wait = self._schedule[0][0] - time.monotonic() if self._schedule else None
+                    self._cond.wait(wait)
+                if not self._running:
+                    return
+                _, _, chat_id, burst = heapq.heappop(self._schedule)
+                # Skip bursts that were already flushed for reaching max_batch
+                if self._pending.get(chat_id) is not burst:
+                    continue
+                del self._pending[chat_id]
+            self._flush(chat_id, list(burst))
+
+    def _flush(self, chat_id: str, participant_ids: List[str]) -> None:
+        with self._cond:
+            self.bursts += 1
+        try:
+            self.flush(chat_id, participant_ids)
+        except Exception as e:
+            logger.error(f"❌ Welcome for {len(participant_ids)} joiners in {chat_id} failed: {e}")
+
+    def stop(self) -> None:
+        """Flush every open burst now and stop the scheduler"""
+        with self._cond:
+            bursts = list(self._pending.items())
+            self._pending.clear()
+            self._schedule.clear()
+            thread, self._thread = self._thread, None
+            self._running = False
+            self._cond.notify_all()
+        if thread is not None:
+            thread.join()
+        for chat_id, burst in bursts:
+            self._flush(chat_id, list(burst))
+
+    def stats(self) -> Dict[str, int]:
+        """Join and burst counters"""
+        with self._cond:
+            return {'joins': self.joins, 'bursts': self.bursts, 'open_bursts': len(self._pending)}
@@ -0,0 +1,171 @@
+"""
+Keyed executor: ordered within a key, parallel across keys
+Each key hashes to a fixed worker lane with its own bounded queue
+"""
+
+import logging
+import queue
+import threading
+import time
+import zlib
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+def lane_for(key: str, lanes: int) -> int:
+    """Stable lane index for a key (same across processes and restarts)"""
+    return zlib.crc32(str(key).encode('utf-8')) % lanes
+
+
+class KeyedExecutor:
+    """
+    Runs tasks on a fixed set of single-threaded lanes
+
+    Tasks with the same key always land on the same lane and therefore run
+    strictly in submission order, while tasks for different keys spread over
+    the lanes and run concurrently. Every lane has its own bounded queue;
+    ``submit`` waits at most ``submit_timeout`` seconds for room in the
+    key's lane and otherwise rejects the task, so one hot key backs up only
+    its own lane.
+    """
+
+    def __init__(self, lanes: int = 4, lane_queue_size: int = 250, submit_timeout: float = 0.5,
+                 name: str = 'lane'):
+        """
+        Args:
+            lanes: Number of worker lanes (threads)
+            lane_queue_size: Maximum tasks waiting per lane
+            submit_timeout: Seconds to wait for room before rejecting a task
+            name: Prefix for worker thread names
+        """
+        self.lanes = max(int(lanes), 1)
+        self.lane_queue_size = lane_queue_size
+        self.submit_timeout = submit_timeout
+        self.name = name
+        self._queues: List["queue.Queue"] = [queue.Queue(maxsize=lane_queue_size) for _ in range(self.lanes)]
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.processed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.max_depth = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self._total_lag = 0.0
+
+    def start(self) -> None:
+        """Start the lane threads (idempotent)"""
+        with self._lock:
+            if self._threads:
+                return
+            for index, lane in enumerate(self._queues):
+                thread = threading.Thread(target=self._work, args=(lane,), name=f'{self.name}-{index}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, key: str, func: Callable, *args, **kwargs) -> bool:
+        """
+        Queue ``func(*args, **kwargs)`` on the lane owning ``key``
+
+        Args:
+            key: Ordering key (e.g. chat id)
+            func: Callable to run
+
+        Returns:
+            True if queued, False if the lane stayed full
+        """
+        return self._submit(key, func, args, kwargs, self.submit_timeout)
+
+    def submit_nowait(self, key: str, func: Callable, *args, **kwargs) -> bool:
+        """Like submit(), but reject at once when the key's lane is full"""
+        return self._submit(key, func, args, kwargs, 0)
+
+    def _submit(self, key: str, func: Callable, args, kwargs, timeout: float) -> bool:
+        lane = self._queues[lane_for(key, self.lanes)]
+        try:
+            lane.put((time.monotonic(), func, args, kwargs), timeout=timeout)
+        except queue.Full:
+            with self._lock:
+                self.rejected += 1
+            logger.warning(f"⚠️ {self.name} lane for {key} is full ({self.lane_queue_size}), rejecting task")
+            return False
+        with self._lock:
+            self.submitted += 1
+            self.max_depth = max(self.max_depth, lane.qsize())
+        return True
+
+    def _work(self, lane: "queue.Queue") -> None:
+        while True:
+            entry = lane.get()
+            try:
+                if entry is _STOP:
+                    return
+                submitted_at, func, args, kwargs = entry
+                lag = time.monotonic() - submitted_at
+                with self._lock:
+                    self.last_lag = lag
+                    self.max_lag = max(self.max_lag, lag)
+                    self._total_lag += lag
+                try:
+                    func(*args, **kwargs)
+                    with self._lock:
+                        self.processed += 1
+                except Exception as e:
+                    with self._lock:
+                        self.failed += 1
+                    logger.error(f"Error in {self.name} task: {e}", exc_info=True)
+            finally:
+                lane.task_done()
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every queued task has run
+
+        Returns:
+            True if all lanes drained within ``timeout``
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while any(lane.unfinished_tasks for lane in self._queues):
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def stop(self) -> None:
+        """Stop the lanes after the tasks already queued"""
+        with self._lock:
+            threads, self._threads = self._threads, []
+        if not threads:
+            return
+        for lane in self._queues:
+            lane.put(_STOP)
+        for thread in threads:
+            thread.join()
+
+    @property
+    def depth(self) -> int:
+        """Tasks waiting across all lanes"""
+        return sum(lane.qsize() for lane in self._queues)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return queue depth, throughput and lag metrics"""
+        with self._lock:
+            started = self.processed + self.failed
+            return {
+                'depth': self.depth,
+                'lane_depths': [lane.qsize() for lane in self._queues],
+                'lanes': self.lanes,
+                'lane_capacity': self.lane_queue_size,
+                'submitted': self.submitted,
+                'processed': self.processed,
+                'failed': self.failed,
+                'rejected': self.rejected,
+                'max_depth': self.max_depth,
+                'last_lag_ms': round(self.last_lag * 1000, 2),
+                'avg_lag_ms': round(self._total_lag / started * 1000, 2) if started else 0.0,
+                'max_lag_ms': round(self.max_lag * 1000, 2),
+            }
@@ -0,0 +1,128 @@
+"""
+Schema migrations
+Adds indexes and constraints declared in db_models to an existing database, in place
+"""
+
+import argparse
+import logging
+import sys
+from typing import List, Optional, Set
+
+from sqlalchemy import Index, inspect, text
+
+from .database import engine as default_engine
+from .db_models import Base
+
+logger = logging.getLogger(__name__)
+
+# Run before creating a unique index so duplicates from older versions do not block it;
+# the oldest row of each group is kept
+DEDUPLICATE = {
+    'uq_bans_chat_user': (
+        "DELETE FROM bans WHERE id NOT IN "
+        "(SELECT MIN(id) FROM bans GROUP BY chat_id, user_id)"
+    ),
+    'uq_blacklist_chat_word': (
+        "DELETE FROM blacklist WHERE id NOT IN "
+        "(SELECT MIN(id) FROM blacklist GROUP BY chat_id, lower(word))"
+    ),
+}
+
+
+def existing_indexes(conn, table_name: str) -> Set[str]:
+    """
+    Names of the indexes a table already has
+
+    SQLite and PostgreSQL are asked through their catalogs, which also list
+    expression indexes such as lower(word) that reflection skips.
+    """
+    dialect = conn.dialect.name
+    if dialect == 'sqlite':
+        rows = conn.execute(
+            text("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :table"),
+            table=table_name,
+        )
+        return {name for (name,) in rows}
+    if dialect == 'postgresql':
+        rows = conn.execute(
+            text("SELECT indexname FROM pg_indexes WHERE tablename = :table"),
+            table=table_name,
+        )
+        return {name for (name,) in rows}
+    return {index['name'] for index in inspect(conn).get_indexes(table_name)}
+
+
+def pending_indexes(bind=None) -> List[Index]:
+    """
+    Declared indexes missing from tables that already exist
+
+    Args:
+        bind: Engine or connection (default: the bot's engine)
+
+    Returns:
+        Index objects still to be created
+    """
+    bind = bind or default_engine
+    pending = []
+    with bind.connect() as conn:
+        tables = set(inspect(conn).get_table_names())
+        for table in Base.metadata.sorted_tables:
+            if table.name not in tables or not table.indexes:
+                continue
+            present = existing_indexes(conn, table.name)
+            pending.extend(index for index in sorted(table.indexes, key=lambda i: i.name)
+                           if index.name not in present)
+    return pending
+
+
+def migrate(bind=None, dry_run: bool = False) -> List[str]:
+    """
+    Bring a database's schema up to date; safe to run repeatedly
+
+    Missing tables are created with their indexes. Missing indexes on
+    existing tables are created one per transaction, removing duplicate rows
+    first where the index is unique.
+
+    Args:
+        bind: Engine (default: the bot's engine)
+        dry_run: Only report what would be created
+
+    Returns:
+        Names of the indexes created (or that would be created)
+    """
+    bind = bind or default_engine
+    pending = pending_indexes(bind)
+    if dry_run:
+        return [index.name for index in pending]
+
+    Base.metadata.create_all(bind=bind)
+    created = []
+    for index in pending:
+        with bind.begin() as conn:
+            dedupe = DEDUPLICATE.get(index.name)
+            if dedupe:
+                removed = conn.execute(text(dedupe)).rowcount
+                if removed:
+                    logger.warning(f"⚠️ Removed {removed} duplicate rows from {index.table.name} before adding {index.name}")
+            index.create(conn)
+        logger.info(f"✅ Created index {index.name} on {index.table.name}")
+        created.append(index.name)
+    return created
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description='Add missing indexes and constraints to the database at DATABASE_URL')
+    parser.add_argument('--dry-run', action='store_true', help='list missing indexes without creating them')
+    args = parser.parse_args(argv)
+
+    names = migrate(dry_run=args.dry_run)
+    if not names:
+        print('Schema is up to date')
+    for name in names:
+        print(f"{'missing' if args.dry_run else 'created'}: {name}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
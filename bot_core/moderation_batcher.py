@@ -0,0 +1,177 @@
+"""
+Micro-batching dispatcher for moderation API calls
+Collects texts from concurrent callers and sends them as a single request
+"""
+
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MODERATION_BATCH_WINDOW_MS = float(os.getenv('MODERATION_BATCH_WINDOW_MS', '25'))
+MODERATION_BATCH_SIZE = int(os.getenv('MODERATION_BATCH_SIZE', '32'))
+MODERATION_BATCH_TIMEOUT = float(os.getenv('MODERATION_BATCH_TIMEOUT', '5'))
+MODERATION_BATCH_CONCURRENCY = int(os.getenv('MODERATION_BATCH_CONCURRENCY', '4'))
+
+_STOP = object()
+
+
+class BatcherClosed(RuntimeError):
+    """Raised by MicroBatcher.submit() after close()"""
+
+
+class MicroBatcher:
+    """
+    Groups items submitted from many threads into batched calls
+
+    The first item of a batch opens a window of ``max_wait`` seconds; the
+    batch is sent when the window closes or ``max_batch_size`` items have
+    arrived, whichever comes first. ``send_batch`` must return one result per
+    item, in order. Batches are sent from a small worker pool so a slow
+    request does not hold up the next window. Each caller waits with its own
+    timeout; items whose caller gave up before sending are dropped. Once
+    closed, ``call`` sends each item on its own in the caller's thread.
+    """
+
+    def __init__(self, send_batch: Callable[[List[Any]], List[Any]],
+                 max_batch_size: int = MODERATION_BATCH_SIZE,
+                 max_wait: float = MODERATION_BATCH_WINDOW_MS / 1000.0,
+                 max_concurrency: int = MODERATION_BATCH_CONCURRENCY,
+                 name: str = 'moderation'):
+        """
+        Args:
+            send_batch: Callable sending a list of items and returning their results
+            max_batch_size: Maximum items per batch
+            max_wait: Seconds to wait for more items after the first one arrives
+            max_concurrency: Maximum batches in flight at once
+            name: Name used for the dispatcher thread and log messages
+        """
+        self.send_batch = send_batch
+        self.max_batch_size = max(int(max_batch_size), 1)
+        self.max_wait = max_wait
+        self.name = name
+        self._queue: "queue.Queue" = queue.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=max(max_concurrency, 1),
+                                            thread_name_prefix=f'{name}-batch')
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._closed = False
+        self.batches_sent = 0
+        self.items_sent = 0
+
+    def submit(self, item: Any) -> Future:
+        """
+        Queue an item and return a future for its result
+
+        Raises:
+            BatcherClosed: If close() has been called
+        """
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise BatcherClosed(f"{self.name} batcher is closed")
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=f'{self.name}-batcher', daemon=True)
+                self._thread.start()
+            self._queue.put((item, future))
+        return future
+
+    def call(self, item: Any, timeout: Optional[float] = MODERATION_BATCH_TIMEOUT) -> Any:
+        """
+        Submit an item and wait for its result
+
+        Args:
+            item: Item to send
+            timeout: Seconds this caller is willing to wait
+
+        Returns:
+            The item's result
+
+        Raises:
+            TimeoutError: If the result did not arrive in time
+            Exception: Whatever ``send_batch`` raised for the item's batch
+        """
+        try:
+            future = self.submit(item)
+        except BatcherClosed:
+            return self.send_batch([item])[0]
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise TimeoutError(f"{self.name} batch result not ready after {timeout}s")
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+            batch: List[Tuple[Any, Future]] = [first]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    entry = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if entry is _STOP:
+                    self._queue.put(_STOP)
+                    break
+                batch.append(entry)
+
+            # Drop items whose callers already timed out
+            batch = [(item, future) for item, future in batch if future.set_running_or_notify_cancel()]
+            if batch:
+                self._executor.submit(self._send, batch)
+
+    def _send(self, batch: List[Tuple[Any, Future]]) -> None:
+        try:
+            results = self.send_batch([item for item, _ in batch])
+            if len(results) != len(batch):
+                raise ValueError(f"expected {len(batch)} results, got {len(results)}")
+        except Exception as e:
+            logger.error(f"❌ {self.name} batch of {len(batch)} failed: {e}")
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        with self._lock:
+            self.batches_sent += 1
+            self.items_sent += len(batch)
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return batch counters"""
+        with self._lock:
+            batches, items = self.batches_sent, self.items_sent
+        return {
+            'batches_sent': batches,
+            'items_sent': items,
+            'avg_batch_size': items / batches if batches else 0.0,
+        }
+
+    def close(self) -> None:
+        """Stop the dispatcher thread once queued items are sent; later calls go out unbatched"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread
+            if thread is not None:
+                self._queue.put(_STOP)
+        if thread is not None:
+            thread.join()
+        self._executor.shutdown(wait=True)
+
+
+def batching_enabled() -> bool:
+    """Whether moderation calls should be micro-batched"""
+    return MODERATION_BATCH_WINDOW_MS > 0 and MODERATION_BATCH_SIZE > 1
@@ -0,0 +1,240 @@
+"""
+Moderation verdict cache
+Remembers raw backend scores for repeated messages so per-chat thresholds can be re-applied
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional, Tuple
+
+from .database import get_session, on_init_db
+from .group_commit import run_write
+from .db_models import ModerationVerdict
+
+logger = logging.getLogger(__name__)
+
+MODERATION_CACHE_SIZE = int(os.getenv('MODERATION_CACHE_SIZE', '10000'))
+MODERATION_CACHE_TTL = float(os.getenv('MODERATION_CACHE_TTL', '86400'))
+MODERATION_CACHE_PERSIST = os.getenv('MODERATION_CACHE_PERSIST', 'false').lower() == 'true'
+
+_WHITESPACE = re.compile(r'\s+')
+# Variation selectors are combining marks, but carry no meaning for moderation
+_VARIATION_SELECTORS = {'\ufe0e', '\ufe0f'}
+# Cf covers zero-width characters, joiners and BOMs; So/Sk cover emoji and skin tones
+_STRIPPED_CATEGORIES = {'Cf', 'So', 'Sk', 'Cs', 'Co'}
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize a message for fingerprinting
+
+    Case-folds, strips emoji and zero-width characters, and collapses runs of
+    whitespace, so trivially altered copies of a message share a fingerprint.
+
+    Args:
+        text: Message text
+
+    Returns:
+        Normalized text
+    """
+    text = unicodedata.normalize('NFKC', text).casefold()
+    text = ''.join(
+        ch for ch in text
+        if ch not in _VARIATION_SELECTORS and unicodedata.category(ch) not in _STRIPPED_CATEGORIES
+    )
+    return _WHITESPACE.sub(' ', text).strip()
+
+
+def fingerprint(backend: str, text: str) -> str:
+    """Hash of the backend name and normalized text"""
+    return hashlib.sha256(f"{backend}\0{normalize_text(text)}".encode('utf-8')).hexdigest()
+
+
+@dataclass(frozen=True)
+class CachedVerdict:
+    """Raw backend output for a message, independent of any chat's thresholds"""
+    scores: Dict[str, float]
+    flagged_categories: Tuple[str, ...] = ()
+
+
+class VerdictCache:
+    """
+    Thread-safe LRU + TTL cache of moderation verdicts
+
+    Only raw category scores are stored, so each chat's thresholds are
+    applied after the lookup. With ``persist`` enabled, verdicts are also
+    written to the ``moderation_verdicts`` table and read back on a memory
+    miss, so a restart does not start cold.
+    """
+
+    def __init__(self, max_size: int = MODERATION_CACHE_SIZE, ttl: float = MODERATION_CACHE_TTL,
+                 persist: bool = MODERATION_CACHE_PERSIST, clock: Callable[[], float] = time.time):
+        """
+        Args:
+            max_size: Maximum verdicts kept in memory
+            ttl: Seconds a verdict stays valid
+            persist: Also store verdicts in the database
+            clock: Time source returning seconds since the epoch
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.persist = persist
+        self.clock = clock
+        self._entries: "OrderedDict[str, Tuple[CachedVerdict, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, backend: str, text: str) -> Optional[CachedVerdict]:
+        """
+        Look up the verdict for a message
+
+        Args:
+            backend: Moderation backend the verdict came from
+            text: Message text
+
+        Returns:
+            CachedVerdict or None on a miss
+        """
+        key = fingerprint(backend, text)
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                verdict, stored_at = entry
+                if now - stored_at < self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return verdict
+                del self._entries[key]
+
+        if self.persist:
+            loaded = self._load(key, now)
+            if loaded is not None:
+                verdict, stored_at = loaded
+                with self._lock:
+                    self._store_locked(key, verdict, stored_at)
+                    self.hits += 1
+                return verdict
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, backend: str, text: str, verdict: CachedVerdict) -> None:
+        """Store the verdict for a message"""
+        key = fingerprint(backend, text)
+        now = self.clock()
+        with self._lock:
+            self._store_locked(key, verdict, now)
+        if self.persist:
+            self._save(key, verdict, now)
+
+    def _store_locked(self, key: str, verdict: CachedVerdict, stored_at: float) -> None:
+        self._entries[key] = (verdict, stored_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def _load(self, key: str, now: float) -> Optional[Tuple[CachedVerdict, float]]:
+        session = get_session()
+        try:
+            row = session.query(ModerationVerdict).filter_by(fingerprint=key).first()
+            if row is None:
+                return None
+            stored_at = row.created_at.timestamp()
+            if now - stored_at >= self.ttl:
+                return None
+            verdict = CachedVerdict(
+                scores=json.loads(row.scores),
+                flagged_categories=tuple(json.loads(row.flagged_categories or '[]')),
+            )
+            return verdict, stored_at
+        except Exception as e:
+            logger.error(f"Error loading moderation verdict: {e}")
+            return None
+        finally:
+            session.close()
+
+    def _save(self, key: str, verdict: CachedVerdict, now: float) -> None:
+        def save(session) -> None:
+            session.merge(ModerationVerdict(
+                fingerprint=key,
+                scores=json.dumps(verdict.scores),
+                flagged_categories=json.dumps(list(verdict.flagged_categories)),
+                created_at=datetime.fromtimestamp(now),
+            ))
+
+        try:
+            run_write(save)
+        except Exception as e:
+            logger.error(f"Error saving moderation verdict: {e}")
+
+    def purge_expired(self) -> int:
+        """
+        Drop expired verdicts from memory and, when persisting, the database
+
+        Returns:
+            Number of verdicts removed
+        """
+        now = self.clock()
+        with self._lock:
+            expired = [key for key, (_, stored_at) in self._entries.items() if now - stored_at >= self.ttl]
+            for key in expired:
+                del self._entries[key]
+        removed = len(expired)
+
+        if self.persist:
+            session = get_session()
+            try:
+                cutoff = datetime.fromtimestamp(now) - timedelta(seconds=self.ttl)
+                removed += session.query(ModerationVerdict).filter(
+                    ModerationVerdict.created_at < cutoff
+                ).delete()
+                session.commit()
+            except Exception as e:
+                session.rollback()
+                logger.error(f"Error purging moderation verdicts: {e}")
+            finally:
+                session.close()
+        return removed
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from the cache"""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> Dict[str, float]:
+        """Return hit/miss counters and current size"""
+        return {'hits': self.hits, 'misses': self.misses, 'hit_rate': self.hit_rate, 'size': len(self)}
+
+    def clear(self) -> None:
+        """Drop every in-memory verdict and reset counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_verdict_cache = VerdictCache()
+
+
+def get_verdict_cache() -> VerdictCache:
+    """Get the process-wide verdict cache"""
+    return _verdict_cache
+
+
+on_init_db(_verdict_cache.clear)
@@ -0,0 +1,147 @@
+"""
+Cost-ordered moderation pipeline
+Runs message checks cheapest-first and stops at the first decisive verdict
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class MessageContext:
+    """A group message being moderated"""
+    chat_id: str
+    from_id: str
+    text: str
+    message: dict = field(default_factory=dict)
+
+
+@dataclass
+class StageVerdict:
+    """Outcome of the stage that stopped the pipeline"""
+    stage: str
+    detail: Any
+
+
+class ModerationStage:
+    """
+    One moderation check
+
+    ``check`` returns a truthy detail (matched word, lock type, AI result...)
+    when the message violates the rule, or None. When it fires, ``act`` is
+    called with that detail. A terminal stage stops the pipeline after
+    acting; a non-terminal one lets later stages run.
+    """
+
+    def __init__(self, name: str, cost: float, check: Callable[[MessageContext], Any],
+                 act: Optional[Callable[[MessageContext, Any], None]] = None, terminal: bool = True):
+        """
+        Args:
+            name: Stage name (used in timing stats)
+            cost: Relative cost; cheaper stages run first
+            check: Callable returning a violation detail or None
+            act: Callable applying the verdict
+            terminal: Whether a violation stops the pipeline
+        """
+        self.name = name
+        self.cost = cost
+        self.check = check
+        self.act = act
+        self.terminal = terminal
+
+    def __repr__(self) -> str:
+        return f"ModerationStage({self.name!r}, cost={self.cost}, terminal={self.terminal})"
+
+
+class ModerationPipeline:
+    """
+    Ordered set of moderation stages with per-stage timing
+
+    Stages are kept sorted by cost (ties keep registration order). A stage
+    that raises is logged and treated as passing, so one broken check never
+    disables the others.
+    """
+
+    def __init__(self, stages: Optional[List[ModerationStage]] = None):
+        self._stages: List[ModerationStage] = []
+        self._lock = threading.Lock()
+        self._timings: Dict[str, Dict[str, float]] = {}
+        for stage in stages or []:
+            self.add(stage)
+
+    @property
+    def stages(self) -> List[ModerationStage]:
+        """Stages in execution order"""
+        return list(self._stages)
+
+    def add(self, stage: ModerationStage) -> None:
+        """Register a stage, replacing any existing stage with the same name"""
+        stages = [s for s in self._stages if s.name != stage.name]
+        stages.append(stage)
+        self._stages = sorted(stages, key=lambda s: s.cost)
+
+    def remove(self, name: str) -> bool:
+        """Unregister a stage. Returns True if it existed."""
+        stages = [s for s in self._stages if s.name != name]
+        removed = len(stages) != len(self._stages)
+        self._stages = stages
+        return removed
+
+    def run(self, ctx: MessageContext, min_cost: Optional[float] = None,
+            max_cost: Optional[float] = None) -> Optional[StageVerdict]:
+        """
+        Run stages cheapest-first until a terminal stage fires
+
+        A run can be split in two by cost, e.g. ``run(ctx, max_cost=10)``
+        then ``run(ctx, min_cost=10)`` when the first returned None.
+
+        Args:
+            ctx: Message being moderated
+            min_cost: Only run stages costing more than this
+            max_cost: Only run stages costing at most this
+
+        Returns:
+            StageVerdict of the terminal stage that fired, or None if the message passed
+        """
+        for stage in self._stages:
+            if min_cost is not None and stage.cost <= min_cost:
+                continue
+            if max_cost is not None and stage.cost > max_cost:
+                break
+            start = time.perf_counter()
+            try:
+                detail = stage.check(ctx)
+            except Exception as e:
+                logger.error(f"Error in moderation stage '{stage.name}': {e}", exc_info=True)
+                detail = None
+            self._record(stage.name, time.perf_counter() - start, bool(detail))
+
+            if not detail:
+                continue
+            if stage.act is not None:
+                stage.act(ctx, detail)
+            if stage.terminal:
+                return StageVerdict(stage=stage.name, detail=detail)
+        return None
+
+    def _record(self, name: str, elapsed: float, fired: bool) -> None:
+        with self._lock:
+            timing = self._timings.setdefault(name, {'calls': 0, 'hits': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+            elapsed_ms = elapsed * 1000
+            timing['calls'] += 1
+            timing['hits'] += int(fired)
+            timing['total_ms'] += elapsed_ms
+            timing['max_ms'] = max(timing['max_ms'], elapsed_ms)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Per-stage call/hit counts and timing"""
+        with self._lock:
+            return {
+                name: dict(timing, avg_ms=timing['total_ms'] / timing['calls'] if timing['calls'] else 0.0)
+                for name, timing in self._timings.items()
+            }
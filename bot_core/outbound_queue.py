@@ -0,0 +1,330 @@
+"""
+Outbound message dispatcher
+Per-chat rate limiting, coalescing of back-to-back texts and retries for bot replies
+"""
+
+import heapq
+import itertools
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+OUTBOUND_RATE = float(os.getenv('OUTBOUND_RATE', '1.0'))
+OUTBOUND_BURST = int(os.getenv('OUTBOUND_BURST', '5'))
+OUTBOUND_COALESCE_MS = float(os.getenv('OUTBOUND_COALESCE_MS', '150'))
+OUTBOUND_MAX_CHARS = int(os.getenv('OUTBOUND_MAX_CHARS', '4000'))
+OUTBOUND_MAX_ATTEMPTS = int(os.getenv('OUTBOUND_MAX_ATTEMPTS', '4'))
+OUTBOUND_RETRY_BASE = float(os.getenv('OUTBOUND_RETRY_BASE', '0.5'))
+OUTBOUND_RETRY_MAX = float(os.getenv('OUTBOUND_RETRY_MAX', '10'))
+OUTBOUND_WORKERS = int(os.getenv('OUTBOUND_WORKERS', '4'))
+
+Deliver = Callable[[str, str, Optional[List[str]]], Optional[str]]
+
+
+class TokenBucket:
+    """Refills ``rate`` tokens per second up to ``burst``"""
+
+    def __init__(self, rate: float, burst: int, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.clock = clock
+        self.tokens = float(self.burst)
+        self.updated = clock()
+
+    def take(self) -> float:
+        """
+        Take one token
+
+        Returns:
+            0 if a token was taken, otherwise seconds until one is available
+        """
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        if self.rate <= 0:
+            return float('inf')
+        return (1 - self.tokens) / self.rate
+
+    def full(self) -> bool:
+        """Whether the bucket has refilled completely"""
+        return self.tokens + (self.clock() - self.updated) * self.rate >= self.burst
+
+
+class OutboundMessage:
+    """Handle for a queued message"""
+
+    def __init__(self, chat_id: str, text: str, mention_ids: Optional[List[str]] = None):
+        self.chat_id = chat_id
+        self.text = text
+        self.mention_ids = list(mention_ids) if mention_ids else None
+        self.message_id: Optional[str] = None
+        self.error: Optional[Exception] = None
+        self.coalesced = False
+        self._done = threading.Event()
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[str]:
+        """
+        Wait for delivery
+
+        Returns:
+            Bridge message id, or None if delivery failed or timed out
+        """
+        self._done.wait(timeout)
+        return self.message_id
+
+    def _resolve(self, message_id: Optional[str], error: Optional[Exception] = None) -> None:
+        self.message_id = message_id
+        self.error = error
+        self._done.set()
+
+
+class _Batch:
+    """One bridge send covering one or more coalesced messages"""
+
+    def __init__(self, messages: List[OutboundMessage]):
+        self.messages = messages
+        self.text = '\n\n'.join(message.text for message in messages)
+        mention_ids: List[str] = []
+        for message in messages:
+            for mention_id in message.mention_ids or ():
+                if mention_id not in mention_ids:
+                    mention_ids.append(mention_id)
+        self.mention_ids = mention_ids or None
+        self.attempts = 0
+
+
+class _ChatState:
+    def __init__(self, bucket: TokenBucket):
+        self.bucket = bucket
+        self.pending: Deque[OutboundMessage] = deque()
+        self.retry: Optional[_Batch] = None
+        self.busy = False
+        self.scheduled = False
+
+
+class OutboundDispatcher:
+    """
+    Queues bot replies and delivers them without blocking the handler
+
+    Each chat has its own token bucket and at most one send in flight, so
+    replies to one chat keep their order while different chats are sent in
+    parallel. Texts queued for the same chat within ``coalesce_window`` (or
+    while a previous send is in flight) go out as one message, separated by
+    blank lines. Failures that ``is_transient`` accepts are retried with
+    jittered exponential backoff; other failures resolve the handle with the
+    error.
+    """
+
+    MAX_IDLE_CHATS = 1024
+
+    def __init__(self, deliver: Deliver, rate: float = OUTBOUND_RATE, burst: int = OUTBOUND_BURST,
+                 coalesce_window: float = OUTBOUND_COALESCE_MS / 1000.0, max_chars: int = OUTBOUND_MAX_CHARS,
+                 max_attempts: int = OUTBOUND_MAX_ATTEMPTS, retry_base: float = OUTBOUND_RETRY_BASE,
+                 retry_max: float = OUTBOUND_RETRY_MAX, workers: int = OUTBOUND_WORKERS,
+                 is_transient: Callable[[Exception], bool] = lambda e: True):
+        """
+        Args:
+            deliver: Callable(chat_id, text, mention_ids) returning the message id; raises on failure
+            rate: Messages per second allowed per chat
+            burst: Messages a quiet chat may send back to back
+            coalesce_window: Seconds to hold a chat's first message for follow-ups
+            max_chars: Longest coalesced text
+            max_attempts: Delivery attempts per message before giving up
+            retry_base: First retry delay in seconds
+            retry_max: Longest retry delay in seconds
+            workers: Chats sent to in parallel
+            is_transient: Whether a delivery error is worth retrying
+        """
+        self.deliver = deliver
+        self.rate = rate
+        self.burst = burst
+        self.coalesce_window = coalesce_window
+        self.max_chars = max_chars
+        self.max_attempts = max(max_attempts, 1)
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.workers = max(workers, 1)
+        self.is_transient = is_transient
+        self._chats: Dict[str, _ChatState] = {}
+        self._schedule: List = []
+        self._sequence = itertools.count()
+        self._cond = threading.Condition()
+        self._outstanding = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self.queued = 0
+        self.sent = 0
+        self.coalesced = 0
+        self.retried = 0
+        self.failed = 0
+
+    def start(self) -> None:
+        """Start the scheduler (idempotent; ``send`` calls it)"""
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='outbound')
+            self._thread = threading.Thread(target=self._run, name='outbound-scheduler', daemon=True)
+            self._thread.start()
+
+    def send(self, chat_id: str, text: str, mention_ids: Optional[List[str]] = None) -> OutboundMessage:
+        """
+        Queue a message for delivery
+
+        Args:
+            chat_id: Target chat
+            text: Message text
+            mention_ids: Users to tag (sent through the mention endpoint)
+
+        Returns:
+            OutboundMessage handle; ``wait()`` returns the message id once sent
+        """
+        self.start()
+        message = OutboundMessage(chat_id, text, mention_ids)
+        with self._cond:
+            state = self._chats.get(chat_id)
+            if state is None:
+                if len(self._chats) >= self.MAX_IDLE_CHATS:
+                    self._prune_locked()
+                state = self._chats[chat_id] = _ChatState(TokenBucket(self.rate, self.burst))
+            state.pending.append(message)
+            self._outstanding += 1
+            self.queued += 1
+            if not state.busy and not state.scheduled:
+                self._schedule_locked(chat_id, state, time.monotonic() + self.coalesce_window)
+        return message
+
+    def _prune_locked(self) -> None:
+        """Forget chats with nothing queued whose bucket has refilled"""
+        for chat_id, state in list(self._chats.items()):
+            idle = not (state.busy or state.scheduled or state.pending or state.retry)
+            if idle and state.bucket.full():
+                del self._chats[chat_id]
+
+    def _schedule_locked(self, chat_id: str, state: _ChatState, due: float) -> None:
+        state.scheduled = True
+        heapq.heappush(self._schedule, (due, next(self._sequence), chat_id))
+        self._cond.notify_all()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while self._running and (not self._schedule or self._schedule[0][0] > time.monotonic()):
+                    wait = self._schedule[0][0] - time.monotonic() if self._schedule else None
+                    self._cond.wait(wait)
+                if not self._running:
+                    return
+                _, _, chat_id = heapq.heappop(self._schedule)
+                batch = self._next_batch_locked(chat_id)
+            if batch is not None:
+                self._executor.submit(self._deliver, chat_id, batch)
+
+    def _next_batch_locked(self, chat_id: str) -> Optional[_Batch]:
+        state = self._chats[chat_id]
+        state.scheduled = False
+        if state.busy or (state.retry is None and not state.pending):
+            return None
+        wait = state.bucket.take()
+        if wait > 0:
+            self._schedule_locked(chat_id, state, time.monotonic() + wait)
+            return None
+        state.busy = True
+        if state.retry is not None:
+            batch, state.retry = state.retry, None
+            return batch
+        messages = [state.pending.popleft()]
+        length = len(messages[0].text)
+        while state.pending and length + 2 + len(state.pending[0].text) <= self.max_chars:
+            length += 2 + len(state.pending[0].text)
+            messages.append(state.pending.popleft())
+        return _Batch(messages)
+
+    def _deliver(self, chat_id: str, batch: _Batch) -> None:
+        batch.attempts += 1
+        message_id, error = None, None
+        try:
+            message_id = self.deliver(chat_id, batch.text, batch.mention_ids)
+        except Exception as e:
+            error = e
+
+        with self._cond:
+            state = self._chats[chat_id]
+            state.busy = False
+            if error is not None and batch.attempts < self.max_attempts and self.is_transient(error):
+                delay = min(self.retry_max, self.retry_base * 2 ** (batch.attempts - 1)) * random.uniform(0.5, 1.5)
+                logger.warning(f"⚠️ Send to {chat_id} failed ({error}), retry {batch.attempts} in {delay:.1f}s")
+                self.retried += 1
+                state.retry = batch
+                self._schedule_locked(chat_id, state, time.monotonic() + delay)
+                return
+
+            if error is None:
+                self.sent += 1
+                self.coalesced += len(batch.messages) - 1
+            else:
+                self.failed += len(batch.messages)
+                logger.error(f"Failed to send to {chat_id} after {batch.attempts} attempts: {error}")
+            for message in batch.messages:
+                message.coalesced = len(batch.messages) > 1
+                message._resolve(message_id, error)
+            self._outstanding -= len(batch.messages)
+
+            if state.pending:
+                self._schedule_locked(chat_id, state, time.monotonic())
+            self._cond.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every queued message has been sent or has failed
+
+        Returns:
+            True if the queue drained within ``timeout``
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._outstanding:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def stop(self, timeout: Optional[float] = 10) -> None:
+        """Deliver what is queued (up to ``timeout``) and stop the workers"""
+        self.flush(timeout)
+        with self._cond:
+            if not self._running:
+                return
+            self._running = False
+            self._cond.notify_all()
+        self._thread.join()
+        self._executor.shutdown(wait=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and delivery counters"""
+        with self._cond:
+            return {
+                'outstanding': self._outstanding,
+                'tracked_chats': len(self._chats),
+                'queued': self.queued,
+                'sent': self.sent,
+                'coalesced': self.coalesced,
+                'retried': self.retried,
+                'failed': self.failed,
+            }
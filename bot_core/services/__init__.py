@@ -11,6 +11,7 @@ from .language_service import (
 from .warn_service import (
     warn_user,
     get_user_warns,
+    get_warn_count,
     reset_user_warns,
     set_warn_limit,
     get_warn_limit
@@ -31,6 +32,8 @@ from .welcome_service import (
 
 from .blacklist_service import (
     add_blacklist_word,
+    add_blacklist_words,
+    export_blacklist,
     remove_blacklist_word,
     get_blacklist_words,
     check_blacklist,
@@ -65,6 +68,12 @@ from .flood_service import (
     reset_user_flood
 )
 
+from .settings_cache import (
+    ChatSettingsSnapshot,
+    get_chat_settings,
+    invalidate_chat_settings
+)
+
 __all__ = [
     # Language service
     'get_chat_language',
@@ -74,6 +83,7 @@ __all__ = [
     # Warn service
     'warn_user',
     'get_user_warns',
+    'get_warn_count',
     'reset_user_warns',
     'set_warn_limit',
     'get_warn_limit',
@@ -91,6 +101,8 @@ __all__ = [
     
     # Blacklist service
     'add_blacklist_word',
+    'add_blacklist_words',
+    'export_blacklist',
     'remove_blacklist_word',
     'get_blacklist_words',
     'check_blacklist',
@@ -120,4 +132,9 @@ __all__ = [
     'check_flood',
     'clear_old_flood_records',
     'reset_user_flood',
+    
+    # Settings cache
+    'ChatSettingsSnapshot',
+    'get_chat_settings',
+    'invalidate_chat_settings',
 ]
@@ -5,11 +5,17 @@ Uses OpenAI's Moderation API
 
 import requests
 import logging
-from typing import Dict, Any
+import threading
+from typing import Dict, Any, List
 from .base_backend import BaseBackend
+from ...moderation_batcher import MODERATION_BATCH_TIMEOUT, MicroBatcher, batching_enabled
 
 logger = logging.getLogger(__name__)
 
+# One batcher per API key, shared by every backend instance using that key
+_batchers: Dict[str, MicroBatcher] = {}
+_batchers_lock = threading.Lock()
+
 
 class OpenAIBackend(BaseBackend):
     """Toxicity detection using OpenAI Moderation API"""
@@ -24,6 +30,33 @@ class OpenAIBackend(BaseBackend):
     def requires_api_key(self) -> bool:
         return True
     
+    def _post(self, inputs: List[str]) -> List[Dict[str, Any]]:
+        """Send one moderation request and return its per-input results"""
+        headers = {
+            'Authorization': f'Bearer {self.api_key}',
+            'Content-Type': 'application/json'
+        }
+        response = requests.post(self.API_URL, json={'input': inputs}, headers=headers, timeout=5)
+        response.raise_for_status()
+        return response.json().get('results') or []
+
+    def _get_batcher(self) -> MicroBatcher:
+        batcher = _batchers.get(self.api_key)
+        if batcher is None:
+            with _batchers_lock:
+                batcher = _batchers.get(self.api_key)
+                if batcher is None:
+                    batcher = MicroBatcher(self._post, name='openai-backend')
+                    _batchers[self.api_key] = batcher
+        return batcher
+
+    def _moderate(self, text: str) -> Dict[str, Any]:
+        """Get the moderation result for one text, batched when enabled"""
+        if batching_enabled():
+            return self._get_batcher().call(text, timeout=MODERATION_BATCH_TIMEOUT)
+        results = self._post([text])
+        return results[0] if results else {}
+
     def check_toxicity(self, text: str, threshold: float = 0.7) -> Dict[str, Any]:
         """Check toxicity using OpenAI Moderation API"""
         if not self.api_key:
@@ -42,19 +75,9 @@ class OpenAIBackend(BaseBackend):
             }
         
         try:
-            headers = {
-                'Authorization': f'Bearer {self.api_key}',
-                'Content-Type': 'application/json'
-            }
+            moderation = self._moderate(text)
             
-            data = {'input': text}
-            
-            response = requests.post(self.API_URL, json=data, headers=headers, timeout=5)
-            response.raise_for_status()
-            
-            result = response.json()
-            
-            if not result.get('results'):
+            if not moderation:
                 return {
                     'is_toxic': False,
                     'score': 0.0,
@@ -62,8 +85,6 @@ class OpenAIBackend(BaseBackend):
                     'error': 'No results from API'
                 }
             
-            moderation = result['results'][0]
-            
             # Check if any category is flagged
             is_flagged = moderation.get('flagged', False)
             
@@ -91,7 +112,7 @@ class OpenAIBackend(BaseBackend):
                 }
             }
             
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, ValueError, TimeoutError) as e:
             logger.error(f"❌ OpenAI API error: {e}")
             return {
                 'is_toxic': False,
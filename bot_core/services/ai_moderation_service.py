@@ -15,7 +15,9 @@ from datetime import datetime
 from ..database import get_session
 from sqlalchemy.exc import OperationalError
 from ..db_models import AIModeration as AIModerationSettings, AIModerationThreshold
+from ..upsert import upsert
 from .ai_backends import OpenAIBackend
+from .settings_cache import get_chat_settings, invalidate_chat_settings
 
 logger = logging.getLogger(__name__)
 
@@ -73,9 +75,9 @@ def get_ai_settings(chat_id: str) -> Dict[str, Any]:
     Returns:
         Dictionary with AI settings
     """
-    session = get_session()
     try:
-        settings = session.query(AIModerationSettings).filter_by(chat_id=chat_id).first()
+        snapshot = get_chat_settings(chat_id)
+        settings = snapshot.ai
         if not settings:
             return {
                 'enabled': False,
@@ -86,24 +88,24 @@ def get_ai_settings(chat_id: str) -> Dict[str, Any]:
                 'action': 'warn'
             }
 
-        threshold = settings.threshold
+        threshold = settings['threshold']
         if threshold is None:
             threshold = 0.7
         elif isinstance(threshold, (int, float)) and threshold > 1:
             threshold = float(threshold) / 100.0
 
-        backend = _resolve_backend(settings.backend or None)
-        api_key = settings.api_key
+        backend = _resolve_backend(settings['backend'] or None)
+        api_key = settings['api_key']
         if backend == 'openai' and os.getenv('OPENAI_API_KEY'):
             api_key = os.getenv('OPENAI_API_KEY')
 
         return {
-            'enabled': settings.enabled,
+            'enabled': settings['enabled'],
             'backend': backend,
             'api_key': api_key,
             'threshold': float(threshold),
-            'thresholds': get_ai_category_thresholds(chat_id),
-            'action': settings.action or 'warn'
+            'thresholds': dict(snapshot.ai_thresholds),
+            'action': settings['action'] or 'warn'
         }
     except Exception as e:
         # If database doesn't exist yet or any error, return defaults
@@ -115,8 +117,15 @@ def get_ai_settings(chat_id: str) -> Dict[str, Any]:
             'thresholds': {},
             'action': 'warn'
         }
-    finally:
-        session.close()
+
+
+# Values a chat's AI settings row starts with when a setter creates it
+_AI_ROW_DEFAULTS = {'enabled': False, 'backend': 'openai', 'threshold': 0.7, 'action': 'warn'}
+
+
+def _upsert_ai_settings(session, chat_id: str, **fields) -> None:
+    """Set some AI settings columns, creating the row with defaults if needed"""
+    upsert(session, AIModerationSettings, {**_AI_ROW_DEFAULTS, 'chat_id': chat_id, **fields}, update=fields)
 
 
 def set_ai_enabled(chat_id: str, enabled: bool) -> bool:
@@ -129,20 +138,9 @@ def set_ai_enabled(chat_id: str, enabled: bool) -> bool:
     """
     session = get_session()
     try:
-        settings = session.query(AIModerationSettings).filter_by(chat_id=chat_id).first()
-        if not settings:
-            settings = AIModerationSettings(
-                chat_id=chat_id,
-                enabled=enabled,
-                backend='openai',
-                threshold=0.7,
-                action='warn'
-            )
-            session.add(settings)
-        else:
-            settings.enabled = enabled
-        
+        _upsert_ai_settings(session, chat_id, enabled=enabled)
         session.commit()
+        invalidate_chat_settings(chat_id)
         
         status = "enabled" if enabled else "disabled"
         logger.info(f"🤖 AI moderation {status} for {chat_id}")
@@ -169,20 +167,9 @@ def set_ai_backend(chat_id: str, backend: str) -> bool:
     
     session = get_session()
     try:
-        settings = session.query(AIModerationSettings).filter_by(chat_id=chat_id).first()
-        if not settings:
-            settings = AIModerationSettings(
-                chat_id=chat_id,
-                enabled=False,
-                backend=backend,
-                threshold=0.7,
-                action='warn'
-            )
-            session.add(settings)
-        else:
-            settings.backend = backend
-        
+        _upsert_ai_settings(session, chat_id, backend=backend)
         session.commit()
+        invalidate_chat_settings(chat_id)
         logger.info(f"🤖 AI backend set to '{backend}' for {chat_id}")
         return True
     except OperationalError:
@@ -201,21 +188,9 @@ def set_ai_api_key(chat_id: str, api_key: str) -> bool:
     """
     session = get_session()
     try:
-        settings = session.query(AIModerationSettings).filter_by(chat_id=chat_id).first()
-        if not settings:
-            settings = AIModerationSettings(
-                chat_id=chat_id,
-                enabled=False,
-                backend='openai',
-                api_key=api_key,
-                threshold=0.7,
-                action='warn'
-            )
-            session.add(settings)
-        else:
-            settings.api_key = api_key
-        
+        _upsert_ai_settings(session, chat_id, api_key=api_key)
         session.commit()
+        invalidate_chat_settings(chat_id)
         logger.info(f"🔑 AI API key set for {chat_id}")
         return True
     except OperationalError:
@@ -244,20 +219,9 @@ def set_ai_threshold(chat_id: str, threshold: float) -> bool:
                     threshold = float(threshold) / 100.0
                 else:
                     return False
-        settings = session.query(AIModerationSettings).filter_by(chat_id=chat_id).first()
-        if not settings:
-            settings = AIModerationSettings(
-                chat_id=chat_id,
-                enabled=False,
-                backend='openai',
-                threshold=float(threshold),
-                action='warn'
-            )
-            session.add(settings)
-        else:
-            settings.threshold = float(threshold)
-        
+        _upsert_ai_settings(session, chat_id, threshold=float(threshold))
         session.commit()
+        invalidate_chat_settings(chat_id)
         logger.info(f"🎯 AI threshold set to {threshold} for {chat_id}")
         return True
     except OperationalError:
@@ -268,20 +232,10 @@ def set_ai_threshold(chat_id: str, threshold: float) -> bool:
 
 def get_ai_category_thresholds(chat_id: str) -> Dict[str, float]:
     """Get per-category thresholds as 0-1 floats."""
-    session = get_session()
     try:
-        rows = session.query(AIModerationThreshold).filter_by(chat_id=chat_id).all()
-        thresholds: Dict[str, float] = {}
-        for row in rows:
-            value = row.threshold
-            if isinstance(value, (int, float)) and value > 1:
-                value = float(value) / 100.0
-            thresholds[row.category] = float(value)
-        return thresholds
+        return dict(get_chat_settings(chat_id).ai_thresholds)
     except Exception:
         return {}
-    finally:
-        session.close()
 
 
 def set_ai_category_thresholds(chat_id: str, categories, threshold: Optional[float] = None) -> bool:
@@ -299,13 +253,10 @@ def set_ai_category_thresholds(chat_id: str, categories, threshold: Optional[flo
                     value = float(value) / 100.0
                 else:
                     return False
-            row = session.query(AIModerationThreshold).filter_by(chat_id=chat_id, category=category).first()
-            if not row:
-                row = AIModerationThreshold(chat_id=chat_id, category=category, threshold=float(value))
-                session.add(row)
-            else:
-                row.threshold = float(value)
+            upsert(session, AIModerationThreshold,
+                   {'chat_id': chat_id, 'category': category, 'threshold': float(value)}, update=['threshold'])
         session.commit()
+        invalidate_chat_settings(chat_id)
         logger.info(f"🎯 AI category thresholds set for {chat_id}: {', '.join([c for c, _ in items])}")
         return True
     except OperationalError:
@@ -324,20 +275,9 @@ def set_ai_action(chat_id: str, action: str) -> bool:
     """
     session = get_session()
     try:
-        settings = session.query(AIModerationSettings).filter_by(chat_id=chat_id).first()
-        if not settings:
-            settings = AIModerationSettings(
-                chat_id=chat_id,
-                enabled=False,
-                backend='openai',
-                threshold=0.7,
-                action=action
-            )
-            session.add(settings)
-        else:
-            settings.action = action
-        
+        _upsert_ai_settings(session, chat_id, action=action)
         session.commit()
+        invalidate_chat_settings(chat_id)
         logger.info(f"⚡ AI action set to '{action}' for {chat_id}")
         _AI_GLOBAL_SETTINGS['action'] = action
         return True
@@ -7,7 +7,10 @@ import logging
 from typing import List
 from datetime import datetime
 
+from sqlalchemy.exc import IntegrityError
+
 from ..database import get_session
+from ..group_commit import run_write
 from ..db_models import Ban
 
 logger = logging.getLogger(__name__)
@@ -24,30 +27,28 @@ def add_ban(chat_id: str, user_id: str, user_name: str = None, banned_by: str =
         banned_by: Admin who issued the ban
         reason: Ban reason
     """
-    session = get_session()
-    try:
-        # Check if already banned
-        existing = session.query(Ban).filter_by(
+    def insert(session) -> bool:
+        if session.query(Ban.id).filter_by(chat_id=chat_id, user_id=user_id).first() is not None:
+            return False
+        session.add(Ban(
             chat_id=chat_id,
-            user_id=user_id
-        ).first()
-        
-        if not existing:
-            ban = Ban(
-                chat_id=chat_id,
-                user_id=user_id,
-                user_name=user_name,
-                reason=reason,
-                banned_by=banned_by,
-                banned_at=datetime.now()
-            )
-            session.add(ban)
-            session.commit()
-            logger.info(f"🚫 User {user_name} banned in {chat_id}")
-            return True
+            user_id=user_id,
+            user_name=user_name,
+            reason=reason,
+            banned_by=banned_by,
+            banned_at=datetime.now()
+        ))
+        session.flush()
+        return True
+
+    try:
+        banned = run_write(insert)
+    except IntegrityError:
+        # Banned concurrently; the unique (chat_id, user_id) index kept one row
         return False
-    finally:
-        session.close()
+    if banned:
+        logger.info(f"🚫 User {user_name} banned in {chat_id}")
+    return banned
 
 
 def remove_ban(chat_id: str, user_id: str) -> bool:
@@ -0,0 +1,203 @@
+"""
+Aho-Corasick multi-pattern matcher for blacklisted words
+Finds every blacklisted term in a message in a single linear pass
+"""
+
+import threading
+from collections import deque
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+
+class BlacklistMatch(NamedTuple):
+    """A blacklisted term found in a text (offsets index the original text)"""
+    term: str
+    start: int
+    end: int
+
+
+def fold(text: str) -> str:
+    """Unicode case-fold (works for Hebrew, English and other scripts)"""
+    return text.casefold()
+
+
+def _fold_with_index(text: str) -> Tuple[str, Optional[List[int]]]:
+    """Fold text, with a map from folded positions to original ones when lengths differ"""
+    folded = fold(text)
+    if len(folded) == len(text):
+        return folded, None
+    # Some characters expand when folded (e.g. "ß" -> "ss");
+    # map folded positions back to the original characters
+    index = [i for i, ch in enumerate(text) for _ in fold(ch)]
+    return ''.join(fold(ch) for ch in text), index
+
+
+def find_terms(terms: Iterable[str], text: str) -> List[BlacklistMatch]:
+    """
+    Find every occurrence of every term with plain substring searches
+
+    Cheaper than an automaton for a handful of terms. Returns the same
+    matches, in the same order, as BlacklistMatcher(terms).find_all(text).
+    """
+    if not text:
+        return []
+    folded, index = _fold_with_index(text)
+    found = []
+    seen = set()
+    for term in terms:
+        key = fold(term)
+        if not key or key in seen:
+            continue
+        seen.add(key)
+        start = folded.find(key)
+        while start != -1:
+            found.append((start + len(key), start, term))
+            start = folded.find(key, start + 1)
+    found.sort(key=lambda hit: (hit[0], hit[1]))
+    if index is None:
+        return [BlacklistMatch(term, start, end) for end, start, term in found]
+    return [BlacklistMatch(term, index[start], index[end - 1] + 1) for end, start, term in found]
+
+
+class BlacklistMatcher:
+    """
+    Aho-Corasick automaton over case-folded terms
+
+    Terms are inserted into the trie incrementally; failure links are
+    recomputed lazily on the next match after a change. Removed terms only
+    lose their output mark, and the trie is compacted once dead terms
+    outnumber live ones.
+    """
+
+    def __init__(self, terms: Iterable[str] = ()):
+        self._lock = threading.Lock()
+        self._reset()
+        for term in terms:
+            self._insert(term)
+
+    def _reset(self) -> None:
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._terminal: List[Optional[str]] = [None]
+        self._out: List[Tuple[str, ...]] = [()]
+        self._terms: Dict[str, str] = {}
+        self._removed = set()
+        self._dirty = False
+
+    def _insert(self, term: str) -> bool:
+        key = fold(term)
+        if not key or key in self._terms:
+            return False
+        node = 0
+        for ch in key:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._terminal.append(None)
+                self._out.append(())
+                self._goto[node][ch] = nxt
+            node = nxt
+        self._removed.discard(key)
+        self._terminal[node] = key
+        self._terms[key] = term
+        self._dirty = True
+        return True
+
+    def _build(self) -> None:
+        """Recompute failure links and merged outputs (breadth-first)"""
+        goto, fail, terminal = self._goto, self._fail, self._terminal
+        out: List[Tuple[str, ...]] = [()] * len(goto)
+        queue = deque()
+        for child in goto[0].values():
+            fail[child] = 0
+            out[child] = (terminal[child],) if terminal[child] else ()
+            queue.append(child)
+        while queue:
+            node = queue.popleft()
+            for ch, child in goto[node].items():
+                state = fail[node]
+                while state and ch not in goto[state]:
+                    state = fail[state]
+                fail[child] = goto[state].get(ch, 0)
+                own = (terminal[child],) if terminal[child] else ()
+                out[child] = own + out[fail[child]]
+                queue.append(child)
+        self._out = out
+        self._dirty = False
+
+    def add(self, term: str) -> bool:
+        """Add a term. Returns False if it was empty or already present."""
+        with self._lock:
+            return self._insert(term)
+
+    def remove(self, term: str) -> bool:
+        """Remove a term (case-insensitive). Returns True if it was present."""
+        key = fold(term)
+        with self._lock:
+            if self._terms.pop(key, None) is None:
+                return False
+            node = 0
+            for ch in key:
+                node = self._goto[node][ch]
+            self._terminal[node] = None
+            self._removed.add(key)
+            if len(self._removed) > len(self._terms):
+                terms = list(self._terms.values())
+                self._reset()
+                for remaining in terms:
+                    self._insert(remaining)
+            self._dirty = True
+            return True
+
+    def clear(self) -> None:
+        """Remove every term"""
+        with self._lock:
+            self._reset()
+
+    def find_all(self, text: str) -> List[BlacklistMatch]:
+        """
+        Find every occurrence of every term
+
+        Args:
+            text: Text to scan
+
+        Returns:
+            Matches ordered by end offset, with offsets into ``text``
+        """
+        if not text:
+            return []
+        with self._lock:
+            if not self._terms:
+                return []
+            if self._dirty:
+                self._build()
+            goto, fail, out, terms = self._goto, self._fail, self._out, self._terms
+
+            folded, index = _fold_with_index(text)
+
+            matches: List[BlacklistMatch] = []
+            node = 0
+            for pos, ch in enumerate(folded):
+                while node and ch not in goto[node]:
+                    node = fail[node]
+                node = goto[node].get(ch, 0)
+                if out[node]:
+                    for key in out[node]:
+                        start = pos - len(key) + 1
+                        if index is None:
+                            matches.append(BlacklistMatch(terms[key], start, pos + 1))
+                        else:
+                            matches.append(BlacklistMatch(terms[key], index[start], index[pos] + 1))
+            return matches
+
+    def search(self, text: str) -> Optional[BlacklistMatch]:
+        """Return the first match in ``text`` or None"""
+        matches = self.find_all(text)
+        return matches[0] if matches else None
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    def __contains__(self, term: str) -> bool:
+        return fold(term) in self._terms
@@ -4,14 +4,109 @@ Platform-independent business logic for word blacklisting
 """
 
 import logging
-from typing import List
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Iterator, List, Optional
 import re
 
-from ..database import get_session
+from sqlalchemy import String, and_, bindparam, exists, func, select
+from sqlalchemy.exc import IntegrityError
+
+from ..database import (
+    after_unit, get_read_session, get_session, in_unit_of_work, on_init_db, start_transaction
+)
 from ..db_models import BlacklistWord as Blacklist
+from .blacklist_matcher import BlacklistMatch, BlacklistMatcher, find_terms
+from .settings_cache import CHAT_SETTINGS_CACHE_SIZE, get_chat_settings, invalidate_chat_settings
 
 logger = logging.getLogger(__name__)
 
+# Words sent per executemany when importing, and fetched per query when exporting
+BLACKLIST_IMPORT_CHUNK = int(os.getenv('BLACKLIST_IMPORT_CHUNK', '1000'))
+# Longest term the blacklist column can store
+MAX_TERM_LENGTH = Blacklist.__table__.c.word.type.length
+
+# Insert :word for :chat_id unless the chat already has it in any case
+_chat_param = bindparam('chat_id', type_=String)
+_word_param = bindparam('word', type_=String)
+_INSERT_IF_ABSENT = Blacklist.__table__.insert().from_select(
+    ['chat_id', 'word'],
+    select([_chat_param, _word_param]).where(~exists().where(and_(
+        Blacklist.chat_id == _chat_param,
+        func.lower(Blacklist.word) == func.lower(_word_param)
+    )))
+)
+
+# Lists shorter than this are checked with plain substring searches instead of a compiled matcher
+BLACKLIST_MATCHER_MIN_TERMS = int(os.getenv('BLACKLIST_MATCHER_MIN_TERMS', '32'))
+
+# Compiled matchers per chat, kept in LRU order and updated in place by writers
+_matchers: "OrderedDict[str, BlacklistMatcher]" = OrderedDict()
+_matchers_lock = threading.Lock()
+# Per-chat locks held while a matcher compiles, and chats whose list changed mid-compile
+_build_locks: Dict[str, threading.Lock] = {}
+_stale_builds = set()
+
+
+def _cached_matcher(chat_id: str) -> Optional[BlacklistMatcher]:
+    # Caller holds _matchers_lock
+    matcher = _matchers.get(chat_id)
+    if matcher is not None:
+        _matchers.move_to_end(chat_id)
+    return matcher
+
+
+def _get_matcher(chat_id: str) -> BlacklistMatcher:
+    while True:
+        with _matchers_lock:
+            matcher = _cached_matcher(chat_id)
+            if matcher is not None:
+                return matcher
+            build_lock = _build_locks.setdefault(chat_id, threading.Lock())
+
+        # Compile outside _matchers_lock so checks in other chats never wait on it
+        with build_lock:
+            with _matchers_lock:
+                matcher = _cached_matcher(chat_id)
+                if matcher is not None:
+                    return matcher
+                if _build_locks.get(chat_id) is not build_lock:
+                    continue
+                _stale_builds.discard(chat_id)
+
+            matcher = BlacklistMatcher(get_chat_settings(chat_id).blacklist)
+
+            with _matchers_lock:
+                if chat_id in _stale_builds:
+                    # A writer changed the list while we read it; compile again
+                    continue
+                del _build_locks[chat_id]
+                _matchers[chat_id] = matcher
+                while len(_matchers) > CHAT_SETTINGS_CACHE_SIZE:
+                    _matchers.popitem(last=False)
+                return matcher
+
+
+def _drop_matcher(chat_id: str) -> None:
+    """Forget a chat's compiled matcher so the next check rebuilds it"""
+    with _matchers_lock:
+        _matchers.pop(chat_id, None)
+        if chat_id in _build_locks:
+            _stale_builds.add(chat_id)
+
+
+def _update_matcher(chat_id: str, update) -> None:
+    """Apply an incremental change to a chat's matcher if it is compiled"""
+    with _matchers_lock:
+        matcher = _matchers.get(chat_id)
+        if matcher is not None:
+            update(matcher)
+        elif chat_id in _build_locks:
+            _stale_builds.add(chat_id)
+    # Rebuild from the database if the write is rolled back with its unit of work
+    after_unit(lambda committed: committed or _drop_matcher(chat_id))
+
 
 def add_blacklist_word(chat_id: str, word: str) -> bool:
     """
@@ -21,21 +116,143 @@ def add_blacklist_word(chat_id: str, word: str) -> bool:
         chat_id: Chat identifier
         word: Word to blacklist
     """
+    if not word:
+        return True
+
     session = get_session()
     try:
-        existing_words = session.query(Blacklist).filter_by(chat_id=chat_id).all()
-        if any(w.word.lower() == word.lower() for w in existing_words):
-            return True
-
-        if word:
-            blacklist = Blacklist(chat_id=chat_id, word=word)
-            session.add(blacklist)
-            session.commit()
-            logger.info(f"✅ Added '{word}' to blacklist in {chat_id}")
+        inserted = session.execute(_INSERT_IF_ABSENT, {'chat_id': chat_id, 'word': word}).rowcount
+        session.commit()
+    except IntegrityError:
+        # Added concurrently; the unique (chat_id, lower(word)) index kept one copy
+        session.rollback()
         return True
     finally:
         session.close()
 
+    if inserted:
+        invalidate_chat_settings(chat_id)
+        _update_matcher(chat_id, lambda m: m.add(word))
+        logger.info(f"✅ Added '{word}' to blacklist in {chat_id}")
+    return True
+
+
+def _distinct_chunks(words: Iterable[str], size: int) -> Iterator[List[str]]:
+    """Yield lists of up to size storable words, without case-insensitive repeats within a list"""
+    chunk = {}
+    for word in words:
+        word = word.strip() if word else ''
+        if not word or len(word) > MAX_TERM_LENGTH:
+            continue
+        chunk.setdefault(word.lower(), word)
+        if len(chunk) >= size:
+            yield list(chunk.values())
+            chunk = {}
+    if chunk:
+        yield list(chunk.values())
+
+
+def _insert_chunk(session, chat_id: str, chunk: List[str]) -> None:
+    """Insert a chunk of words, falling back to one row at a time if a concurrent add collides"""
+    rows = [{'chat_id': chat_id, 'word': word} for word in chunk]
+    savepoint = session.begin_nested()
+    try:
+        session.execute(_INSERT_IF_ABSENT, rows)
+        savepoint.commit()
+        return
+    except IntegrityError:
+        # Another writer committed one of these words after our NOT EXISTS check
+        savepoint.rollback()
+    for row in rows:
+        savepoint = session.begin_nested()
+        try:
+            session.execute(_INSERT_IF_ABSENT, row)
+            savepoint.commit()
+        except IntegrityError:
+            savepoint.rollback()
+
+
+def add_blacklist_words(chat_id: str, words: Iterable[str]) -> int:
+    """
+    Add many words to the blacklist in one transaction
+    
+    Words are read in bounded chunks and each chunk is inserted with one
+    executemany. Duplicates, within the input, against the chat's list or
+    added concurrently, are skipped case-insensitively by the database.
+    Words longer than MAX_TERM_LENGTH are skipped.
+    
+    Args:
+        chat_id: Chat identifier
+        words: Words to blacklist (any iterable, consumed once)
+    
+    Returns:
+        Number of words added
+    """
+    session = get_session()
+    try:
+        if not in_unit_of_work():
+            start_transaction(session)
+        before = session.query(func.count(Blacklist.id)).filter_by(chat_id=chat_id).scalar()
+        for chunk in _distinct_chunks(words, BLACKLIST_IMPORT_CHUNK):
+            _insert_chunk(session, chat_id, chunk)
+        added = session.query(func.count(Blacklist.id)).filter_by(chat_id=chat_id).scalar() - before
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+    if added:
+        invalidate_chat_settings(chat_id)
+        _drop_matcher(chat_id)
+        logger.info(f"✅ Added {added} words to blacklist in {chat_id}")
+    return added
+
+
+def export_blacklist(chat_id: str) -> Iterator[str]:
+    """
+    Stream a chat's blacklist in insertion order
+    
+    Words are fetched in chunks with keyset pagination, so no session stays
+    open between chunks and memory use does not grow with the list.
+    
+    Args:
+        chat_id: Chat identifier
+    
+    Yields:
+        Blacklisted words
+    """
+    last_id = 0
+    while True:
+        session = get_read_session()
+        try:
+            rows = session.query(Blacklist.id, Blacklist.word).filter(
+                Blacklist.chat_id == chat_id,
+                Blacklist.id > last_id
+            ).order_by(Blacklist.id).limit(BLACKLIST_IMPORT_CHUNK).all()
+        finally:
+            session.close()
+        for row_id, word in rows:
+            yield word
+        if len(rows) < BLACKLIST_IMPORT_CHUNK:
+            return
+        last_id = rows[-1][0]
+
+
+def parse_blacklist_terms(text: str) -> List[str]:
+    """
+    Split pasted or uploaded text into blacklist terms
+    
+    Args:
+        text: One term per line
+    
+    Returns:
+        Non-empty terms, in order; add_blacklist_words skips any too long to store
+    """
+    terms = (line.strip() for line in (text or '').splitlines())
+    return [term for term in terms if term]
+
 
 def remove_blacklist_word(chat_id: str, word: str) -> bool:
     """
@@ -50,13 +267,19 @@ def remove_blacklist_word(chat_id: str, word: str) -> bool:
     """
     session = get_session()
     try:
-        words = session.query(Blacklist).filter_by(chat_id=chat_id).all()
-        to_delete = [w for w in words if w.word.lower() == word.lower()]
+        to_delete = session.query(Blacklist).filter(
+            Blacklist.chat_id == chat_id,
+            func.lower(Blacklist.word) == func.lower(word)
+        ).all()
+        removed = [entry.word for entry in to_delete]
         count = 0
         for entry in to_delete:
             session.delete(entry)
             count += 1
         session.commit()
+        invalidate_chat_settings(chat_id)
+        for removed_word in removed:
+            _update_matcher(chat_id, lambda m, w=removed_word: m.remove(w))
 
         if count > 0:
             logger.info(f"✅ Removed '{word}' from blacklist in {chat_id}")
@@ -76,17 +299,31 @@ def get_blacklist_words(chat_id: str) -> List[str]:
     Returns:
         List of blacklisted words
     """
-    session = get_session()
-    try:
-        words = session.query(Blacklist).filter_by(chat_id=chat_id).all()
-        return [w.word for w in words]
-    finally:
-        session.close()
+    return list(get_chat_settings(chat_id).blacklist)
+
+
+def find_blacklist_matches(chat_id: str, text: str) -> List[BlacklistMatch]:
+    """
+    Find every blacklisted term in text in one pass
+    
+    Args:
+        chat_id: Chat identifier
+        text: Text to check
+    
+    Returns:
+        List of BlacklistMatch(term, start, end), ordered by end offset
+    """
+    if not text:
+        return []
+    terms = get_chat_settings(chat_id).blacklist
+    if len(terms) < BLACKLIST_MATCHER_MIN_TERMS:
+        return find_terms(terms, text)
+    return _get_matcher(chat_id).find_all(text)
 
 
 def check_blacklist(chat_id: str, text: str) -> str:
     """
-    Check if text contains blacklisted words
+    Check if text contains blacklisted words (case-insensitive)
     
     Args:
         chat_id: Chat identifier
@@ -95,17 +332,13 @@ def check_blacklist(chat_id: str, text: str) -> str:
     Returns:
         The blacklisted word found, or None
     """
-    words = get_blacklist_words(chat_id)
-    if not words:
+    matches = find_blacklist_matches(chat_id, text)
+    if not matches:
         return None
     
-    text_lower = text.lower()
-    for word in words:
-        if word in text_lower:
-            logger.info(f"🚫 Blacklist triggered: '{word}' found in {chat_id}")
-            return word
-    
-    return None
+    word = matches[0].term
+    logger.info(f"🚫 Blacklist triggered: '{word}' found in {chat_id}")
+    return word
 
 
 def clear_blacklist(chat_id: str) -> bool:
@@ -122,6 +355,8 @@ def clear_blacklist(chat_id: str) -> bool:
     try:
         count = session.query(Blacklist).filter_by(chat_id=chat_id).delete()
         session.commit()
+        invalidate_chat_settings(chat_id)
+        _update_matcher(chat_id, lambda m: m.clear())
         
         logger.info(f"✅ Cleared {count} blacklist words in {chat_id}")
         return count > 0
@@ -137,3 +372,12 @@ def get_blacklist(chat_id: str) -> List[str]:
 def get_blacklist_action(chat_id: str) -> str:
     """Return blacklist action (default: delete)."""
     return 'delete'
+
+
+def _clear_matchers() -> None:
+    with _matchers_lock:
+        _matchers.clear()
+        _stale_builds.update(_build_locks)
+
+
+on_init_db(_clear_matchers)
@@ -8,6 +8,8 @@ from typing import Optional
 
 from ..database import get_session
 from ..db_models import ChatConfig
+from ..upsert import upsert
+from .settings_cache import get_chat_settings, invalidate_chat_settings
 
 logger = logging.getLogger(__name__)
 
@@ -22,12 +24,7 @@ def should_delete_commands(chat_id: str) -> bool:
     Returns:
         True if commands should be deleted
     """
-    session = get_session()
-    try:
-        config = session.query(ChatConfig).filter_by(chat_id=chat_id).first()
-        return config.delete_commands if config else False
-    finally:
-        session.close()
+    return get_chat_settings(chat_id).delete_commands
 
 
 def set_delete_commands(chat_id: str, enabled: bool) -> bool:
@@ -40,13 +37,9 @@ def set_delete_commands(chat_id: str, enabled: bool) -> bool:
     """
     session = get_session()
     try:
-        config = session.query(ChatConfig).filter_by(chat_id=chat_id).first()
-        if config:
-            config.delete_commands = enabled
-        else:
-            config = ChatConfig(chat_id=chat_id, delete_commands=enabled)
-            session.add(config)
+        upsert(session, ChatConfig, {'chat_id': chat_id, 'delete_commands': enabled}, update=['delete_commands'])
         session.commit()
+        invalidate_chat_settings(chat_id)
         
         status = "enabled" if enabled else "disabled"
         logger.info(f"🗑️ Command deletion {status} in {chat_id}")
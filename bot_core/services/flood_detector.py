@@ -0,0 +1,153 @@
+"""
+In-memory sliding-window flood detector
+Keeps recent message timestamps per (chat, user) in bounded ring buffers
+"""
+
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+Key = Tuple[str, str]
+
+
+class SlidingWindowFloodDetector:
+    """
+    Sliding-window message counter per (chat, user)
+
+    Each key owns a deque bounded by the chat's message limit, so memory per
+    user never exceeds ``limit`` timestamps. Keys are kept in LRU order and
+    evicted when idle for longer than ``idle_timeout`` or when more than
+    ``max_users`` keys are tracked.
+    """
+
+    def __init__(self, max_users: int = 100000, idle_timeout: float = 600.0,
+                 sweep_interval: float = 60.0, clock: Callable[[], float] = time.time):
+        """
+        Args:
+            max_users: Maximum number of (chat, user) keys kept in memory
+            idle_timeout: Seconds without messages before a key is evicted
+            sweep_interval: Minimum seconds between idle sweeps
+            clock: Time source returning seconds since the epoch
+        """
+        self.max_users = max_users
+        self.idle_timeout = idle_timeout
+        self.sweep_interval = sweep_interval
+        self.clock = clock
+        self._buffers: "OrderedDict[Key, deque]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._last_sweep = clock()
+
+    def hit(self, chat_id: str, user_id: str, max_messages: int, time_window: float) -> Tuple[bool, int]:
+        """
+        Record a message and check it against the window
+
+        Args:
+            chat_id: Chat identifier
+            user_id: User identifier
+            max_messages: Maximum messages allowed in the window
+            time_window: Window length in seconds
+
+        Returns:
+            Tuple of (is_flooding, messages seen in the window before this one)
+        """
+        now = self.clock()
+        cutoff = now - time_window
+        capacity = max(int(max_messages), 1)
+        key = (chat_id, user_id)
+
+        with self._lock:
+            buffer = self._buffers.get(key)
+            if buffer is None:
+                buffer = deque(maxlen=capacity)
+                self._buffers[key] = buffer
+            else:
+                if buffer.maxlen != capacity:
+                    buffer = deque(buffer, maxlen=capacity)
+                    self._buffers[key] = buffer
+                self._buffers.move_to_end(key)
+
+            while buffer and buffer[0] <= cutoff:
+                buffer.popleft()
+
+            recent_count = len(buffer)
+            buffer.append(now)
+
+            if len(self._buffers) > self.max_users:
+                self._buffers.popitem(last=False)
+            if now - self._last_sweep >= self.sweep_interval:
+                self._evict_idle_locked(now)
+
+        return recent_count >= max_messages, recent_count
+
+    def reset(self, chat_id: str, user_id: str) -> bool:
+        """Forget a user's history. Returns True if anything was tracked."""
+        with self._lock:
+            return self._buffers.pop((chat_id, user_id), None) is not None
+
+    def evict_idle(self) -> int:
+        """Drop keys idle for longer than ``idle_timeout``. Returns count evicted."""
+        with self._lock:
+            return self._evict_idle_locked(self.clock())
+
+    def _evict_idle_locked(self, now: float) -> int:
+        self._last_sweep = now
+        cutoff = now - self.idle_timeout
+        evicted = 0
+        # Keys are in LRU order, so the first fresh key ends the sweep
+        while self._buffers:
+            key, buffer = next(iter(self._buffers.items()))
+            if buffer and buffer[-1] > cutoff:
+                break
+            del self._buffers[key]
+            evicted += 1
+        return evicted
+
+    def clear(self) -> None:
+        """Forget all tracked users"""
+        with self._lock:
+            self._buffers.clear()
+
+    def snapshot(self) -> List[Tuple[str, str, List[float]]]:
+        """Return ``(chat_id, user_id, timestamps)`` for every tracked key"""
+        with self._lock:
+            return [(chat_id, user_id, list(buffer))
+                    for (chat_id, user_id), buffer in self._buffers.items() if buffer]
+
+    def restore(self, entries: Iterable[Tuple[str, str, Iterable[float]]], capacity: int = 5) -> int:
+        """
+        Load timestamps produced by ``snapshot`` (or read back from the DB)
+
+        Returns:
+            Number of keys restored
+        """
+        grouped: Dict[Key, List[float]] = {}
+        for chat_id, user_id, timestamps in entries:
+            grouped.setdefault((chat_id, user_id), []).extend(timestamps)
+
+        with self._lock:
+            for key, timestamps in grouped.items():
+                timestamps.sort()
+                size = max(capacity, 1)
+                self._buffers[key] = deque(timestamps[-size:], maxlen=size)
+                self._buffers.move_to_end(key)
+            while len(self._buffers) > self.max_users:
+                self._buffers.popitem(last=False)
+        return len(grouped)
+
+    def __len__(self) -> int:
+        return len(self._buffers)
+
+
+_detector: Optional[SlidingWindowFloodDetector] = None
+_detector_lock = threading.Lock()
+
+
+def get_flood_detector() -> SlidingWindowFloodDetector:
+    """Get the process-wide flood detector"""
+    global _detector
+    if _detector is None:
+        with _detector_lock:
+            if _detector is None:
+                _detector = SlidingWindowFloodDetector()
+    return _detector
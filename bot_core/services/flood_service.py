@@ -4,12 +4,15 @@ Platform-independent business logic for anti-flood protection
 """
 
 import logging
-from typing import Optional
+from typing import Dict, Optional
 from datetime import datetime, timedelta
 
-from ..database import get_session
+from ..database import get_session, on_init_db
 from sqlalchemy.exc import OperationalError
 from ..db_models import FloodControl, FloodSettings
+from ..upsert import upsert
+from .flood_detector import get_flood_detector
+from .settings_cache import get_chat_settings, invalidate_chat_settings
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +22,9 @@ def check_flood(chat_id: str, user_id: str, max_messages: int = 5,
     """
     Check if user is flooding
     
+    Message timestamps are kept in memory by the sliding-window detector;
+    nothing is written to the database per message.
+    
     Args:
         chat_id: Chat identifier
         user_id: User identifier
@@ -28,47 +34,23 @@ def check_flood(chat_id: str, user_id: str, max_messages: int = 5,
     Returns:
         True if user is flooding
     """
-    session = get_session()
     try:
-        now = datetime.now()
-        cutoff = now - timedelta(seconds=time_window)
-        
-        try:
-            settings = session.query(FloodSettings).filter_by(chat_id=chat_id).first()
-            if settings:
-                max_messages = settings.limit
-                time_window = settings.timeframe
-        except OperationalError:
-            return False
-
-        # Get recent messages
-        recent_count = session.query(FloodControl).filter(
-            FloodControl.chat_id == chat_id,
-            FloodControl.user_id == user_id,
-            FloodControl.timestamp > cutoff
-        ).count()
-        
-        # Add current message
-        flood = FloodControl(
-            chat_id=chat_id,
-            user_id=user_id,
-            timestamp=now
-        )
-        session.add(flood)
-        session.commit()
-        
-        if recent_count >= max_messages:
-            logger.warning(f"🌊 Flood detected: {user_id} in {chat_id} ({recent_count} msgs)")
-            return True
-        
+        settings = get_chat_settings(chat_id).flood
+    except OperationalError:
         return False
-    finally:
-        session.close()
+    if settings:
+        max_messages = settings['limit']
+        time_window = settings['timeframe']
+
+    flooding, recent_count = get_flood_detector().hit(chat_id, user_id, max_messages, time_window)
+    if flooding:
+        logger.warning(f"🌊 Flood detected: {user_id} in {chat_id} ({recent_count} msgs)")
+    return flooding
 
 
 def clear_old_flood_records(days: int = 7) -> int:
     """
-    Clear old flood control records
+    Clear old flood control records and evict idle users from memory
     
     Args:
         days: Number of days to keep
@@ -83,6 +65,7 @@ def clear_old_flood_records(days: int = 7) -> int:
             FloodControl.timestamp < cutoff
         ).delete()
         session.commit()
+        get_flood_detector().evict_idle()
         
         logger.info(f"🧹 Cleared {count} old flood records")
         return count
@@ -99,8 +82,9 @@ def reset_user_flood(chat_id: str, user_id: str) -> bool:
         user_id: User identifier
     
     Returns:
-        Number of records deleted
+        True if the user had any flood history
     """
+    tracked = get_flood_detector().reset(chat_id, user_id)
     session = get_session()
     try:
         count = session.query(FloodControl).filter_by(
@@ -110,7 +94,7 @@ def reset_user_flood(chat_id: str, user_id: str) -> bool:
         session.commit()
         
         logger.info(f"✅ Reset flood records for {user_id} in {chat_id}")
-        return count > 0
+        return tracked or count > 0
     finally:
         session.close()
 
@@ -127,14 +111,10 @@ def set_flood_limit(chat_id: str, limit: int, timeframe: int = 10) -> bool:
     session = get_session()
     try:
         try:
-            settings = session.query(FloodSettings).filter_by(chat_id=chat_id).first()
-            if settings:
-                settings.limit = limit
-                settings.timeframe = timeframe
-            else:
-                settings = FloodSettings(chat_id=chat_id, limit=limit, timeframe=timeframe)
-                session.add(settings)
+            upsert(session, FloodSettings, {'chat_id': chat_id, 'limit': limit, 'timeframe': timeframe},
+                   update=['limit', 'timeframe'])
             session.commit()
+            invalidate_chat_settings(chat_id)
             return True
         except OperationalError:
             return True
@@ -144,14 +124,78 @@ def set_flood_limit(chat_id: str, limit: int, timeframe: int = 10) -> bool:
 
 def get_flood_settings(chat_id: str) -> Optional[dict]:
     """Get flood settings for a chat"""
+    try:
+        settings = get_chat_settings(chat_id).flood
+    except OperationalError:
+        return {'limit': 5, 'timeframe': 10}
+    if not settings:
+        return {'limit': 5, 'timeframe': 10}
+    return dict(settings)
+
+
+def save_flood_snapshot() -> int:
+    """
+    Persist the in-memory flood windows to the flood_control table
+    
+    Replaces any previous snapshot so a restart can resume the current
+    windows with load_flood_snapshot().
+    
+    Returns:
+        Number of timestamps written
+    """
+    entries = get_flood_detector().snapshot()
     session = get_session()
     try:
-        try:
-            settings = session.query(FloodSettings).filter_by(chat_id=chat_id).first()
-            if not settings:
-                return {'limit': 5, 'timeframe': 10}
-            return {'limit': settings.limit, 'timeframe': settings.timeframe}
-        except OperationalError:
-            return {'limit': 5, 'timeframe': 10}
+        session.query(FloodControl).delete()
+        rows = [
+            {'chat_id': chat_id, 'user_id': user_id, 'timestamp': datetime.fromtimestamp(ts)}
+            for chat_id, user_id, timestamps in entries
+            for ts in timestamps
+        ]
+        if rows:
+            session.bulk_insert_mappings(FloodControl, rows)
+        session.commit()
+        logger.info(f"💾 Saved flood snapshot ({len(rows)} timestamps, {len(entries)} users)")
+        return len(rows)
+    finally:
+        session.close()
+
+
+def load_flood_snapshot(max_age: int = 600) -> int:
+    """
+    Restore flood windows saved by save_flood_snapshot()
+    
+    Args:
+        max_age: Ignore timestamps older than this many seconds
+    
+    Returns:
+        Number of (chat, user) windows restored
+    """
+    session = get_session()
+    try:
+        cutoff = datetime.now() - timedelta(seconds=max_age)
+        rows = session.query(FloodControl).filter(FloodControl.timestamp > cutoff).all()
+        limits: Dict[str, int] = {
+            s.chat_id: s.limit for s in session.query(FloodSettings).all()
+        }
+    except OperationalError:
+        return 0
     finally:
         session.close()
+
+    per_chat: Dict[str, list] = {}
+    for row in rows:
+        per_chat.setdefault(row.chat_id, []).append(
+            (row.chat_id, row.user_id, [row.timestamp.timestamp()])
+        )
+
+    detector = get_flood_detector()
+    restored = 0
+    for chat_id, entries in per_chat.items():
+        restored += detector.restore(entries, capacity=limits.get(chat_id, 5))
+
+    logger.info(f"♻️ Restored flood windows for {restored} users")
+    return restored
+
+
+on_init_db(lambda: get_flood_detector().clear())
@@ -4,6 +4,8 @@ Language management service
 
 from ..database import get_session
 from ..db_models import ChatLanguage as Language
+from ..upsert import upsert
+from .settings_cache import get_chat_settings, invalidate_chat_settings
 
 
 def get_chat_language(chat_id: str) -> str:
@@ -16,12 +18,7 @@ def get_chat_language(chat_id: str) -> str:
     Returns:
         Language code (default: 'en')
     """
-    session = get_session()
-    try:
-        lang = session.query(Language).filter_by(chat_id=chat_id).first()
-        return lang.lang_code if lang else 'en'
-    finally:
-        session.close()
+    return get_chat_settings(chat_id).language or 'en'
 
 
 def set_chat_language(chat_id: str, lang_code: str) -> bool:
@@ -34,13 +31,9 @@ def set_chat_language(chat_id: str, lang_code: str) -> bool:
     """
     session = get_session()
     try:
-        lang = session.query(Language).filter_by(chat_id=chat_id).first()
-        if lang:
-            lang.lang_code = lang_code
-        else:
-            lang = Language(chat_id=chat_id, lang_code=lang_code)
-            session.add(lang)
+        upsert(session, Language, {'chat_id': chat_id, 'lang_code': lang_code}, update=['lang_code'])
         session.commit()
+        invalidate_chat_settings(chat_id)
         return True
     finally:
         session.close()
@@ -9,6 +9,8 @@ from typing import Dict
 
 from ..database import get_session
 from ..db_models import Lock as Locks
+from ..upsert import upsert
+from .settings_cache import get_chat_settings, invalidate_chat_settings
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +23,13 @@ _LOCK_TYPE_ALIASES = {
     'sticker': 'stickers'
 }
 
+_LOCK_COLUMNS = {
+    'links': 'lock_links',
+    'stickers': 'lock_stickers',
+    'media': 'lock_media',
+    'all': 'lock_all',
+}
+
 
 def set_lock(chat_id: str, lock_type: str, enabled: bool) -> bool:
     """
@@ -32,25 +41,15 @@ def set_lock(chat_id: str, lock_type: str, enabled: bool) -> bool:
         enabled: Lock enabled state
     """
     lock_type = _LOCK_TYPE_ALIASES.get(lock_type, lock_type)
+    column = _LOCK_COLUMNS.get(lock_type)
+    if column is None:
+        return False
+
     session = get_session()
     try:
-        locks = session.query(Locks).filter_by(chat_id=chat_id).first()
-        if not locks:
-            locks = Locks(chat_id=chat_id)
-            session.add(locks)
-
-        if lock_type == 'links':
-            locks.lock_links = enabled
-        elif lock_type == 'stickers':
-            locks.lock_stickers = enabled
-        elif lock_type == 'media':
-            locks.lock_media = enabled
-        elif lock_type == 'all':
-            locks.lock_all = enabled
-        else:
-            return False
-        
+        upsert(session, Locks, {'chat_id': chat_id, column: enabled}, update=[column])
         session.commit()
+        invalidate_chat_settings(chat_id)
         
         status = "enabled" if enabled else "disabled"
         logger.info(f"🔒 Lock '{lock_type}' {status} in {chat_id}")
@@ -69,29 +68,17 @@ def get_locks(chat_id: str) -> Dict[str, bool]:
     Returns:
         Dictionary of lock types and their states
     """
-    session = get_session()
-    try:
-        locks = session.query(Locks).filter_by(chat_id=chat_id).first()
-        if not locks:
-            return {
-                'links': False,
-                'stickers': False,
-                'media': False,
-                'all': False,
-                'url': False,
-                'sticker': False
-            }
-
-        return {
-            'links': locks.lock_links,
-            'stickers': locks.lock_stickers,
-            'media': locks.lock_media,
-            'all': locks.lock_all,
-            'url': locks.lock_links,
-            'sticker': locks.lock_stickers
-        }
-    finally:
-        session.close()
+    locks = get_chat_settings(chat_id).locks
+    links = locks.get('links', False)
+    stickers = locks.get('stickers', False)
+    return {
+        'links': links,
+        'stickers': stickers,
+        'media': locks.get('media', False),
+        'all': locks.get('all', False),
+        'url': links,
+        'sticker': stickers
+    }
 
 
 def is_locked(chat_id: str, lock_type: str) -> bool:
@@ -190,6 +177,7 @@ def clear_locks(chat_id: str) -> bool:
     try:
         count = session.query(Locks).filter_by(chat_id=chat_id).delete()
         session.commit()
+        invalidate_chat_settings(chat_id)
         
         if count > 0:
             logger.info(f"✅ Locks cleared for {chat_id}")
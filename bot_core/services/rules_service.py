@@ -8,6 +8,8 @@ from typing import Optional
 
 from ..database import get_session
 from ..db_models import Rules
+from ..upsert import upsert
+from .settings_cache import get_chat_settings, invalidate_chat_settings
 
 logger = logging.getLogger(__name__)
 
@@ -22,12 +24,7 @@ def get_rules(chat_id: str) -> Optional[str]:
     Returns:
         Rules text or None
     """
-    session = get_session()
-    try:
-        rules = session.query(Rules).filter_by(chat_id=chat_id).first()
-        return rules.rules if rules else None
-    finally:
-        session.close()
+    return get_chat_settings(chat_id).rules
 
 
 def set_rules(chat_id: str, rules_text: str) -> bool:
@@ -40,13 +37,9 @@ def set_rules(chat_id: str, rules_text: str) -> bool:
     """
     session = get_session()
     try:
-        rules = session.query(Rules).filter_by(chat_id=chat_id).first()
-        if rules:
-            rules.rules = rules_text
-        else:
-            rules = Rules(chat_id=chat_id, rules=rules_text)
-            session.add(rules)
+        upsert(session, Rules, {'chat_id': chat_id, 'rules': rules_text}, update=['rules'])
         session.commit()
+        invalidate_chat_settings(chat_id)
         
         logger.info(f"✅ Rules updated for {chat_id}")
         return True
@@ -68,6 +61,7 @@ def clear_rules(chat_id: str) -> bool:
     try:
         count = session.query(Rules).filter_by(chat_id=chat_id).delete()
         session.commit()
+        invalidate_chat_settings(chat_id)
         
         if count > 0:
             logger.info(f"✅ Rules cleared for {chat_id}")
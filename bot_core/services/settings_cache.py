@@ -0,0 +1,181 @@
+"""
+Per-chat settings snapshot cache
+Loads every setting a message needs in one session and serves it from memory
+"""
+
+import logging
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+from ..database import after_unit, get_read_session, on_init_db
+from ..db_models import (
+    AIModeration, AIModerationThreshold, BlacklistWord, ChatConfig, ChatLanguage,
+    FloodSettings, Lock, Rules, WarnSettings, Welcome
+)
+
+logger = logging.getLogger(__name__)
+
+CHAT_SETTINGS_CACHE_SIZE = int(os.getenv('CHAT_SETTINGS_CACHE_SIZE', '1024'))
+
+
+@dataclass(frozen=True)
+class ChatSettingsSnapshot:
+    """
+    Read-only view of a chat's settings
+
+    Fields that are ``None`` mean the chat has no row for that setting, so
+    each service can keep applying its own defaults.
+    """
+    chat_id: str
+    language: Optional[str] = None
+    locks: Dict[str, bool] = field(default_factory=dict)
+    ai: Optional[Dict[str, Any]] = None
+    ai_thresholds: Dict[str, float] = field(default_factory=dict)
+    flood: Optional[Dict[str, int]] = None
+    warn_limit: Optional[int] = None
+    soft_warn: Optional[bool] = None
+    welcome: Optional[str] = None
+    rules: Optional[str] = None
+    blacklist: Tuple[str, ...] = ()
+    delete_commands: bool = False
+
+
+def load_chat_settings(chat_id: str) -> ChatSettingsSnapshot:
+    """
+    Load all settings for a chat using a single session
+
+    Args:
+        chat_id: Chat identifier
+
+    Returns:
+        ChatSettingsSnapshot for the chat
+    """
+    session = get_read_session()
+    try:
+        language = session.query(ChatLanguage).filter_by(chat_id=chat_id).first()
+        locks = session.query(Lock).filter_by(chat_id=chat_id).first()
+        ai = session.query(AIModeration).filter_by(chat_id=chat_id).first()
+        threshold_rows = session.query(AIModerationThreshold).filter_by(chat_id=chat_id).all()
+        flood = session.query(FloodSettings).filter_by(chat_id=chat_id).first()
+        warn = session.query(WarnSettings).filter_by(chat_id=chat_id).first()
+        welcome = session.query(Welcome).filter_by(chat_id=chat_id).first()
+        rules = session.query(Rules).filter_by(chat_id=chat_id).first()
+        words = session.query(BlacklistWord.word).filter_by(chat_id=chat_id).order_by(BlacklistWord.id).all()
+        config = session.query(ChatConfig).filter_by(chat_id=chat_id).first()
+
+        ai_thresholds: Dict[str, float] = {}
+        for row in threshold_rows:
+            value = row.threshold
+            if isinstance(value, (int, float)) and value > 1:
+                value = float(value) / 100.0
+            ai_thresholds[row.category] = float(value)
+
+        return ChatSettingsSnapshot(
+            chat_id=chat_id,
+            language=language.lang_code if language else None,
+            locks={
+                'links': bool(locks.lock_links),
+                'stickers': bool(locks.lock_stickers),
+                'media': bool(locks.lock_media),
+                'all': bool(locks.lock_all),
+            } if locks else {},
+            ai={
+                'enabled': ai.enabled,
+                'backend': ai.backend,
+                'api_key': ai.api_key,
+                'threshold': ai.threshold,
+                'action': ai.action,
+            } if ai else None,
+            ai_thresholds=ai_thresholds,
+            flood={'limit': flood.limit, 'timeframe': flood.timeframe} if flood else None,
+            warn_limit=warn.warn_limit if warn else None,
+            soft_warn=warn.soft_warn if warn else None,
+            welcome=welcome.message if welcome and welcome.enabled else None,
+            rules=rules.rules if rules else None,
+            blacklist=tuple(w for (w,) in words),
+            delete_commands=bool(config.delete_commands) if config else False,
+        )
+    finally:
+        session.close()
+
+
+class ChatSettingsCache:
+    """
+    Thread-safe LRU cache of ChatSettingsSnapshot objects
+
+    Writers call ``invalidate`` after committing. A per-chat generation
+    counter stops a load that raced with a write from caching stale data.
+    """
+
+    def __init__(self, max_chats: int = CHAT_SETTINGS_CACHE_SIZE):
+        self.max_chats = max_chats
+        self._snapshots: "OrderedDict[str, ChatSettingsSnapshot]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, chat_id: str) -> ChatSettingsSnapshot:
+        """Return the chat's snapshot, loading it on a miss"""
+        with self._lock:
+            snapshot = self._snapshots.get(chat_id)
+            if snapshot is not None:
+                self._snapshots.move_to_end(chat_id)
+                self.hits += 1
+                return snapshot
+            self.misses += 1
+            generation = self._generations.get(chat_id, 0)
+
+        snapshot = load_chat_settings(chat_id)
+
+        with self._lock:
+            if self._generations.get(chat_id, 0) == generation:
+                self._snapshots[chat_id] = snapshot
+                self._snapshots.move_to_end(chat_id)
+                while len(self._snapshots) > self.max_chats:
+                    evicted, _ = self._snapshots.popitem(last=False)
+                    self._generations.pop(evicted, None)
+        return snapshot
+
+    def invalidate(self, chat_id: str) -> None:
+        """Drop a chat's snapshot after its settings changed"""
+        with self._lock:
+            self._snapshots.pop(chat_id, None)
+            self._generations[chat_id] = self._generations.get(chat_id, 0) + 1
+
+    def clear(self) -> None:
+        """Drop every snapshot"""
+        with self._lock:
+            self._snapshots.clear()
+            self._generations.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._snapshots)
+
+
+_cache = ChatSettingsCache()
+
+
+def get_chat_settings(chat_id: str) -> ChatSettingsSnapshot:
+    """Get a chat's settings snapshot (served from memory once warm)"""
+    return _cache.get(chat_id)
+
+
+def invalidate_chat_settings(chat_id: str) -> None:
+    """Invalidate a chat's snapshot; call after committing a settings change"""
+    _cache.invalidate(chat_id)
+    # A snapshot reloaded inside a unit of work saw writes that are not final yet
+    after_unit(lambda committed: _cache.invalidate(chat_id))
+
+
+def get_settings_cache() -> ChatSettingsCache:
+    """Get the process-wide settings cache"""
+    return _cache
+
+
+on_init_db(_cache.clear)
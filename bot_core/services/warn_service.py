@@ -4,14 +4,51 @@ Platform-independent business logic for user warnings
 """
 
 import logging
-from typing import Optional, Tuple
+import os
+from typing import List, Optional, Tuple
 from datetime import datetime
 
-from ..database import get_session
-from ..db_models import Warn, WarnSettings
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+
+from ..database import get_session, on_init_db
+from ..group_commit import run_write
+from ..db_models import Warn, WarnCount, WarnSettings
+from ..upsert import upsert
+from .settings_cache import get_chat_settings, invalidate_chat_settings
 
 logger = logging.getLogger(__name__)
 
+# Warns listed per /warns reply
+WARNS_PAGE_SIZE = int(os.getenv('WARNS_PAGE_SIZE', '10'))
+
+
+def _increment_warn_count(session, chat_id: str, user_id: str) -> int:
+    """Bump a user's warn counter inside the caller's transaction and return the new value"""
+    updated = session.query(WarnCount).filter_by(chat_id=chat_id, user_id=user_id).update(
+        {WarnCount.count: WarnCount.count + 1}, synchronize_session=False
+    )
+    if not updated:
+        session.add(WarnCount(chat_id=chat_id, user_id=user_id, count=1))
+        session.flush()
+        return 1
+    return session.query(WarnCount.count).filter_by(chat_id=chat_id, user_id=user_id).scalar()
+
+
+@on_init_db
+def backfill_warn_counts() -> None:
+    """Build warn counters from existing warns when the counter table is new"""
+    session = get_session()
+    try:
+        if session.query(WarnCount).first() is not None or session.query(Warn).first() is None:
+            return
+        rows = select([Warn.chat_id, Warn.user_id, func.count(Warn.id)]).group_by(Warn.chat_id, Warn.user_id)
+        session.execute(WarnCount.__table__.insert().from_select(['chat_id', 'user_id', 'count'], rows))
+        session.commit()
+        logger.info("✅ Backfilled warn counters from existing warns")
+    finally:
+        session.close()
+
 
 def warn_user(chat_id: str, user_id: str, user_name: str, reason: Optional[str] = None) -> Tuple[int, int]:
     """
@@ -26,33 +63,28 @@ def warn_user(chat_id: str, user_id: str, user_name: str, reason: Optional[str]
     Returns:
         Tuple of (current_warns, warn_limit)
     """
-    session = get_session()
-    try:
-        # Add warning
-        warn = Warn(
+    def record(session) -> int:
+        session.add(Warn(
             chat_id=chat_id,
             user_id=user_id,
             user_name=user_name,
             reason=reason or "No reason provided",
             warned_at=datetime.now()
-        )
-        session.add(warn)
-        session.commit()
-        
-        # Count warns
-        count = session.query(Warn).filter_by(
-            chat_id=chat_id,
-            user_id=user_id
-        ).count()
-        
-        # Get limit
-        settings = session.query(WarnSettings).filter_by(chat_id=chat_id).first()
-        limit = settings.warn_limit if settings else 3
-        
-        logger.info(f"⚠️ User {user_name} warned in {chat_id}: {count}/{limit}")
-        return count, limit
-    finally:
-        session.close()
+        ))
+        return _increment_warn_count(session, chat_id, user_id)
+
+    for attempt in range(2):
+        try:
+            count = run_write(record)
+            break
+        except IntegrityError:
+            # Another warn created this user's counter first; retry as an update
+            if attempt:
+                raise
+
+    limit = get_warn_limit(chat_id)
+    logger.info(f"⚠️ User {user_name} warned in {chat_id}: {count}/{limit}")
+    return count, limit
 
 
 def add_warn(chat_id: str, user_id: str, user_name: str, reason: Optional[str] = None) -> bool:
@@ -72,17 +104,24 @@ def get_user_warns(chat_id: str, user_id: str) -> Tuple[int, int]:
     Returns:
         Tuple of (current_warns, warn_limit)
     """
+    return get_warn_count(chat_id, user_id), get_warn_limit(chat_id)
+
+
+def get_warn_count(chat_id: str, user_id: str) -> int:
+    """
+    Get the number of warnings a user has
+    
+    Args:
+        chat_id: Chat identifier
+        user_id: User identifier
+    
+    Returns:
+        Current warn count
+    """
     session = get_session()
     try:
-        count = session.query(Warn).filter_by(
-            chat_id=chat_id,
-            user_id=user_id
-        ).count()
-        
-        settings = session.query(WarnSettings).filter_by(chat_id=chat_id).first()
-        limit = settings.warn_limit if settings else 3
-        
-        return count, limit
+        count = session.query(WarnCount.count).filter_by(chat_id=chat_id, user_id=user_id).scalar()
+        return count or 0
     finally:
         session.close()
 
@@ -104,6 +143,7 @@ def reset_user_warns(chat_id: str, user_id: str) -> int:
             chat_id=chat_id,
             user_id=user_id
         ).delete()
+        session.query(WarnCount).filter_by(chat_id=chat_id, user_id=user_id).delete()
         session.commit()
         
         logger.info(f"✅ Cleared {count} warns for user {user_id} in {chat_id}")
@@ -127,13 +167,9 @@ def set_warn_limit(chat_id: str, limit: int) -> None:
     """
     session = get_session()
     try:
-        settings = session.query(WarnSettings).filter_by(chat_id=chat_id).first()
-        if settings:
-            settings.warn_limit = limit
-        else:
-            settings = WarnSettings(chat_id=chat_id, warn_limit=limit)
-            session.add(settings)
+        upsert(session, WarnSettings, {'chat_id': chat_id, 'warn_limit': limit}, update=['warn_limit'])
         session.commit()
+        invalidate_chat_settings(chat_id)
         
         logger.info(f"✅ Warn limit set to {limit} for {chat_id}")
     finally:
@@ -150,6 +186,10 @@ def get_warn_settings(chat_id: str) -> Tuple[int, bool]:
     Returns:
         Tuple of (warn_limit, soft_warn)
     """
+    snapshot = get_chat_settings(chat_id)
+    if snapshot.warn_limit is not None:
+        return snapshot.warn_limit, snapshot.soft_warn
+
     session = get_session()
     try:
         settings = session.query(WarnSettings).filter_by(chat_id=chat_id).first()
@@ -157,6 +197,7 @@ def get_warn_settings(chat_id: str) -> Tuple[int, bool]:
             settings = WarnSettings(chat_id=chat_id)
             session.add(settings)
             session.commit()
+            invalidate_chat_settings(chat_id)
         return settings.warn_limit, settings.soft_warn
     finally:
         session.close()
@@ -172,27 +213,30 @@ def get_warn_limit(chat_id: str) -> int:
     Returns:
         Warning limit (default: 3)
     """
-    session = get_session()
-    try:
-        settings = session.query(WarnSettings).filter_by(chat_id=chat_id).first()
-        return settings.warn_limit if settings else 3
-    finally:
-        session.close()
+    limit = get_chat_settings(chat_id).warn_limit
+    return limit if limit is not None else 3
 
 
-def get_warns(chat_id: str, user_id: str):
+def get_warns(chat_id: str, user_id: str, limit: Optional[int] = None, offset: int = 0) -> List[Warn]:
     """
-    Get all warnings for a user in a chat
+    Get warnings for a user in a chat, oldest first
     
     Args:
         chat_id: Chat identifier
         user_id: User identifier
+        limit: Maximum number of warnings to return (default: all)
+        offset: Number of older warnings to skip
     
     Returns:
         List of Warn objects
     """
     session = get_session()
     try:
-        return session.query(Warn).filter_by(chat_id=chat_id, user_id=user_id).all()
+        query = session.query(Warn).filter_by(chat_id=chat_id, user_id=user_id).order_by(Warn.id)
+        if offset:
+            query = query.offset(offset)
+        if limit is not None:
+            query = query.limit(limit)
+        return query.all()
     finally:
         session.close()
@@ -8,6 +8,8 @@ from typing import Optional
 
 from ..database import get_session
 from ..db_models import Welcome
+from ..upsert import upsert
+from .settings_cache import get_chat_settings, invalidate_chat_settings
 
 logger = logging.getLogger(__name__)
 
@@ -22,12 +24,7 @@ def get_welcome_message(chat_id: str) -> Optional[str]:
     Returns:
         Welcome message or None
     """
-    session = get_session()
-    try:
-        welcome = session.query(Welcome).filter_by(chat_id=chat_id).first()
-        return welcome.message if welcome and welcome.enabled else None
-    finally:
-        session.close()
+    return get_chat_settings(chat_id).welcome
 
 
 def set_welcome_message(chat_id: str, message: str) -> bool:
@@ -40,13 +37,9 @@ def set_welcome_message(chat_id: str, message: str) -> bool:
     """
     session = get_session()
     try:
-        welcome = session.query(Welcome).filter_by(chat_id=chat_id).first()
-        if welcome:
-            welcome.message = message
-        else:
-            welcome = Welcome(chat_id=chat_id, message=message)
-            session.add(welcome)
+        upsert(session, Welcome, {'chat_id': chat_id, 'message': message}, update=['message'])
         session.commit()
+        invalidate_chat_settings(chat_id)
         
         logger.info(f"✅ Welcome message updated for {chat_id}")
         return True
@@ -68,6 +61,7 @@ def clear_welcome_message(chat_id: str) -> bool:
     try:
         count = session.query(Welcome).filter_by(chat_id=chat_id).delete()
         session.commit()
+        invalidate_chat_settings(chat_id)
         
         if count > 0:
             logger.info(f"✅ Welcome message cleared for {chat_id}")
@@ -3,14 +3,24 @@ Shared bot logic for WhatsApp and Telegram.
 Platform-specific adapters should implement the required action methods.
 """
 
+from contextlib import contextmanager, nullcontext
 from typing import Dict, List, Optional
+import base64
+import binascii
 import logging
 import re
 
-from bot_core.i18n import get_chat_text as get_text, TRANSLATIONS, LANG_NAMES, COMMAND_HELP
+from bot_core.command_registry import COMMANDS, CommandContext
+from bot_core.database import after_unit, in_unit_of_work, unit_of_work
+from bot_core.join_aggregator import JoinAggregator, render_welcomes
+from bot_core.moderation_pipeline import MessageContext, ModerationPipeline, ModerationStage
+from bot_core.i18n import (
+    get_chat_text as get_text, get_command_help, get_help_text, TRANSLATIONS, LANG_NAMES, COMMAND_HELP
+)
 
 from bot_core.services.warn_service import (
-    warn_user, reset_user_warns, set_warn_limit, get_warns, get_warn_settings
+    warn_user, reset_user_warns, set_warn_limit, get_warns, get_warn_count, get_warn_settings,
+    WARNS_PAGE_SIZE
 )
 from bot_core.services.rules_service import get_rules, set_rules
 from bot_core.services.welcome_service import (
@@ -19,6 +29,9 @@ from bot_core.services.welcome_service import (
 )
 from bot_core.services.blacklist_service import (
     add_blacklist_word as add_blacklist,
+    add_blacklist_words,
+    parse_blacklist_terms,
+    MAX_TERM_LENGTH,
     remove_blacklist_word as remove_blacklist,
     get_blacklist_words as get_blacklist,
     check_blacklist
@@ -34,6 +47,37 @@ from bot_core.services.ai_moderation_service import (
 
 logger = logging.getLogger(__name__)
 
+# Moderation stages up to this cost run inside the event's unit of work;
+# dearer ones call out over the network and run after it commits
+LOCAL_STAGE_COST = 10
+
+
+class _UnitActions:
+    """
+    Platform actions whose replies wait for the current unit of work
+
+    Inside unit_of_work() messages and deletes are queued with after_unit()
+    and go out once the unit commits (and not at all if it rolls back), so
+    no transaction stays open across a bridge round trip. Everything else,
+    and every call outside a unit, goes straight to the platform.
+    """
+
+    _DEFERRED = frozenset(('send_message', 'send_message_with_mentions', 'delete_message'))
+
+    def __init__(self, actions):
+        self._actions = actions
+
+    def __getattr__(self, name):
+        attr = getattr(self._actions, name)
+        if name not in self._DEFERRED:
+            return attr
+
+        def deferred(*args, **kwargs):
+            if not in_unit_of_work():
+                return attr(*args, **kwargs)
+            after_unit(lambda committed: committed and attr(*args, **kwargs))
+        return deferred
+
 
 class SharedBotLogic:
     def __init__(self, actions):
@@ -50,8 +94,15 @@ class SharedBotLogic:
         - format_mention(user_id) -> str
         Optional:
         - get_group_members(chat_id) -> Optional[List[dict]]
+        - prefetch_contacts(user_ids)  # Resolve names in one round trip
+        - batch()  # Context manager yielding actions sent in one round trip
+        - download_media(message_id) -> Optional[dict]  # {'mimetype', 'data' (base64), 'filename'}
         """
-        self.actions = actions
+        self.actions = _UnitActions(actions)
+        self.commands = COMMANDS
+        self.moderation = self._build_moderation_pipeline()
+        # Joins arriving close together get one welcome per chat
+        self.joins = JoinAggregator(self._welcome_joiners)
 
     def _normalize_phone_to_user_id(self, raw_phone: str) -> Optional[str]:
         if not raw_phone:
@@ -141,14 +192,14 @@ class SharedBotLogic:
         if not settings['enabled']:
             return None
 
-        from bot_core.content_filter import ContentModerator
+        from bot_core.content_filter import get_moderator
 
         backend = settings['backend']
         api_key = settings['api_key']
         threshold_value = settings['threshold'] if settings['threshold'] <= 1 else settings['threshold'] / 100.0
         action = settings['action']
 
-        moderator = ContentModerator(backend=backend, api_key=api_key)
+        moderator = get_moderator(backend=backend, api_key=api_key)
         thresholds = {
             'toxicity': threshold_value,
             'spam': threshold_value,
@@ -171,6 +222,97 @@ class SharedBotLogic:
 
         return None
 
+    def _build_moderation_pipeline(self) -> ModerationPipeline:
+        """Default stages: local checks first, the AI network call last"""
+        return ModerationPipeline([
+            ModerationStage(
+                'blacklist', cost=1,
+                check=lambda ctx: check_blacklist(ctx.chat_id, ctx.text),
+                act=lambda ctx, word: self.actions.send_message(ctx.chat_id, get_text(ctx.chat_id, 'blacklist_detected')),
+            ),
+            ModerationStage(
+                'locks', cost=2,
+                check=lambda ctx: self._check_locks(ctx.chat_id, ctx.message),
+                act=lambda ctx, lock: self.actions.send_message(
+                    ctx.chat_id, get_text(ctx.chat_id, 'lock_triggered', lock_type=lock)),
+            ),
+            ModerationStage(
+                'ai', cost=100,
+                check=lambda ctx: self._check_ai_moderation(ctx.chat_id, ctx.text),
+                act=self._apply_ai_moderation,
+            ),
+        ])
+
+    @contextmanager
+    def _batched_actions(self):
+        """Actions whose sends, deletes and removals go out in one bridge request, when supported"""
+        batch = getattr(self.actions, 'batch', None)
+        if batch is None:
+            yield self.actions
+            return
+        with batch() as actions:
+            yield actions
+
+    def _apply_ai_moderation(self, ctx: MessageContext, ai_result: Dict):
+        # Report, delete and kick/ban go out in one bridge round trip
+        with self._batched_actions() as actions:
+            self._run_ai_actions(actions, ctx, ai_result)
+
+    def _run_ai_actions(self, actions, ctx: MessageContext, ai_result: Dict):
+        chat_id, from_id = ctx.chat_id, ctx.from_id
+        action = ai_result.get('action', 'warn')
+        score = ai_result.get('score', 0.0)
+        backend = ai_result.get('backend', 'unknown')
+        requested_backend = ai_result.get('requested_backend', backend)
+        msg_id = ctx.message.get('id')
+
+        do_warn = 'warn' in action
+        do_delete = 'delete' in action
+        do_kick = 'kick' in action
+        do_ban = 'ban' in action
+
+        action_parts = []
+        if do_warn:
+            action_parts.append(get_text(chat_id, 'ai_action_warn'))
+        if do_delete:
+            action_parts.append(get_text(chat_id, 'ai_action_delete'))
+        if do_kick:
+            action_parts.append(get_text(chat_id, 'ai_action_kick'))
+        if do_ban:
+            action_parts.append(get_text(chat_id, 'ai_action_ban'))
+
+        actions_text = ' + '.join(action_parts)
+
+        backend_label = backend if backend == requested_backend else f"{backend} ← {requested_backend}"
+        msg = get_text(chat_id, 'ai_moderation_header', backend=backend_label)
+        msg += get_text(chat_id, 'ai_toxic_detected')
+        msg += get_text(chat_id, 'ai_score_label', score=score)
+        msg += get_text(chat_id, 'ai_reason_label', reason=ai_result.get('reason', get_text(chat_id, 'no_reason')))
+        msg += get_text(chat_id, 'ai_actions_label', actions=actions_text)
+        # Look the user up before the database work so no transaction waits on the bridge
+        user_display = actions.get_user_display(from_id) if do_warn or do_ban else None
+        remove = do_kick
+        # Warn and ban rows commit together, before any action is sent
+        with unit_of_work():
+            if do_warn:
+                warn_count, warn_limit = warn_user(chat_id, from_id, user_display, get_text(chat_id, 'toxic_content'))
+                if warn_count >= warn_limit:
+                    _, soft = get_warn_settings(chat_id)
+                    if not soft:
+                        add_ban(chat_id, from_id, user_display, reason="Too many warns")
+                    remove = True
+            if do_ban:
+                add_ban(chat_id, from_id, user_display, reason="AI detected toxic content")
+                remove = True
+
+        actions.send_message(chat_id, msg)
+
+        if do_delete and msg_id:
+            actions.delete_message(chat_id, msg_id)
+
+        if remove:
+            actions.remove_participant(chat_id, from_id)
+
     def handle_message(self, message: dict):
         try:
             text = message.get('body', '').strip()
@@ -185,71 +327,12 @@ class SharedBotLogic:
                 return
 
             if is_group:
-                ai_result = self._check_ai_moderation(chat_id, text)
-                if ai_result:
-                    action = ai_result.get('action', 'warn')
-                    score = ai_result.get('score', 0.0)
-                    backend = ai_result.get('backend', 'unknown')
-                    requested_backend = ai_result.get('requested_backend', backend)
-                    msg_id = message.get('id')
-
-                    do_warn = 'warn' in action
-                    do_delete = 'delete' in action
-                    do_kick = 'kick' in action
-                    do_ban = 'ban' in action
-
-                    action_parts = []
-                    if do_warn:
-                        action_parts.append(get_text(chat_id, 'ai_action_warn'))
-                    if do_delete:
-                        action_parts.append(get_text(chat_id, 'ai_action_delete'))
-                    if do_kick:
-                        action_parts.append(get_text(chat_id, 'ai_action_kick'))
-                    if do_ban:
-                        action_parts.append(get_text(chat_id, 'ai_action_ban'))
-
-                    actions_text = ' + '.join(action_parts)
-
-                    backend_label = backend if backend == requested_backend else f"{backend} ← {requested_backend}"
-                    msg = get_text(chat_id, 'ai_moderation_header', backend=backend_label)
-                    msg += get_text(chat_id, 'ai_toxic_detected')
-                    msg += get_text(chat_id, 'ai_score_label', score=score)
-                    msg += get_text(chat_id, 'ai_reason_label', reason=ai_result.get('reason', get_text(chat_id, 'no_reason')))
-                    msg += get_text(chat_id, 'ai_actions_label', actions=actions_text)
-                    self.actions.send_message(chat_id, msg)
-
-                    if do_delete and msg_id:
-                        self.actions.delete_message(chat_id, msg_id)
-
-                    if do_warn:
-                        user_display = self.actions.get_user_display(from_id)
-                        warn_count, warn_limit = warn_user(chat_id, from_id, user_display, get_text(chat_id, 'toxic_content'))
-                        if warn_count >= warn_limit:
-                            _, soft = get_warn_settings(chat_id)
-                            if soft:
-                                self.actions.remove_participant(chat_id, from_id)
-                            else:
-                                add_ban(chat_id, from_id, user_display, reason="Too many warns")
-                                self.actions.remove_participant(chat_id, from_id)
-
-                    if do_ban:
-                        user_display = self.actions.get_user_display(from_id)
-                        add_ban(chat_id, from_id, user_display, reason="AI detected toxic content")
-                        self.actions.remove_participant(chat_id, from_id)
-                    elif do_kick:
-                        self.actions.remove_participant(chat_id, from_id)
-
-                    return
-
-                blacklisted = check_blacklist(chat_id, text)
-                if blacklisted:
-                    self.actions.send_message(chat_id, get_text(chat_id, 'blacklist_detected'))
-                    return
-
-                lock_violation = self._check_locks(chat_id, message)
-                if lock_violation:
-                    self.actions.send_message(chat_id, get_text(chat_id, 'lock_triggered', lock_type=lock_violation))
-                    return
+                ctx = MessageContext(chat_id=chat_id, from_id=from_id, text=text, message=message)
+                # Local checks share one transaction and their replies go out after it commits
+                with unit_of_work():
+                    verdict = self.moderation.run(ctx, max_cost=LOCAL_STAGE_COST)
+                if verdict is None:
+                    self.moderation.run(ctx, min_cost=LOCAL_STAGE_COST)
 
         except Exception as e:
             logger.error(f"Error handling message: {e}", exc_info=True)
@@ -260,12 +343,15 @@ class SharedBotLogic:
             command = parts[0][1:].lower()
             args = parts[1] if len(parts) > 1 else ""
 
-            self._process_command(command, args, from_id, chat_id, is_group, message)
+            # The command's database work commits once; its replies go out after it
+            spec = self.commands.get(command)
+            with unit_of_work() if spec is None or spec.unit_of_work else nullcontext():
+                self._process_command(command, args, from_id, chat_id, is_group, message)
 
-            if is_group and should_delete_commands(chat_id):
-                message_id = message.get('id')
-                if message_id:
-                    self.actions.delete_message(chat_id, message_id)
+                if is_group and should_delete_commands(chat_id):
+                    message_id = message.get('id')
+                    if message_id:
+                        self.actions.delete_message(chat_id, message_id)
 
         except Exception as e:
             logger.error(f"Error handling command '{text}': {e}", exc_info=True)
@@ -275,163 +361,29 @@ class SharedBotLogic:
                 pass
 
     def _process_command(self, command: str, args: str, from_id: str, chat_id: str, is_group: bool, message: dict):
-        quoted_msg = message.get('quotedMsg')
-        quoted_participant = message.get('quotedParticipant')
-
-        if command == 'start':
-            self.cmd_start(chat_id)
-        elif command == 'help':
-            self.cmd_help(chat_id, from_id, self.actions.is_admin(chat_id, from_id), args)
-        elif command == 'info':
-            self.cmd_info(chat_id, from_id)
-        elif command == 'ping':
-            self.actions.send_message(chat_id, get_text(chat_id, 'pong'))
-
-        elif command == 'rules':
-            self.cmd_rules(chat_id)
-        elif command == 'setrules':
-            if not self.actions.is_admin(chat_id, from_id):
-                self.actions.send_message(chat_id, get_text(chat_id, 'admin_only'))
-                return
-            self.cmd_setrules(chat_id, args)
-
-        elif command == 'warn':
-            if not self.actions.is_admin(chat_id, from_id):
-                self.actions.send_message(chat_id, get_text(chat_id, 'admin_only'))
-                return
-            self.cmd_warn(chat_id, from_id, args, message)
-        elif command == 'warns':
-            self.cmd_warns(chat_id, from_id, message, args)
-        elif command == 'resetwarns':
-            if not self.actions.is_admin(chat_id, from_id):
-                self.actions.send_message(chat_id, get_text(chat_id, 'admin_only'))
-                return
-            self.cmd_resetwarns(chat_id, message, args)
-        elif command == 'setwarn':
-            if not self.actions.is_admin(chat_id, from_id):
-                self.actions.send_message(chat_id, get_text(chat_id, 'admin_only'))
-                return
-            self.cmd_setwarn(chat_id, args)
-
-        elif command == 'kick':
-            if not self.actions.is_admin(chat_id, from_id):
-                self.actions.send_message(chat_id, get_text(chat_id, 'admin_only'))
-                return
-            self.cmd_kick(chat_id, message, args)
-        elif command == 'ban':
-            if not self.actions.is_admin(chat_id, from_id):
-                self.actions.send_message(chat_id, get_text(chat_id, 'admin_only'))
-                return
-            self.cmd_ban(chat_id, message, args)
-        elif command == 'unban':
-            if not self.actions.is_admin(chat_id, from_id):
-                self.actions.send_message(chat_id, get_text(chat_id, 'admin_only'))
-                return
-            self.cmd_unban(chat_id, args)
-        elif command == 'role':
-            self.cmd_role(chat_id, message, args)
-        elif command == 'add':
-            if not self.actions.is_admin(chat_id, from_id):
-                self.actions.send_message(chat_id, get_text(chat_id, 'admin_only'))
-                return
-            self.cmd_add(chat_id, args)
-        elif command == 'invite':
-            if not self.actions.is_admin(chat_id, from_id):
-                self.actions.send_message(chat_id, get_text(chat_id, 'admin_only'))
-                return
-            self.cmd_invite(chat_id)
-        elif command == 'delcmds':
-            if not self.actions.is_admin(chat_id, from_id):
-                self.actions.send_message(chat_id, get_text(chat_id, 'admin_only'))
-                return
-            self.cmd_delcmds(chat_id, args)
-
-        elif command == 'setwelcome':
-            if not self.actions.is_admin(chat_id, from_id):
-                self.actions.send_message(chat_id, get_text(chat_id, 'admin_only'))
-                return
-            self.cmd_setwelcome(chat_id, args)
-        elif command == 'welcome':
-            self.cmd_welcome(chat_id)
-
-        elif command == 'blacklist':
-            self.cmd_blacklist(chat_id)
-        elif command == 'addblacklist':
-            if not self.actions.is_admin(chat_id, from_id):
-                self.actions.send_message(chat_id, get_text(chat_id, 'admin_only'))
-                return
-            self.cmd_addblacklist(chat_id, args)
-        elif command == 'rmblacklist':
-            if not self.actions.is_admin(chat_id, from_id):
-                self.actions.send_message(chat_id, get_text(chat_id, 'admin_only'))
-                return
-            self.cmd_rmblacklist(chat_id, args)
-
-        elif command == 'lock':
-            if not self.actions.is_admin(chat_id, from_id):
-                self.actions.send_message(chat_id, get_text(chat_id, 'admin_only'))
-                return
-            self.cmd_lock(chat_id, args)
-        elif command == 'unlock':
-            if not self.actions.is_admin(chat_id, from_id):
-                self.actions.send_message(chat_id, get_text(chat_id, 'admin_only'))
-                return
-            self.cmd_unlock(chat_id, args)
-        elif command == 'locks':
-            self.cmd_locks(chat_id)
-
-        elif command == 'aimod':
-            if not self.actions.is_admin(chat_id, from_id):
-                self.actions.send_message(chat_id, get_text(chat_id, 'admin_only'))
-                return
-            self.cmd_aimod(chat_id, args)
-        elif command == 'aimodset':
-            if not self.actions.is_admin(chat_id, from_id):
-                self.actions.send_message(chat_id, get_text(chat_id, 'admin_only'))
-                return
-            self.cmd_aimodset(chat_id, args)
-        elif command == 'aimodstatus':
-            self.cmd_aimodstatus(chat_id)
-        elif command == 'aimodkey':
-            if not self.actions.is_admin(chat_id, from_id):
-                self.actions.send_message(chat_id, get_text(chat_id, 'admin_only'))
-                return
-            self.cmd_aimodkey(chat_id, args)
-        elif command == 'aimodbackend':
-            if not self.actions.is_admin(chat_id, from_id):
-                self.actions.send_message(chat_id, get_text(chat_id, 'admin_only'))
-                return
-            self.cmd_aimodbackend(chat_id, args)
-        elif command == 'aimodaction':
-            if not self.actions.is_admin(chat_id, from_id):
-                self.actions.send_message(chat_id, get_text(chat_id, 'admin_only'))
-                return
-            self.cmd_aimodaction(chat_id, args)
-        elif command == 'aimodthreshold':
-            if not self.actions.is_admin(chat_id, from_id):
-                self.actions.send_message(chat_id, get_text(chat_id, 'admin_only'))
-                return
-            self.cmd_aimodthreshold(chat_id, args)
-        elif command == 'aihelp':
-            self.cmd_aihelp(chat_id)
-        elif command == 'aitest':
-            if not self.actions.is_admin(chat_id, from_id):
-                self.actions.send_message(chat_id, get_text(chat_id, 'admin_only'))
-                return
-            self.cmd_aitest(chat_id, args, quoted_msg)
-
-        elif command in ('setlang', 'lang'):
-            if not self.actions.is_admin(chat_id, from_id):
-                self.actions.send_message(chat_id, get_text(chat_id, 'admin_only'))
-                return
-            self.cmd_setlang(chat_id, args)
-        else:
+        spec = self.commands.get(command)
+        if spec is None:
             self.actions.send_message(chat_id, get_text(chat_id, 'unknown_command', command=command))
+            return
+
+        ctx = CommandContext(self.actions, command, args, from_id, chat_id, is_group, message)
+        if spec.group_only and not is_group:
+            self.actions.send_message(chat_id, get_text(chat_id, 'group_only'))
+            return
+        if spec.admin and not ctx.is_admin():
+            self.actions.send_message(chat_id, get_text(chat_id, 'admin_only'))
+            return
+        spec.handler(self, ctx)
 
     def cmd_start(self, chat_id: str):
         self.actions.send_message(chat_id, get_text(chat_id, 'start_msg'))
 
-    def cmd_help(self, chat_id: str, from_id: str, is_admin_user: bool, args: str = ''):
+    def cmd_ping(self, chat_id: str):
+        self.actions.send_message(chat_id, get_text(chat_id, 'pong'))
+
+    def cmd_help(self, chat_id: str, from_id: str, is_admin_user, args: str = ''):
+        # is_admin_user may be a bool or a zero-argument check that only runs when the answer matters
+        check_admin = is_admin_user if callable(is_admin_user) else (lambda: is_admin_user)
         lang = get_chat_lang(chat_id)
 
         if args:
@@ -439,52 +391,16 @@ class SharedBotLogic:
             cmd_data = COMMAND_HELP.get(lang, {}).get(cmd_name)
 
             if cmd_data:
-                if cmd_data['admin'] and not is_admin_user:
+                if cmd_data['admin'] and not check_admin():
                     self.actions.send_message(chat_id, get_text(chat_id, 'admin_only'))
                     return
-                msg = get_text(chat_id, 'help_cmd_header', cmd=cmd_name)
-                msg += get_text(chat_id, 'help_cmd_usage', usage=cmd_data['usage'])
-                msg += get_text(chat_id, 'help_cmd_desc', desc=cmd_data['desc'])
-                msg += get_text(chat_id, 'help_cmd_example', example=cmd_data['example'])
-                if cmd_data['admin']:
-                    msg += get_text(chat_id, 'help_cmd_admin')
-                self.actions.send_message(chat_id, msg)
+                self.actions.send_message(chat_id, get_command_help(lang, cmd_name))
                 return
             else:
                 self.actions.send_message(chat_id, get_text(chat_id, 'help_cmd_not_found', cmd=cmd_name))
                 return
 
-        msg = get_text(chat_id, 'help_general')
-        msg += get_text(chat_id, 'help_general_admin' if is_admin_user else 'help_general_user')
-
-        msg += get_text(chat_id, 'help_rules')
-        msg += get_text(chat_id, 'help_rules_admin' if is_admin_user else 'help_rules_user')
-
-        msg += get_text(chat_id, 'help_warns')
-        msg += get_text(chat_id, 'help_warns_admin' if is_admin_user else 'help_warns_user')
-
-        if is_admin_user:
-            msg += get_text(chat_id, 'help_moderation')
-            msg += get_text(chat_id, 'help_moderation_admin')
-
-        msg += get_text(chat_id, 'help_welcome')
-        msg += get_text(chat_id, 'help_welcome_admin' if is_admin_user else 'help_welcome_user')
-
-        msg += get_text(chat_id, 'help_blacklist')
-        msg += get_text(chat_id, 'help_blacklist_admin' if is_admin_user else 'help_blacklist_user')
-
-        msg += get_text(chat_id, 'help_locks')
-        msg += get_text(chat_id, 'help_locks_admin' if is_admin_user else 'help_locks_user')
-
-        if is_admin_user:
-            msg += get_text(chat_id, 'help_language_admin')
-
-        msg += get_text(chat_id, 'help_ai')
-        msg += get_text(chat_id, 'help_ai_admin' if is_admin_user else 'help_ai_user')
-
-        msg += get_text(chat_id, 'help_note')
-        msg += get_text(chat_id, 'help_use_cmd')
-        self.actions.send_message(chat_id, msg)
+        self.actions.send_message(chat_id, get_help_text(lang, check_admin()))
 
     def cmd_info(self, chat_id: str, from_id: str):
         msg = get_text(chat_id, 'bot_info', from_id=from_id, chat_id_value=chat_id)
@@ -528,21 +444,30 @@ class SharedBotLogic:
 
         user_display = self.actions.get_user_display(target_user)
         reason = reason or get_text(chat_id, 'no_reason')
-        count, limit = warn_user(chat_id, target_user, user_display, reason)
-        _, soft = get_warn_settings(chat_id)
+        with unit_of_work():
+            count, limit = warn_user(chat_id, target_user, user_display, reason)
+            _, soft = get_warn_settings(chat_id)
 
         if count >= limit:
             msg = get_text(chat_id, 'warn_limit_reached', user=user_display)
             self.actions.send_message(chat_id, msg)
 
             if not soft:
-                success = self.actions.remove_participant(chat_id, target_user)
-                if success:
-                    self.actions.send_message(chat_id, get_text(chat_id, 'user_banned', user=user_display))
+                banned = get_text(chat_id, 'user_banned', user=user_display)
+                after_unit(lambda committed: committed and self._remove_and_report(
+                    chat_id, target_user, banned))
         else:
             msg = get_text(chat_id, 'warn_issued', user=user_display, reason=reason, count=count, limit=limit)
             self.actions.send_message(chat_id, msg)
 
+    def _remove_and_report(self, chat_id: str, user_id: str, success_msg: str,
+                           failure_msg: Optional[str] = None):
+        """Remove a member and say how it went; commands queue this with after_unit()"""
+        if self.actions.remove_participant(chat_id, user_id):
+            self.actions.send_message(chat_id, success_msg)
+        elif failure_msg:
+            self.actions.send_message(chat_id, failure_msg)
+
     def cmd_warns(self, chat_id: str, user_id: str, message: dict, args: str = ''):
         quoted_participant = message.get('quotedParticipant')
         target_user = quoted_participant
@@ -555,16 +480,21 @@ class SharedBotLogic:
         if not target_user:
             target_user = user_id
 
-        warns = get_warns(chat_id, target_user)
-        limit, _ = get_warn_settings(chat_id)
-
         user_display = self.actions.get_user_display(target_user)
 
-        if not warns:
+        count = get_warn_count(chat_id, target_user)
+        limit, _ = get_warn_settings(chat_id)
+
+        if not count:
             msg = get_text(chat_id, 'warns_none', user=user_display)
         else:
-            msg = get_text(chat_id, 'warns_list', count=len(warns), limit=limit)
-            for i, warn in enumerate(warns, 1):
+            # Only the most recent page; the counter gives the total
+            skipped = max(0, count - WARNS_PAGE_SIZE)
+            warns = get_warns(chat_id, target_user, limit=WARNS_PAGE_SIZE, offset=skipped)
+            msg = get_text(chat_id, 'warns_list', count=count, limit=limit)
+            if skipped:
+                msg += get_text(chat_id, 'warns_earlier', count=skipped)
+            for i, warn in enumerate(warns, skipped + 1):
                 reason = warn.reason or get_text(chat_id, 'no_reason')
                 msg += f"{i}. {reason}\n"
 
@@ -583,8 +513,8 @@ class SharedBotLogic:
             self.actions.send_message(chat_id, get_text(chat_id, 'resetwarns_usage'))
             return
 
-        reset_user_warns(chat_id, target_user)
         user_display = self.actions.get_user_display(target_user)
+        reset_user_warns(chat_id, target_user)
         self.actions.send_message(chat_id, get_text(chat_id, 'warns_reset', user=user_display))
 
     def cmd_setwarn(self, chat_id: str, limit_str: str):
@@ -638,12 +568,11 @@ class SharedBotLogic:
             return
 
         user_display = self.actions.get_user_display(target_user)
-        add_ban(chat_id, target_user, user_display=user_display, reason=reason)
-        success = self.actions.remove_participant(chat_id, target_user)
-        if success:
-            self.actions.send_message(chat_id, get_text(chat_id, 'user_banned', user=user_display))
-        else:
-            self.actions.send_message(chat_id, get_text(chat_id, 'ban_failed'))
+        add_ban(chat_id, target_user, user_name=user_display, reason=reason)
+        banned = get_text(chat_id, 'user_banned', user=user_display)
+        failed = get_text(chat_id, 'ban_failed')
+        # Remove the member once the ban row is committed
+        after_unit(lambda committed: committed and self._remove_and_report(chat_id, target_user, banned, failed))
 
     def cmd_unban(self, chat_id: str, phone: str):
         if not phone:
@@ -815,13 +744,48 @@ class SharedBotLogic:
             msg = get_text(chat_id, 'blacklist_empty_admin')
         self.actions.send_message(chat_id, msg)
 
-    def cmd_addblacklist(self, chat_id: str, word: str):
-        if not word:
+    def _read_text_attachment(self, message: Optional[dict]) -> Optional[str]:
+        """Text of a file sent with, or replied to by, the command; '' if it is not text, None if there is none"""
+        if not message or not hasattr(self.actions, 'download_media'):
+            return None
+        source = message if message.get('hasMedia') else message.get('quotedMsg')
+        if not source or not source.get('hasMedia') or not source.get('id'):
+            return None
+
+        media = self.actions.download_media(source['id'])
+        if not media or not media.get('data'):
+            return ''
+        mimetype = (media.get('mimetype') or '').split(';')[0].strip()
+        filename = (media.get('filename') or '').lower()
+        if not (mimetype.startswith('text/') or filename.endswith(('.txt', '.csv'))):
+            return ''
+        try:
+            return base64.b64decode(media['data']).decode('utf-8-sig')
+        except (binascii.Error, UnicodeDecodeError):
+            return ''
+
+    def cmd_addblacklist(self, chat_id: str, words: str, message: Optional[dict] = None):
+        attachment = self._read_text_attachment(message)
+        if attachment == '':
+            self.actions.send_message(chat_id, get_text(chat_id, 'blacklist_file_invalid'))
+            return
+
+        terms = parse_blacklist_terms(words)
+        if attachment:
+            terms.extend(parse_blacklist_terms(attachment))
+        if not terms:
             self.actions.send_message(chat_id, get_text(chat_id, 'usage_addblacklist'))
             return
 
-        add_blacklist(chat_id, word)
-        self.actions.send_message(chat_id, get_text(chat_id, 'blacklist_added', word=word))
+        if len(terms) == 1 and not attachment and len(terms[0]) <= MAX_TERM_LENGTH:
+            add_blacklist(chat_id, terms[0])
+            self.actions.send_message(chat_id, get_text(chat_id, 'blacklist_added', word=terms[0]))
+            return
+
+        added = add_blacklist_words(chat_id, terms)
+        self.actions.send_message(chat_id, get_text(
+            chat_id, 'blacklist_bulk_added', added=added, skipped=len(terms) - added
+        ))
 
     def cmd_rmblacklist(self, chat_id: str, word: str):
         if not word:
@@ -938,8 +902,8 @@ class SharedBotLogic:
 
         settings = get_ai_settings(chat_id)
 
-        from bot_core.content_filter import ContentModerator
-        moderator = ContentModerator(
+        from bot_core.content_filter import get_moderator
+        moderator = get_moderator(
             backend=settings['backend'],
             api_key=settings['api_key']
         )
@@ -1184,17 +1148,27 @@ class SharedBotLogic:
 
             logger.info(f"Group join event in {chat_id}: {participants}")
 
-            welcome_msg = get_welcome(chat_id)
-            if not welcome_msg:
-                return
-
-            for participant_id in participants:
-                message = welcome_msg.replace('{mention}', self.actions.format_mention(participant_id))
-                # Use mentions for proper @tagging if the method exists
-                if hasattr(self.actions, 'send_message_with_mentions'):
-                    self.actions.send_message_with_mentions(chat_id, message, [participant_id])
-                else:
-                    self.actions.send_message(chat_id, message)
-                logger.info(f"Sent welcome message to {participant_id}")
+            if get_welcome(chat_id):
+                self.joins.add(chat_id, participants)
         except Exception as e:
             logger.error(f"Error handling group join: {e}")
+
+    def _welcome_joiners(self, chat_id: str, participants: List[str]):
+        """Send one welcome (split if needed) mentioning every member of a join burst"""
+        welcome_msg = get_welcome(chat_id)
+        if not welcome_msg:
+            return
+
+        # One batched contact lookup resolves every mention below
+        if hasattr(self.actions, 'prefetch_contacts'):
+            self.actions.prefetch_contacts(participants)
+        mentions = [self.actions.format_mention(participant_id) for participant_id in participants]
+
+        messages = render_welcomes(welcome_msg, participants, mentions)
+        for message, mention_ids in messages:
+            # Use mentions for proper @tagging if the method exists
+            if hasattr(self.actions, 'send_message_with_mentions'):
+                self.actions.send_message_with_mentions(chat_id, message, mention_ids)
+            else:
+                self.actions.send_message(chat_id, message)
+        logger.info(f"👋 Welcomed {len(participants)} members in {chat_id} with {len(messages)} messages")
@@ -0,0 +1,72 @@
+"""
+Single-statement upserts
+INSERT ... ON CONFLICT DO UPDATE on SQLite and PostgreSQL, read-then-write elsewhere
+"""
+
+from typing import Any, Dict, Iterable, Sequence
+
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import Insert
+
+
+class OnConflictUpdate(Insert):
+    """INSERT that updates the given columns when the key already exists"""
+
+    def __init__(self, table, values: Dict[str, Any], conflict: Sequence[str], update: Sequence[str]):
+        super().__init__(table, values=values)
+        self.conflict = tuple(conflict)
+        self.update = tuple(update)
+
+
+@compiles(OnConflictUpdate)
+def _compile_on_conflict_update(element, compiler, **kw):
+    # visit_insert renders the INSERT with Python-side column defaults filled in
+    sql = compiler.visit_insert(element, **kw)
+    quote = compiler.preparer.quote
+    target = ', '.join(quote(name) for name in element.conflict)
+    if not element.update:
+        return f"{sql} ON CONFLICT ({target}) DO NOTHING"
+    assignments = ', '.join(f"{quote(name)} = excluded.{quote(name)}" for name in element.update)
+    return f"{sql} ON CONFLICT ({target}) DO UPDATE SET {assignments}"
+
+
+def supports_on_conflict(dialect) -> bool:
+    """Whether a dialect understands INSERT ... ON CONFLICT DO UPDATE"""
+    if dialect.name == 'sqlite':
+        return dialect.dbapi.sqlite_version_info >= (3, 24, 0)
+    if dialect.name == 'postgresql':
+        version = dialect.server_version_info
+        return version is None or version >= (9, 5)
+    return False
+
+
+def upsert(session, model, values: Dict[str, Any], update: Iterable[str]) -> None:
+    """
+    Insert a row or update some of its columns, keyed by the primary key
+
+    Runs in the caller's transaction; the caller commits. On SQLite and
+    PostgreSQL this is one atomic statement, so concurrent writers cannot
+    both insert. Other databases fall back to a read followed by a write.
+
+    Args:
+        session: Database session
+        model: Mapped class
+        values: Full row to insert, including the primary key
+        update: Columns overwritten from ``values`` when the row exists
+    """
+    update = tuple(update)
+    mapper = sa_inspect(model)
+    keys = [column.key for column in mapper.primary_key]
+
+    if supports_on_conflict(session.get_bind(mapper).dialect):
+        session.execute(OnConflictUpdate(mapper.local_table, values, keys, update))
+        return
+
+    row = session.query(model).get(tuple(values[key] for key in keys))
+    if row is None:
+        session.add(model(**values))
+    else:
+        for name in update:
+            setattr(row, name, values[name])
+    session.flush()
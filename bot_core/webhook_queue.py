@@ -0,0 +1,82 @@
+"""
+Bounded worker queue for bridge webhook events
+Lets the webhook acknowledge events immediately while workers run the handlers
+"""
+
+import logging
+import os
+from typing import Any, Callable, Dict
+
+from .keyed_executor import KeyedExecutor
+
+logger = logging.getLogger(__name__)
+
+WEBHOOK_WORKERS = int(os.getenv('WEBHOOK_WORKERS', '4'))
+WEBHOOK_LANE_QUEUE_SIZE = int(os.getenv('WEBHOOK_LANE_QUEUE_SIZE', '250'))
+WEBHOOK_ENQUEUE_TIMEOUT = float(os.getenv('WEBHOOK_ENQUEUE_TIMEOUT', '0.5'))
+
+
+def event_chat_id(event: Dict[str, Any]) -> str:
+    """Chat an event belongs to (falls back to the event type for chat-less events)"""
+    data = event.get('data')
+    if isinstance(data, dict):
+        chat_id = data.get('chatId') or data.get('from')
+        if chat_id:
+            return chat_id
+    return event.get('chatId') or event.get('type', 'message')
+
+
+class WebhookQueue(KeyedExecutor):
+    """
+    Webhook events on per-chat ordered lanes
+
+    Events from one chat always run in arrival order (so a ``/warn`` never
+    overtakes the ``/resetwarns`` sent after it), while different chats are
+    handled concurrently. When a chat's lane stays full ``enqueue`` rejects
+    the event, which the webhook turns into backpressure on the bridge.
+    """
+
+    def __init__(self, handler: Callable[[Dict[str, Any]], None], workers: int = WEBHOOK_WORKERS,
+                 lane_queue_size: int = WEBHOOK_LANE_QUEUE_SIZE, enqueue_timeout: float = WEBHOOK_ENQUEUE_TIMEOUT):
+        """
+        Args:
+            handler: Callable processing one event
+            workers: Number of lanes (worker threads)
+            lane_queue_size: Maximum events waiting per lane
+            enqueue_timeout: Seconds to wait for room before rejecting an event
+        """
+        super().__init__(lanes=workers, lane_queue_size=lane_queue_size,
+                         submit_timeout=enqueue_timeout, name='webhook-lane')
+        self.handler = handler
+
+    @property
+    def workers(self) -> int:
+        return self.lanes
+
+    def start(self) -> None:
+        """Start the worker lanes (idempotent)"""
+        started = bool(self._threads)
+        super().start()
+        if not started:
+            logger.info(f"📥 Webhook queue started with {self.lanes} lanes (capacity {self.lane_queue_size} each)")
+
+    def enqueue(self, event: Dict[str, Any], wait: bool = True) -> bool:
+        """
+        Queue an event on its chat's lane
+
+        Args:
+            event: Webhook payload
+            wait: Wait up to the enqueue timeout for room; False rejects at once
+
+        Returns:
+            True if queued, False if the lane stayed full (caller should back off)
+        """
+        if not wait:
+            return self.submit_nowait(event_chat_id(event), self.handler, event)
+        return self.submit(event_chat_id(event), self.handler, event)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return queue depth, throughput and lag metrics"""
+        stats = super().stats()
+        stats['enqueued'] = stats.pop('submitted')
+        return stats
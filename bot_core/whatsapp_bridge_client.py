@@ -4,13 +4,20 @@ Python client for WhatsApp Bridge (Node.js)
 This module provides a Python interface to communicate with the WhatsApp Bridge server.
 """
 
-import requests
 import logging
+import requests
 from typing import Optional, Dict, Any, Callable, List
 import threading
 import time
 from flask import Flask, request as flask_request
 
+from .bridge_batch import BridgeBatch
+from .bridge_http import BridgeSession
+from .bridge_stream import BRIDGE_STREAM, BridgeStream, BridgeStreamError, stream_action
+from .contact_cache import ContactCache
+from .outbound_queue import OutboundDispatcher, OutboundMessage
+from .webhook_queue import WEBHOOK_WORKERS, WebhookQueue
+
 logger = logging.getLogger(__name__)
 
 
@@ -19,70 +26,128 @@ class WhatsAppBridgeClient:
     Client to communicate with WhatsApp Bridge Node.js server
     """
     
-    def __init__(self, bridge_url: str = "http://localhost:3000", callback_port: int = 5000):
+    def __init__(self, bridge_url: str = "http://localhost:3000", callback_port: int = 5000,
+                 webhook_workers: int = WEBHOOK_WORKERS, stream_address: str = BRIDGE_STREAM):
+        """
+        Args:
+            bridge_url: Base URL of the Node.js bridge
+            callback_port: Port for the webhook server
+            webhook_workers: Worker threads handling webhook events; 0 runs handlers inline
+            stream_address: Persistent bridge channel ("unix:<path>" or "tcp:<host>:<port>");
+                empty uses HTTP only
+        """
         self.bridge_url = bridge_url.rstrip('/')
         self.callback_port = callback_port
         self.message_handlers = []
         self.group_join_handlers = []
         self.group_leave_handlers = []
+        self.ready_handlers = []
         self.event_handlers = {}
         self.flask_app = None
         self.flask_thread = None
         self._bridge_ready = threading.Event()  # Event to wait for bridge ready signal
+        self.http = BridgeSession(self.bridge_url)
+        self.contacts = ContactCache(self._fetch_contact, self._fetch_contacts)
+        self.outbound = OutboundDispatcher(self._deliver_message, is_transient=self._is_transient_error)
+        self.webhook_queue = WebhookQueue(self._dispatch_event, workers=webhook_workers) if webhook_workers > 0 else None
+        self.stream = BridgeStream(stream_address, self._on_stream_event) if stream_address else None
+        # Stream events never run on the stream's reader thread; without a webhook
+        # queue they get bounded lanes of their own
+        self.stream_lanes = None
+        if self.stream is not None and self.webhook_queue is None:
+            self.stream_lanes = WebhookQueue(self._dispatch_event, workers=WEBHOOK_WORKERS)
 
     def _request(self, method: str, path: str, json: Optional[Dict[str, Any]] = None, timeout: int = 10) -> Dict[str, Any]:
-        url = f"{self.bridge_url}{path}"
-        response = requests.request(method, url, json=json, timeout=timeout)
+        # Actions go over the persistent stream while it is up; everything else (and any
+        # call made while it is reconnecting) uses HTTP
+        if self.stream is not None and self.stream.connected:
+            routed = stream_action(method, path, json)
+            if routed is not None:
+                action, data = routed
+                return {'success': True, **self.stream.call(action, data, timeout=timeout)}
+        response = self.http.request(method, path, json=json, timeout=timeout)
         response.raise_for_status()
         return response.json()
+
+    def batch(self, stop_on_error: bool = False) -> BridgeBatch:
+        """Collect actions and send them in one /batch request when the ``with`` block exits
+
+        Example:
+            with client.batch() as batch:
+                batch.delete_message(chat_id, message_id)
+                batch.remove_participant(chat_id, user_id)
+        """
+        return BridgeBatch(self, stop_on_error=stop_on_error)
+
+    def close(self):
+        """Deliver queued messages and release bridge connections"""
+        self.outbound.stop()
+        if self.stream is not None:
+            self.stream.close()
+        if self.stream_lanes is not None:
+            self.stream_lanes.stop()
+        self.http.close()
         
-    def start_callback_server(self):
-        """Start Flask server to receive callbacks from bridge"""
-        self.flask_app = Flask(__name__)
+    def create_callback_app(self) -> Flask:
+        """Build the Flask app serving the bridge webhook"""
+        app = Flask(__name__)
         
-        @self.flask_app.route('/webhook', methods=['POST'])
+        @app.route('/webhook', methods=['POST'])
         def webhook():
-            data = flask_request.json
-            event_type = data.get('type', 'message')
-            logger.info(f"Webhook received: {event_type}")
-            logger.info(f"Registered handlers: {len(self.message_handlers)}")
-            
-            # Handle 'ready' event from bridge
-            if event_type == 'ready':
-                logger.info("🎉 Bridge sent ready signal!")
-                self._bridge_ready.set()
-                return {'status': 'ok'}
-            
-            if event_type == 'message':
-                msg_data = data.get('data', {})
-                logger.info(f"Message data: {msg_data.get('body', '')[:50]}")
-                for handler in self.message_handlers:
-                    try:
-                        logger.info(f"Calling handler: {handler}")
-                        handler(msg_data)
-                    except Exception as e:
-                        logger.error(f"Error in message handler: {e}", exc_info=True)
-            elif event_type == 'group_join':
-                for handler in self.group_join_handlers:
-                    try:
-                        handler(data)
-                    except Exception as e:
-                        logger.error(f"Error in group_join handler: {e}")
-            elif event_type == 'group_leave':
-                for handler in self.group_leave_handlers:
-                    try:
-                        handler(data)
-                    except Exception as e:
-                        logger.error(f"Error in group_leave handler: {e}")
-            else:
-                # Generic event handlers
-                handlers = self.event_handlers.get(event_type, [])
-                for handler in handlers:
-                    try:
-                        handler(data)
-                    except Exception as e:
-                        logger.error(f"Error in {event_type} handler: {e}")
-            return {'status': 'ok'}
+            data = flask_request.get_json(silent=True)
+            if not isinstance(data, dict):
+                return {'status': 'error', 'error': 'invalid payload'}, 400
+            logger.debug(f"Webhook received: {data.get('type', 'message')}")
+            if not self._accept_event(data):
+                return {'status': 'busy'}, 503, {'Retry-After': '1'}
+            return {'status': 'ok' if self.webhook_queue is None else 'queued'}
+        
+        @app.route('/webhook/stats', methods=['GET'])
+        def webhook_stats():
+            stats = {'mode': 'inline'} if self.webhook_queue is None else {'mode': 'queued', **self.webhook_queue.stats()}
+            if self.stream is not None:
+                stats['stream'] = self.stream.stats()
+            return stats
+        
+        return app
+
+    def _accept_event(self, data: Dict[str, Any]) -> bool:
+        """Handle or queue one bridge event (from the webhook or the stream)
+
+        Returns:
+            False if the webhook queue is full and the bridge should retry later
+        """
+        # Handle 'ready' event from bridge
+        if data.get('type', 'message') == 'ready':
+            logger.info("🎉 Bridge sent ready signal!")
+            self._bridge_ready.set()
+            if self.ready_handlers:
+                threading.Thread(target=self._run_ready_handlers, name='bridge-ready', daemon=True).start()
+            return True
+
+        if self.webhook_queue is None:
+            self._dispatch_event(data)
+            return True
+        return self.webhook_queue.enqueue(data)
+
+    def _on_stream_event(self, data: Dict[str, Any]) -> bool:
+        # This runs on the stream's reader thread, which also reads the replies to
+        # the handlers' bridge calls: never block it, and let the bridge retry
+        # (returning False) when the chat's lane is full
+        if data.get('type', 'message') == 'ready':
+            return self._accept_event(data)
+        lanes = self.webhook_queue if self.webhook_queue is not None else self.stream_lanes
+        return lanes.enqueue(data, wait=False)
+    
+    def start_callback_server(self):
+        """Start Flask server to receive callbacks from bridge"""
+        self.flask_app = self.create_callback_app()
+        if self.webhook_queue is not None:
+            self.webhook_queue.start()
+        if self.stream_lanes is not None:
+            self.stream_lanes.start()
+        if self.stream is not None:
+            self.stream.start()
         
         # Run Flask in a separate thread
         self.flask_thread = threading.Thread(
@@ -97,8 +162,8 @@ class WhatsAppBridgeClient:
         # Register callback with bridge
         callback_url = f"http://localhost:{self.callback_port}/webhook"
         try:
-            response = requests.post(
-                f"{self.bridge_url}/set-callback",
+            response = self.http.request(
+                'POST', '/set-callback',
                 json={'url': callback_url},
                 timeout=5
             )
@@ -107,6 +172,45 @@ class WhatsAppBridgeClient:
         except Exception as e:
             logger.error(f"Failed to register callback: {e}")
     
+    def _run_ready_handlers(self):
+        for handler in self.ready_handlers:
+            try:
+                handler()
+            except Exception as e:
+                logger.error(f"Error in ready handler: {e}")
+    
+    def _dispatch_event(self, data: Dict[str, Any]):
+        """Run the registered handlers for a webhook event"""
+        event_type = data.get('type', 'message')
+        if event_type == 'message':
+            msg_data = data.get('data', {})
+            logger.info(f"Message data: {msg_data.get('body', '')[:50]}")
+            for handler in self.message_handlers:
+                try:
+                    handler(msg_data)
+                except Exception as e:
+                    logger.error(f"Error in message handler: {e}", exc_info=True)
+        elif event_type == 'group_join':
+            for handler in self.group_join_handlers:
+                try:
+                    handler(data)
+                except Exception as e:
+                    logger.error(f"Error in group_join handler: {e}")
+        elif event_type == 'group_leave':
+            for handler in self.group_leave_handlers:
+                try:
+                    handler(data)
+                except Exception as e:
+                    logger.error(f"Error in group_leave handler: {e}")
+        else:
+            # Generic event handlers
+            handlers = self.event_handlers.get(event_type, [])
+            for handler in handlers:
+                try:
+                    handler(data)
+                except Exception as e:
+                    logger.error(f"Error in {event_type} handler: {e}")
+    
     def is_ready(self) -> bool:
         """Check if bridge is ready (via HTTP or internal flag)"""
         # First check internal flag (set by ready event)
@@ -232,7 +336,18 @@ class WhatsAppBridgeClient:
             return None
 
     def get_contact(self, contact_id: str) -> Optional[Dict[str, Any]]:
-        """Get contact by WhatsApp ID"""
+        """Get contact by WhatsApp ID (cached)"""
+        return self.contacts.get(contact_id)
+
+    def get_contacts(self, contact_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get several contacts by WhatsApp ID with at most one bridge request (cached)"""
+        return self.contacts.get_many(contact_ids)
+
+    def prefetch_contacts(self, contact_ids: List[str]) -> int:
+        """Warm the contact cache for ids about to be displayed"""
+        return self.contacts.prefetch(contact_ids)
+
+    def _fetch_contact(self, contact_id: str) -> Optional[Dict[str, Any]]:
         try:
             result = self._request('GET', f"/contact/{contact_id}", timeout=10)
             return result.get('contact')
@@ -240,6 +355,14 @@ class WhatsAppBridgeClient:
             logger.error(f"Failed to get contact: {e}")
             return None
 
+    def _fetch_contacts(self, contact_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        try:
+            result = self._request('POST', "/contacts", json={'ids': contact_ids}, timeout=30)
+            return result.get('contacts') or {}
+        except Exception as e:
+            logger.error(f"Failed to get contacts: {e}")
+            return {}
+
     def get_contact_by_phone(self, phone_number: str) -> Optional[Dict[str, Any]]:
         """Get contact by phone number in any format"""
         try:
@@ -298,6 +421,33 @@ class WhatsAppBridgeClient:
             logger.error(f"Failed to send mention message: {e}")
             return None
 
+    def _deliver_message(self, chat_id: str, message: str, mention_ids: Optional[List[str]] = None) -> Optional[str]:
+        """Send one outbound queue batch, raising on failure so it can be retried"""
+        if mention_ids:
+            payload = {'chatId': chat_id, 'message': message, 'mentionIds': mention_ids}
+            return self._request('POST', '/send-mention', json=payload, timeout=10).get('messageId')
+        return self._request('POST', '/send-message', json={'chatId': chat_id, 'message': message}, timeout=10).get('messageId')
+
+    @staticmethod
+    def _is_transient_error(error: Exception) -> bool:
+        """Connection problems, timeouts, 429 and 5xx are worth retrying"""
+        if isinstance(error, (requests.ConnectionError, requests.Timeout, ConnectionError, TimeoutError)):
+            return True
+        status = None
+        if isinstance(error, requests.HTTPError) and error.response is not None:
+            status = error.response.status_code
+        elif isinstance(error, BridgeStreamError):
+            status = error.status
+        return status is not None and (status == 429 or status >= 500)
+
+    def queue_message(self, chat_id: str, message: str) -> OutboundMessage:
+        """Queue a text message on the rate-limited outbound dispatcher"""
+        return self.outbound.send(chat_id, message)
+
+    def queue_mention(self, chat_id: str, message: str, mention_ids: List[str]) -> OutboundMessage:
+        """Queue a message with user mentions on the outbound dispatcher"""
+        return self.outbound.send(chat_id, message, mention_ids)
+
     def find_contacts_by_name(self, name_query: str) -> List[Dict[str, Any]]:
         """Find contacts by name or pushname (best-effort)"""
         try:
@@ -401,8 +551,7 @@ class WhatsAppBridgeClient:
     def add_participants(self, group_id: str, participants: list) -> bool:
         """Add participants to group"""
         try:
-            url = f"{self.bridge_url}/group/{group_id}/add"
-            response = requests.post(url, json={'participants': participants}, timeout=30)
+            response = self.http.request('POST', f"/group/{group_id}/add", json={'participants': participants}, timeout=30)
             if response.ok:
                 data = response.json()
                 # Check if invite was sent vs actual add
@@ -431,6 +580,11 @@ class WhatsAppBridgeClient:
             logger.error(f"Failed to add participants: {e}")
             return {'success': False, 'error': str(e)}
     
+    def get_group_ids(self) -> List[str]:
+        """Ids of every group chat the bridge account is in"""
+        chats = self.call('client', 'getChats') or []
+        return [chat['id'] for chat in chats if isinstance(chat, dict) and chat.get('isGroup') and chat.get('id')]
+
     def get_invite_link(self, group_id: str) -> Optional[str]:
         """Get group invite link"""
         try:
@@ -476,6 +630,10 @@ class WhatsAppBridgeClient:
         """Register group leave handler"""
         self.group_leave_handlers.append(handler)
 
+    def on_ready(self, handler: Callable):
+        """Register a handler run (in a background thread) when the bridge reports ready"""
+        self.ready_handlers.append(handler)
+
     def on_event(self, event_type: str, handler: Callable):
         """Register a generic event handler (e.g., message_reaction, message_edit, group_update)"""
         if event_type not in self.event_handlers:
@@ -7,6 +7,7 @@ import logging
 import sys
 import os
 import time
+from contextlib import contextmanager
 
 # Add project root to path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
@@ -21,6 +22,7 @@ except Exception:
 from bot_core.whatsapp_bridge_client import WhatsAppBridgeClient
 from bot_core.database import init_db
 from bot_core.shared_bot_logic import SharedBotLogic
+from bot_core.group_roles import GroupRoleCache
 
 # Setup logging
 logging.basicConfig(
@@ -46,30 +48,84 @@ except ImportError:
     logger.info("Using environment variables for configuration")
 
 
+class BatchedActions:
+    """WhatsAppActions view that collects sends, deletes and removals into one bridge /batch call.
+
+    Results are only known after the batch is sent, so these methods return
+    BatchResult placeholders instead of booleans. Everything else is passed
+    through to the wrapped actions.
+    """
+
+    def __init__(self, actions: 'WhatsAppActions', batch):
+        self._actions = actions
+        self._batch = batch
+        self.changed_groups = set()
+
+    def send_message(self, chat_id: str, text: str):
+        return self._batch.send_message(chat_id, text)
+
+    def send_message_with_mentions(self, chat_id: str, text: str, mention_ids: list):
+        return self._batch.send_mention(chat_id, text, mention_ids)
+
+    def delete_message(self, chat_id: str, message_id: str):
+        return self._batch.delete_message(chat_id, message_id)
+
+    def remove_participant(self, chat_id: str, user_id: str):
+        self.changed_groups.add(chat_id)
+        return self._batch.remove_participant(chat_id, user_id)
+
+    def __getattr__(self, name):
+        return getattr(self._actions, name)
+
+
 class WhatsAppActions:
     def __init__(self, client: WhatsAppBridgeClient, owner_id: str):
         self.client = client
         self.owner_id = owner_id
+        self.group_roles = GroupRoleCache(self.get_group_members)
 
     def send_message(self, chat_id: str, text: str):
-        return self.client.send_message(chat_id, text)
+        """Queue a reply; returns an OutboundMessage whose wait() gives the message id."""
+        return self.client.queue_message(chat_id, text)
 
     def send_message_with_mentions(self, chat_id: str, text: str, mention_ids: list):
         """Send a message with proper @mentions that tag users."""
-        return self.client.send_mention(chat_id, text, mention_ids)
+        return self.client.queue_mention(chat_id, text, mention_ids)
 
     def delete_message(self, chat_id: str, message_id: str):
         return self.client.delete_message(chat_id, message_id)
 
+    @contextmanager
+    def batch(self):
+        """Collect the actions taken inside the block into a single bridge round trip."""
+        batched = None
+        try:
+            with self.client.batch() as batch:
+                batched = BatchedActions(self, batch)
+                yield batched
+        finally:
+            for chat_id in (batched.changed_groups if batched else ()):
+                self.group_roles.invalidate(chat_id)
+
     def remove_participant(self, chat_id: str, user_id: str) -> bool:
-        return self.client.remove_participant(chat_id, user_id)
+        result = self.client.remove_participant(chat_id, user_id)
+        self.group_roles.invalidate(chat_id)
+        return result
 
     def add_participants(self, chat_id: str, participants):
-        return self.client.add_participants(chat_id, participants)
+        result = self.client.add_participants(chat_id, participants)
+        self.group_roles.invalidate(chat_id)
+        return result
 
     def get_contact(self, contact_id: str):
         return self.client.get_contact(contact_id)
 
+    def download_media(self, message_id: str):
+        return self.client.download_media(message_id)
+
+    def prefetch_contacts(self, contact_ids):
+        return self.client.prefetch_contacts(contact_ids)
+
     def get_invite_link(self, chat_id: str):
         return self.client.get_invite_link(chat_id)
 
@@ -101,50 +157,7 @@ class WhatsAppActions:
         if not chat_id.endswith('@g.us'):
             return 'member'  # Not a group, no special roles
         
-        members = self.get_group_members(chat_id)
-        if not members:
-            logger.warning(f"Could not get members for {chat_id}")
-            return 'unknown'
-        
-        # Extract the identifier part (before @)
-        user_identifier = user_id.split('@')[0] if user_id else ''
-        is_lid_format = user_id.endswith('@lid')
-        
-        for member in members:
-            member_id = member.get('id', '')
-            member_identifier = member_id.split('@')[0] if member_id else ''
-            member_lid = member.get('lid', '')
-            member_lid_identifier = member_lid.split('@')[0] if member_lid else ''
-            member_phone = member.get('phone', '')
-            member_phone_identifier = member_phone.split('@')[0] if member_phone else ''
-            
-            # Check all possible matches:
-            # 1. Direct ID match
-            # 2. LID to LID match
-            # 3. Phone to phone match
-            # 4. User LID matches member's resolved LID
-            matched = False
-            
-            if user_identifier == member_identifier:
-                matched = True
-            elif is_lid_format and member_lid_identifier and user_identifier == member_lid_identifier:
-                matched = True
-            elif not is_lid_format and member_phone_identifier and user_identifier == member_phone_identifier:
-                matched = True
-            elif is_lid_format and member_id.endswith('@lid') and user_identifier == member_identifier:
-                matched = True
-            
-            if matched:
-                is_super = member.get('isSuperAdmin', False)
-                is_admin = member.get('isAdmin', False)
-                if is_super:
-                    return 'superadmin'
-                if is_admin:
-                    return 'admin'
-                return 'member'
-        
-        logger.warning(f"User {user_id} not found in group members")
-        return 'unknown'
+        return self.group_roles.get_role(chat_id, user_id)
 
     def is_admin(self, chat_id: str, user_id: str) -> bool:
         """Check if user is an admin (or higher) in the chat."""
@@ -244,6 +257,14 @@ class WhatsAppBot:
         # Register message handler
         self.client.on_message(self.logic.handle_message)
 
+        # Keep the group role cache in step with membership and admin changes
+        group_roles = self.actions.group_roles
+        self.client.on_group_join(lambda event: group_roles.invalidate(event.get('chatId')))
+        self.client.on_group_leave(lambda event: group_roles.invalidate(event.get('chatId')))
+        self.client.on_event('group_admin_changed',
+                             lambda event: group_roles.invalidate(event.get('data', {}).get('chatId')))
+        self.client.on_ready(lambda: group_roles.warm(self.client.get_group_ids()))
+
         # Register group join handler for welcome messages
         self.client.on_group_join(self.logic.handle_group_join)
 
@@ -267,6 +288,10 @@ class WhatsAppBot:
                 time.sleep(1)
         except KeyboardInterrupt:
             logger.info("\nBot stopped by user")
+        finally:
+            # Send welcomes still waiting for their join window to close
+            self.logic.joins.stop()
+            self.client.close()
 
 
 def main():
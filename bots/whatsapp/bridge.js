@@ -54,15 +54,33 @@ try {
 
 const ALLOW_UNSAFE_CALLS = process.env.BRIDGE_ALLOW_UNSAFE_CALLS === 'true';
 
+const FORWARD_MAX_ATTEMPTS = parseInt(process.env.BRIDGE_FORWARD_MAX_ATTEMPTS || '5', 10);
+
 async function forwardToPython(payload) {
-    if (!pythonCallbackUrl) return;
     try {
         const fetch = require('node-fetch');
-        await fetch(pythonCallbackUrl, {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify(payload)
-        });
+        // Python answers 503 when its webhook queue is full; back off and retry
+        for (let attempt = 1; attempt <= FORWARD_MAX_ATTEMPTS; attempt++) {
+            let status;
+            let retryAfter = 1;
+            // Prefer the persistent stream; fall back to the HTTP webhook when it is down
+            const ack = await sendStreamEvent(payload);
+            if (ack) {
+                status = ack.ok ? 200 : (ack.s || 500);
+            } else {
+                if (!pythonCallbackUrl) return;
+                const response = await fetch(pythonCallbackUrl, {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/json' },
+                    body: JSON.stringify(payload)
+                });
+                status = response.status;
+                retryAfter = parseFloat(response.headers.get('retry-after')) || 1;
+            }
+            if (status !== 503) return;
+            await new Promise(resolve => setTimeout(resolve, retryAfter * 1000 * attempt));
+        }
+        console.warn(`Python webhook busy, dropped ${payload.type} event after ${FORWARD_MAX_ATTEMPTS} attempts`);
     } catch (error) {
         console.error('Error forwarding event to Python:', error);
     }
@@ -102,7 +120,9 @@ client.on('message', async (msg) => {
                 id: quoted.id._serialized,
                 body: quoted.body,
                 from: quoted.author || quoted.from,
-                timestamp: quoted.timestamp
+                timestamp: quoted.timestamp,
+                hasMedia: quoted.hasMedia,
+                type: quoted.type
             };
             console.log('Quoted participant:', quotedParticipant);
         } catch (e) {
@@ -278,59 +298,28 @@ client.on('vote_update', (vote) => {
 client.on('group_join', async (notification) => {
     console.log('Group join notification:', notification);
     
-    // Forward to Python
-    if (pythonCallbackUrl) {
-        try {
-            const fetch = require('node-fetch');
-            
-            // Get the participant IDs who joined
-            const participantIds = notification.recipientIds || [];
-            
-            await fetch(pythonCallbackUrl, {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({
-                    type: 'group_join',
-                    chatId: notification.chatId,
-                    participants: participantIds,
-                    author: notification.author,  // Who added them (if added by admin)
-                    isGroup: true,
-                    timestamp: notification.timestamp
-                })
-            });
-        } catch (error) {
-            console.error('Error forwarding group_join to Python:', error);
-        }
-    }
+    await forwardToPython({
+        type: 'group_join',
+        chatId: notification.chatId,
+        participants: notification.recipientIds || [],
+        author: notification.author,  // Who added them (if added by admin)
+        isGroup: true,
+        timestamp: notification.timestamp
+    });
 });
 
 // Group participant left/removed event
 client.on('group_leave', async (notification) => {
     console.log('Group leave notification:', notification);
     
-    // Forward to Python
-    if (pythonCallbackUrl) {
-        try {
-            const fetch = require('node-fetch');
-            
-            const participantIds = notification.recipientIds || [];
-            
-            await fetch(pythonCallbackUrl, {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({
-                    type: 'group_leave',
-                    chatId: notification.chatId,
-                    participants: participantIds,
-                    author: notification.author,
-                    isGroup: true,
-                    timestamp: notification.timestamp
-                })
-            });
-        } catch (error) {
-            console.error('Error forwarding group_leave to Python:', error);
-        }
-    }
+    await forwardToPython({
+        type: 'group_leave',
+        chatId: notification.chatId,
+        participants: notification.recipientIds || [],
+        author: notification.author,
+        isGroup: true,
+        timestamp: notification.timestamp
+    });
 });
 
 // Initialize client
@@ -464,6 +453,110 @@ app.post('/call', async (req, res) => {
     }
 });
 
+// Action helpers shared by the single-action routes and /batch
+async function sendText(chatId, message) {
+    // Send message without trying to mark as read
+    const sentMsg = await client.sendMessage(chatId, message, { sendSeen: false });
+    return { messageId: sentMsg.id._serialized };
+}
+
+async function sendMention(chatId, message, mentionIds) {
+    const mentions = [];
+    if (Array.isArray(mentionIds)) {
+        for (const id of mentionIds) {
+            try {
+                const contact = await client.getContactById(id);
+                if (contact) mentions.push(contact);
+            } catch (e) {
+                console.warn('Unable to resolve mention contact:', id);
+            }
+        }
+    }
+
+    const sentMsg = await client.sendMessage(chatId, message, { mentions });
+    return { messageId: sentMsg.id._serialized };
+}
+
+// Returns false when the message is not among the chat's recent messages
+async function deleteMessage(chatId, messageId) {
+    const chat = await client.getChatById(chatId);
+    const messages = await chat.fetchMessages({ limit: 50 });
+
+    // Find the message by ID
+    const msg = messages.find(m => m.id._serialized === messageId);
+    if (!msg) return false;
+    await msg.delete(true);  // true = delete for everyone
+    return true;
+}
+
+async function changeParticipant(groupId, participantId, method) {
+    const chat = await client.getChatById(groupId);
+    await chat[method]([participantId]);
+}
+
+const BATCH_ACTIONS = {
+    'send-message': (p) => sendText(p.chatId, p.message),
+    'send-mention': (p) => sendMention(p.chatId, p.message, p.mentionIds),
+    'delete-message': async (p) => {
+        if (!(await deleteMessage(p.chatId, p.messageId))) throw new Error('Message not found');
+        return {};
+    },
+    'remove-participant': async (p) => { await changeParticipant(p.groupId, p.participantId, 'removeParticipants'); return {}; },
+    'promote-participant': async (p) => { await changeParticipant(p.groupId, p.participantId, 'promoteParticipants'); return {}; },
+    'demote-participant': async (p) => { await changeParticipant(p.groupId, p.participantId, 'demoteParticipants'); return {}; },
+};
+const BATCH_MAX_ACTIONS = parseInt(process.env.BRIDGE_BATCH_MAX_ACTIONS || '50', 10);
+
+// Run actions in order; each gets its own result
+async function runBatch(actions, stopOnError) {
+    const results = [];
+    let failed = false;
+    for (const entry of actions) {
+        if (failed && stopOnError) {
+            results.push({ success: false, error: 'skipped', skipped: true });
+            continue;
+        }
+        const handler = BATCH_ACTIONS[entry && entry.action];
+        if (!handler) {
+            failed = true;
+            results.push({ success: false, error: `Unknown action: ${entry && entry.action}` });
+            continue;
+        }
+        try {
+            results.push({ success: true, ...(await handler(entry.params || {})) });
+        } catch (error) {
+            console.error(`Error in batch action ${entry.action}:`, error);
+            failed = true;
+            results.push({ success: false, error: error.message });
+        }
+    }
+    return { success: !failed, results };
+}
+
+function validateBatch(actions) {
+    if (!Array.isArray(actions)) {
+        return { status: 400, error: 'actions must be a list' };
+    }
+    if (actions.length > BATCH_MAX_ACTIONS) {
+        return { status: 413, error: `At most ${BATCH_MAX_ACTIONS} actions per batch` };
+    }
+    return null;
+}
+
+// Run several actions in order in one request; each gets its own result
+app.post('/batch', async (req, res) => {
+    const { actions, stopOnError } = req.body || {};
+
+    if (!isReady) {
+        return res.status(503).json({ error: 'Client not ready' });
+    }
+    const invalid = validateBatch(actions);
+    if (invalid) {
+        return res.status(invalid.status).json({ error: invalid.error });
+    }
+    res.json(await runBatch(actions, stopOnError));
+});
+
 // Send message
 app.post('/send-message', async (req, res) => {
     try {
@@ -473,13 +566,7 @@ app.post('/send-message', async (req, res) => {
             return res.status(503).json({ error: 'Client not ready' });
         }
         
-        // Send message without trying to mark as read
-        const sentMsg = await client.sendMessage(chatId, message, { sendSeen: false });
-        
-        res.json({
-            success: true,
-            messageId: sentMsg.id._serialized
-        });
+        res.json({ success: true, ...(await sendText(chatId, message)) });
     } catch (error) {
         console.error('Error sending message:', error);
         res.status(500).json({ error: error.message });
@@ -495,14 +582,7 @@ app.post('/delete-message', async (req, res) => {
             return res.status(503).json({ error: 'Client not ready' });
         }
         
-        const chat = await client.getChatById(chatId);
-        const messages = await chat.fetchMessages({ limit: 50 });
-        
-        // Find the message by ID
-        const msg = messages.find(m => m.id._serialized === messageId);
-        
-        if (msg) {
-            await msg.delete(true);  // true = delete for everyone
+        if (await deleteMessage(chatId, messageId)) {
             res.json({ success: true });
         } else {
             res.status(404).json({ error: 'Message not found' });
@@ -566,20 +646,7 @@ app.post('/send-mention', async (req, res) => {
             return res.status(503).json({ error: 'Client not ready' });
         }
 
-        const mentions = [];
-        if (Array.isArray(mentionIds)) {
-            for (const id of mentionIds) {
-                try {
-                    const contact = await client.getContactById(id);
-                    if (contact) mentions.push(contact);
-                } catch (e) {
-                    console.warn('Unable to resolve mention contact:', id);
-                }
-            }
-        }
-
-        const sentMsg = await client.sendMessage(chatId, message, { mentions });
-        res.json({ success: true, messageId: sentMsg.id._serialized });
+        res.json({ success: true, ...(await sendMention(chatId, message, mentionIds)) });
     } catch (error) {
         console.error('Error sending mention message:', error);
         res.status(500).json({ error: error.message });
@@ -641,6 +708,49 @@ app.get('/message/:messageId/media', async (req, res) => {
 });
 
 // Get contact by ID (with LID to phone resolution)
+// Resolve a contact, mapping LIDs to phone numbers where possible
+async function resolveContact(contactId) {
+    let contact = null;
+    let phoneNumber = null;
+    let lid = null;
+
+    // Try to get contact info
+    try {
+        contact = await client.getContactById(contactId);
+    } catch (e) {
+        console.log('getContactById failed:', e?.message);
+    }
+
+    // If contactId is a LID, try to resolve to phone number
+    if (contactId.endsWith('@lid')) {
+        try {
+            const mappings = await client.getContactLidAndPhone([contactId]);
+            if (mappings && mappings.length > 0 && mappings[0].pn) {
+                phoneNumber = mappings[0].pn;
+                lid = mappings[0].lid || contactId;
+                
+                // Try to get contact by phone number for more info
+                if (!contact && phoneNumber) {
+                    try {
+                        contact = await client.getContactById(phoneNumber);
+                    } catch (e) {
+                        console.log('getContactById by phone failed:', e?.message);
+                    }
+                }
+            }
+        } catch (e) {
+            console.log('getContactLidAndPhone failed:', e?.message);
+        }
+    }
+
+    // Build response with all available info
+    const result = contact ? serializeResult(contact) : {};
+    result.phoneNumber = phoneNumber || (contactId.endsWith('@c.us') ? contactId : null);
+    result.lid = lid || (contactId.endsWith('@lid') ? contactId : null);
+    result.originalId = contactId;
+    return result;
+}
+
 app.get('/contact/:contactId', async (req, res) => {
     try {
         const { contactId } = req.params;
@@ -649,53 +759,37 @@ app.get('/contact/:contactId', async (req, res) => {
             return res.status(503).json({ error: 'Client not ready' });
         }
 
-        let contact = null;
-        let phoneNumber = null;
-        let lid = null;
+        res.json({ success: true, contact: await resolveContact(contactId) });
+    } catch (error) {
+        console.error('Error getting contact:', error);
+        res.status(500).json({ error: error.message });
+    }
+});
 
-        // Try to get contact info
-        try {
-            contact = await client.getContactById(contactId);
-        } catch (e) {
-            console.log('getContactById failed:', e?.message);
-        }
+// Resolve several contacts in one request
+app.post('/contacts', async (req, res) => {
+    try {
+        const ids = Array.isArray(req.body?.ids) ? req.body.ids.filter(id => typeof id === 'string') : [];
 
-        // If contactId is a LID, try to resolve to phone number
-        if (contactId.endsWith('@lid')) {
-            try {
-                const mappings = await client.getContactLidAndPhone([contactId]);
-                if (mappings && mappings.length > 0 && mappings[0].pn) {
-                    phoneNumber = mappings[0].pn;
-                    lid = mappings[0].lid || contactId;
-                    
-                    // Try to get contact by phone number for more info
-                    if (!contact && phoneNumber) {
-                        try {
-                            contact = await client.getContactById(phoneNumber);
-                        } catch (e) {
-                            console.log('getContactById by phone failed:', e?.message);
-                        }
-                    }
-                }
-            } catch (e) {
-                console.log('getContactLidAndPhone failed:', e?.message);
-            }
+        if (!isReady) {
+            return res.status(503).json({ error: 'Client not ready' });
+        }
+        if (ids.length === 0) {
+            return res.status(400).json({ error: 'Missing ids' });
         }
 
-        // Build response with all available info
-        const result = contact ? serializeResult(contact) : {};
-        result.phoneNumber = phoneNumber || (contactId.endsWith('@c.us') ? contactId : null);
-        result.lid = lid || (contactId.endsWith('@lid') ? contactId : null);
-        result.originalId = contactId;
-
-        res.json({ success: true, contact: result });
+        const resolved = await Promise.all(ids.map(id => resolveContact(id).catch(() => null)));
+        const contacts = {};
+        ids.forEach((id, idx) => {
+            if (resolved[idx]) contacts[id] = resolved[idx];
+        });
+        res.json({ success: true, contacts });
     } catch (error) {
-        console.error('Error getting contact:', error);
+        console.error('Error getting contacts:', error);
         res.status(500).json({ error: error.message });
     }
 });
 
-// Get contact by phone number (various formats)
 app.get('/contact/by-number/:number', async (req, res) => {
     try {
         const { number } = req.params;
@@ -823,8 +917,7 @@ app.post('/group/:groupId/remove', async (req, res) => {
             return res.status(503).json({ error: 'Client not ready' });
         }
         
-        const chat = await client.getChatById(groupId);
-        await chat.removeParticipants([participantId]);
+        await changeParticipant(groupId, participantId, 'removeParticipants');
         
         res.json({ success: true });
     } catch (error) {
@@ -843,8 +936,7 @@ app.post('/group/:groupId/promote', async (req, res) => {
             return res.status(503).json({ error: 'Client not ready' });
         }
         
-        const chat = await client.getChatById(groupId);
-        await chat.promoteParticipants([participantId]);
+        await changeParticipant(groupId, participantId, 'promoteParticipants');
         
         res.json({ success: true });
     } catch (error) {
@@ -863,8 +955,7 @@ app.post('/group/:groupId/demote', async (req, res) => {
             return res.status(503).json({ error: 'Client not ready' });
         }
         
-        const chat = await client.getChatById(groupId);
-        await chat.demoteParticipants([participantId]);
+        await changeParticipant(groupId, participantId, 'demoteParticipants');
         
         res.json({ success: true });
     } catch (error) {
@@ -1310,6 +1401,136 @@ app.get('/group/:groupId/invite', async (req, res) => {
     }
 });
 
+// ---------------------------------------------------------------------------
+// Persistent stream channel (optional)
+// One long-lived socket to the Python bot carrying events and action RPCs as
+// newline-delimited compact JSON frames:
+//   request  {"t":"q","i":7,"a":"send-message","d":{...}}   Python -> bridge
+//   event    {"t":"e","i":3,"d":{...webhook payload...}}    bridge -> Python
+//   response {"t":"r","i":7,"ok":true,"d":{...}}            answers a q or an e
+// Listens on BRIDGE_STREAM_PATH (Unix socket) or BRIDGE_STREAM_PORT (TCP).
+// The HTTP routes and webhook stay available as the fallback.
+// ---------------------------------------------------------------------------
+const net = require('net');
+
+const STREAM_PATH = process.env.BRIDGE_STREAM_PATH || '';
+const STREAM_PORT = parseInt(process.env.BRIDGE_STREAM_PORT || '0', 10);
+const STREAM_EVENT_TIMEOUT_MS = parseInt(process.env.BRIDGE_STREAM_EVENT_TIMEOUT_MS || '5000', 10);
+
+let streamSocket = null;
+let streamEventId = 0;
+const streamPendingEvents = new Map();
+
+const STREAM_ACTIONS = {
+    ...BATCH_ACTIONS,
+    'batch': async (d) => {
+        const invalid = validateBatch(d.actions);
+        if (invalid) throw Object.assign(new Error(invalid.error), { status: invalid.status });
+        return runBatch(d.actions, d.stopOnError);
+    },
+};
+
+function streamWrite(socket, frame) {
+    socket.write(JSON.stringify(frame) + '\n');
+}
+
+async function handleStreamRequest(socket, frame) {
+    const reply = { t: 'r', i: frame.i };
+    try {
+        if (!isReady) {
+            throw Object.assign(new Error('Client not ready'), { status: 503 });
+        }
+        const handler = STREAM_ACTIONS[frame.a];
+        if (!handler) {
+            throw Object.assign(new Error(`Unknown action: ${frame.a}`), { status: 404 });
+        }
+        reply.ok = true;
+        reply.d = await handler(frame.d || {});
+    } catch (error) {
+        reply.ok = false;
+        reply.e = error.message;
+        reply.s = error.status || (error.message === 'Message not found' ? 404 : 500);
+    }
+    if (!socket.destroyed) streamWrite(socket, reply);
+}
+
+function handleStreamFrame(socket, line) {
+    let frame;
+    try {
+        frame = JSON.parse(line);
+    } catch (e) {
+        console.warn('Ignoring malformed stream frame');
+        return;
+    }
+    if (frame.t === 'q') {
+        handleStreamRequest(socket, frame);
+    } else if (frame.t === 'r') {
+        const pending = streamPendingEvents.get(frame.i);
+        if (pending) {
+            streamPendingEvents.delete(frame.i);
+            pending(frame);
+        }
+    }
+}
+
+// Send an event over the stream; resolves to the ack frame, or null if the stream is unavailable
+function sendStreamEvent(payload) {
+    const socket = streamSocket;
+    if (!socket || socket.destroyed) return Promise.resolve(null);
+    const id = ++streamEventId;
+    return new Promise((resolve) => {
+        const timer = setTimeout(() => {
+            streamPendingEvents.delete(id);
+            resolve(null);
+        }, STREAM_EVENT_TIMEOUT_MS);
+        streamPendingEvents.set(id, (frame) => {
+            clearTimeout(timer);
+            resolve(frame);
+        });
+        streamWrite(socket, { t: 'e', i: id, d: payload });
+    });
+}
+
+function startStreamServer() {
+    if (!STREAM_PATH && !STREAM_PORT) return;
+    const server = net.createServer((socket) => {
+        if (streamSocket && !streamSocket.destroyed) {
+            streamSocket.destroy();  // newest connection wins (the bot restarted)
+        }
+        streamSocket = socket;
+        socket.setNoDelay(true);
+        socket.setEncoding('utf8');
+        console.log('Python bot connected to stream channel');
+
+        let buffer = '';
+        socket.on('data', (chunk) => {
+            buffer += chunk;
+            let newline;
+            while ((newline = buffer.indexOf('\n')) >= 0) {
+                const line = buffer.slice(0, newline);
+                buffer = buffer.slice(newline + 1);
+                if (line) handleStreamFrame(socket, line);
+            }
+        });
+        socket.on('close', () => {
+            if (streamSocket === socket) {
+                streamSocket = null;
+                console.log('Stream channel closed, events fall back to HTTP');
+            }
+        });
+        socket.on('error', (error) => console.warn('Stream channel error:', error.message));
+    });
+
+    if (STREAM_PATH) {
+        try { fs.unlinkSync(STREAM_PATH); } catch (e) { /* no stale socket */ }
+        server.listen(STREAM_PATH, () => console.log(`Stream channel listening on ${STREAM_PATH}`));
+    } else {
+        server.listen(STREAM_PORT, '127.0.0.1', () => console.log(`Stream channel listening on 127.0.0.1:${STREAM_PORT}`));
+    }
+}
+
+startStreamServer();
+
 // Health check endpoint for Fly.io
 app.get('/health', (req, res) => {
     res.json({ 
@@ -1321,7 +1542,12 @@ app.get('/health', (req, res) => {
 
 // Start server
 const PORT = process.env.PORT || 3000;
-app.listen(PORT, () => {
+const KEEP_ALIVE_TIMEOUT_MS = parseInt(process.env.BRIDGE_KEEP_ALIVE_TIMEOUT_MS || '65000', 10);
+const server = app.listen(PORT, () => {
     console.log(`WhatsApp Bridge running on port ${PORT}`);
     console.log('Waiting for WhatsApp authentication...');
 });
+// Keep idle connections open longer than the Python client's pool reuses them,
+// so a pooled POST never races the server closing its socket
+server.keepAliveTimeout = KEEP_ALIVE_TIMEOUT_MS;
+server.headersTimeout = KEEP_ALIVE_TIMEOUT_MS + 1000;
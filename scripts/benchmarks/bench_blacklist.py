@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Blacklist matching: per-word substring loop vs. compiled Aho-Corasick automaton
+
+Usage:
+    python scripts/benchmarks/bench_blacklist.py [--sizes 10,1000,50000] [--messages 2000]
+"""
+
+import argparse
+import os
+import random
+import string
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, ROOT)
+
+from bot_core.services.blacklist_matcher import BlacklistMatcher  # noqa: E402
+
+HEBREW = 'אבגדהוזחטיכלמנסעפצקרשת'
+
+
+def random_word(rng, alphabet):
+    return ''.join(rng.choice(alphabet) for _ in range(rng.randint(4, 10)))
+
+
+def legacy_check(words, text):
+    """The previous implementation: one substring scan per word"""
+    text_lower = text.lower()
+    for word in words:
+        if word in text_lower:
+            return word
+    return None
+
+
+def timed(func, messages):
+    start = time.perf_counter()
+    for text in messages:
+        func(text)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='10,1000,50000', help='comma-separated term counts')
+    parser.add_argument('--messages', type=int, default=2000, help='messages per run')
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    print(f"{'terms':>8} {'build':>9} {'before':>12} {'after':>12} {'speedup':>8}")
+    for size in (int(s) for s in args.sizes.split(',')):
+        terms = [random_word(rng, string.ascii_lowercase if i % 2 else HEBREW) for i in range(size)]
+        messages = [
+            ' '.join(random_word(rng, string.ascii_letters + HEBREW) for _ in range(rng.randint(5, 40)))
+            for _ in range(args.messages)
+        ]
+
+        start = time.perf_counter()
+        matcher = BlacklistMatcher(terms)
+        matcher.find_all('warm up')
+        build = time.perf_counter() - start
+
+        before = timed(lambda text: legacy_check(terms, text), messages)
+        after = timed(matcher.find_all, messages)
+        print(f"{size:>8} {build * 1000:>7.1f}ms "
+              f"{before / len(messages) * 1e6:>10.1f}us {after / len(messages) * 1e6:>10.1f}us "
+              f"{before / after:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
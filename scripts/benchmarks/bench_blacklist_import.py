@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Blacklist import: one add_blacklist_word() per term vs. add_blacklist_words()
+
+Usage:
+    python scripts/benchmarks/bench_blacklist_import.py [--terms 100000] [--legacy 5000]
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+
+db_dir = tempfile.mkdtemp(prefix='bench_blacklist_import_')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(db_dir, 'bench.db')}"
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, ROOT)
+
+from bot_core.database import init_db  # noqa: E402
+from bot_core.services.blacklist_service import (  # noqa: E402
+    add_blacklist_word, add_blacklist_words, export_blacklist
+)
+
+logging.disable(logging.WARNING)
+
+
+def terms(count, prefix):
+    """count terms, every tenth followed by an upper-case repeat"""
+    for i in range(count):
+        yield f"{prefix}{i}"
+        if i % 10 == 0:
+            yield f"{prefix}{i}".upper()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--terms', type=int, default=100_000, help='terms in the bulk import')
+    parser.add_argument('--legacy', type=int, default=5_000, help='terms added one at a time (extrapolated)')
+    args = parser.parse_args()
+    init_db()
+
+    legacy = list(terms(args.legacy, 'legacy'))
+    bulk = list(terms(args.terms, 'bulk'))
+    start = time.perf_counter()
+    for word in legacy:
+        add_blacklist_word('legacy_chat', word)
+    per_term = (time.perf_counter() - start) / len(legacy)
+    print(f"{'before (per-word)':<20} {1 / per_term:10,.0f} terms/sec  "
+          f"~{per_term * len(bulk):6.1f} s for {len(bulk):,}")
+
+    start = time.perf_counter()
+    added = add_blacklist_words('bulk_chat', bulk)
+    elapsed = time.perf_counter() - start
+    print(f"{'after (bulk)':<20} {len(bulk) / elapsed:10,.0f} terms/sec  "
+          f"{elapsed:7.1f} s for {len(bulk):,} ({added:,} new)")
+
+    start = time.perf_counter()
+    exported = sum(1 for _ in export_blacklist('bulk_chat'))
+    print(f"{'export':<20} {exported / (time.perf_counter() - start):10,.0f} terms/sec")
+    print(f"speedup: {per_term * len(bulk) / elapsed:.0f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+send_message round trips: a new connection per call vs. the pooled keep-alive session
+
+Runs against a local stub bridge that answers /send-message immediately, so
+the numbers show client-side connection overhead, not WhatsApp latency.
+
+Usage:
+    python scripts/benchmarks/bench_bridge_http.py [--calls 2000] [--concurrency 8]
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, ROOT)
+
+import requests  # noqa: E402
+
+from bot_core.whatsapp_bridge_client import WhatsAppBridgeClient  # noqa: E402
+
+
+class StubBridge(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True  # like Node, so keep-alive replies aren't held by delayed ACKs
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        payload = json.dumps({'messageId': 'msg-1'}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+def run(name, send, calls, concurrency):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda i: send('123@c.us', f"message {i}"), range(calls)))
+    elapsed = time.perf_counter() - start
+    assert all(results), 'stub bridge returned no messageId'
+    rate = calls / elapsed
+    print(f"{name:<18} {rate:8.1f} round trips/sec")
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--calls', type=int, default=2000, help='send_message calls per run')
+    parser.add_argument('--concurrency', type=int, default=8, help='concurrent senders')
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubBridge)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    def unpooled_send(chat_id, message):
+        response = requests.request('POST', f"{url}/send-message",
+                                    json={'chatId': chat_id, 'message': message}, timeout=10)
+        response.raise_for_status()
+        return response.json().get('messageId')
+
+    before = run('before (per call)', unpooled_send, args.calls, args.concurrency)
+
+    client = WhatsAppBridgeClient(bridge_url=url, webhook_workers=0)
+    after = run('after (pooled)', client.send_message, args.calls, args.concurrency)
+    stats = client.http.stats()
+    client.close()
+    server.shutdown()
+
+    print(f"connections opened: {stats['connections_opened']} for {stats['requests']} requests "
+          f"(reuse {stats['connection_reuse']:.1%})")
+    print(f"speedup: {after / before:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Concurrent webhook-style database load: untuned engine vs. the tuned SQLite profile
+
+Usage:
+    python scripts/benchmarks/bench_db_profiles.py [--threads 16] [--ops 200]
+"""
+
+import argparse
+import logging
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, ROOT)
+
+from sqlalchemy.exc import OperationalError  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from bot_core.database import build_engine, resolve_profile  # noqa: E402
+from bot_core.db_models import Base, Warn, WarnSettings  # noqa: E402
+
+logging.disable(logging.WARNING)
+
+
+def legacy_engine(url):
+    """The previous engine: default pool, no pragmas, sqlite3's 5s lock timeout"""
+    from sqlalchemy import create_engine
+    return create_engine(url, connect_args={'check_same_thread': False}, echo=False)
+
+
+def run(name, write_engine, read_engine, threads, ops, read_ratio):
+    Base.metadata.create_all(bind=write_engine)
+    Session = sessionmaker(bind=write_engine)
+    ReadSession = sessionmaker(bind=read_engine)
+    errors = []
+    latencies = []
+    lock = threading.Lock()
+
+    def worker(n):
+        rng = random.Random(n)
+        for i in range(ops):
+            chat_id = f"chat_{rng.randrange(50)}"
+            start = time.perf_counter()
+            try:
+                if rng.random() < read_ratio:
+                    session = ReadSession()
+                    try:
+                        session.query(WarnSettings).filter_by(chat_id=chat_id).first()
+                        session.query(Warn.id).filter_by(chat_id=chat_id, user_id=f"user_{n}").count()
+                    finally:
+                        session.close()
+                else:
+                    session = Session()
+                    try:
+                        session.add(Warn(chat_id=chat_id, user_id=f"user_{n}", reason='spam', warned_at=datetime.now()))
+                        session.commit()
+                    finally:
+                        session.close()
+            except OperationalError as e:
+                with lock:
+                    errors.append(e)
+                continue
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000 if latencies else float('nan')
+    rate = len(latencies) / elapsed
+    print(f"{name:<28} {rate:10,.0f} ops/sec  p99 {p99:8.1f} ms  errors {len(errors)}")
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--threads', type=int, default=16, help='concurrent workers')
+    parser.add_argument('--ops', type=int, default=200, help='operations per worker')
+    parser.add_argument('--reads', type=float, default=0.8, help='fraction of operations that only read')
+    args = parser.parse_args()
+
+    print(f"{args.threads} threads x {args.ops} ops, {args.reads:.0%} reads, file-backed SQLite")
+    db_dir = tempfile.mkdtemp(prefix='bench_db_profiles_')
+
+    url = f"sqlite:///{os.path.join(db_dir, 'legacy.db')}"
+    engine = legacy_engine(url)
+    before = run('before (default engine)', engine, engine, args.threads, args.ops, args.reads)
+
+    url = f"sqlite:///{os.path.join(db_dir, 'tuned.db')}"
+    profile = resolve_profile(url, 'sqlite')
+    print(f"profile: {profile.describe()}")
+    engine = build_engine(url, profile)
+    read_engine = build_engine(url, profile, read_only=True)
+    after = run('after (sqlite profile)', engine, read_engine, args.threads, args.ops, args.reads)
+    print(f"speedup: {after / before:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
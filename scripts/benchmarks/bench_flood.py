@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Flood check throughput: per-message FloodControl rows vs. in-memory windows
+
+Usage:
+    python scripts/benchmarks/bench_flood.py [--users 10000] [--messages 20000]
+"""
+
+import argparse
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, ROOT)
+
+_db_dir = tempfile.mkdtemp(prefix='bench_flood_')
+os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(_db_dir, 'bench.db')}")
+os.environ.setdefault('TESTING', 'true')
+
+from bot_core.database import init_db, get_session  # noqa: E402
+from bot_core.db_models import FloodControl, FloodSettings  # noqa: E402
+from bot_core.services.flood_service import check_flood  # noqa: E402
+
+logging.disable(logging.WARNING)
+
+
+def legacy_check_flood(chat_id: str, user_id: str, max_messages: int = 5, time_window: int = 10) -> bool:
+    """The previous implementation: one INSERT and one COUNT(*) per message"""
+    session = get_session()
+    try:
+        now = datetime.now()
+        cutoff = now - timedelta(seconds=time_window)
+        settings = session.query(FloodSettings).filter_by(chat_id=chat_id).first()
+        if settings:
+            max_messages = settings.limit
+            time_window = settings.timeframe
+        recent_count = session.query(FloodControl).filter(
+            FloodControl.chat_id == chat_id,
+            FloodControl.user_id == user_id,
+            FloodControl.timestamp > cutoff
+        ).count()
+        session.add(FloodControl(chat_id=chat_id, user_id=user_id, timestamp=now))
+        session.commit()
+        return recent_count >= max_messages
+    finally:
+        session.close()
+
+
+def run(name, func, events):
+    start = time.perf_counter()
+    for chat_id, user_id in events:
+        func(chat_id, user_id)
+    elapsed = time.perf_counter() - start
+    rate = len(events) / elapsed if elapsed else float('inf')
+    print(f"{name:<12} {len(events):>8} msgs  {elapsed:8.2f}s  {rate:12,.0f} msgs/sec")
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=10000, help='active users')
+    parser.add_argument('--chats', type=int, default=100, help='chats the users are spread over')
+    parser.add_argument('--messages', type=int, default=20000, help='messages to replay')
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    users = [(f"chat_{i % args.chats}@g.us", f"user_{i}@c.us") for i in range(args.users)]
+    events = [rng.choice(users) for _ in range(args.messages)]
+
+    print(f"{args.users} active users across {args.chats} chats")
+    init_db()
+    before = run('before (db)', legacy_check_flood, events)
+    init_db()
+    after = run('after (mem)', check_flood, events)
+    print(f"speedup: {after / before:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Raid-style warn bursts: one commit per warn vs. group commit
+
+Usage:
+    python scripts/benchmarks/bench_group_commit.py [--threads 32] [--warns 50]
+    SQLITE_SYNCHRONOUS=FULL python scripts/benchmarks/bench_group_commit.py  # fsync on every commit
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+
+db_dir = tempfile.mkdtemp(prefix='bench_group_commit_')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(db_dir, 'bench.db')}"
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, ROOT)
+
+from bot_core import group_commit  # noqa: E402
+from bot_core.database import init_db, profile  # noqa: E402
+from bot_core.services.warn_service import get_warn_count, warn_user  # noqa: E402
+
+logging.disable(logging.WARNING)
+
+
+def run(name, chat_id, threads, warns):
+    errors = []
+    latencies = []
+    lock = threading.Lock()
+
+    def worker(n):
+        for i in range(warns):
+            start = time.perf_counter()
+            try:
+                warn_user(chat_id, f"user_{n % 8}", 'Raider', 'spam')
+            except Exception as e:
+                with lock:
+                    errors.append(e)
+                continue
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000 if latencies else float('nan')
+    stored = sum(get_warn_count(chat_id, f"user_{n}") for n in range(min(threads, 8)))
+    rate = len(latencies) / elapsed
+    print(f"{name:<22} {rate:8,.0f} warns/sec  p99 {p99:7.1f} ms  errors {len(errors)}  stored {stored}")
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--threads', type=int, default=32, help='concurrent handlers')
+    parser.add_argument('--warns', type=int, default=50, help='warns per handler')
+    args = parser.parse_args()
+    init_db()
+    print(f"{args.threads} threads x {args.warns} warns, profile: {profile.describe()}")
+
+    group_commit.DB_WRITE_MODE = 'sync'
+    before = run('before (sync)', 'sync_chat', args.threads, args.warns)
+
+    group_commit.DB_WRITE_MODE = 'batched'
+    after = run('after (batched)', 'batched_chat', args.threads, args.warns)
+    stats = group_commit.get_group_committer().stats()
+    print(f"commits: {stats['commits']:,} for {stats['writes']:,} writes "
+          f"({stats['avg_writes_per_commit']:.1f} per commit)")
+    print(f"speedup: {after / before:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
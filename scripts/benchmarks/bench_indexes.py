@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Service lookup latency on large tables, before and after the index migration
+
+Usage:
+    python scripts/benchmarks/bench_indexes.py [--rows 1000000] [--queries 200]
+"""
+
+import argparse
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, ROOT)
+
+_db_dir = tempfile.mkdtemp(prefix='bench_indexes_')
+os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(_db_dir, 'bench.db')}")
+
+from sqlalchemy import func, text  # noqa: E402
+
+from bot_core.database import engine, get_session  # noqa: E402
+from bot_core.db_models import Ban, Base, BlacklistWord, Warn  # noqa: E402
+from bot_core.migrations import migrate  # noqa: E402
+
+logging.disable(logging.WARNING)
+
+CHATS = 1000
+
+
+def populate(rows: int) -> None:
+    """Create the tables without indexes, as an older database has them, and fill them"""
+    Base.metadata.create_all(bind=engine)
+    now = datetime.now()
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                conn.execute(text(f"DROP INDEX {index.name}"))
+        for start in range(0, rows, 50000):
+            ids = range(start, min(start + 50000, rows))
+            conn.execute(Warn.__table__.insert(), [
+                {'chat_id': f"chat_{i % CHATS}", 'user_id': f"user_{i}", 'reason': 'spam', 'warned_at': now}
+                for i in ids])
+            conn.execute(Ban.__table__.insert(), [
+                {'chat_id': f"chat_{i % CHATS}", 'user_id': f"user_{i}", 'banned_at': now} for i in ids])
+            conn.execute(BlacklistWord.__table__.insert(), [
+                {'chat_id': f"chat_{i % CHATS}", 'word': f"Word{i}"} for i in ids])
+
+
+def lookups(rows: int):
+    session = get_session()
+    return {
+        'warns (chat, user)': lambda i: session.query(Warn).filter_by(
+            chat_id=f"chat_{i % CHATS}", user_id=f"user_{i}").all(),
+        'bans (chat, user)': lambda i: session.query(Ban.id).filter_by(
+            chat_id=f"chat_{i % CHATS}", user_id=f"user_{i}").first(),
+        'blacklist (chat, word)': lambda i: session.query(BlacklistWord.id).filter(
+            BlacklistWord.chat_id == f"chat_{i % CHATS}",
+            func.lower(BlacklistWord.word) == func.lower(f"WORD{i}")).first(),
+    }
+
+
+def run(label, rows, queries):
+    rng = random.Random(42)
+    keys = [rng.randrange(rows) for _ in range(queries)]
+    results = {}
+    for name, lookup in lookups(rows).items():
+        start = time.perf_counter()
+        for i in keys:
+            lookup(i)
+        elapsed = time.perf_counter() - start
+        results[name] = elapsed / queries * 1000
+        print(f"{label:<8} {name:<24} {results[name]:10.3f} ms/query")
+    get_session().close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000, help='rows per table')
+    parser.add_argument('--queries', type=int, default=200, help='lookups per table')
+    args = parser.parse_args()
+
+    print(f"{args.rows:,} rows per table, {engine.url}")
+    start = time.perf_counter()
+    populate(args.rows)
+    print(f"populated in {time.perf_counter() - start:.1f}s")
+
+    before = run('before', args.rows, args.queries)
+    start = time.perf_counter()
+    created = migrate()
+    print(f"migrate: {len(created)} indexes in {time.perf_counter() - start:.1f}s")
+    after = run('after', args.rows, args.queries)
+    for name in before:
+        print(f"speedup {name:<24} {before[name] / after[name]:10.0f}x")
+
+
+if __name__ == '__main__':
+    main()
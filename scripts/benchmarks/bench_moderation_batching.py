@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Moderation calls under load: one request per message vs. micro-batched requests
+
+The moderation endpoint is simulated with a fixed round-trip latency, so the
+numbers show request count and added per-message latency, not API speed.
+
+Usage:
+    python scripts/benchmarks/bench_moderation_batching.py [--messages 500] [--concurrency 50] [--latency-ms 300]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, ROOT)
+
+from bot_core.moderation_batcher import MicroBatcher  # noqa: E402
+
+
+class FakeEndpoint:
+    """Moderation endpoint with fixed latency that counts requests"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def moderate(self, texts):
+        with self._lock:
+            self.requests += 1
+        time.sleep(self.latency)
+        return [{'flagged': False} for _ in texts]
+
+
+def run(name, check, messages, concurrency, endpoint):
+    latencies = []
+
+    def one(text):
+        start = time.perf_counter()
+        check(text)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, messages))
+    elapsed = time.perf_counter() - start
+    print(f"{name:<16} {endpoint.requests:>6} requests  {len(messages) / elapsed:8.1f} msgs/sec  "
+          f"p50 {statistics.median(latencies) * 1000:6.0f}ms  "
+          f"p95 {sorted(latencies)[int(len(latencies) * 0.95) - 1] * 1000:6.0f}ms")
+    return endpoint.requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--messages', type=int, default=500, help='messages to moderate')
+    parser.add_argument('--concurrency', type=int, default=50, help='concurrent callers')
+    parser.add_argument('--latency-ms', type=float, default=300, help='simulated round-trip latency')
+    parser.add_argument('--window-ms', type=float, default=25, help='batching window')
+    parser.add_argument('--batch-size', type=int, default=32, help='maximum batch size')
+    parser.add_argument('--max-concurrency', type=int, default=4, help='maximum batches in flight')
+    args = parser.parse_args()
+
+    messages = [f"message {i}" for i in range(args.messages)]
+    latency = args.latency_ms / 1000.0
+
+    # The baseline is limited by the same number of in-flight requests as the batcher
+    direct = FakeEndpoint(latency)
+    gate = threading.Semaphore(args.max_concurrency)
+
+    def direct_check(text):
+        with gate:
+            direct.moderate([text])
+
+    before = run('before (1/msg)', direct_check, messages, args.concurrency, direct)
+
+    batched = FakeEndpoint(latency)
+    batcher = MicroBatcher(batched.moderate, max_batch_size=args.batch_size,
+                           max_wait=args.window_ms / 1000.0, max_concurrency=args.max_concurrency)
+    after = run('after (batched)', lambda text: batcher.call(text, timeout=60), messages, args.concurrency, batched)
+    batcher.close()
+
+    print(f"request reduction: {before / after:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
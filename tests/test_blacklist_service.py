@@ -189,3 +189,193 @@ class TestBlacklistServiceEdgeCases:
         self.add_blacklist_word('chat', long_word)
         words = self.get_blacklist_words('chat')
         assert long_word in words
+
+
+class TestBlacklistMatcher:
+    """Tests for the compiled Aho-Corasick matcher"""
+    
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        from bot_core.services.blacklist_matcher import BlacklistMatcher
+        self.BlacklistMatcher = BlacklistMatcher
+    
+    def test_overlapping_matches(self):
+        """Test every term is found with offsets in one pass"""
+        matcher = self.BlacklistMatcher(['he', 'she', 'his', 'hers'])
+        matches = matcher.find_all('ushers')
+        assert [(m.term, m.start, m.end) for m in matches] == [
+            ('she', 1, 4), ('he', 2, 4), ('hers', 2, 6)
+        ]
+    
+    def test_case_folding_english(self):
+        """Test matching is case-insensitive and keeps the stored term"""
+        matcher = self.BlacklistMatcher(['Spam'])
+        match = matcher.search('BUY SPAM now')
+        assert match.term == 'Spam'
+        assert (match.start, match.end) == (4, 8)
+    
+    def test_hebrew(self):
+        """Test Hebrew terms"""
+        matcher = self.BlacklistMatcher(['ספאם'])
+        text = 'זה ספאם!'
+        match = matcher.search(text)
+        assert text[match.start:match.end] == 'ספאם'
+    
+    def test_offsets_when_folding_expands(self):
+        """Test offsets index the original text when folding changes length"""
+        matcher = self.BlacklistMatcher(['strasse', 'x'])
+        text = 'Straße x'
+        matches = matcher.find_all(text)
+        assert [text[m.start:m.end] for m in matches] == ['Straße', 'x']
+    
+    def test_incremental_add_remove(self):
+        """Test add/remove/clear update the automaton in place"""
+        matcher = self.BlacklistMatcher(['spam'])
+        assert matcher.add('scam') is True
+        assert matcher.add('SCAM') is False
+        assert matcher.search('a scam') is not None
+        assert matcher.remove('spam') is True
+        assert matcher.search('spam') is None
+        matcher.clear()
+        assert len(matcher) == 0
+        assert matcher.find_all('scam') == []
+
+
+class TestBlacklistMatches:
+    """Tests for find_blacklist_matches"""
+    
+    @pytest.fixture(autouse=True)
+    def setup(self, test_db):
+        from bot_core.services.blacklist_service import (
+            add_blacklist_word, remove_blacklist_word, clear_blacklist, find_blacklist_matches
+        )
+        self.add = add_blacklist_word
+        self.remove = remove_blacklist_word
+        self.clear = clear_blacklist
+        self.find = find_blacklist_matches
+    
+    @pytest.mark.parametrize('min_terms', [0, 32])
+    def test_matches_follow_writes(self, min_terms):
+        """Test the compiled matcher and the plain scan track add/remove/clear"""
+        from unittest.mock import patch
+        from bot_core.services import blacklist_service
+        with patch.object(blacklist_service, 'BLACKLIST_MATCHER_MIN_TERMS', min_terms):
+            self.add('chat', 'spam')
+            assert [m.term for m in self.find('chat', 'spam and scam')] == ['spam']
+            self.add('chat', 'scam')
+            assert [m.term for m in self.find('chat', 'spam and scam')] == ['spam', 'scam']
+            self.remove('chat', 'SPAM')
+            assert [m.term for m in self.find('chat', 'spam and scam')] == ['scam']
+            self.clear('chat')
+            assert self.find('chat', 'spam and scam') == []
+
+    def test_plain_scan_matches_automaton(self):
+        from bot_core.services.blacklist_matcher import BlacklistMatcher, find_terms
+        terms = ['he', 'she', 'His', 'hers', 'HE', 'strasse', 's']
+        for text in ['ushers', 'Die Straße, his shed', '', 'nothing']:
+            assert find_terms(terms, text) == BlacklistMatcher(terms).find_all(text)
+
+    def test_compiles_outside_global_lock(self):
+        """A chat compiling its matcher does not block lookups, and a write mid-compile forces a rebuild"""
+        from unittest.mock import patch
+        from bot_core.services import blacklist_service
+        self.add('chat', 'spam')
+        self.add('other', 'promo')
+        real = blacklist_service.BlacklistMatcher
+        builds = []
+
+        def compile_matcher(terms):
+            builds.append(tuple(terms))
+            if len(builds) == 1:
+                # Another chat's matcher is reachable while this one compiles
+                assert blacklist_service._matchers_lock.acquire(timeout=1)
+                blacklist_service._matchers_lock.release()
+                assert [m.term for m in self.find('other', 'promo')] == ['promo']
+                self.add('chat', 'scam')
+            return real(terms)
+
+        with patch.object(blacklist_service, 'BLACKLIST_MATCHER_MIN_TERMS', 0), \
+                patch.object(blacklist_service, 'BlacklistMatcher', side_effect=compile_matcher):
+            assert [m.term for m in self.find('chat', 'spam and scam')] == ['spam', 'scam']
+        assert builds[0] == ('spam',)
+        assert builds[-1] == ('spam', 'scam')
+
+
+class TestBulkImport:
+    """Tests for add_blacklist_words, export_blacklist and multi-word /addblacklist"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, test_db):
+        from bot_core.services import blacklist_service
+        self.service = blacklist_service
+
+    def test_dedupes_case_insensitively(self):
+        self.service.add_blacklist_word('chat', 'Spam')
+        added = self.service.add_blacklist_words('chat', ['spam', 'Scam', 'SCAM', ' ', 'promo', 'scam'])
+        assert added == 2
+        assert self.service.get_blacklist_words('chat') == ['Spam', 'Scam', 'promo']
+
+    def test_chunks_and_export(self):
+        from unittest.mock import patch
+        words = (f"word{i}" for i in range(25))
+        with patch.object(self.service, 'BLACKLIST_IMPORT_CHUNK', 4):
+            # Repeats across chunk boundaries are caught by the database
+            assert self.service.add_blacklist_words('chat', list(words) + ['WORD3', 'word24']) == 25
+            assert list(self.service.export_blacklist('chat')) == [f"word{i}" for i in range(25)]
+        assert list(self.service.export_blacklist('other')) == []
+
+    def test_import_refreshes_matcher(self):
+        self.service.add_blacklist_word('chat', 'spam')
+        assert self.service.check_blacklist('chat', 'scam here') is None
+        self.service.add_blacklist_words('chat', ['scam'])
+        assert self.service.check_blacklist('chat', 'scam here') == 'scam'
+
+    def test_parse_terms(self):
+        text = 'spam\r\n  scam  \n\n'
+        assert self.service.parse_blacklist_terms(text) == ['spam', 'scam']
+
+    def test_skips_terms_too_long_to_store(self):
+        too_long = 'x' * (self.service.MAX_TERM_LENGTH + 1)
+        assert self.service.add_blacklist_words('chat', ['spam', too_long]) == 1
+        assert self.service.get_blacklist_words('chat') == ['spam']
+
+    def test_concurrent_insert_retries_chunk(self):
+        from unittest.mock import patch
+        from bot_core.db_models import BlacklistWord
+        self.service.add_blacklist_word('chat', 'Spam')
+        # A plain insert stands in for a NOT EXISTS check that lost a race
+        with patch.object(self.service, '_INSERT_IF_ABSENT', BlacklistWord.__table__.insert()):
+            assert self.service.add_blacklist_words('chat', ['scam', 'spam', 'promo']) == 2
+        assert self.service.get_blacklist_words('chat') == ['Spam', 'scam', 'promo']
+
+    def test_command_reports_long_terms_skipped(self):
+        from unittest.mock import MagicMock, patch
+        from bot_core.shared_bot_logic import SharedBotLogic
+        logic = SharedBotLogic(MagicMock())
+        too_long = 'x' * (self.service.MAX_TERM_LENGTH + 1)
+        with patch('bot_core.shared_bot_logic.get_text') as get_text:
+            logic.cmd_addblacklist('chat', f"spam\n{too_long}")
+            get_text.assert_called_with('chat', 'blacklist_bulk_added', added=1, skipped=1)
+            logic.cmd_addblacklist('chat', too_long)
+            get_text.assert_called_with('chat', 'blacklist_bulk_added', added=0, skipped=1)
+
+    def test_command_multiline_and_attachment(self):
+        import base64
+        from unittest.mock import MagicMock
+        from bot_core.shared_bot_logic import SharedBotLogic
+        actions = MagicMock()
+        actions.download_media.return_value = {
+            'mimetype': 'text/plain', 'data': base64.b64encode('promo\nSPAM\n'.encode()).decode()
+        }
+        logic = SharedBotLogic(actions)
+
+        logic.cmd_addblacklist('chat', 'spam\nscam')
+        assert self.service.get_blacklist_words('chat') == ['spam', 'scam']
+        logic.cmd_addblacklist('chat', '', {'id': 'm2', 'quotedMsg': {'id': 'm1', 'hasMedia': True}})
+        actions.download_media.assert_called_once_with('m1')
+        assert self.service.get_blacklist_words('chat') == ['spam', 'scam', 'promo']
+
+        actions.download_media.return_value = {'mimetype': 'image/png', 'data': 'iVBORw0KGgo='}
+        logic.cmd_addblacklist('chat', '', {'id': 'm3', 'hasMedia': True})
+        assert self.service.get_blacklist_words('chat') == ['spam', 'scam', 'promo']
+        assert actions.send_message.call_count == 3
@@ -0,0 +1,102 @@
+"""
+Bridge Batch Tests
+Tests for sending several bridge actions in one /batch request.
+"""
+import pytest
+import sys
+import os
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+def fake_response(status, body=None):
+    response = MagicMock()
+    response.status_code = status
+    response.json.return_value = body or {}
+    if status >= 400:
+        import requests
+        response.raise_for_status.side_effect = requests.HTTPError(f"{status}", response=response)
+    return response
+
+
+class TestBridgeBatch:
+    """Test WhatsAppBridgeClient.batch()"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        from bot_core.whatsapp_bridge_client import WhatsAppBridgeClient
+        self.client = WhatsAppBridgeClient(webhook_workers=0)
+
+    def test_actions_sent_in_one_request(self):
+        body = {'success': True, 'results': [
+            {'success': True, 'messageId': 'm1'}, {'success': True}, {'success': False, 'error': 'not admin'}]}
+        with patch.object(self.client.http, 'request', return_value=fake_response(200, body)) as request:
+            with self.client.batch() as batch:
+                sent = batch.send_message('g@g.us', 'report')
+                deleted = batch.delete_message('g@g.us', 'bad-msg')
+                removed = batch.remove_participant('g@g.us', 'u@c.us')
+                request.assert_not_called()
+
+        request.assert_called_once()
+        method, path = request.call_args.args
+        assert (method, path) == ('POST', '/batch')
+        assert request.call_args.kwargs['json']['actions'] == [
+            {'action': 'send-message', 'params': {'chatId': 'g@g.us', 'message': 'report'}},
+            {'action': 'delete-message', 'params': {'chatId': 'g@g.us', 'messageId': 'bad-msg'}},
+            {'action': 'remove-participant', 'params': {'groupId': 'g@g.us', 'participantId': 'u@c.us'}},
+        ]
+        assert sent.success and sent.message_id == 'm1'
+        assert deleted.success
+        assert removed.success is False and removed.error == 'not admin'
+
+    def test_empty_batch_sends_nothing(self):
+        with patch.object(self.client.http, 'request') as request:
+            with self.client.batch():
+                pass
+        request.assert_not_called()
+
+    def test_sent_even_if_block_raises(self):
+        body = {'results': [{'success': True}]}
+        with patch.object(self.client.http, 'request', return_value=fake_response(200, body)) as request:
+            with pytest.raises(ValueError):
+                with self.client.batch() as batch:
+                    batch.delete_message('g@g.us', 'bad-msg')
+                    raise ValueError('boom')
+        request.assert_called_once()
+
+    def test_transport_failure_fails_every_action(self):
+        import requests
+        with patch.object(self.client.http, 'request', side_effect=requests.ConnectionError('down')):
+            with self.client.batch() as batch:
+                first = batch.send_message('g@g.us', 'hi')
+                second = batch.remove_participant('g@g.us', 'u@c.us')
+        assert first.success is False and second.success is False
+        assert 'down' in first.error
+
+    def test_falls_back_without_batch_route(self):
+        import requests
+        responses = {'/send-message': {'success': True, 'messageId': 'm1'}}
+
+        def single(method, path, json=None, timeout=10):
+            if path in ('/batch', '/delete-message'):
+                raise requests.HTTPError('404 Not Found', response=fake_response(404))
+            return responses.get(path, {'success': True})
+
+        with patch.object(self.client, '_request', side_effect=single) as request:
+            with self.client.batch(stop_on_error=True) as batch:
+                sent = batch.send_message('g@g.us', 'hi')
+                deleted = batch.delete_message('g@g.us', 'gone')
+                removed = batch.remove_participant('g@g.us', 'u@c.us')
+
+        assert [c.args[1] for c in request.call_args_list] == ['/batch', '/send-message', '/delete-message']
+        assert sent.message_id == 'm1'
+        assert deleted.success is False
+        assert removed.data.get('skipped') is True
+
+    def test_cannot_add_after_send(self):
+        with patch.object(self.client.http, 'request', return_value=fake_response(200, {'results': [{}]})):
+            with self.client.batch() as batch:
+                batch.send_message('g@g.us', 'hi')
+        with pytest.raises(RuntimeError):
+            batch.send_message('g@g.us', 'late')
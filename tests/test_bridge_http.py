@@ -0,0 +1,112 @@
+"""
+Bridge HTTP Session Tests
+Tests for pooled keep-alive connections, retries and per-endpoint timeouts.
+"""
+import json
+import pytest
+import sys
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+class StubBridgeHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True  # like Node, so keep-alive replies aren't held by delayed ACKs
+
+    def _reply(self, status, body):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        server = self.server
+        server.hits[self.path] = server.hits.get(self.path, 0) + 1
+        if self.path == '/flaky' and server.hits[self.path] == 1:
+            self._reply(503, {'error': 'busy'})
+        else:
+            self._reply(200, {'ready': True})
+
+    def do_POST(self):
+        server = self.server
+        server.hits[self.path] = server.hits.get(self.path, 0) + 1
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        if self.path == '/busy':
+            self._reply(503, {'error': 'busy'})
+        else:
+            self._reply(200, {'messageId': 'msg-1'})
+
+    def log_message(self, *args):
+        pass
+
+
+class TestBridgeSession:
+    """Test the pooled bridge session"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        from bot_core.bridge_http import BridgeSession
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), StubBridgeHandler)
+        self.server.hits = {}
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.session = BridgeSession(self.url, pool_size=4, retries=2, backoff_factor=0, timeouts={})
+        yield
+        self.session.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_connections_are_reused(self):
+        for _ in range(20):
+            response = self.session.request('POST', '/send-message', json={'chatId': 'c', 'message': 'hi'})
+            assert response.json() == {'messageId': 'msg-1'}
+        stats = self.session.stats()
+        assert stats['requests'] == 20
+        assert stats['connections_opened'] == 1
+        assert stats['connection_reuse'] == 0.95
+
+    def test_get_retried_on_503(self):
+        response = self.session.request('GET', '/flaky')
+        assert response.status_code == 200
+        assert self.server.hits['/flaky'] == 2
+
+    def test_post_not_retried_on_503(self):
+        response = self.session.request('POST', '/busy', json={})
+        assert response.status_code == 503
+        assert self.server.hits['/busy'] == 1
+
+    def test_connection_errors_counted(self):
+        import requests
+        from bot_core.bridge_http import BridgeSession
+        self.server.shutdown()
+        self.server.server_close()
+        session = BridgeSession(self.url, retries=0, timeouts={})
+        with pytest.raises(requests.ConnectionError):
+            session.request('POST', '/send-message', json={})
+        assert session.stats()['errors'] == 1
+
+    def test_per_endpoint_timeouts(self):
+        from bot_core.bridge_http import BridgeSession
+        session = BridgeSession(self.url, timeouts={'/group': 20, '/group/x/add': 45})
+        assert session.timeout_for('/send-message', 10) == 10
+        assert session.timeout_for('/group/y/members', 10) == 20
+        assert session.timeout_for('/group/x/add', 30) == 45
+
+    def test_parse_timeouts(self):
+        from bot_core.bridge_http import parse_timeouts
+        assert parse_timeouts('/send-media=60, /call=45,bad,/x=nan?') == {'/send-media': 60.0, '/call': 45.0}
+
+    def test_client_uses_session(self):
+        from bot_core.whatsapp_bridge_client import WhatsAppBridgeClient
+        client = WhatsAppBridgeClient(bridge_url=self.url, webhook_workers=0)
+        try:
+            for _ in range(5):
+                assert client.send_message('123@c.us', 'hi') == 'msg-1'
+            assert client.http.stats()['connections_opened'] == 1
+        finally:
+            client.close()
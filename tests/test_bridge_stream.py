@@ -0,0 +1,267 @@
+"""
+Bridge Stream Tests
+Tests for the persistent event/RPC channel between the bot and bridge.js.
+"""
+import json
+import pytest
+import sys
+import os
+import socket
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+class FakeStreamBridge:
+    """Unix-socket server speaking the bridge stream protocol"""
+
+    def __init__(self, path, handler=None):
+        self.path = path
+        self.handler = handler or (lambda frame: {'t': 'r', 'i': frame['i'], 'ok': True, 'd': {'echo': frame['a']}})
+        self.acks = []
+        self.requests = []
+        self.connections = 0
+        self.conn = None
+        self._lock = threading.Lock()
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.server.bind(path)
+        self.server.listen(4)
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self.server.accept()
+            except OSError:
+                return
+            self.conn = conn
+            self.connections += 1
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn):
+        for line in conn.makefile('rb'):
+            frame = json.loads(line)
+            if frame['t'] == 'q':
+                self.requests.append(frame)
+                reply = self.handler(frame)
+                if reply is not None:
+                    self.send(reply, conn)
+            elif frame['t'] == 'r':
+                self.acks.append(frame)
+
+    def send(self, frame, conn=None):
+        with self._lock:
+            (conn or self.conn).sendall(json.dumps(frame).encode() + b'\n')
+
+    def drop(self):
+        self.conn.shutdown(socket.SHUT_RDWR)
+        self.conn.close()
+
+    def close(self):
+        self.server.close()
+        if self.conn:
+            self.conn.close()
+
+
+def wait_for(condition, timeout=2):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+class TestBridgeStream:
+    """Test the stream client"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        from bot_core.bridge_stream import BridgeStream
+        self.path = str(tmp_path / 'bridge.sock')
+        self.events = []
+        self.accept = True
+        self.make = lambda: BridgeStream(f"unix:{self.path}", self._on_event, reconnect_min=0.05, reconnect_max=0.1)
+        self.bridge = None
+        self.stream = None
+        yield
+        if self.stream:
+            self.stream.close()
+        if self.bridge:
+            self.bridge.close()
+
+    def _on_event(self, data):
+        self.events.append(data)
+        return self.accept
+
+    def connect(self, handler=None):
+        self.bridge = FakeStreamBridge(self.path, handler)
+        self.stream = self.make()
+        self.stream.start()
+        assert self.stream.wait_connected(2)
+
+    def test_call_round_trip(self):
+        self.connect()
+        assert self.stream.call('send-message', {'chatId': 'g@g.us'}) == {'echo': 'send-message'}
+        assert self.bridge.requests[0]['d'] == {'chatId': 'g@g.us'}
+
+    def test_concurrent_calls_correlated_by_id(self):
+        held = []
+
+        def handler(frame):
+            held.append(frame)
+            if len(held) == 2:
+                # Answer out of order
+                for pending in reversed(held):
+                    self.bridge.send({'t': 'r', 'i': pending['i'], 'ok': True, 'd': {'action': pending['a']}})
+            return None
+
+        self.connect(handler)
+        results = {}
+        threads = [threading.Thread(target=lambda a=a: results.__setitem__(a, self.stream.call(a)))
+                   for a in ('first', 'second')]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(2)
+        assert results == {'first': {'action': 'first'}, 'second': {'action': 'second'}}
+
+    def test_error_response(self):
+        from bot_core.bridge_stream import BridgeStreamError
+        self.connect(lambda frame: {'t': 'r', 'i': frame['i'], 'ok': False, 'e': 'Client not ready', 's': 503})
+        with pytest.raises(BridgeStreamError) as error:
+            self.stream.call('send-message')
+        assert error.value.status == 503
+
+    def test_call_timeout(self):
+        self.connect(lambda frame: None)
+        with pytest.raises(TimeoutError):
+            self.stream.call('send-message', timeout=0.1)
+        assert self.stream.stats()['in_flight'] == 0
+
+    def test_events_acknowledged(self):
+        self.connect()
+        self.bridge.send({'t': 'e', 'i': 1, 'd': {'type': 'message', 'data': {'body': 'hi'}}})
+        assert wait_for(lambda: len(self.bridge.acks) == 1)
+        assert self.events == [{'type': 'message', 'data': {'body': 'hi'}}]
+        assert self.bridge.acks[0] == {'t': 'r', 'i': 1, 'ok': True}
+
+        self.accept = False
+        self.bridge.send({'t': 'e', 'i': 2, 'd': {'type': 'message'}})
+        assert wait_for(lambda: len(self.bridge.acks) == 2)
+        assert self.bridge.acks[1] == {'t': 'r', 'i': 2, 'ok': False, 's': 503}
+
+    def test_reconnects_and_fails_in_flight_calls(self):
+        self.connect(lambda frame: None)
+        errors = []
+        thread = threading.Thread(target=lambda: errors.append(pytest.raises(ConnectionError, self.stream.call, 'x', timeout=2)))
+        thread.start()
+        assert wait_for(lambda: self.bridge.requests)
+        self.bridge.drop()
+        thread.join(2)
+        assert errors
+        assert wait_for(lambda: self.bridge.connections == 2 and self.stream.connected)
+
+    def test_not_connected(self):
+        from bot_core.bridge_stream import BridgeStream
+        stream = BridgeStream(f"unix:{self.path}", self._on_event)
+        with pytest.raises(ConnectionError):
+            stream.call('send-message')
+
+
+class TestStreamRouting:
+    """Test which bridge calls use the stream"""
+
+    def test_stream_action(self):
+        from bot_core.bridge_stream import stream_action
+        assert stream_action('POST', '/send-message', {'chatId': 'c'}) == ('send-message', {'chatId': 'c'})
+        assert stream_action('POST', '/batch', {'actions': []}) == ('batch', {'actions': []})
+        assert stream_action('POST', '/group/g@g.us/remove', {'participantId': 'u'}) == (
+            'remove-participant', {'groupId': 'g@g.us', 'participantId': 'u'})
+        assert stream_action('GET', '/group/g@g.us/members', None) is None
+        assert stream_action('POST', '/contacts', {'ids': []}) is None
+
+    def test_parse_address(self):
+        import socket as socket_module
+        from bot_core.bridge_stream import parse_address
+        assert parse_address('unix:/tmp/b.sock') == (socket_module.AF_UNIX, '/tmp/b.sock')
+        assert parse_address('tcp:127.0.0.1:3001') == (socket_module.AF_INET, ('127.0.0.1', 3001))
+        with pytest.raises(ValueError):
+            parse_address('ws://localhost')
+
+    def test_client_uses_stream_when_connected(self, tmp_path):
+        from unittest.mock import patch
+        from bot_core.whatsapp_bridge_client import WhatsAppBridgeClient
+        path = str(tmp_path / 'bridge.sock')
+        bridge = FakeStreamBridge(path, lambda frame: {'t': 'r', 'i': frame['i'], 'ok': True, 'd': {'messageId': 'm1'}})
+        client = WhatsAppBridgeClient(webhook_workers=0, stream_address=f"unix:{path}")
+        try:
+            with patch.object(client.http, 'request') as http:
+                # Not connected yet: HTTP fallback
+                http.return_value.json.return_value = {'messageId': 'http'}
+                assert client.send_message('g@g.us', 'hi') == 'http'
+
+                client.stream.start()
+                assert client.stream.wait_connected(2)
+                assert client.send_message('g@g.us', 'hi') == 'm1'
+                assert http.call_count == 1
+                assert bridge.requests[0]['a'] == 'send-message'
+
+                # Reads have no stream action and stay on HTTP
+                http.return_value.json.return_value = {'participants': []}
+                client.get_group_members('g@g.us')
+                assert http.call_count == 2
+        finally:
+            client.close()
+            bridge.close()
+
+    def test_client_receives_stream_events(self, tmp_path):
+        from bot_core.whatsapp_bridge_client import WhatsAppBridgeClient
+        path = str(tmp_path / 'bridge.sock')
+        bridge = FakeStreamBridge(path)
+        client = WhatsAppBridgeClient(webhook_workers=1, stream_address=f"unix:{path}")
+        received = []
+        client.on_message(received.append)
+        client.webhook_queue.start()
+        client.stream.start()
+        try:
+            assert client.stream.wait_connected(2)
+            bridge.send({'t': 'e', 'i': 1, 'd': {'type': 'ready'}})
+            bridge.send({'t': 'e', 'i': 2, 'd': {'type': 'message', 'data': {'body': 'hi', 'from': 'u@c.us'}}})
+            assert wait_for(lambda: received)
+            assert client._bridge_ready.is_set()
+            assert received[0]['body'] == 'hi'
+        finally:
+            client.close()
+            client.webhook_queue.stop()
+            bridge.close()
+
+    def test_stream_events_never_block_the_reader(self, tmp_path):
+        from bot_core.webhook_queue import WebhookQueue
+        from bot_core.whatsapp_bridge_client import WhatsAppBridgeClient
+        client = WhatsAppBridgeClient(webhook_workers=1, stream_address=f"unix:{tmp_path / 'bridge.sock'}")
+        client.webhook_queue = WebhookQueue(client._dispatch_event, workers=1, lane_queue_size=1, enqueue_timeout=2)
+        event = {'type': 'message', 'data': {'chatId': 'g@g.us', 'body': 'hi'}}
+        assert client._on_stream_event(event) is True
+        start = time.monotonic()
+        # Lane full (workers not started): rejected at once so the bridge retries
+        assert client._on_stream_event(event) is False
+        assert time.monotonic() - start < 0.5
+        client.close()
+
+    def test_inline_mode_uses_bounded_lanes(self, tmp_path):
+        from bot_core.whatsapp_bridge_client import WhatsAppBridgeClient
+        client = WhatsAppBridgeClient(webhook_workers=0, stream_address=f"unix:{tmp_path / 'bridge.sock'}")
+        received = []
+        client.on_message(received.append)
+        client.stream_lanes.start()
+        try:
+            before = threading.active_count()
+            for i in range(50):
+                assert client._on_stream_event({'type': 'message', 'data': {'chatId': 'g@g.us', 'body': str(i)}})
+            assert wait_for(lambda: len(received) == 50)
+            assert threading.active_count() == before
+            assert [m['body'] for m in received] == [str(i) for i in range(50)]
+        finally:
+            client.close()
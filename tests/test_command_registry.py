@@ -0,0 +1,121 @@
+"""
+Command Registry Tests
+Tests for table-driven command dispatch and registry-generated help.
+"""
+import pytest
+import sys
+import os
+from unittest.mock import MagicMock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+class TestCommandRegistry:
+    """Test the registry itself"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        from bot_core.command_registry import CommandRegistry, CommandSpec
+        self.CommandSpec = CommandSpec
+        self.registry = CommandRegistry([
+            CommandSpec('setlang', lambda bot, c: None, admin=True, aliases=('language',)),
+            CommandSpec('secret', lambda bot, c: None),
+        ])
+
+    def test_lookup_by_name_and_alias(self):
+        assert self.registry.get('setlang') is self.registry.get('language')
+        assert 'language' in self.registry
+        assert self.registry.get('missing') is None
+        assert len(self.registry) == 2
+
+    def test_duplicate_rejected(self):
+        with pytest.raises(ValueError):
+            self.registry.register(self.CommandSpec('language', lambda bot, c: None))
+
+    def test_decorator(self):
+        @self.registry.command('hello', group_only=True)
+        def hello(bot, ctx):
+            pass
+        spec = self.registry.get('hello')
+        assert spec.handler is hello and spec.group_only and not spec.admin
+
+    def test_help_table(self):
+        texts = {
+            'en': {'setlang': {'usage': '/setlang <lang>', 'desc': 'Change language', 'example': '/setlang he'}},
+            'he': {},
+        }
+        table = self.registry.help_table(texts)
+        assert table['en']['setlang']['admin'] is True
+        assert table['en']['language'] == table['en']['setlang']
+        # Missing translations fall back to English, undocumented commands are left out
+        assert table['he']['setlang']['usage'] == '/setlang <lang>'
+        assert 'secret' not in table['en']
+
+    def test_command_help_matches_registry(self):
+        from bot_core.command_registry import COMMANDS
+        from bot_core.i18n import COMMAND_HELP
+        for lang, entries in COMMAND_HELP.items():
+            for name, entry in entries.items():
+                assert entry['admin'] == COMMANDS.get(name).admin, (lang, name)
+
+    def test_handlers_exist(self):
+        from bot_core.command_registry import COMMANDS, CommandContext
+        from bot_core.shared_bot_logic import SharedBotLogic
+        for spec in COMMANDS:
+            bot = MagicMock(spec=SharedBotLogic)
+            spec.handler(bot, CommandContext(MagicMock(), spec.name, '', 'u@c.us', 'g@g.us', True, {}))
+
+
+class TestCommandDispatch:
+    """Test SharedBotLogic dispatch through the registry"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, test_db):
+        from bot_core.shared_bot_logic import SharedBotLogic
+        self.actions = MagicMock()
+        self.actions.is_admin.return_value = False
+        self.logic = SharedBotLogic(self.actions)
+
+    def run(self, text, is_group=True):
+        self.logic.handle_command(text, 'u@c.us', 'g@g.us' if is_group else 'u@c.us', is_group, {'id': 'm1'})
+        return [call.args[1] for call in self.actions.send_message.call_args_list]
+
+    def test_public_command_skips_admin_check(self):
+        self.run('/ping')
+        self.actions.is_admin.assert_not_called()
+
+    def test_help_for_public_command_skips_admin_check(self):
+        self.run('/help rules')
+        self.actions.is_admin.assert_not_called()
+
+    def test_help_in_private_chat_skips_admin_check(self):
+        self.run('/help', is_group=False)
+        self.run('/help warn', is_group=False)
+        self.actions.is_admin.assert_not_called()
+
+    def test_help_checks_admin_once_when_needed(self):
+        from bot_core.i18n import get_chat_text
+        sent = self.run('/help warn')
+        assert self.actions.is_admin.call_count == 1
+        assert sent == [get_chat_text('g@g.us', 'admin_only')]
+
+    def test_admin_command_denied(self):
+        from bot_core.i18n import get_chat_text
+        assert self.run('/setrules be nice') == [get_chat_text('g@g.us', 'admin_only')]
+        assert self.actions.is_admin.call_count == 1
+
+    def test_group_only_command_in_private_chat(self):
+        from bot_core.i18n import get_chat_text
+        assert self.run('/kick', is_group=False) == [get_chat_text('u@c.us', 'group_only')]
+        self.actions.is_admin.assert_not_called()
+
+    def test_unknown_command(self):
+        from bot_core.i18n import get_chat_text
+        assert self.run('/nope') == [get_chat_text('g@g.us', 'unknown_command', command='nope')]
+
+    def test_registered_command_dispatched(self):
+        from bot_core.command_registry import CommandRegistry, CommandSpec
+        calls = []
+        self.logic.commands = CommandRegistry([CommandSpec('hello', lambda bot, c: calls.append(c.args))])
+        self.run('/hello world')
+        assert calls == ['world']
@@ -0,0 +1,102 @@
+"""
+Tests for the bridge contact cache
+"""
+import pytest
+import sys
+import os
+import threading
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+class TestContactCache:
+    """Test contact_cache.py"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        from bot_core.contact_cache import ContactCache
+        self.ContactCache = ContactCache
+        self.one_calls = []
+        self.many_calls = []
+        self.now = 0.0
+        self.cache = ContactCache(self._fetch_one, self._fetch_many, ttl=60, clock=lambda: self.now)
+
+    def _fetch_one(self, contact_id):
+        self.one_calls.append(contact_id)
+        return {'id': contact_id, 'pushname': contact_id.split('@')[0]}
+
+    def _fetch_many(self, contact_ids):
+        self.many_calls.append(list(contact_ids))
+        return {contact_id: {'id': contact_id} for contact_id in contact_ids}
+
+    def test_repeated_lookups_hit_cache(self):
+        """Test name + phone + mention lookups cost one request"""
+        for _ in range(4):
+            assert self.cache.get('111@c.us')['pushname'] == '111'
+        assert self.one_calls == ['111@c.us']
+        assert self.cache.hits == 3
+
+    def test_ttl(self):
+        """Test expired contacts are refetched"""
+        self.cache.get('111@c.us')
+        self.now = 61
+        self.cache.get('111@c.us')
+        assert len(self.one_calls) == 2
+
+    def test_failures_are_not_cached(self):
+        """Test a failed lookup is retried"""
+        cache = self.ContactCache(lambda contact_id: None)
+        assert cache.get('111@c.us') is None
+        assert len(cache) == 0
+
+    def test_prefetch_uses_one_request(self):
+        """Test batch prefetch resolves only the missing ids in one call"""
+        self.cache.get('111@c.us')
+        assert self.cache.prefetch(['111@c.us', '222@c.us', '333@c.us']) == 3
+        assert self.many_calls == [['222@c.us', '333@c.us']]
+        self.cache.get('333@c.us')
+        assert self.one_calls == ['111@c.us']
+
+    def test_in_flight_requests_are_shared(self):
+        """Test concurrent lookups for one id share the request"""
+        release = threading.Event()
+        calls = []
+
+        def slow_fetch(contact_id):
+            calls.append(contact_id)
+            release.wait(2)
+            return {'id': contact_id}
+
+        cache = self.ContactCache(slow_fetch)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get('111@c.us'))) for _ in range(5)]
+        for t in threads:
+            t.start()
+        release.set()
+        for t in threads:
+            t.join()
+        assert calls == ['111@c.us']
+        assert results == [{'id': '111@c.us'}] * 5
+
+
+class TestBridgeClientContacts:
+    """Test WhatsAppBridgeClient routes contact lookups through the cache"""
+
+    def test_get_contact_cached(self):
+        from bot_core.whatsapp_bridge_client import WhatsAppBridgeClient
+        client = WhatsAppBridgeClient(bridge_url="http://localhost:3000")
+        with patch.object(client, '_request') as mock_request:
+            mock_request.return_value = {'contact': {'pushname': 'Alice'}}
+            assert client.get_contact('111@c.us')['pushname'] == 'Alice'
+            assert client.get_contact('111@c.us')['pushname'] == 'Alice'
+            mock_request.assert_called_once()
+
+    def test_get_contacts_batches(self):
+        from bot_core.whatsapp_bridge_client import WhatsAppBridgeClient
+        client = WhatsAppBridgeClient(bridge_url="http://localhost:3000")
+        with patch.object(client, '_request') as mock_request:
+            mock_request.return_value = {'contacts': {'1@c.us': {'name': 'A'}, '2@c.us': {'name': 'B'}}}
+            contacts = client.get_contacts(['1@c.us', '2@c.us'])
+            assert set(contacts) == {'1@c.us', '2@c.us'}
+            mock_request.assert_called_once_with('POST', '/contacts', json={'ids': ['1@c.us', '2@c.us']}, timeout=30)
@@ -10,7 +10,7 @@ import unittest
 # Add parent directory to path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from bot_core.content_filter import ContentModerator
+from bot_core.content_filter import ContentModerator, ModeratorPool
 
 
 class TestContentFilterRules(unittest.TestCase):
@@ -52,5 +52,134 @@ class TestContentFilterRules(unittest.TestCase):
         self.assertGreaterEqual(result.scores['sexual'], 0.6)
 
 
+class FakeClient:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class FakeModerator:
+    def __init__(self, backend, api_key):
+        self.backend = backend
+        self.api_key = api_key
+        self.client = FakeClient()
+
+
+class TestModeratorPool(unittest.TestCase):
+    """Moderator pool tests"""
+
+    def setUp(self):
+        self.now = 0.0
+        self.pool = ModeratorPool(max_size=2, idle_timeout=60, factory=FakeModerator, clock=lambda: self.now)
+
+    def test_same_key_reuses_instance(self):
+        first = self.pool.get('openai', 'key-a')
+        self.assertIs(self.pool.get('openai', 'key-a'), first)
+        self.assertIsNot(self.pool.get('openai', 'key-b'), first)
+        self.assertEqual(len(self.pool), 2)
+
+    def test_lru_bound_closes_evicted(self):
+        first = self.pool.get('openai', 'key-a')
+        self.pool.get('openai', 'key-b')
+        self.pool.get('openai', 'key-c')
+        self.assertEqual(len(self.pool), 2)
+        self.assertTrue(first.client.closed)
+
+    def test_idle_eviction(self):
+        first = self.pool.get('openai', 'key-a')
+        self.now = 61
+        second = self.pool.get('openai', 'key-a')
+        self.assertIsNot(second, first)
+        self.assertTrue(first.client.closed)
+
+    def test_idle_close_runs_outside_pool_lock(self):
+        import threading
+        first = self.pool.get('openai', 'key-a')
+        closing = threading.Event()
+        release = threading.Event()
+
+        def slow_close():
+            closing.set()
+            release.wait(2)
+
+        first.client.close = slow_close
+        self.now = 61
+        evicting = threading.Thread(target=self.pool.get, args=('openai', 'key-a'))
+        evicting.start()
+        self.assertTrue(closing.wait(2))
+        # Another key is served while the idle moderator is still closing
+        other = threading.Thread(target=self.pool.get, args=('openai', 'key-b'))
+        other.start()
+        other.join(1)
+        self.assertFalse(other.is_alive())
+        release.set()
+        evicting.join()
+
+    def test_concurrent_first_use_builds_once(self):
+        import threading
+        built = []
+
+        def factory(backend, api_key):
+            built.append(api_key)
+            return FakeModerator(backend, api_key)
+
+        pool = ModeratorPool(factory=factory)
+        threads = [threading.Thread(target=pool.get, args=('openai', 'key-a')) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(built, ['key-a'])
+
+    def test_caller_arriving_during_publish_does_not_rebuild(self):
+        import threading
+        built = []
+        key = ('openai', 'key-a')
+
+        def factory(backend, api_key):
+            built.append(api_key)
+            return FakeModerator(backend, api_key)
+
+        pool = ModeratorPool(factory=factory)
+        lock = pool._lock
+        late = []
+
+        class ReleaseHook:
+            # Sends in another caller whenever the pool lock is released with
+            # the key neither published nor marked as building
+            def __enter__(self):
+                lock.acquire()
+
+            def __exit__(self, *exc):
+                lock.release()
+                if built and not late and key not in pool._entries and key not in pool._building:
+                    late.append(threading.Thread(target=pool.get, args=key))
+                    late[0].start()
+                    late[0].join()
+
+        pool._lock = ReleaseHook()
+        first = pool.get(*key)
+        self.assertEqual(built, ['key-a'])
+        self.assertIs(pool.get(*key), first)
+        self.assertFalse(first.client.closed)
+
+    def test_build_losing_a_race_is_closed(self):
+        winner = FakeModerator('openai', 'key-a')
+        built = []
+
+        def factory(backend, api_key):
+            # Another builder published this key while we were building
+            self.pool._entries[(backend, api_key)] = (winner, self.now)
+            built.append(FakeModerator(backend, api_key))
+            return built[-1]
+
+        self.pool.factory = factory
+        self.assertIs(self.pool.get('openai', 'key-a'), winner)
+        self.assertEqual(len(self.pool), 1)
+        self.assertFalse(winner.client.closed)
+        self.assertTrue(built[0].client.closed)
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,287 @@
+"""
+Database Engine Tests
+Tests for engine profiles selected from the database URL.
+"""
+import pytest
+import sys
+import os
+import threading
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+class TestResolveProfile:
+    """Test profile selection"""
+
+    def test_auto_by_url(self):
+        from bot_core.database import resolve_profile
+        assert resolve_profile('sqlite:///bot.db', 'auto').name == 'sqlite'
+        assert resolve_profile('sqlite://', 'auto').name == 'sqlite-memory'
+        assert resolve_profile('sqlite:///:memory:', 'auto').name == 'sqlite-memory'
+        assert resolve_profile('postgresql://u:p@db/rose', 'auto').name == 'postgres'
+        assert resolve_profile('mysql://u:p@db/rose', 'auto').name == 'default'
+
+    def test_postgres_pooling(self):
+        from bot_core.database import resolve_profile
+        profile = resolve_profile('postgresql+psycopg2://u:p@db/rose', 'auto')
+        assert profile.engine_kwargs['pool_pre_ping'] is True
+        assert profile.engine_kwargs['pool_size'] > 0
+        assert 'check_same_thread' not in profile.engine_kwargs.get('connect_args', {})
+        assert 'default_transaction_read_only=on' in profile.read_only['connect_args']['options']
+        assert 'executemany_mode' not in resolve_profile('postgresql+pg8000://u:p@db/rose', 'auto').engine_kwargs
+
+    def test_explicit_and_unknown(self):
+        from bot_core.database import resolve_profile
+        assert resolve_profile('sqlite:///bot.db', 'default').pragmas == ()
+        with pytest.raises(ValueError):
+            resolve_profile('sqlite:///bot.db', 'turbo')
+
+    def test_unit_of_work_per_profile(self):
+        from bot_core.database import resolve_profile
+        assert resolve_profile('postgresql://u:p@db/rose', 'auto').unit_of_work is True
+        assert resolve_profile('sqlite:///bot.db', 'auto').unit_of_work is True
+        assert resolve_profile('sqlite://', 'auto').unit_of_work is False
+
+    def test_describe(self):
+        from bot_core.database import resolve_profile
+        text = resolve_profile('sqlite:///bot.db', 'auto').describe()
+        assert text.startswith('sqlite QueuePool') and 'journal_mode=WAL' in text
+
+
+class TestSqliteProfile:
+    """Test the tuned SQLite engine"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        from sqlalchemy import text
+        from bot_core.database import build_engine, resolve_profile
+        self.text = text
+        self.url = f"sqlite:///{tmp_path / 'bot.db'}"
+        self.profile = resolve_profile(self.url, 'auto')
+        self.engine = build_engine(self.url, self.profile)
+        self.read_engine = build_engine(self.url, self.profile, read_only=True)
+        with self.engine.begin() as conn:
+            conn.execute(text("CREATE TABLE t (id INTEGER PRIMARY KEY, v TEXT)"))
+        yield
+        self.engine.dispose()
+        self.read_engine.dispose()
+
+    def test_pragmas_applied(self):
+        with self.engine.connect() as conn:
+            assert conn.execute(self.text("PRAGMA journal_mode")).scalar().lower() == 'wal'
+            assert conn.execute(self.text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+            assert conn.execute(self.text("PRAGMA busy_timeout")).scalar() > 0
+
+    def test_read_only_engine_refuses_writes(self):
+        from sqlalchemy.exc import OperationalError
+        with self.engine.begin() as conn:
+            conn.execute(self.text("INSERT INTO t (v) VALUES ('a')"))
+        with self.read_engine.connect() as conn:
+            assert conn.execute(self.text("SELECT COUNT(*) FROM t")).scalar() == 1
+            with pytest.raises(OperationalError):
+                conn.execute(self.text("INSERT INTO t (v) VALUES ('b')"))
+
+    def test_concurrent_writers_and_readers(self):
+        from sqlalchemy.orm import sessionmaker
+        Session = sessionmaker(bind=self.engine)
+        errors = []
+
+        def writer(n):
+            for i in range(25):
+                session = Session()
+                try:
+                    session.execute(self.text("INSERT INTO t (v) VALUES (:v)"), {'v': f"{n}-{i}"})
+                    session.commit()
+                    with self.read_engine.connect() as conn:
+                        conn.execute(self.text("SELECT COUNT(*) FROM t")).scalar()
+                except Exception as e:
+                    errors.append(e)
+                finally:
+                    session.close()
+
+        threads = [threading.Thread(target=writer, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert errors == []
+        with self.engine.connect() as conn:
+            assert conn.execute(self.text("SELECT COUNT(*) FROM t")).scalar() == 200
+
+
+class TestUnitOfWork:
+    """Test the per-event shared session"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, test_db):
+        from unittest.mock import patch
+        from sqlalchemy import event, text
+        from bot_core.database import engine
+        self.text = text
+        self.engine = engine
+        self.checkouts = []
+        listener = lambda *args: self.checkouts.append(args)
+        event.listen(engine.pool, 'checkout', listener)
+        with patch('bot_core.database.unit_of_work_enabled', True):
+            yield
+        event.remove(engine.pool, 'checkout', listener)
+
+    def committed_rules(self, chat_id):
+        with self.engine.connect() as conn:
+            return conn.execute(self.text("SELECT rules FROM rules WHERE chat_id = :c"), {'c': chat_id}).scalar()
+
+    def test_one_checkout_and_one_commit(self):
+        from bot_core.database import unit_of_work
+        from bot_core.services.rules_service import set_rules, get_rules
+        from bot_core.services.warn_service import warn_user
+        with unit_of_work():
+            set_rules('c', 'be nice')
+            assert get_rules('c') == 'be nice'
+            warn_user('c', 'u', 'User', 'spam')
+            assert self.committed_rules('c') is None
+            checkouts = len(self.checkouts)
+        assert checkouts == 2  # the unit's connection and the probe above
+        assert self.committed_rules('c') == 'be nice'
+
+    def test_error_rolls_back_everything_and_caches(self):
+        from bot_core.database import unit_of_work
+        from bot_core.services.rules_service import set_rules, get_rules
+        from bot_core.services.blacklist_service import add_blacklist_word, check_blacklist
+        add_blacklist_word('c', 'spam')
+        assert check_blacklist('c', 'scam') is None
+        with pytest.raises(RuntimeError):
+            with unit_of_work():
+                set_rules('c', 'be nice')
+                add_blacklist_word('c', 'scam')
+                assert get_rules('c') == 'be nice'
+                raise RuntimeError('boom')
+        assert get_rules('c') is None
+        assert check_blacklist('c', 'scam') is None
+
+    def test_nested_block_is_a_savepoint(self):
+        from bot_core.database import unit_of_work
+        from bot_core.services.rules_service import set_rules, get_rules
+        from bot_core.services.welcome_service import set_welcome_message, get_welcome_message
+        with unit_of_work():
+            set_rules('c', 'be nice')
+            with pytest.raises(RuntimeError):
+                with unit_of_work():
+                    set_welcome_message('c', 'hi')
+                    raise RuntimeError('boom')
+        assert get_rules('c') == 'be nice'
+        assert get_welcome_message('c') is None
+
+    def test_service_rollback_keeps_the_unit(self):
+        from sqlalchemy.exc import IntegrityError
+        from bot_core.database import get_session, unit_of_work
+        from bot_core.db_models import Ban
+        from bot_core.services.ban_service import add_ban, is_banned
+        with unit_of_work():
+            assert add_ban('c', 'u1')
+            session = get_session()
+            session.add(Ban(chat_id='c', user_id='u1'))
+            with pytest.raises(IntegrityError):
+                session.commit()
+            session.rollback()
+            assert add_ban('c', 'u2')
+        assert is_banned('c', 'u1') and is_banned('c', 'u2')
+
+    def test_disabled_is_a_no_op(self):
+        from unittest.mock import patch
+        from bot_core.database import unit_of_work
+        from bot_core.services.rules_service import set_rules
+        with patch('bot_core.database.unit_of_work_enabled', False):
+            with unit_of_work():
+                set_rules('c', 'be nice')
+                assert self.committed_rules('c') == 'be nice'
+
+    def test_ai_actions_sent_after_commit(self):
+        from unittest.mock import MagicMock
+        from bot_core.moderation_pipeline import MessageContext
+        from bot_core.shared_bot_logic import SharedBotLogic
+        from bot_core.services.warn_service import set_warn_limit
+        set_warn_limit('c', 1)
+        seen = []
+
+        def committed_counts(*args):
+            with self.engine.connect() as conn:
+                seen.append((
+                    conn.execute(self.text("SELECT count FROM warn_counts WHERE chat_id = 'c'")).scalar(),
+                    conn.execute(self.text("SELECT COUNT(*) FROM bans WHERE chat_id = 'c'")).scalar(),
+                ))
+
+        actions = MagicMock()
+        actions.get_user_display.return_value = 'User'
+        actions.send_message.side_effect = committed_counts
+        actions.remove_participant.side_effect = committed_counts
+        ctx = MessageContext(chat_id='c', from_id='u', text='bad', message={'id': 'm1'})
+        SharedBotLogic(actions)._run_ai_actions(actions, ctx, {'action': 'warn', 'score': 0.9})
+        assert seen == [(1, 1), (1, 1)]
+        actions.remove_participant.assert_called_once_with('c', 'u')
+
+    def test_unit_opens_no_transaction_until_used(self):
+        from bot_core.database import unit_of_work
+        from bot_core.services.settings_cache import get_chat_settings
+        get_chat_settings('c')
+        checkouts = len(self.checkouts)
+        with unit_of_work():
+            get_chat_settings('c')
+        assert len(self.checkouts) == checkouts
+
+    def test_message_replies_sent_after_commit_and_ai_outside_unit(self):
+        from unittest.mock import MagicMock, patch
+        from bot_core.database import in_unit_of_work
+        from bot_core.shared_bot_logic import SharedBotLogic
+        from bot_core.services.blacklist_service import add_blacklist_word
+        add_blacklist_word('c', 'casino')
+        actions = MagicMock()
+        sends = []
+        actions.send_message.side_effect = lambda *args: sends.append(in_unit_of_work())
+        logic = SharedBotLogic(actions)
+        message = {'body': 'casino', 'from': 'u', 'chatId': 'c', 'isGroup': True, 'id': 'm1'}
+        logic.handle_message(message)
+        assert sends == [False]
+
+        ai_calls = []
+        with patch.object(logic, '_check_ai_moderation', side_effect=lambda *args: ai_calls.append(in_unit_of_work())):
+            logic.handle_message(dict(message, body='hello'))
+        assert ai_calls == [False]
+
+    def test_command_replies_and_removals_after_commit(self):
+        from unittest.mock import MagicMock
+        from bot_core.shared_bot_logic import SharedBotLogic
+        seen = []
+
+        def committed(*args):
+            with self.engine.connect() as conn:
+                seen.append((
+                    conn.execute(self.text("SELECT rules FROM rules WHERE chat_id = 'c'")).scalar(),
+                    conn.execute(self.text("SELECT COUNT(*) FROM bans WHERE chat_id = 'c'")).scalar(),
+                ))
+            return True
+
+        actions = MagicMock()
+        actions.is_admin.return_value = True
+        actions.get_user_display.return_value = 'User'
+        actions.send_message.side_effect = committed
+        actions.remove_participant.side_effect = committed
+        logic = SharedBotLogic(actions)
+        logic.handle_command('/setrules be nice', 'a', 'c', True, {'id': 'm1'})
+        assert seen == [('be nice', 0)]
+        logic.handle_command('/ban 0521234567', 'a', 'c', True, {'id': 'm2'})
+        assert seen[1:] == [('be nice', 1), ('be nice', 1)]
+        actions.remove_participant.assert_called_once_with('c', '972521234567@c.us')
+
+    def test_failed_command_drops_queued_replies(self):
+        from unittest.mock import MagicMock, patch
+        from bot_core.i18n import get_chat_text
+        from bot_core.shared_bot_logic import SharedBotLogic
+        actions = MagicMock()
+        actions.is_admin.return_value = True
+        logic = SharedBotLogic(actions)
+        with patch('bot_core.shared_bot_logic.should_delete_commands', side_effect=RuntimeError('boom')):
+            logic.handle_command('/setrules be nice', 'a', 'c', True, {'id': 'm1'})
+        assert [call.args[1] for call in actions.send_message.call_args_list] == [
+            get_chat_text('c', 'error_occurred')
+        ]
+        assert self.committed_rules('c') is None
@@ -186,6 +186,99 @@ class TestFloodServiceEdgeCases:
         # Implementation dependent - may or may not reset
 
 
+class TestSlidingWindowFloodDetector:
+    """Tests for the in-memory flood detector"""
+    
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        from bot_core.services.flood_detector import SlidingWindowFloodDetector
+        self.now = 1000.0
+        self.detector = SlidingWindowFloodDetector(
+            max_users=3, idle_timeout=60, sweep_interval=3600, clock=lambda: self.now
+        )
+    
+    def test_flood_after_limit(self):
+        """Test the message after the limit is flagged"""
+        results = [self.detector.hit('chat', 'user', 3, 10)[0] for _ in range(4)]
+        assert results == [False, False, False, True]
+    
+    def test_window_slides(self):
+        """Test old timestamps fall out of the window"""
+        for _ in range(3):
+            self.detector.hit('chat', 'user', 3, 10)
+        self.now += 11
+        flooding, recent = self.detector.hit('chat', 'user', 3, 10)
+        assert flooding is False
+        assert recent == 0
+    
+    def test_buffer_is_bounded(self):
+        """Test ring buffer never holds more than the limit"""
+        for _ in range(50):
+            self.detector.hit('chat', 'user', 5, 10)
+        _, _, timestamps = self.detector.snapshot()[0]
+        assert len(timestamps) == 5
+    
+    def test_lru_eviction(self):
+        """Test oldest users are dropped beyond max_users"""
+        for i in range(5):
+            self.detector.hit('chat', f'user_{i}', 5, 10)
+        assert len(self.detector) == 3
+        assert self.detector.reset('chat', 'user_0') is False
+        assert self.detector.reset('chat', 'user_4') is True
+    
+    def test_idle_eviction(self):
+        """Test idle users are evicted"""
+        self.detector.hit('chat', 'idle', 5, 10)
+        self.now += 30
+        self.detector.hit('chat', 'active', 5, 10)
+        self.now += 45
+        assert self.detector.evict_idle() == 1
+        assert self.detector.reset('chat', 'active') is True
+    
+    def test_snapshot_restore(self):
+        """Test snapshot round trip preserves the window"""
+        for _ in range(3):
+            self.detector.hit('chat', 'user', 3, 10)
+        entries = self.detector.snapshot()
+        self.detector.clear()
+        assert self.detector.restore(entries, capacity=3) == 1
+        assert self.detector.hit('chat', 'user', 3, 10)[0] is True
+
+
+class TestFloodSnapshot:
+    """Tests for persisting flood windows to the database"""
+    
+    @pytest.fixture(autouse=True)
+    def setup(self, test_db):
+        from bot_core.services.flood_service import (
+            check_flood, save_flood_snapshot, load_flood_snapshot, set_flood_limit
+        )
+        from bot_core.services.flood_detector import get_flood_detector
+        self.check_flood = check_flood
+        self.save = save_flood_snapshot
+        self.load = load_flood_snapshot
+        self.set_flood_limit = set_flood_limit
+        self.detector = get_flood_detector()
+    
+    def test_check_flood_writes_nothing(self, test_db):
+        """Test check_flood no longer inserts rows per message"""
+        from bot_core.db_models import FloodControl
+        for _ in range(10):
+            self.check_flood('chat', 'user')
+        assert test_db.query(FloodControl).count() == 0
+    
+    def test_snapshot_survives_restart(self):
+        """Test saved windows are restored after the detector is cleared"""
+        self.set_flood_limit('chat', 3)
+        for _ in range(3):
+            self.check_flood('chat', 'user')
+        assert self.save() == 3
+        
+        self.detector.clear()
+        assert self.load() == 1
+        assert self.check_flood('chat', 'user') is True
+
+
 class TestAntifloodSettings:
     """Tests for antiflood configuration"""
     
@@ -0,0 +1,91 @@
+"""
+Group Commit Tests
+Tests for batching writes from concurrent handlers into shared commits.
+"""
+import pytest
+import sys
+import os
+import threading
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+def run_threads(count, target):
+    results = [None] * count
+    errors = []
+    barrier = threading.Barrier(count)
+
+    def worker(n):
+        barrier.wait()
+        try:
+            results[n] = target(n)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    return results
+
+
+class TestGroupCommit:
+    """Test batched writes keep per-call results"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, test_db):
+        from bot_core import group_commit
+        self.committer = group_commit.GroupCommitter(max_batch_size=64, max_wait=0.05)
+        with patch.object(group_commit, 'DB_WRITE_MODE', 'batched'), \
+                patch.object(group_commit, '_committer', self.committer):
+            yield
+        self.committer.close()
+
+    def test_concurrent_warns_share_commits(self):
+        from bot_core.services.warn_service import warn_user, get_warn_count
+        results = run_threads(16, lambda n: warn_user('c', 'u', 'User', f"spam {n}"))
+        assert sorted(count for count, _ in results) == list(range(1, 17))
+        assert all(limit == 3 for _, limit in results)
+        assert get_warn_count('c', 'u') == 16
+        stats = self.committer.stats()
+        assert stats['writes'] == 16 and stats['commits'] < 16
+
+    def test_duplicate_bans_report_one_insert(self):
+        from bot_core.services.ban_service import add_ban, get_banned_users
+        results = run_threads(8, lambda n: add_ban('c', 'u', 'User'))
+        assert results.count(True) == 1
+        assert len(get_banned_users('c')) == 1
+
+    def test_failed_write_is_rolled_back_alone(self):
+        from bot_core.db_models import Rules
+        from bot_core.services.rules_service import get_rules
+
+        def bad(session):
+            session.add(Rules(chat_id='bad', rules='x'))
+            session.flush()
+            raise ValueError('boom')
+
+        def good(n):
+            return lambda session: session.add(Rules(chat_id=f"c{n}", rules='ok')) or n
+
+        def call(n):
+            if n == 0:
+                with pytest.raises(ValueError):
+                    self.committer.run(bad)
+                return None
+            return self.committer.run(good(n))
+
+        assert run_threads(6, call) == [None, 1, 2, 3, 4, 5]
+        assert get_rules('bad') is None
+        assert all(get_rules(f"c{n}") == 'ok' for n in range(1, 6))
+
+    def test_unit_of_work_writes_inline(self):
+        from bot_core.database import unit_of_work
+        from bot_core.services.warn_service import warn_user
+        with patch('bot_core.database.unit_of_work_enabled', True):
+            with unit_of_work():
+                assert warn_user('c', 'u', 'User') == (1, 3)
+        assert self.committer.stats()['writes'] == 0
@@ -0,0 +1,70 @@
+"""
+Tests for the group membership/role cache
+"""
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+MEMBERS = [
+    {'id': '111@c.us', 'isAdmin': True, 'isSuperAdmin': True},
+    {'id': '222@c.us', 'isAdmin': True, 'isSuperAdmin': False, 'lid': '9222@lid', 'phone': '222@c.us'},
+    {'id': '9333@lid', 'isAdmin': False, 'isSuperAdmin': False, 'lid': '9333@lid', 'phone': '333@c.us'},
+]
+
+
+class TestGroupRoleCache:
+    """Test group_roles.py"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        from bot_core.group_roles import GroupRoleCache
+        self.fetches = []
+        self.members = list(MEMBERS)
+        self.now = 0.0
+
+        def fetch(chat_id):
+            self.fetches.append(chat_id)
+            return self.members
+
+        self.cache = GroupRoleCache(fetch, ttl=60, clock=lambda: self.now)
+        self.group = 'group@g.us'
+
+    def test_roles_by_id_lid_and_phone(self):
+        """Test every identifier form resolves like the old linear scan"""
+        assert self.cache.get_role(self.group, '111@c.us') == 'superadmin'
+        assert self.cache.get_role(self.group, '222@s.whatsapp.net') == 'admin'
+        assert self.cache.get_role(self.group, '9222@lid') == 'admin'
+        assert self.cache.get_role(self.group, '333@c.us') == 'member'
+        assert self.cache.get_role(self.group, '9333@lid') == 'member'
+        assert self.cache.get_role(self.group, '444@c.us') == 'unknown'
+        assert self.fetches == [self.group]
+
+    def test_ttl_refetches(self):
+        """Test stale indexes are rebuilt"""
+        self.cache.get_role(self.group, '111@c.us')
+        self.now = 61
+        self.cache.get_role(self.group, '111@c.us')
+        assert len(self.fetches) == 2
+
+    def test_invalidate_picks_up_promotion(self):
+        """Test an admin change is visible after invalidation"""
+        assert self.cache.get_role(self.group, '333@c.us') == 'member'
+        self.members = [dict(m, isAdmin=True) if m['id'] == '9333@lid' else m for m in MEMBERS]
+        self.cache.invalidate(self.group)
+        assert self.cache.get_role(self.group, '333@c.us') == 'admin'
+
+    def test_failed_fetch_is_not_cached(self):
+        """Test an unavailable member list returns unknown and retries later"""
+        self.members = None
+        assert self.cache.get_role(self.group, '111@c.us') == 'unknown'
+        self.members = list(MEMBERS)
+        assert self.cache.get_role(self.group, '111@c.us') == 'superadmin'
+        assert len(self.cache) == 1
+
+    def test_warm(self):
+        """Test bulk warm-up loads every group once"""
+        assert self.cache.warm(['a@g.us', 'b@g.us']) == 2
+        self.cache.get_role('a@g.us', '111@c.us')
+        assert self.fetches == ['a@g.us', 'b@g.us']
@@ -400,6 +400,48 @@ class TestCommandHelp:
         assert 'help_note' in self.en
 
 
+class TestCompiledTemplates:
+    """Test pre-parsed templates and memoized help messages"""
+    
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        from bot_core.i18n import TRANSLATIONS, get_text
+        self.translations = TRANSLATIONS
+        self.get_text = get_text
+    
+    def test_matches_str_format(self):
+        """Test every template renders exactly like str.format"""
+        import string
+        for lang in self.translations:
+            for key, text in {**self.translations['en'], **self.translations[lang]}.items():
+                kwargs = {field: (0.5 if spec else '50%') for _, field, spec, _ in string.Formatter().parse(text) if field}
+                if kwargs:
+                    assert self.get_text(lang, key, **kwargs) == text.format(**kwargs), (lang, key)
+    
+    def test_percent_in_literal_text(self):
+        """Test literal % signs survive printf-style compilation"""
+        from bot_core.i18n import _compile_template
+        render = _compile_template('{name} is 100% {{done}}')
+        assert render({'name': 'x'}) == 'x is 100% {done}'
+    
+    def test_general_help_memoized(self):
+        """Test general help is rendered once per language and role"""
+        from bot_core.i18n import get_help_text, HELP_KEYS
+        admin = get_help_text('en', True)
+        assert admin is get_help_text('en', True)
+        assert admin == ''.join(self.translations['en'][key] for key in HELP_KEYS[True])
+        assert self.translations['en']['help_moderation_admin'] not in get_help_text('en', False)
+        assert get_help_text('xx', False) is get_help_text('en', False)
+    
+    def test_command_help(self):
+        """Test per-command help rendering"""
+        from bot_core.i18n import get_command_help
+        text = get_command_help('en', 'warn')
+        assert '/warn' in text
+        assert self.translations['en']['help_cmd_admin'] in text
+        assert get_command_help('en', 'nope') is None
+
+
 class TestAIHelpTranslations:
     """Test AI-specific help translations"""
     
@@ -0,0 +1,111 @@
+"""
+Join Aggregator Tests
+Tests for coalescing join bursts into one welcome per chat.
+"""
+import pytest
+import sys
+import os
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+class TestRenderWelcomes:
+    """Test filling and splitting welcome templates"""
+
+    def test_single_message(self):
+        from bot_core.join_aggregator import render_welcomes
+        assert render_welcomes('Hi {mention}!', ['a', 'b'], ['@a', '@b']) == [('Hi @a, @b!', ['a', 'b'])]
+
+    def test_splits_under_limit(self):
+        from bot_core.join_aggregator import render_welcomes
+        ids = [f"u{i}" for i in range(200)]
+        mentions = [f"@9725000{i:05d}" for i in range(200)]
+        messages = render_welcomes('Welcome {mention}! Say hi {mention}', ids, mentions, max_chars=500)
+        assert len(messages) > 1
+        assert all(len(text) <= 500 for text, _ in messages)
+        assert [i for _, chunk in messages for i in chunk] == ids
+        text, chunk = messages[0]
+        assert text.count(mentions[0]) == 2 and len(chunk) > 1
+
+    def test_without_placeholder(self):
+        from bot_core.join_aggregator import render_welcomes
+        assert render_welcomes('Welcome!', ['a', 'b'], ['@a', '@b']) == [('Welcome!', ['a', 'b'])]
+
+
+class TestJoinAggregator:
+    """Test per-chat join bursts"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        from bot_core.join_aggregator import JoinAggregator
+        self.flushed = []
+        self.done = threading.Event()
+
+        def flush(chat_id, participants):
+            self.flushed.append((chat_id, participants))
+            self.done.set()
+
+        self.make = lambda **kwargs: JoinAggregator(flush, **kwargs)
+
+    def test_window_collects_burst(self):
+        joins = self.make(window=0.05)
+        joins.add('g1', ['a', 'b'])
+        joins.add('g1', ['b', 'c'])
+        joins.add('g2', ['x'])
+        deadline = time.monotonic() + 2
+        while len(self.flushed) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        joins.stop()
+        assert sorted(self.flushed) == [('g1', ['a', 'b', 'c']), ('g2', ['x'])]
+        assert joins.stats() == {'joins': 5, 'bursts': 2, 'open_bursts': 0}
+
+    def test_max_batch_and_stop(self):
+        joins = self.make(window=60, max_batch=3)
+        joins.add('g1', ['a', 'b', 'c', 'd'])
+        assert self.flushed == [('g1', ['a', 'b', 'c', 'd'])]
+        joins.add('g1', ['e'])
+        joins.stop()
+        assert self.flushed[-1] == ('g1', ['e'])
+
+    def test_zero_window_is_immediate(self):
+        joins = self.make(window=0)
+        joins.add('g1', ['a', 'a', 'b'])
+        assert self.flushed == [('g1', ['a', 'b'])]
+
+
+class TestGroupJoinWelcome:
+    """Test SharedBotLogic welcomes join bursts together"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, test_db):
+        from unittest.mock import MagicMock
+        from bot_core.join_aggregator import JoinAggregator
+        from bot_core.shared_bot_logic import SharedBotLogic
+        self.actions = MagicMock()
+        self.actions.format_mention.side_effect = lambda user_id: f"@{user_id.split('@')[0]}"
+        self.logic = SharedBotLogic(self.actions)
+        self.logic.joins = JoinAggregator(self.logic._welcome_joiners, window=60)
+
+    def test_burst_gets_one_lookup_and_chunked_welcome(self):
+        from bot_core.outbound_queue import OUTBOUND_MAX_CHARS
+        from bot_core.services.welcome_service import set_welcome_message
+        set_welcome_message('g@g.us', 'Welcome {mention}!')
+        joiners = [f"97250{i:07d}@c.us" for i in range(400)]
+        for start in range(0, 400, 20):
+            self.logic.handle_group_join({'chatId': 'g@g.us', 'participants': joiners[start:start + 20]})
+        self.actions.send_message_with_mentions.assert_not_called()
+        self.logic.joins.stop()
+
+        self.actions.prefetch_contacts.assert_called_once_with(joiners)
+        calls = self.actions.send_message_with_mentions.call_args_list
+        assert 1 < len(calls) < 10
+        assert all(len(call.args[1]) <= OUTBOUND_MAX_CHARS for call in calls)
+        assert [i for call in calls for i in call.args[2]] == joiners
+
+    def test_no_welcome_no_burst(self):
+        self.logic.handle_group_join({'chatId': 'g@g.us', 'participants': ['a@c.us']})
+        self.logic.joins.stop()
+        assert self.logic.joins.stats()['bursts'] == 0
+        self.actions.send_message_with_mentions.assert_not_called()
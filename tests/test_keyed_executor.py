@@ -0,0 +1,67 @@
+"""
+Tests for the per-chat ordered executor
+"""
+import pytest
+import sys
+import os
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+class TestKeyedExecutor:
+    """Test keyed_executor.py"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        from bot_core.keyed_executor import KeyedExecutor, lane_for
+        self.KeyedExecutor = KeyedExecutor
+        self.lane_for = lane_for
+
+    def test_same_key_runs_in_order(self):
+        """Test tasks for one chat never reorder"""
+        executor = self.KeyedExecutor(lanes=4)
+        executor.start()
+        seen = {f'chat{c}': [] for c in range(8)}
+
+        def record(chat, i):
+            # Jitter so a reordering bug would show up
+            time.sleep(0.001 * (i % 3))
+            seen[chat].append(i)
+
+        for i in range(30):
+            for chat in seen:
+                assert executor.submit(chat, record, chat, i)
+        assert executor.join(timeout=10)
+        executor.stop()
+        assert all(order == list(range(30)) for order in seen.values())
+
+    def test_different_keys_run_concurrently(self):
+        """Test a slow chat does not block chats on other lanes"""
+        executor = self.KeyedExecutor(lanes=2)
+        executor.start()
+        slow_key = 'slow@g.us'
+        fast_key = next(f'fast{i}@g.us' for i in range(100)
+                        if self.lane_for(f'fast{i}@g.us', 2) != self.lane_for(slow_key, 2))
+        release = threading.Event()
+        done = threading.Event()
+
+        executor.submit(slow_key, release.wait, 5)
+        executor.submit(fast_key, done.set)
+        assert done.wait(2)
+        release.set()
+        executor.stop()
+
+    def test_lane_limit_rejects(self):
+        """Test a full lane rejects and counts the task"""
+        executor = self.KeyedExecutor(lanes=1, lane_queue_size=2, submit_timeout=0)
+        assert executor.submit('chat', print)
+        assert executor.submit('chat', print)
+        assert executor.submit('chat', print) is False
+        assert executor.stats()['rejected'] == 1
+
+    def test_lane_is_stable(self):
+        """Test lane assignment does not depend on hash randomization"""
+        assert self.lane_for('123@g.us', 8) == self.lane_for('123@g.us', 8)
+        assert 0 <= self.lane_for('123@g.us', 8) < 8
@@ -0,0 +1,95 @@
+"""
+Migration Tests
+Tests for adding indexes and constraints to an existing database.
+"""
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+class TestMigrate:
+    """Test bot_core.migrations against a database created before the indexes"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        from sqlalchemy import create_engine, text
+        from bot_core.db_models import Base
+        self.text = text
+        self.engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+        Base.metadata.create_all(self.engine)
+        with self.engine.begin() as conn:
+            for table in Base.metadata.sorted_tables:
+                for index in table.indexes:
+                    conn.execute(text(f"DROP INDEX {index.name}"))
+            conn.execute(text("INSERT INTO blacklist (chat_id, word) VALUES ('c', 'Spam'), ('c', 'spam'), ('c', 'eggs')"))
+            conn.execute(text("INSERT INTO bans (chat_id, user_id) VALUES ('c', 'u'), ('c', 'u')"))
+        yield
+        self.engine.dispose()
+
+    def query(self, sql):
+        with self.engine.connect() as conn:
+            return conn.execute(self.text(sql)).fetchall()
+
+    def test_adds_missing_indexes(self):
+        from bot_core.migrations import migrate
+        expected = ['ix_flood_control_chat_user_time', 'ix_flood_control_time', 'ix_warns_chat_user',
+                    'uq_bans_chat_user', 'uq_blacklist_chat_word']
+        assert sorted(migrate(self.engine, dry_run=True)) == expected
+        assert sorted(migrate(self.engine)) == expected
+        names = {name for (name,) in self.query("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        assert set(expected) <= names
+
+    def test_idempotent(self):
+        from bot_core.migrations import migrate
+        migrate(self.engine)
+        assert migrate(self.engine) == []
+        assert migrate(self.engine, dry_run=True) == []
+
+    def test_removes_duplicates_before_unique_index(self):
+        from bot_core.migrations import migrate
+        migrate(self.engine)
+        assert self.query("SELECT word FROM blacklist ORDER BY id") == [('Spam',), ('eggs',)]
+        assert len(self.query("SELECT id FROM bans")) == 1
+
+    def test_unique_index_is_case_insensitive(self):
+        from sqlalchemy.exc import IntegrityError
+        from bot_core.migrations import migrate
+        migrate(self.engine)
+        with pytest.raises(IntegrityError):
+            with self.engine.begin() as conn:
+                conn.execute(self.text("INSERT INTO blacklist (chat_id, word) VALUES ('c', 'SPAM')"))
+
+    def test_lookups_use_indexes(self):
+        from bot_core.migrations import migrate
+        migrate(self.engine)
+        plans = {
+            "SELECT * FROM warns WHERE chat_id = 'c' AND user_id = 'u'": 'ix_warns_chat_user',
+            "SELECT * FROM bans WHERE chat_id = 'c' AND user_id = 'u'": 'uq_bans_chat_user',
+            "SELECT * FROM blacklist WHERE chat_id = 'c' AND lower(word) = lower('x')": 'uq_blacklist_chat_word',
+        }
+        for sql, index in plans.items():
+            plan = ' '.join(str(row[-1]) for row in self.query(f"EXPLAIN QUERY PLAN {sql}"))
+            assert index in plan, plan
+
+
+class TestServicesWithConstraints:
+    """Test services against the unique indexes"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, test_db):
+        pass
+
+    def test_blacklist_case_insensitive(self):
+        from bot_core.services.blacklist_service import add_blacklist_word, remove_blacklist_word, get_blacklist_words
+        assert add_blacklist_word('c', 'Spam')
+        assert add_blacklist_word('c', 'SPAM')
+        assert get_blacklist_words('c') == ['Spam']
+        assert remove_blacklist_word('c', 'spam')
+        assert get_blacklist_words('c') == []
+
+    def test_duplicate_ban(self):
+        from bot_core.services.ban_service import add_ban
+        assert add_ban('c', 'u') is True
+        assert add_ban('c', 'u') is False
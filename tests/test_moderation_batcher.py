@@ -0,0 +1,177 @@
+"""
+Tests for the moderation micro-batching dispatcher
+"""
+import pytest
+import sys
+import os
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+class TestMicroBatcher:
+    """Test moderation_batcher.py"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        from bot_core.moderation_batcher import MicroBatcher
+        self.MicroBatcher = MicroBatcher
+        self.batches = []
+
+    def _send(self, items):
+        self.batches.append(list(items))
+        return [item.upper() for item in items]
+
+    def _call_concurrently(self, batcher, items, timeout=2):
+        results = {}
+
+        def worker(item):
+            results[item] = batcher.call(item, timeout=timeout)
+
+        threads = [threading.Thread(target=worker, args=(item,)) for item in items]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return results
+
+    def test_concurrent_calls_share_a_request(self):
+        """Test items arriving within the window are sent together"""
+        batcher = self.MicroBatcher(self._send, max_batch_size=50, max_wait=0.2)
+        items = [f'msg{i}' for i in range(20)]
+        results = self._call_concurrently(batcher, items)
+        batcher.close()
+
+        assert results == {item: item.upper() for item in items}
+        assert len(self.batches) < len(items)
+        assert sum(len(b) for b in self.batches) == len(items)
+
+    def test_batch_size_cap(self):
+        """Test a full batch is sent without waiting for the window"""
+        batcher = self.MicroBatcher(self._send, max_batch_size=4, max_wait=5)
+        start = time.monotonic()
+        self._call_concurrently(batcher, [f'msg{i}' for i in range(8)])
+        batcher.close()
+
+        assert time.monotonic() - start < 5
+        assert all(len(b) <= 4 for b in self.batches)
+
+    def test_caller_timeout_is_independent(self):
+        """Test a slow batch times out one caller without breaking the batcher"""
+        release = threading.Event()
+
+        def slow_send(items):
+            release.wait(2)
+            return items
+
+        batcher = self.MicroBatcher(slow_send, max_wait=0.01)
+        with pytest.raises(TimeoutError):
+            batcher.call('slow', timeout=0.05)
+        release.set()
+        assert batcher.call('fast', timeout=2) == 'fast'
+        batcher.close()
+
+    def test_errors_reach_every_caller(self):
+        """Test a failed request fails each waiting caller"""
+        def failing_send(items):
+            raise RuntimeError('API down')
+
+        batcher = self.MicroBatcher(failing_send, max_wait=0.01)
+        with pytest.raises(RuntimeError):
+            batcher.call('one', timeout=2)
+        batcher.close()
+
+
+    def test_call_after_close_sends_directly(self):
+        """Test a caller holding a closed batcher is served at once"""
+        from bot_core.moderation_batcher import BatcherClosed
+        batcher = self.MicroBatcher(self._send, max_wait=0.01)
+        assert batcher.call('one', timeout=2) == 'ONE'
+        batcher.close()
+        with pytest.raises(BatcherClosed):
+            batcher.submit('two')
+        start = time.monotonic()
+        assert batcher.call('two', timeout=2) == 'TWO'
+        assert time.monotonic() - start < 1
+        assert self.batches[-1] == ['two']
+
+
+class TestModeratorBatching:
+    """Test ContentModerator sends concurrent texts in one request"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, test_db):
+        from bot_core.content_filter import ContentModerator
+        from bot_core.moderation_batcher import MicroBatcher
+        from bot_core.moderation_cache import VerdictCache
+
+        self.moderator = ContentModerator(backend='openai', verdict_cache=VerdictCache())
+        self.client = MagicMock()
+
+        def create(model, input):
+            return MagicMock(results=[
+                {'flagged': False, 'categories': {}, 'category_scores': {'hate': 0.9 if 'hate' in text else 0.0}}
+                for text in input
+            ])
+
+        self.client.moderations.create.side_effect = create
+        self.moderator.client = self.client
+        self.moderator.openai_client_type = 'new'
+        self.moderator.batcher = MicroBatcher(self.moderator._fetch_openai_batch, max_wait=0.2)
+        yield
+        self.moderator.batcher.close()
+
+    def test_results_fan_out_to_callers(self):
+        """Test each caller gets its own verdict from a shared request"""
+        texts = [f'message number {i}' for i in range(10)] + ['i hate this']
+        results = {}
+
+        def worker(text):
+            results[text] = self.moderator.check_message(text, {'toxicity': 0.5})
+
+        threads = [threading.Thread(target=worker, args=(text,)) for text in texts]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert self.client.moderations.create.call_count < len(texts)
+        assert results['i hate this'].is_flagged is True
+        assert not any(r.is_flagged for text, r in results.items() if text != 'i hate this')
+
+
+class TestOpenAIBackendBatching:
+    """Test OpenAIBackend shares requests between concurrent checks"""
+
+    def test_concurrent_checks_share_a_post(self):
+        from bot_core.services.ai_backends import openai_backend
+
+        def post(url, json, headers, timeout):
+            response = MagicMock()
+            response.json.return_value = {'results': [
+                {'flagged': 'hate' in text, 'categories': {'hate': 'hate' in text},
+                 'category_scores': {'hate': 0.95 if 'hate' in text else 0.01}}
+                for text in json['input']
+            ]}
+            return response
+
+        backend = openai_backend.OpenAIBackend(api_key='batch-test-key')
+        backend._get_batcher().max_wait = 0.2
+        texts = ['hello there', 'i hate you', 'good morning', 'see you']
+        results = {}
+
+        def worker(text):
+            results[text] = openai_backend.OpenAIBackend(api_key='batch-test-key').check_toxicity(text)
+
+        with patch.object(openai_backend.requests, 'post', side_effect=post) as mock_post:
+            threads = [threading.Thread(target=worker, args=(text,)) for text in texts]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+        assert mock_post.call_count < len(texts)
+        assert results['i hate you']['is_toxic'] is True
+        assert results['hello there']['is_toxic'] is False
@@ -0,0 +1,98 @@
+"""
+Tests for the moderation verdict cache
+"""
+import pytest
+import sys
+import os
+from unittest.mock import MagicMock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+class TestVerdictCache:
+    """Test moderation_cache.py"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, test_db):
+        from bot_core.moderation_cache import CachedVerdict, VerdictCache, normalize_text
+        self.CachedVerdict = CachedVerdict
+        self.VerdictCache = VerdictCache
+        self.normalize_text = normalize_text
+        self.now = 1000.0
+        self.cache = VerdictCache(max_size=2, ttl=60, clock=lambda: self.now)
+
+    def test_normalization(self):
+        """Test case, whitespace, emoji and zero-width characters are folded away"""
+        assert self.normalize_text('  BUY\u200b  now 🔥🔥\n') == 'buy now'
+        assert self.normalize_text('שלום  👋🏽 עולם') == 'שלום עולם'
+        assert self.normalize_text('Free ❤️ money') == self.normalize_text('free money')
+
+    def test_variants_share_a_verdict(self):
+        """Test near-identical copies hit the same entry"""
+        verdict = self.CachedVerdict(scores={'hate': 0.9})
+        self.cache.put('openai', 'Click HERE now', verdict)
+        assert self.cache.get('openai', 'click here  now 🚀') is verdict
+        assert self.cache.get('other', 'click here now') is None
+        assert self.cache.hits == 1
+        assert self.cache.misses == 1
+        assert self.cache.hit_rate == 0.5
+
+    def test_ttl_and_lru(self):
+        """Test entries expire and the cache stays bounded"""
+        for text in ('one', 'two', 'three'):
+            self.cache.put('openai', text, self.CachedVerdict(scores={}))
+        assert len(self.cache) == 2
+        assert self.cache.get('openai', 'one') is None
+        self.now += 61
+        assert self.cache.get('openai', 'three') is None
+
+    def test_persisted_verdicts_survive_restart(self):
+        """Test verdicts are read back from the database after a restart"""
+        cache = self.VerdictCache(persist=True, clock=lambda: self.now)
+        cache.put('openai', 'spam spam', self.CachedVerdict(scores={'hate': 0.4}, flagged_categories=('hate',)))
+
+        restarted = self.VerdictCache(persist=True, clock=lambda: self.now)
+        verdict = restarted.get('openai', 'SPAM spam')
+        assert verdict.scores == {'hate': 0.4}
+        assert verdict.flagged_categories == ('hate',)
+
+        self.now += restarted.ttl
+        assert restarted.purge_expired() >= 1
+        assert self.VerdictCache(persist=True, clock=lambda: self.now).get('openai', 'spam spam') is None
+
+
+class TestModeratorUsesVerdictCache:
+    """Test ContentModerator only calls the API once per fingerprint"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, test_db):
+        from bot_core.content_filter import ContentModerator
+        from bot_core.moderation_cache import VerdictCache
+
+        self.moderator = ContentModerator(backend='openai', verdict_cache=VerdictCache())
+        self.client = MagicMock()
+        self.client.Moderation.create.return_value = {'results': [{
+            'flagged': True,
+            'categories': {'hate': True},
+            'category_scores': {'hate': 0.6},
+        }]}
+        self.moderator.client = self.client
+        self.moderator.openai_client_type = 'legacy'
+
+    def test_thresholds_applied_after_lookup(self):
+        """Test a cached verdict is re-evaluated against each caller's thresholds"""
+        strict = self.moderator.check_message('I hate you all', {'toxicity': 0.5})
+        lenient = self.moderator.check_message('i  HATE you all 😡', {'toxicity': 0.9})
+
+        assert self.client.Moderation.create.call_count == 1
+        assert strict.is_flagged is True
+        assert lenient.is_flagged is False
+        assert 'below thresholds: hate' in lenient.reason
+        assert self.moderator.verdict_cache.hits == 1
+
+    def test_errors_are_not_cached(self):
+        """Test backend errors do not poison the cache"""
+        self.client.Moderation.create.side_effect = Exception('API Error')
+        result = self.moderator.check_message('some message here')
+        assert result.reason == 'OpenAI backend error'
+        assert len(self.moderator.verdict_cache) == 0
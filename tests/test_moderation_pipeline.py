@@ -0,0 +1,134 @@
+"""
+Tests for the cost-ordered moderation pipeline
+"""
+import pytest
+import sys
+import os
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+class TestModerationPipeline:
+    """Test moderation_pipeline.py"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        from bot_core.moderation_pipeline import MessageContext, ModerationPipeline, ModerationStage
+        self.Pipeline = ModerationPipeline
+        self.Stage = ModerationStage
+        self.ctx = MessageContext(chat_id='g@g.us', from_id='u@c.us', text='hello')
+        self.calls = []
+
+    def _stage(self, name, cost, result=None, terminal=True):
+        def check(ctx):
+            self.calls.append(name)
+            return result
+        return self.Stage(name, cost=cost, check=check, act=lambda ctx, d: self.calls.append(f'{name}:act'),
+                          terminal=terminal)
+
+    def test_runs_cheapest_first_and_short_circuits(self):
+        """Test a cheap decisive stage prevents the expensive one"""
+        pipeline = self.Pipeline([
+            self._stage('ai', 100, result={'is_toxic': True}),
+            self._stage('blacklist', 1, result='spam'),
+        ])
+        verdict = pipeline.run(self.ctx)
+        assert verdict.stage == 'blacklist'
+        assert verdict.detail == 'spam'
+        assert self.calls == ['blacklist', 'blacklist:act']
+
+    def test_non_terminal_stage_continues(self):
+        """Test non-terminal stages act and let later stages run"""
+        pipeline = self.Pipeline([
+            self._stage('audit', 0, result='seen', terminal=False),
+            self._stage('locks', 2),
+        ])
+        assert pipeline.run(self.ctx) is None
+        assert self.calls == ['audit', 'audit:act', 'locks']
+
+    def test_failing_stage_is_skipped(self):
+        """Test one broken stage does not disable the rest"""
+        def broken(ctx):
+            raise RuntimeError('boom')
+        pipeline = self.Pipeline([self.Stage('broken', 1, check=broken), self._stage('locks', 2, result='links')])
+        assert pipeline.run(self.ctx).stage == 'locks'
+
+    def test_stage_timings(self):
+        """Test per-stage timings are recorded"""
+        pipeline = self.Pipeline([self._stage('blacklist', 1, result='spam'), self._stage('ai', 100)])
+        pipeline.run(self.ctx)
+        pipeline.run(self.ctx)
+        stats = pipeline.stats()
+        assert stats['blacklist']['calls'] == 2
+        assert stats['blacklist']['hits'] == 2
+        assert 'ai' not in stats
+
+    def test_run_split_by_cost(self):
+        """Test a run split at a cost bound covers every stage once, in order"""
+        pipeline = self.Pipeline([self._stage('blacklist', 1), self._stage('locks', 2), self._stage('ai', 100)])
+        assert pipeline.run(self.ctx, max_cost=2) is None
+        assert self.calls == ['blacklist', 'locks']
+        assert pipeline.run(self.ctx, min_cost=2) is None
+        assert self.calls == ['blacklist', 'locks', 'ai']
+
+    def test_add_replaces_by_name(self):
+        """Test stages can be swapped out"""
+        pipeline = self.Pipeline([self._stage('ai', 100)])
+        pipeline.add(self._stage('ai', 50))
+        assert [s.cost for s in pipeline.stages] == [50]
+        assert pipeline.remove('ai') is True
+        assert pipeline.stages == []
+
+
+class TestSharedBotLogicModeration:
+    """Test handle_message runs moderation through the pipeline"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, test_db):
+        from bot_core.shared_bot_logic import SharedBotLogic
+        from bot_core.services.blacklist_service import add_blacklist_word
+        self.actions = MagicMock()
+        self.logic = SharedBotLogic(self.actions)
+        self.chat_id = 'pipeline@g.us'
+        add_blacklist_word(self.chat_id, 'casino')
+
+    def _message(self, body):
+        return {'body': body, 'from': 'u@c.us', 'chatId': self.chat_id, 'isGroup': True, 'id': 'm1'}
+
+    def test_blacklisted_message_skips_ai(self):
+        """Test blatant spam never costs an AI call"""
+        with patch.object(self.logic, '_check_ai_moderation') as ai:
+            self.logic.handle_message(self._message('best casino in town'))
+        ai.assert_not_called()
+        self.actions.send_message.assert_called_once()
+
+    def test_clean_message_reaches_ai(self):
+        """Test messages passing the cheap stages are sent to the AI stage"""
+        with patch.object(self.logic, '_check_ai_moderation', return_value=None) as ai:
+            self.logic.handle_message(self._message('good morning everyone'))
+        ai.assert_called_once_with(self.chat_id, 'good morning everyone')
+        assert [s.name for s in self.logic.moderation.stages] == ['blacklist', 'locks', 'ai']
+
+    def test_ai_actions_use_one_batch(self):
+        """Test an AI verdict's report, delete and ban are collected into one batch"""
+        from contextlib import contextmanager
+        batched = MagicMock()
+        batched.get_user_display.return_value = 'User'
+        batches = []
+
+        @contextmanager
+        def batch():
+            batches.append(batched)
+            yield batched
+
+        self.actions.batch = batch
+        verdict = {'action': 'delete_ban', 'score': 0.97, 'backend': 'openai', 'reason': 'toxic'}
+        with patch.object(self.logic, '_check_ai_moderation', return_value=verdict):
+            self.logic.handle_message(self._message('something toxic'))
+
+        assert len(batches) == 1
+        batched.send_message.assert_called_once()
+        batched.delete_message.assert_called_once_with(self.chat_id, 'm1')
+        batched.remove_participant.assert_called_once_with(self.chat_id, 'u@c.us')
+        self.actions.remove_participant.assert_not_called()
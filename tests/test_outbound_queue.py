@@ -0,0 +1,181 @@
+"""
+Outbound Queue Tests
+Tests for per-chat rate limiting, coalescing and retries of outbound messages.
+"""
+import pytest
+import sys
+import os
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+class FakeBridge:
+    """Records deliveries; fails the first ``failures`` calls with ``error``"""
+
+    def __init__(self, failures=0, error=None, delay=0.0):
+        self.calls = []
+        self.failures = failures
+        self.error = error or ConnectionError('bridge down')
+        self.delay = delay
+        self._lock = threading.Lock()
+
+    def deliver(self, chat_id, text, mention_ids=None):
+        time.sleep(self.delay)
+        with self._lock:
+            self.calls.append((chat_id, text, mention_ids, time.monotonic()))
+            if self.failures:
+                self.failures -= 1
+                raise self.error
+            return f"msg-{len(self.calls)}"
+
+
+class TestTokenBucket:
+    """Test the per-chat token bucket"""
+
+    def test_burst_then_rate(self):
+        from bot_core.outbound_queue import TokenBucket
+        now = [0.0]
+        bucket = TokenBucket(rate=2, burst=3, clock=lambda: now[0])
+        assert [bucket.take() for _ in range(3)] == [0, 0, 0]
+        assert bucket.take() == pytest.approx(0.5)
+        now[0] += 0.5
+        assert bucket.take() == 0
+        assert not bucket.full()
+        now[0] += 10
+        assert bucket.full()
+
+
+class TestOutboundDispatcher:
+    """Test the outbound dispatcher"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        from bot_core.outbound_queue import OutboundDispatcher
+        self.make = lambda bridge, **kwargs: OutboundDispatcher(
+            bridge.deliver, **{'coalesce_window': 0.05, 'retry_base': 0.01, 'retry_max': 0.02, **kwargs})
+        self.dispatchers = []
+        yield
+        for dispatcher in self.dispatchers:
+            dispatcher.stop(timeout=1)
+
+    def dispatcher(self, bridge, **kwargs):
+        dispatcher = self.make(bridge, **kwargs)
+        self.dispatchers.append(dispatcher)
+        return dispatcher
+
+    def test_send_does_not_block(self):
+        bridge = FakeBridge(delay=0.2)
+        dispatcher = self.dispatcher(bridge)
+        start = time.monotonic()
+        message = dispatcher.send('g1@g.us', 'hello')
+        assert time.monotonic() - start < 0.1
+        assert message.wait(2) == 'msg-1'
+
+    def test_consecutive_texts_coalesced(self):
+        bridge = FakeBridge()
+        dispatcher = self.dispatcher(bridge)
+        first = dispatcher.send('g1@g.us', 'AI report')
+        second = dispatcher.send('g1@g.us', 'Warned 1/3')
+        third = dispatcher.send('g1@g.us', 'Banned', mention_ids=['u1@c.us'])
+        assert dispatcher.flush(2)
+        assert [(c[0], c[1], c[2]) for c in bridge.calls] == [
+            ('g1@g.us', 'AI report\n\nWarned 1/3\n\nBanned', ['u1@c.us'])]
+        assert first.wait() == second.wait() == third.wait() == 'msg-1'
+        assert first.coalesced
+        assert dispatcher.stats()['coalesced'] == 2
+
+    def test_max_chars_splits_batches(self):
+        bridge = FakeBridge()
+        dispatcher = self.dispatcher(bridge, max_chars=12)
+        for text in ('aaaaa', 'bbbbb', 'ccccc'):
+            dispatcher.send('g1@g.us', text)
+        assert dispatcher.flush(2)
+        assert [c[1] for c in bridge.calls] == ['aaaaa\n\nbbbbb', 'ccccc']
+
+    def test_chats_are_not_merged(self):
+        bridge = FakeBridge()
+        dispatcher = self.dispatcher(bridge)
+        dispatcher.send('g1@g.us', 'one')
+        dispatcher.send('g2@g.us', 'two')
+        assert dispatcher.flush(2)
+        assert sorted((c[0], c[1]) for c in bridge.calls) == [('g1@g.us', 'one'), ('g2@g.us', 'two')]
+
+    def test_rate_limited_per_chat(self):
+        bridge = FakeBridge()
+        dispatcher = self.dispatcher(bridge, rate=10, burst=1, coalesce_window=0, max_chars=1)
+        for text in ('a', 'b', 'c'):
+            dispatcher.send('g1@g.us', text)
+        dispatcher.send('g2@g.us', 'x')
+        assert dispatcher.flush(2)
+        g1 = [c for c in bridge.calls if c[0] == 'g1@g.us']
+        assert [c[1] for c in g1] == ['a', 'b', 'c']
+        assert g1[2][3] - g1[0][3] >= 0.18
+        g2 = [c for c in bridge.calls if c[0] == 'g2@g.us']
+        assert g2[0][3] - g1[0][3] < 0.05
+
+    def test_transient_failure_retried(self):
+        bridge = FakeBridge(failures=2)
+        dispatcher = self.dispatcher(bridge)
+        message = dispatcher.send('g1@g.us', 'hello')
+        assert dispatcher.flush(2)
+        assert message.wait() == 'msg-3'
+        assert message.error is None
+        assert dispatcher.stats()['retried'] == 2
+
+    def test_gives_up_after_max_attempts(self):
+        bridge = FakeBridge(failures=10)
+        dispatcher = self.dispatcher(bridge, max_attempts=3)
+        message = dispatcher.send('g1@g.us', 'hello')
+        assert dispatcher.flush(2)
+        assert message.wait() is None
+        assert isinstance(message.error, ConnectionError)
+        assert len(bridge.calls) == 3
+        assert dispatcher.stats()['failed'] == 1
+
+    def test_permanent_failure_not_retried(self):
+        bridge = FakeBridge(failures=1, error=ValueError('bad chat'))
+        dispatcher = self.dispatcher(bridge, is_transient=lambda e: isinstance(e, ConnectionError))
+        message = dispatcher.send('g1@g.us', 'hello')
+        assert dispatcher.flush(2)
+        assert message.wait() is None
+        assert len(bridge.calls) == 1
+
+    def test_flush_times_out(self):
+        bridge = FakeBridge(delay=0.5)
+        dispatcher = self.dispatcher(bridge)
+        dispatcher.send('g1@g.us', 'slow')
+        assert dispatcher.flush(0.05) is False
+        assert dispatcher.flush(2) is True
+
+
+class TestClientOutbound:
+    """Test the bridge client's outbound wiring"""
+
+    def test_transient_errors(self):
+        import requests
+        from bot_core.whatsapp_bridge_client import WhatsAppBridgeClient
+
+        def http_error(status):
+            response = requests.Response()
+            response.status_code = status
+            return requests.HTTPError(response=response)
+
+        assert WhatsAppBridgeClient._is_transient_error(requests.ConnectionError())
+        assert WhatsAppBridgeClient._is_transient_error(requests.Timeout())
+        assert WhatsAppBridgeClient._is_transient_error(http_error(503))
+        assert WhatsAppBridgeClient._is_transient_error(http_error(429))
+        assert not WhatsAppBridgeClient._is_transient_error(http_error(400))
+        assert not WhatsAppBridgeClient._is_transient_error(ValueError())
+
+    def test_queue_mention_uses_mention_endpoint(self):
+        from unittest.mock import patch
+        from bot_core.whatsapp_bridge_client import WhatsAppBridgeClient
+        client = WhatsAppBridgeClient(webhook_workers=0)
+        with patch.object(client, '_request', return_value={'messageId': 'm1'}) as mock_request:
+            assert client.queue_mention('g1@g.us', 'hi @u1', ['u1@c.us']).wait(2) == 'm1'
+            assert client.queue_message('g2@g.us', 'hello').wait(2) == 'm1'
+            client.close()
+        paths = sorted(call.args[1] for call in mock_request.call_args_list)
+        assert paths == ['/send-mention', '/send-message']
@@ -0,0 +1,115 @@
+"""
+Tests for the per-chat settings snapshot cache
+"""
+import pytest
+import sys
+import os
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+class TestChatSettingsCache:
+    """Test settings_cache.py"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, test_db):
+        from bot_core.services.settings_cache import (
+            ChatSettingsCache, get_chat_settings, get_settings_cache
+        )
+        self.ChatSettingsCache = ChatSettingsCache
+        self.get_chat_settings = get_chat_settings
+        self.cache = get_settings_cache()
+        self.chat_id = 'cache_chat@g.us'
+
+    def test_defaults_for_unknown_chat(self):
+        """Test snapshot of a chat with no settings"""
+        snapshot = self.get_chat_settings('unknown@g.us')
+        assert snapshot.language is None
+        assert snapshot.ai is None
+        assert snapshot.blacklist == ()
+        assert snapshot.delete_commands is False
+
+    def test_snapshot_loads_all_settings(self):
+        """Test one load covers every service"""
+        from bot_core.services.language_service import set_chat_language
+        from bot_core.services.locks_service import set_lock
+        from bot_core.services.rules_service import set_rules
+        from bot_core.services.welcome_service import set_welcome_message
+        from bot_core.services.blacklist_service import add_blacklist_word
+        from bot_core.services.warn_service import set_warn_limit
+        from bot_core.services.flood_service import set_flood_limit
+        from bot_core.services.ai_moderation_service import set_ai_enabled, set_ai_category_thresholds
+
+        set_chat_language(self.chat_id, 'he')
+        set_lock(self.chat_id, 'links', True)
+        set_rules(self.chat_id, 'Be nice')
+        set_welcome_message(self.chat_id, 'Hi {mention}')
+        add_blacklist_word(self.chat_id, 'spam')
+        set_warn_limit(self.chat_id, 4)
+        set_flood_limit(self.chat_id, 7, 20)
+        set_ai_enabled(self.chat_id, True)
+        set_ai_category_thresholds(self.chat_id, ['spam'], 80)
+
+        snapshot = self.get_chat_settings(self.chat_id)
+        assert snapshot.language == 'he'
+        assert snapshot.locks['links'] is True
+        assert snapshot.rules == 'Be nice'
+        assert snapshot.welcome == 'Hi {mention}'
+        assert snapshot.blacklist == ('spam',)
+        assert snapshot.warn_limit == 4
+        assert snapshot.flood == {'limit': 7, 'timeframe': 20}
+        assert snapshot.ai['enabled'] is True
+        assert snapshot.ai_thresholds == {'spam': 0.8}
+
+    def test_warm_cache_makes_no_db_calls(self):
+        """Test message-path getters are served from memory once warm"""
+        from bot_core.services.ai_moderation_service import get_ai_settings
+        from bot_core.services.blacklist_service import check_blacklist
+        from bot_core.services.locks_service import get_locks
+        from bot_core.services.chat_config_service import should_delete_commands
+        from bot_core.services.language_service import get_chat_language
+
+        self.get_chat_settings(self.chat_id)
+        with patch('bot_core.services.settings_cache.get_read_session', side_effect=AssertionError('DB hit')):
+            get_ai_settings(self.chat_id)
+            check_blacklist(self.chat_id, 'hello world')
+            get_locks(self.chat_id)
+            should_delete_commands(self.chat_id)
+            get_chat_language(self.chat_id)
+        assert self.cache.hits >= 5
+
+    def test_setter_invalidates(self):
+        """Test write-through invalidation"""
+        from bot_core.services.rules_service import set_rules, get_rules, clear_rules
+
+        assert get_rules(self.chat_id) is None
+        set_rules(self.chat_id, 'First')
+        assert get_rules(self.chat_id) == 'First'
+        set_rules(self.chat_id, 'Second')
+        assert get_rules(self.chat_id) == 'Second'
+        clear_rules(self.chat_id)
+        assert get_rules(self.chat_id) is None
+
+    def test_lru_bound(self):
+        """Test cache size is bounded"""
+        cache = self.ChatSettingsCache(max_chats=2)
+        for i in range(5):
+            cache.get(f'chat_{i}')
+        assert len(cache) == 2
+
+    def test_invalidate_during_load_is_not_cached(self):
+        """Test a load racing with a write does not cache stale data"""
+        from bot_core.services import settings_cache
+
+        cache = self.ChatSettingsCache()
+        real_load = settings_cache.load_chat_settings
+
+        def racing_load(chat_id):
+            snapshot = real_load(chat_id)
+            cache.invalidate(chat_id)
+            return snapshot
+
+        with patch.object(settings_cache, 'load_chat_settings', side_effect=racing_load):
+            cache.get(self.chat_id)
+        assert len(cache) == 0
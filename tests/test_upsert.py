@@ -0,0 +1,121 @@
+"""
+Upsert Tests
+Tests for single-statement upserts used by the setter services.
+"""
+import pytest
+import sys
+import os
+import threading
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+class TestOnConflictUpdate:
+    """Test the SQL the upsert construct compiles to"""
+
+    def test_compiles_for_sqlite_and_postgres(self):
+        from sqlalchemy.dialects import postgresql, sqlite
+        from bot_core.db_models import Lock
+        from bot_core.upsert import OnConflictUpdate
+        statement = OnConflictUpdate(Lock.__table__, {'chat_id': 'c', 'lock_links': True}, ['chat_id'], ['lock_links'])
+        for dialect in (sqlite.dialect(), postgresql.dialect()):
+            sql = str(statement.compile(dialect=dialect))
+            assert sql.startswith('INSERT INTO locks')
+            assert sql.endswith('ON CONFLICT (chat_id) DO UPDATE SET lock_links = excluded.lock_links')
+            # Column defaults still fill the other columns on insert
+            assert 'lock_stickers' in sql
+
+    def test_quotes_reserved_names(self):
+        from sqlalchemy.dialects import sqlite
+        from bot_core.db_models import FloodSettings
+        from bot_core.upsert import OnConflictUpdate
+        statement = OnConflictUpdate(FloodSettings.__table__, {'chat_id': 'c', 'limit': 3}, ['chat_id'], ['limit'])
+        assert 'SET "limit" = excluded."limit"' in str(statement.compile(dialect=sqlite.dialect()))
+
+
+class TestSetterServices:
+    """Test setters built on upsert"""
+
+    @pytest.fixture(autouse=True, params=[True, False], ids=['on-conflict', 'fallback'])
+    def setup(self, request, test_db):
+        with patch('bot_core.upsert.supports_on_conflict', return_value=request.param):
+            yield
+
+    def test_set_lock_keeps_other_columns(self):
+        from bot_core.services.locks_service import set_lock, get_locks
+        assert set_lock('c', 'links', True)
+        assert set_lock('c', 'stickers', True)
+        assert set_lock('c', 'links', False)
+        assert get_locks('c')['links'] is False and get_locks('c')['stickers'] is True
+        assert set_lock('c', 'bogus', True) is False
+
+    def test_ai_settings_defaults_and_updates(self):
+        from bot_core.services.ai_moderation_service import set_ai_action, set_ai_enabled, get_ai_settings
+        assert set_ai_action('c', 'delete')
+        assert set_ai_enabled('c', True)
+        settings = get_ai_settings('c')
+        assert settings['action'] == 'delete' and settings['enabled'] is True
+        assert settings['backend'] == 'openai'
+
+    def test_simple_setters(self):
+        from bot_core.services.rules_service import set_rules, get_rules
+        from bot_core.services.language_service import set_chat_language, get_chat_language
+        from bot_core.services.flood_service import set_flood_limit, get_flood_settings
+        for text in ('one', 'two'):
+            set_rules('c', text)
+        assert get_rules('c') == 'two'
+        set_chat_language('c', 'he')
+        set_chat_language('c', 'en')
+        assert get_chat_language('c') == 'en'
+        set_flood_limit('c', 3, 5)
+        set_flood_limit('c', 4, 6)
+        assert get_flood_settings('c')['limit'] == 4
+
+    def test_blacklist_add_is_idempotent(self):
+        from bot_core.services.blacklist_service import add_blacklist_word, get_blacklist_words
+        assert add_blacklist_word('c', 'Spam')
+        assert add_blacklist_word('c', 'spam')
+        assert get_blacklist_words('c') == ['Spam']
+
+
+class TestSingleStatement:
+    """Test setters issue one statement and tolerate parallel writers"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, test_db):
+        from sqlalchemy import event
+        from bot_core.database import engine
+        self.statements = []
+        listener = lambda conn, cursor, statement, *args: self.statements.append(statement)
+        event.listen(engine, 'before_cursor_execute', listener)
+        yield
+        event.remove(engine, 'before_cursor_execute', listener)
+
+    def test_setters_issue_one_statement(self):
+        from bot_core.services.rules_service import set_rules
+        from bot_core.services.blacklist_service import add_blacklist_word
+        set_rules('c', 'be nice')
+        set_rules('c', 'be kind')
+        add_blacklist_word('c', 'spam')
+        assert len(self.statements) == 3
+        assert not any(s.lstrip().upper().startswith('SELECT') for s in self.statements)
+
+    def test_parallel_setters(self):
+        from bot_core.services.locks_service import set_lock, get_locks
+        errors = []
+
+        def worker(lock_type):
+            try:
+                for _ in range(10):
+                    set_lock('race', lock_type, True)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker, args=(t,)) for t in ('links', 'stickers', 'media', 'all')]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert errors == []
+        assert all(get_locks('race').values())
@@ -170,3 +170,76 @@ class TestWarnServiceEdgeCases:
         """Test setting large warn limit"""
         self.set_warn_limit('chat', 100)
         assert self.get_warn_limit('chat') == 100
+
+
+class TestWarnCounters:
+    """Test the maintained per-user warn counter"""
+    
+    @pytest.fixture(autouse=True)
+    def setup(self, test_db):
+        """Setup for each test"""
+        from bot_core.services import warn_service
+        self.service = warn_service
+        self.session = test_db
+        self.chat_id = 'counter_chat'
+        self.user_id = 'counter_user'
+    
+    def test_counter_tracks_warns_and_reset(self):
+        """Test the counter follows warns and resets"""
+        for i in range(3):
+            count, _ = self.service.warn_user(self.chat_id, self.user_id, 'User', f"r{i}")
+            assert count == i + 1
+        assert self.service.get_warn_count(self.chat_id, self.user_id) == 3
+        assert self.service.reset_user_warns(self.chat_id, self.user_id) == 3
+        assert self.service.get_warn_count(self.chat_id, self.user_id) == 0
+        assert self.service.warn_user(self.chat_id, self.user_id, 'User')[0] == 1
+    
+    def test_counts_without_scanning_warns(self):
+        """Test reading the count does not touch the warns table"""
+        from sqlalchemy import event
+        from bot_core.database import engine
+        self.service.warn_user(self.chat_id, self.user_id, 'User')
+        statements = []
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(engine, 'before_cursor_execute', listener)
+        try:
+            self.service.get_user_warns(self.chat_id, self.user_id)
+        finally:
+            event.remove(engine, 'before_cursor_execute', listener)
+        assert not any('FROM warns' in s for s in statements)
+    
+    def test_get_warns_paging(self):
+        """Test warn history paging"""
+        for i in range(5):
+            self.service.warn_user(self.chat_id, self.user_id, 'User', f"r{i}")
+        page = self.service.get_warns(self.chat_id, self.user_id, limit=2, offset=3)
+        assert [w.reason for w in page] == ['r3', 'r4']
+        assert len(self.service.get_warns(self.chat_id, self.user_id)) == 5
+    
+    def test_backfill_from_existing_warns(self):
+        """Test counters are built for warns recorded before the counter table"""
+        from bot_core.db_models import Warn, WarnCount
+        self.session.add_all([Warn(chat_id=self.chat_id, user_id=self.user_id) for _ in range(2)])
+        self.session.add(Warn(chat_id=self.chat_id, user_id='other'))
+        self.session.commit()
+        self.service.backfill_warn_counts()
+        assert self.service.get_warn_count(self.chat_id, self.user_id) == 2
+        assert self.service.get_warn_count(self.chat_id, 'other') == 1
+        # Existing counters are never overwritten
+        self.session.query(WarnCount).filter_by(user_id='other').update({'count': 7})
+        self.session.commit()
+        self.service.backfill_warn_counts()
+        assert self.service.get_warn_count(self.chat_id, 'other') == 7
+    
+    def test_warns_command_lists_latest_page(self):
+        """Test /warns shows the total and only the latest page"""
+        from unittest.mock import MagicMock
+        from bot_core.shared_bot_logic import SharedBotLogic
+        for i in range(self.service.WARNS_PAGE_SIZE + 2):
+            self.service.warn_user(self.chat_id, self.user_id, 'User', f"reason {i}")
+        actions = MagicMock()
+        SharedBotLogic(actions).cmd_warns(self.chat_id, self.user_id, {})
+        msg = actions.send_message.call_args.args[1]
+        assert f"({self.service.WARNS_PAGE_SIZE + 2}/3)" in msg
+        assert 'reason 0\n' not in msg and 'reason 1\n' not in msg
+        assert f"{self.service.WARNS_PAGE_SIZE + 2}. reason {self.service.WARNS_PAGE_SIZE + 1}" in msg
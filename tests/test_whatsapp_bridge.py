@@ -475,3 +475,61 @@ class TestBridgeClientHelpers:
     def test_format_mention(self):
         from bot_core.whatsapp_bridge_client import WhatsAppBridgeClient
         assert WhatsAppBridgeClient.format_mention("972501234567") == "@972501234567"
+
+
+class TestWebhookIntake:
+    """Tests for queued webhook intake"""
+    
+    def _client(self, **kwargs):
+        from bot_core.whatsapp_bridge_client import WhatsAppBridgeClient
+        client = WhatsAppBridgeClient(bridge_url="http://localhost:3000", **kwargs)
+        return client, client.create_callback_app().test_client()
+    
+    def test_webhook_returns_before_handlers_run(self):
+        """Test the webhook acknowledges immediately and workers run handlers"""
+        import threading
+        client, http = self._client(webhook_workers=2)
+        release = threading.Event()
+        seen = []
+        client.on_message(lambda msg: (release.wait(2), seen.append(msg['body'])))
+        client.webhook_queue.start()
+        
+        response = http.post('/webhook', json={'type': 'message', 'data': {'body': 'hi'}})
+        assert response.status_code == 200
+        assert response.get_json()['status'] == 'queued'
+        assert seen == []
+        
+        release.set()
+        assert client.webhook_queue.join(timeout=2)
+        assert seen == ['hi']
+        stats = http.get('/webhook/stats').get_json()
+        assert stats['processed'] == 1
+        assert stats['depth'] == 0
+        client.webhook_queue.stop()
+    
+    def test_backpressure_when_full(self):
+        """Test a full queue answers 503 with Retry-After"""
+        from bot_core.webhook_queue import WebhookQueue
+        client, http = self._client(webhook_workers=1)
+        client.webhook_queue = WebhookQueue(client._dispatch_event, workers=1, lane_queue_size=1, enqueue_timeout=0)
+        
+        assert http.post('/webhook', json={'type': 'message', 'data': {}}).status_code == 200
+        response = http.post('/webhook', json={'type': 'message', 'data': {}})
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '1'
+        assert client.webhook_queue.stats()['rejected'] == 1
+    
+    def test_inline_mode(self):
+        """Test webhook_workers=0 keeps handlers inline"""
+        client, http = self._client(webhook_workers=0)
+        seen = []
+        client.on_group_join(lambda data: seen.append(data['chatId']))
+        http.post('/webhook', json={'type': 'group_join', 'chatId': 'g@g.us'})
+        assert seen == ['g@g.us']
+    
+    def test_ready_event_is_handled_immediately(self):
+        """Test the ready signal bypasses the queue"""
+        client, http = self._client(webhook_workers=1)
+        http.post('/webhook', json={'type': 'ready'})
+        assert client._bridge_ready.is_set()
+        assert client.webhook_queue.stats()['enqueued'] == 0